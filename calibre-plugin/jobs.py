@@ -138,6 +138,7 @@ def do_download_for_worker(book,options,merge,notification=lambda x,y:x):
         from calibre_plugins.fanficfare_plugin.wordcount import get_word_count
         from fanficfare import adapters, writers
         from fanficfare.epubutils import get_update_data
+        from fanficfare.spillfile import parse_budget
         from fanficfare.six import text_type as unicode
 
         from calibre_plugins.fanficfare_plugin.fff_util import get_fff_config
@@ -280,7 +281,8 @@ def do_download_for_worker(book,options,merge,notification=lambda x,y:x):
                  adapter.calibrebookmark,
                  adapter.logfile,
                  adapter.oldchaptersmap,
-                 adapter.oldchaptersdata) = get_update_data(book['epub_for_update'])[0:9]
+                 adapter.oldchaptersdata) = get_update_data(book['epub_for_update'],
+                                                            image_memory_budget=parse_budget(adapter.getConfig('image_memory_budget')))[0:9]
 
                 # dup handling from fff_plugin needed for anthology updates & BG metadata.
                 if book['collision'] in (UPDATE,UPDATEALWAYS):
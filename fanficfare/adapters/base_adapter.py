@@ -37,7 +37,7 @@ from ..htmlheuristics import replace_br_with_p
 
 logger = logging.getLogger(__name__)
 
-from ..story import Story
+from ..story import Story, get_chapter_text_pool, clean_chapter_html
 from ..requestable import Requestable
 from ..htmlcleanup import stripHTML, decode_email
 from ..exceptions import InvalidStoryURL, StoryDoesNotExist, HTTPErrorFFF
@@ -58,6 +58,145 @@ class TimeKeeper(defaultdict):
         keys = list(self.keys())
         keys.sort()
         return u"\n".join([ u"%s: %s"%(k,self[k]) for k in keys ])
+
+## Settings only used when the story is written, by the writers or
+## the story metadata, which copy_for_fileform() redoes.  Any other
+## setting may be used while the story is fetched.
+WRITE_SETTINGS = set(['allow_unsafe_filename',
+                      'always_overwrite',
+                      'calibre_series_meta',
+                      'chapter_end',
+                      'chapter_start',
+                      'cover_content',
+                      'epub_compress_threads',
+                      'epub_compression_level',
+                      'epub_deflate_images',
+                      'epub_version',
+                      'file_end',
+                      'file_start',
+                      'force_old_logpage_behavior',
+                      'include_logpage',
+                      'include_titlepage',
+                      'include_tocpage',
+                      'internalize_text_links',
+                      'logpage_at_end',
+                      'make_directories',
+                      'mobi_compression',
+                      'output_css',
+                      'output_filename',
+                      'output_filename_safepattern',
+                      'post_process_cmd',
+                      'post_process_safepattern',
+                      'titlepage_use_table',
+                      'use_old_cover',
+                      'wide_titlepage_entries',
+                      'windows_eol',
+                      'wrap_width',
+                      'zip_filename',
+                      'zip_output',
+                      ## story metadata
+                      'add_category_when_multi_category',
+                      'add_chapter_numbers',
+                      'add_genre_when_multi_category',
+                      'chapter_title_add_pattern',
+                      'chapter_title_addnew_pattern',
+                      'chapter_title_def_pattern',
+                      'chapter_title_new_pattern',
+                      'comma_entries',
+                      'conditionals_use_lists',
+                      'extra_subject_tags',
+                      'extra_valid_entries',
+                      'extratags',
+                      'include_subject_tags',
+                      'make_linkhtml_entries',
+                      'mark_new_chapters',
+                      'replace_metadata',
+                      'sort_ships',
+                      'sort_ships_splits',
+                      'title_chapter_range_pattern',
+                      ## copy_for_fileform() redoes the description.
+                      'description_limit',
+                      'keep_summary_html',
+                      ])
+WRITE_SETTING_PREFIXES = ('default_value_',
+                          'extra_logpage_',
+                          'extra_titlepage_',
+                          'include_in_',
+                          'join_string_',
+                          'keep_in_order_',
+                          'logpage_',
+                          'titlepage_',
+                          'tocpage_',
+                          )
+WRITE_SETTING_SUFFIXES = ('_format',
+                          '_label',
+                          )
+
+## Only used while fetching when include_images is on.
+IMAGE_SETTINGS = set(['nook_img_fix',
+                      'force_cover_image',
+                      'default_cover_image',
+                      'cover_exclusion_regexp',
+                      'never_make_cover',
+                      'make_firstimage_cover',
+                      'convert_inline_images',
+                      'additional_images',
+                      'no_image_processing',
+                      'no_image_processing_regexp',
+                      'dedup_img_files',
+                      'force_img_self_referer_regexp',
+                      'image_max_size',
+                      'grayscale_images',
+                      'convert_images_to',
+                      'remove_transparency',
+                      'background_color',
+                      'jpg_quality',
+                      'cover_min_size',
+                      ])
+
+def fileform_setting_keys(configuration):
+    '''
+    The settings in configuration's [fileform] and [site:fileform]
+    sections, add_to_ and _filelist taken off.
+    '''
+    keys = set()
+    suffix = ":"+configuration.fileform
+    for section in configuration.sectionslist:
+        if ( section == configuration.fileform or section.endswith(suffix) ) \
+                and configuration.has_section(section):
+            for key in configuration.options(section):
+                if key.startswith('__'): # configparser's __name__
+                    continue
+                if key.startswith('add_to_'):
+                    key = key[len('add_to_'):]
+                if key.endswith('_filelist'):
+                    key = key[:-len('_filelist')]
+                keys.add(key)
+    return keys
+
+def fetch_settings_differ(configuration,other):
+    '''
+    Returns the settings that configuration and other, for two
+    formats, would use differently while fetching a story.  When there
+    are none, one download can be written as both formats with
+    copy_for_fileform().
+    '''
+    keys = fileform_setting_keys(configuration) | fileform_setting_keys(other)
+    images = configuration.getConfig('include_images') or other.getConfig('include_images')
+    ## the CLI turns include_images off for some formats in
+    ## [overrides].  Unset is '' and false is False, both mean off.
+    retval = []
+    if bool(configuration.getConfig('include_images')) != bool(other.getConfig('include_images')):
+        retval.append('include_images')
+    keys.discard('include_images')
+    retval.extend( key for key in keys
+                   if key not in WRITE_SETTINGS
+                   and not key.startswith(WRITE_SETTING_PREFIXES)
+                   and not key.endswith(WRITE_SETTING_SUFFIXES)
+                   and (images or key not in IMAGE_SETTINGS)
+                   and configuration.getConfig(key) != other.getConfig(key) )
+    return sorted(retval)
+
 import inspect
 class BaseSiteAdapter(Requestable):
 
@@ -103,6 +242,10 @@ class BaseSiteAdapter(Requestable):
         ## for doing some performance profiling.
         self.times = TimeKeeper()
 
+        ## (url, description) as passed to setDescription(), for
+        ## copy_for_fileform() to redo it.
+        self.description_source = None
+
         ## Save class inheritence list in metadata.  Must be added to
         ## extra_valid_entries to use.
         cl = [ c.__name__ for c in inspect.getmro(self.__class__)[::-1] ]
@@ -227,6 +370,12 @@ class BaseSiteAdapter(Requestable):
             if self.oldchaptersmap:
                 self.oldchaptersmap = dict((self.normalize_chapterurl(key), value) for (key, value) in self.oldchaptersmap.items())
 
+            (pool,processes) = get_chapter_text_pool(self)
+            ## chapters are added in order as their text comes back
+            ## from clean_chapter_html().  A few are kept in the works
+            ## while the next ones download.
+            pending = []
+
             percent = 0.0
             per_step = 1.0/self.story.getChapterCount()
             # logger.debug("self.story.getChapterCount():%s per_step:%s"%(self.story.getChapterCount(),per_step))
@@ -298,7 +447,12 @@ class BaseSiteAdapter(Requestable):
                     ## XXX -- add chapter text replacement here?
                     ## No?  Want to be able to configure by [writer]
                     ## It's a soup or soup part?
-                self.story.addChapter(passchap, newchap)
+                pending.append((passchap, newchap,
+                                self.submit_chapter_html(pool,passchap['html'])))
+                while len(pending) > processes*2:
+                    self.add_pending_chapter(*pending.pop(0))
+            for args in pending:
+                self.add_pending_chapter(*args)
             self.storyDone = True
 
             # include image, but no cover from story, add default_cover_image cover.
@@ -334,6 +488,51 @@ class BaseSiteAdapter(Requestable):
         # logger.debug(u"getStory times:\n%s"%self.times)
         return self.story
 
+    def submit_chapter_html(self,pool,html):
+        '''
+        Starts clean_chapter_html() for chapter_text_processes.
+        Returns None when there's no pool or html isn't a string (error
+        chapters are soups) and addChapter() should clean it itself.
+        '''
+        if pool is None or not isinstance(html,basestring) or not html:
+            return None
+        try:
+            return pool.submit(clean_chapter_html,html,
+                               self.story.get_chapter_text_replacements())
+        except Exception as e:
+            logger.warning("chapter_text_processes failed, cleaning chapter here: %s"%e)
+            return None
+
+    def add_pending_chapter(self,passchap,newchap,future):
+        html_cleaned = False
+        if future is not None:
+            try:
+                passchap['html'] = future.result()
+                html_cleaned = True
+            except Exception as e:
+                logger.warning("chapter_text_processes failed, cleaning chapter here: %s"%e)
+        self.story.addChapter(passchap, newchap, html_cleaned=html_cleaned)
+
+    def copy_for_fileform(self,fileform):
+        '''
+        Returns an adapter for writing the already fetched story as
+        fileform, with that format's config sections applied to the
+        story metadata and description.  Nothing is fetched again, so
+        fetch_settings_differ() should find nothing for the formats.
+        '''
+        configuration = self.configuration.copy_for_fileform(fileform)
+        if configuration is self.configuration:
+            return self
+        adapter = copy.copy(self)
+        adapter.configuration = configuration
+        adapter.story = self.story.copy_for_configuration(configuration)
+        if self.description_source and \
+                any( self.getConfig(key) != adapter.getConfig(key)
+                     for key in ('keep_summary_html','description_limit') ):
+            (url,svalue) = self.description_source
+            adapter.setDescription(url,copy.copy(svalue))
+        return adapter
+
     def getStoryMetadataOnly(self,get_cover=True):
         if not self.metadataDone:
             try:
@@ -573,6 +772,8 @@ class BaseSiteAdapter(Requestable):
 
     def setDescription(self,url,svalue):
         #print("\n\nsvalue:\n%s\n"%svalue)
+        ## utf8FromSoup changes the soup, keep a copy.
+        self.description_source = (url,copy.copy(svalue))
         strval = u"%s"%svalue # works for either soup or string
         if self.hasConfig('description_limit'):
             if self.getConfig('keep_summary_html'):
@@ -641,6 +842,8 @@ class BaseSiteAdapter(Requestable):
         ## _do_utf8FromSoup broken out to separate copy & timing and
         ## allow for inherit override.
         retval = self._do_utf8FromSoup(url,soup,fetch,allow_replace_br_with_p)
+        ## waits for any images still being fetched in the background.
+        retval = self.story.resolve_img_placeholders(retval)
         self.times.add("utf8FromSoup", datetime.now() - start)
         return retval
 
@@ -701,8 +904,8 @@ class BaseSiteAdapter(Requestable):
                 try:
                     # some pre-existing epubs have img tags that had src stripped off.
                     if img.has_attr('src'):
-                        (img['src'],img['longdesc'])=self.story.addImgUrl(url,self.img_url_trans(img['src']),fetch,
-                                                                          coverexclusion=self.getConfig('cover_exclusion_regexp'))
+                        (img['src'],img['longdesc'])=self.story.queueImgUrl(url,self.img_url_trans(img['src']),fetch,
+                                                                            coverexclusion=self.getConfig('cover_exclusion_regexp'))
                 except AttributeError as ae:
                     logger.info("Parsing for img tags failed--probably poor input HTML.  Skipping img(%s)"%img)
         else:
@@ -48,6 +48,17 @@ from ..exceptions import BrowserCacheException
 CACHE_DIR_CONFIG="browser_cache_path"
 AGE_LIMIT_CONFIG="browser_cache_age_limit"
 
+## Max number of directory entries looked at when sampling a cache
+## dir for entry files.  Caches can have hundreds of thousands of
+## files, detection should not depend on that.
+CACHE_DIR_SAMPLE_LIMIT=64
+
+## (class name, cache dir) of dirs is_cache_dir() found valid.
+## get_fetcher() creates new fetchers (and BrowserCaches) for every
+## story, a dir only needs detecting once per process.  Only True is
+## kept--the browser may not have created its cache yet.
+_cache_dir_results = set()
+
 class BaseBrowserCache(object):
     """Base class to read various formats of web browser cache file"""
 
@@ -69,7 +80,7 @@ class BaseBrowserCache(object):
     @classmethod
     def new_browser_cache(cls, site, getConfig_fn, getConfigList_fn):
         """Return new instance of this BrowserCache class, or None if supplied directory not the correct cache type"""
-        if cls.is_cache_dir(cls.expand_cache_dir(getConfig_fn(CACHE_DIR_CONFIG))):
+        if cls.is_cache_dir_cached(cls.expand_cache_dir(getConfig_fn(CACHE_DIR_CONFIG))):
             try:
                 return cls(site,
                            getConfig_fn,
@@ -82,11 +93,48 @@ class BaseBrowserCache(object):
     def expand_cache_dir(cache_dir):
         return os.path.realpath(os.path.expanduser(cache_dir))
 
+    @classmethod
+    def is_cache_dir_cached(cls, cache_dir):
+        """is_cache_dir(), remembering valid dirs for the life of the process."""
+        key = (cls.__name__, cache_dir)
+        if key in _cache_dir_results:
+            return True
+        result = cls.is_cache_dir(cache_dir)
+        logger.debug("%s.is_cache_dir(%s):%s"%(cls.__name__,cache_dir,result))
+        if result:
+            _cache_dir_results.add(key)
+        return result
+
     @staticmethod
     def is_cache_dir(cache_dir):
-        """Check given dir is a valid cache."""
+        """
+        Check given dir is a valid cache.  Should only look at fixed
+        marker files and a small sample of entries, never the whole
+        directory.
+        """
         raise NotImplementedError()
 
+    @staticmethod
+    def sample_dir_entries(dir_path, name_re, limit=CACHE_DIR_SAMPLE_LIMIT):
+        """
+        Yield paths of up to limit entries in dir_path whose name
+        matches compiled regexp name_re.  Stops after looking at limit
+        directory entries regardless of how many matched.
+        """
+        try:
+            it = os.scandir(dir_path)
+        except OSError:
+            return
+        try:
+            for count, entry in enumerate(it):
+                if count >= limit:
+                    break
+                if name_re.match(entry.name):
+                    yield entry.path
+        finally:
+            if hasattr(it,'close'):
+                it.close()
+
     def get_data(self, url):
         """Return cached value for URL if found."""
         # logger.debug("get_data:%s"%url)
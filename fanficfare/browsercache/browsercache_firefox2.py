@@ -23,7 +23,7 @@ from __future__ import absolute_import
 import os
 import struct
 import hashlib
-import glob
+import re
 import datetime
 import time
 
@@ -36,6 +36,8 @@ from .share_open import share_open
 import logging
 logger = logging.getLogger(__name__)
 
+ENTRY_FILE_RE = re.compile(r'^[0-9A-Fa-f]{40}$')
+
 class FirefoxCache2(BaseBrowserCache):
     """Class to access data stream in Firefox Cache2 format cache files"""
 
@@ -69,12 +71,22 @@ class FirefoxCache2(BaseBrowserCache):
         # logger.debug("\n\n1Starting cache check\n\n")
         if not os.path.isdir(cache_dir):
             return False
-        ## check at least one entry file exists.
-        for en_fl in glob.iglob(os.path.join(cache_dir, 'entries', '????????????????????????????????????????')):
+        entries_dir = os.path.join(cache_dir, 'entries')
+        if not os.path.isdir(entries_dir):
+            return False
+        ## cache2 index file is enough when present.  It's not always
+        ## written yet while Firefox is running, so fall back to
+        ## checking a small sample of entry files.
+        if os.path.isfile(os.path.join(cache_dir, 'index')):
+            return True
+        for en_fl in FirefoxCache2.sample_dir_entries(entries_dir, ENTRY_FILE_RE):
             # logger.debug(en_fl)
-            k = _validate_entry_file(en_fl)
-            if k is not None:
-                return True
+            try:
+                if _validate_entry_file(en_fl) is not None:
+                    return True
+            except (struct.error, OSError):
+                # entry possibly being written
+                pass
         return False
 
     def make_keys(self,url):
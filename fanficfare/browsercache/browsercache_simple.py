@@ -41,6 +41,7 @@ FLAG_HAS_SHA256 = 2
 ENTRY_MAGIC_NUMBER = 0xfcfb6d1ba7725c30
 EOF_MAGIC_NUMBER = 0xf4fa6f45970d41d8
 THE_REAL_INDEX_MAGIC_NUMBER = 0x656e74657220796f
+ENTRY_FILE_RE = re.compile(r'^[0-9a-fA-F]{16}_[0-9]+$')
 
 class SimpleCache(BaseChromiumCache):
     """Class to access data stream in Chrome Simple Cache format cache files"""
@@ -59,7 +60,7 @@ class SimpleCache(BaseChromiumCache):
         ## hits and time.
         logger.debug("using scandir")
         for entry in os.scandir(self.cache_dir):
-            if re.match(r'^[0-9a-fA-F]{16}_[0-9]+$',os.path.basename(entry.path)):
+            if ENTRY_FILE_RE.match(os.path.basename(entry.path)):
                 with share_open(entry.path, "rb") as entry_file:
                     try:
                         file_key = _read_entry_file(entry.path,entry_file)
@@ -86,15 +87,15 @@ class SimpleCache(BaseChromiumCache):
         with share_open(real_index_file, 'rb') as index_file:
             if struct.unpack('QQ', index_file.read(16))[1] != THE_REAL_INDEX_MAGIC_NUMBER:
                 return False
-        try:
-            # logger.debug("\n\nStarting cache check\n\n")
-            for en_fl in glob.iglob(os.path.join(cache_dir, '????????????????_[0-9]*')):
-                k = _validate_entry_file(en_fl)
-                if k is not None:
+        ## check a valid entry file exists, looking at only a small
+        ## sample of the dir.
+        for en_fl in SimpleCache.sample_dir_entries(cache_dir, ENTRY_FILE_RE):
+            try:
+                if _validate_entry_file(en_fl) is not None:
                     return True
-        except SimpleCacheException:
-            # raise
-            return False
+            except (SimpleCacheException, struct.error):
+                # entry possibly being written
+                pass
         return False
 
     def get_data_key_impl(self, url, key):
@@ -21,6 +21,7 @@ from io import StringIO
 from optparse import OptionParser, SUPPRESS_HELP
 from os.path import expanduser, join, dirname
 from subprocess import call
+import copy
 import getpass
 import logging
 import pprint
@@ -44,9 +45,11 @@ if sys.version_info >= (2, 7):
 logger = logging.getLogger('fanficfare')
 
 from fanficfare import adapters, writers, exceptions
+from fanficfare.adapters.base_adapter import fetch_settings_differ
 from fanficfare.configurable import Configuration
 from fanficfare.epubutils import (
     get_dcsource_chaptercount, get_update_data, reset_orig_chapters_epub)
+from fanficfare.spillfile import parse_budget
 from fanficfare.geturls import get_urls_from_page, get_urls_from_imap
 from fanficfare.six.moves import configparser
 from fanficfare.six import text_type as unicode
@@ -64,12 +67,21 @@ def write_story(config, adapter, writeformat,
     del writer
     return output_filename
 
+def post_process(config, adapter, output_filename):
+    if config.getConfig('post_process_cmd'):
+        if config.getConfig('post_process_safepattern'):
+            metadata = adapter.story.get_filename_safe_metadata(pattern=config.getConfig('post_process_safepattern'))
+        else:
+            metadata = adapter.story.getAllMetadata()
+        metadata['output_filename'] = output_filename
+        call(string.Template(config.getConfig('post_process_cmd')).substitute(metadata), shell=True)
+
 def mkParser(calibre, parser=None):
     # read in args, anything starting with -- will be treated as --<varible>=<value>
     if not parser:
         parser = OptionParser('usage: %prog [options] [STORYURL]...')
     parser.add_option('-f', '--format', dest='format', default='epub',
-                      help='Write story as FORMAT, epub(default), mobi, txt or html.', metavar='FORMAT')
+                      help='Write story as FORMAT, epub(default), mobi, txt or html.  Give more than one, like epub,html,txt, to write each from the same download where their download settings allow.', metavar='FORMAT')
     if calibre:
         config_help = 'calibre plugin defaults.ini, calibre plugin personal.ini'
     else:
@@ -199,6 +211,13 @@ def expandOptions(options):
                              options.normalize,
                              ))
 
+    # -f epub,html,txt downloads once and writes each format, unless
+    # they differ in settings used while downloading.  See
+    # format_groups().
+    options.formats = [ f.strip() for f in options.format.split(',') if f.strip() ]
+    if options.formats:
+        options.format = options.formats[0]
+
     # options.updatealways should also invoke most options.update logic.
     if options.updatealways:
         options.update = True
@@ -211,10 +230,10 @@ def validateOptions(parser, options, args):
                                            options.downloadlist))):
         parser.error('Incorrect arguments: Cannot download and list URLs at the same time.')
 
-    if options.update and options.format != 'epub':
+    if options.update and options.formats != ['epub']:
         parser.error('-u/--update-epub/-U/--update-epub-always only work with epub')
 
-    if options.unnew and options.format != 'epub':
+    if options.unnew and options.formats != ['epub']:
         parser.error('--unnew only works with epub')
 
     if not options.list_only and not (args or any((options.infile,
@@ -384,6 +403,21 @@ def do_download(arg,
                                       chaptercount,
                                       output_filename)
 
+    if len(options.formats) > 1:
+        groups = format_groups(url,
+                               passed_defaultsini,
+                               passed_personalini,
+                               options)
+        if len(groups) > 1:
+            for formats in groups:
+                do_download(arg,
+                            formats_options(options, formats),
+                            passed_defaultsini,
+                            passed_personalini,
+                            warn,
+                            fail)
+            return
+
     try:
         # Allow chapter range with URL.
         # like test1.com?sid=5[4-6] or [4,6]
@@ -486,7 +520,8 @@ def do_download(arg,
                  adapter.calibrebookmark,
                  adapter.logfile,
                  adapter.oldchaptersmap,
-                 adapter.oldchaptersdata) = (get_update_data(output_filename))[0:9]
+                 adapter.oldchaptersdata) = (get_update_data(output_filename,
+                                                             image_memory_budget=parse_budget(adapter.getConfig('image_memory_budget'))))[0:9]
 
                 print('Do update - epub(%d) vs url(%d)' % (chaptercount, urlchaptercount))
 
@@ -502,6 +537,9 @@ def do_download(arg,
                 output_filename = write_story(configuration, adapter, 'epub',
                                               nooutput=options.nooutput)
 
+            if not options.metaonly:
+                post_process(configuration, adapter, output_filename)
+
         else:
             if not options.metaonly and adapter.getConfig('pre_process_cmd'):
                 if adapter.getConfig('pre_process_safepattern'):
@@ -510,8 +548,18 @@ def do_download(arg,
                     metadata = adapter.story.getAllMetadata()
                 call(string.Template(adapter.getConfig('pre_process_cmd')).substitute(metadata), shell=True)
 
-            output_filename = write_story(configuration, adapter, options.format,
-                                          metaonly=options.metaonly, nooutput=options.nooutput)
+            ## The story is only fetched once, then each format is
+            ## written from it with its own [format] sections.
+            ## format_groups() made sure that gives the same output
+            ## as downloading each format by itself.
+            output_filenames = []
+            for writeformat in options.formats:
+                writeadapter = adapter.copy_for_fileform(writeformat)
+                output_filenames.append(write_story(writeadapter.configuration, writeadapter, writeformat,
+                                                    metaonly=options.metaonly, nooutput=options.nooutput))
+                if not options.metaonly:
+                    post_process(writeadapter.configuration, writeadapter, output_filenames[-1])
+            output_filename = output_filenames[0]
 
             if options.metaonly and not options.jsonmeta:
                 metadata = adapter.getStoryMetadataOnly().getAllMetadata()
@@ -529,14 +577,6 @@ def do_download(arg,
                     del metadata['output_css']
                 pprint.pprint(metadata)
 
-        if not options.metaonly and adapter.getConfig('post_process_cmd'):
-            if adapter.getConfig('post_process_safepattern'):
-                metadata = adapter.story.get_filename_safe_metadata(pattern=adapter.getConfig('post_process_safepattern'))
-            else:
-                metadata = adapter.story.getAllMetadata()
-            metadata['output_filename'] = output_filename
-            call(string.Template(adapter.getConfig('post_process_cmd')).substitute(metadata), shell=True)
-
         if options.jsonmeta or options.jsonmetafile:
             metadata = adapter.getStoryMetadataOnly().getAllMetadata()
             metadata['output_filename'] = output_filename
@@ -567,6 +607,37 @@ def do_download(arg,
     except exceptions.AccessDenied as ad:
         fail(ad)
 
+def formats_options(options, formats):
+    formatoptions = copy.copy(options)
+    formatoptions.formats = formats
+    formatoptions.format = formats[0]
+    return formatoptions
+
+def format_groups(url,
+                  passed_defaultsini,
+                  passed_personalini,
+                  options):
+    '''
+    Splits options.formats into lists of formats that can be written
+    from one download--those that use no setting differently while
+    fetching (fetch_settings_differ()) than the first of the list.
+    Others would come out differently than when downloaded by
+    themselves.
+    '''
+    groups = []
+    for writeformat in options.formats:
+        configuration = get_configuration(url,
+                                          passed_defaultsini,
+                                          passed_personalini,
+                                          formats_options(options, [writeformat]))
+        for (groupconfiguration, formats) in groups:
+            if not fetch_settings_differ(groupconfiguration, configuration):
+                formats.append(writeformat)
+                break
+        else:
+            groups.append((configuration, [writeformat]))
+    return [ formats for (groupconfiguration, formats) in groups ]
+
 def get_configuration(url,
                       passed_defaultsini,
                       passed_personalini,
@@ -635,7 +706,7 @@ def get_configuration(url,
 
     # images only for epub, even if the user mistakenly turned it
     # on else where.
-    if options.format not in ('epub', 'html'):
+    if not set(options.formats) & set(('epub', 'html')):
         configuration.set('overrides', 'include_images', 'false')
 
     if options.options:
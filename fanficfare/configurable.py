@@ -19,6 +19,7 @@ from __future__ import absolute_import
 import sys
 import re
 import codecs
+import copy
 
 # py2 vs py3 transition
 from . import six
@@ -216,7 +217,9 @@ def get_valid_set_options():
                'use_ssl_default_seclevelone':(None,None,boollist),
                'use_cloudscraper':(None,None,boollist),
                'use_basic_cache':(None,None,boollist),
+               'use_negative_cache':(None,None,boollist),
                'use_nsapa_proxy':(None,None,boollist),
+               'nsapa_proxy_keepalive':(None,None,boollist),
                'use_flaresolverr_proxy':(None,None,boollist+['withimages','directimages']),
                'use_flaresolverr_session':(None,None,boollist),
 
@@ -228,6 +231,8 @@ def get_valid_set_options():
                'open_pages_in_browser':(None,None,boollist),
 
                'continue_on_chapter_error':(None,None,boollist),
+               'chapter_memory_budget':(None,None,None),
+               'chapter_text_processes':(None,None,None),
                'conditionals_use_lists':(None,None,boollist),
                'dedup_chapter_list':(None,None,boollist),
 
@@ -283,6 +288,10 @@ def get_valid_set_options():
 
                'calibre_series_meta':(None,['epub'],boollist),
                'force_update_epub_always':(None,['epub'],boollist),
+               'epub_compression_level':(None,['epub'],None),
+               'epub_deflate_images':(None,['epub'],boollist),
+               'epub_compress_threads':(None,['epub'],None),
+               'mobi_compression':(None,['mobi'],boollist),
 
                'windows_eol':(None,['txt'],boollist),
 
@@ -292,6 +301,11 @@ def get_valid_set_options():
                'grayscale_images':(None,['epub','html'],boollist),
                'no_image_processing':(None,['epub','html'],boollist),
                'dedup_img_files':(None,['epub','html'],boollist),
+               'image_fetch_threads':(None,['epub','html'],None),
+               'image_convert_processes':(None,['epub','html'],None),
+               'image_memory_budget':(None,['epub','html'],None),
+               'converted_image_cache_dir':(None,['epub','html'],None),
+               'converted_image_cache_max_size':(None,['epub','html'],None),
                'convert_inline_images':(None,['epub','html'],boollist),
                'fix_relative_text_links':(None,['epub','html'],boollist),
                'normalize_text_links':(None,['epub','html'],boollist),
@@ -487,6 +501,11 @@ def get_valid_keywords():
                  'no_image_processing',
                  'no_image_processing_regexp',
                  'dedup_img_files',
+                 'image_fetch_threads',
+                 'image_convert_processes',
+                 'image_memory_budget',
+                 'converted_image_cache_dir',
+                 'converted_image_cache_max_size',
                  'convert_inline_images',
                  'non_breaking_spaces',
                  'download_text_version',
@@ -542,12 +561,16 @@ def get_valid_keywords():
                  'https_proxy',
                  'use_cloudscraper',
                  'use_basic_cache',
+                 'use_negative_cache',
+                 'negative_cache_ttl',
+                 'negative_cache_host_threshold',
                  'use_browser_cache',
                  'use_browser_cache_only',
                  'open_pages_in_browser',
                  'use_nsapa_proxy',
                  'nsapa_proxy_address',
                  'nsapa_proxy_port',
+                 'nsapa_proxy_keepalive',
                  'use_flaresolverr_proxy',
                  'flaresolverr_proxy_address',
                  'flaresolverr_proxy_port',
@@ -555,6 +578,7 @@ def get_valid_keywords():
                  'flaresolverr_proxy_timeout',
                  'use_flaresolverr_session',
                  'flaresolverr_session',
+                 'flaresolverr_session_pool_size',
                  'browser_cache_path',
                  'browser_cache_age_limit',
                  'user_agent',
@@ -567,6 +591,8 @@ def get_valid_keywords():
                  'zip_output',
                  'capitalize_forumtags',
                  'continue_on_chapter_error',
+                 'chapter_memory_budget',
+                 'chapter_text_processes',
                  'chapter_title_error_mark',
                  'minimum_threadmarks',
                  'first_post_title',
@@ -611,6 +637,10 @@ def get_valid_keywords():
                  'max_zalgo',
                  'decode_emails',
                  'epub_version',
+                 'epub_compression_level',
+                 'epub_deflate_images',
+                 'epub_compress_threads',
+                 'mobi_compression',
                  'prepend_section_titles',
                  ])
 
@@ -651,6 +681,7 @@ class Configuration(ConfigParser):
         self.filelist_fetcher = None # used for _filelist
 
         self.lightweight = lightweight
+        self.fileform = fileform
 
         self.linenos=dict() # key by section or section,key -> lineno
 
@@ -711,6 +742,24 @@ class Configuration(ConfigParser):
                 self.addConfigSection(url,'overrides')
                 self.url_config_set=True
 
+    def copy_for_fileform(self,fileform):
+        '''
+        Returns a Configuration that reads the [fileform] and
+        [site:fileform] sections in place of this one's, but shares
+        everything else--ini data, caches, cookies and fetcher.  So
+        one downloaded story can be written in more than one format.
+        '''
+        if fileform == self.fileform:
+            return self
+        suffix = ":"+self.fileform
+        config = copy.copy(self)
+        config.fileform = fileform
+        config.sectionslist = [ fileform if section == self.fileform else
+                                section[:-len(suffix)]+":"+fileform if section.endswith(suffix) else
+                                section
+                                for section in self.sectionslist ]
+        return config
+
     def addConfigSection(self,section,before=None):
         if section not in self.sectionslist: # don't add if already present.
             if before is None:
@@ -1126,6 +1175,10 @@ class Configuration(ConfigParser):
             self.sleeper = fetchers.SleepDecorator()
             self.sleeper.decorate_fetcher(self.fetcher)
 
+            ## fails known bad URLs/hosts before sleeping.
+            if self.getConfig('use_negative_cache'):
+                fetchers.NegativeCacheDecorator().decorate_fetcher(self.fetcher)
+
             ## cache decorator terminates the chain when found.
             logger.debug("use_basic_cache:%s"%self.getConfig('use_basic_cache'))
             if self.getConfig('use_basic_cache') and self.basic_cache is not None:
@@ -22,6 +22,8 @@ from io import BytesIO
 
 import bs4
 
+from .spillfile import SpillDict
+
 def get_dcsource(inputio):
     return get_update_data(inputio,getfilecount=False,getsoups=False)[0]
 
@@ -35,7 +37,12 @@ def get_cover_data(inputio):
 
 def get_update_data(inputio,
                     getfilecount=True,
-                    getsoups=True):
+                    getsoups=True,
+                    image_memory_budget=None):
+    '''
+    image_memory_budget, in bytes, limits how much old image data is
+    kept in memory.  The rest is kept in a temporary file.
+    '''
     epub = ZipFile(inputio, 'r') # works equally well with inputio as a path or a blob
 
     ## Find the .opf file.
@@ -107,7 +114,7 @@ def get_update_data(inputio,
     filecount = 0
     soups = [] # list of xhmtl blocks
     urlsoups = {} # map of xhtml blocks by url
-    images = {} # dict() longdesc->data
+    images = SpillDict(image_memory_budget) # dict() longdesc->data
     datamaps = defaultdict(dict) # map of data maps by url
     if getfilecount:
         # spin through the manifest--only place there are item tags.
@@ -22,4 +22,5 @@ from .decorators import ( ProgressBarDecorator,
                           SleepDecorator )
 
 from .cache_basic import BasicCache, BasicCacheDecorator
+from .cache_negative import NegativeCache, NegativeCacheDecorator
 from .cache_browser import BrowserCacheDecorator
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2026 FanFicFare team
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from __future__ import absolute_import
+import copy
+import time
+import threading
+import logging
+logger = logging.getLogger(__name__)
+
+import requests
+
+from .. import exceptions
+from ..six.moves.urllib.parse import urlparse
+
+from .decorators import FetcherDecorator
+from .log import make_log
+
+## HTTP codes that mean the URL itself is gone.
+GONE_CODES = (404, 410)
+
+class NegativeCache(object):
+    """
+    Short lived record of failed fetches.  URLs that returned
+    404/410 or failed to connect are failed again immediately until
+    their TTL runs out.  A host that fails to connect threshold times
+    in a row is treated as down for all its URLs.
+    """
+    def __init__(self):
+        self.cache_lock = threading.RLock()
+        ## url -> (expires, exception)
+        self.urls = {}
+        ## host -> [consecutive connect failures, expires, exception]
+        self.hosts = {}
+
+    def clear(self):
+        with self.cache_lock:
+            self.urls = {}
+            self.hosts = {}
+
+    def get_failure(self,url):
+        """Return the cached exception for url, or None."""
+        now = time.time()
+        with self.cache_lock:
+            if url in self.urls:
+                (expires, exc) = self.urls[url]
+                if expires > now:
+                    return exc
+                del self.urls[url]
+            host = get_host(url)
+            if host in self.hosts:
+                (count, expires, exc) = self.hosts[host]
+                if exc is not None:
+                    if expires > now:
+                        return exc
+                    # give host another chance.
+                    del self.hosts[host]
+        return None
+
+    def add_url_failure(self,url,exc,ttl):
+        with self.cache_lock:
+            self.urls[url] = (time.time()+ttl, exc)
+
+    def add_host_failure(self,url,exc,ttl,threshold):
+        host = get_host(url)
+        with self.cache_lock:
+            count = self.hosts.get(host,[0])[0] + 1
+            if count >= threshold:
+                logger.warning("%s failed %s times, skipping it for %s seconds"%(host,count,ttl))
+                self.hosts[host] = [count, time.time()+ttl, exc]
+            else:
+                self.hosts[host] = [count, 0, None]
+
+    def add_success(self,url):
+        host = get_host(url)
+        with self.cache_lock:
+            if host in self.hosts:
+                del self.hosts[host]
+
+def fresh_exception(exc):
+    """
+    New exception with the same type, args and attributes as exc.
+    The cached one is never raised itself, raising sets its
+    __traceback__ and __context__ and it may be raised in other
+    threads at the same time.
+    """
+    try:
+        return copy.copy(exc)
+    except Exception:
+        return type(exc)(*exc.args)
+
+def get_host(url):
+    return (urlparse(url).hostname or '').lower()
+
+def is_connect_failure(e):
+    ## DNS failures, connection refused and connect timeouts all
+    ## come through as ConnectionErrors.  ReadTimeout doesn't.
+    return isinstance(e, (requests.exceptions.ConnectionError,
+                          ConnectionError))
+
+## Shared by all fetchers in the process, like pacing.
+_negative_cache = NegativeCache()
+
+def get_negative_cache():
+    return _negative_cache
+
+class NegativeCacheDecorator(FetcherDecorator):
+    def __init__(self,cache=None):
+        super(NegativeCacheDecorator,self).__init__()
+        self.cache = cache or get_negative_cache()
+
+    def fetcher_do_request(self,
+                           fetcher,
+                           chainfn,
+                           method,
+                           url,
+                           parameters=None,
+                           referer=None,
+                           usecache=True,
+                           image=False):
+        ## only GETs--POSTs are usually logins and shouldn't be
+        ## skipped.  Like BasicCache, usecache=False skips lookup but
+        ## still records the result.
+        if method != 'GET' or url.startswith('file:'):
+            return chainfn(
+                method,
+                url,
+                parameters=parameters,
+                referer=referer,
+                usecache=usecache,
+                image=image)
+
+        if usecache:
+            exc = self.cache.get_failure(url)
+            if exc is not None:
+                logger.debug(make_log('NegativeCache',method,url,hit=True))
+                raise fresh_exception(exc)
+
+        try:
+            ttl = float(fetcher.getConfig('negative_cache_ttl',600))
+            threshold = int(fetcher.getConfig('negative_cache_host_threshold',3))
+        except ValueError as e:
+            logger.warning("Bad negative_cache_ttl/negative_cache_host_threshold: %s"%e)
+            ttl, threshold = 600, 3
+
+        try:
+            fetchresp = chainfn(
+                method,
+                url,
+                parameters=parameters,
+                referer=referer,
+                usecache=usecache,
+                image=image)
+        except exceptions.HTTPErrorFFF as e:
+            if e.status_code in GONE_CODES:
+                self.cache.add_url_failure(url,e,ttl)
+            raise
+        except Exception as e:
+            if is_connect_failure(e):
+                self.cache.add_url_failure(url,e,ttl)
+                self.cache.add_host_failure(url,e,ttl,threshold)
+            raise
+        if not fetchresp.fromcache:
+            self.cache.add_success(url)
+        return fetchresp
@@ -22,6 +22,7 @@ import time
 from functools import partial
 
 from .log import make_log
+from .pacing import get_pacer
 
 import logging
 logger = logging.getLogger(__name__)
@@ -124,9 +125,18 @@ class SleepDecorator(FetcherDecorator):
                 t = float(fetcher.getConfig('slow_down_sleep_time'))
             ## sleep randomly between 0.5 time and 1.5 time.
             ## So 8 would be between 4 and 12.
+            rt = 0
             if t:
                 rt = random.uniform(t*0.5, t*1.5)
                 logger.debug("random sleep(%0.2f-%0.2f):%0.2f"%(t*0.5, t*1.5,rt))
+            ## never faster than the pace learned from the site's
+            ## 429/503 responses.
+            pacer = get_pacer(url)
+            pt = pacer.wait_time()
+            if pt > rt:
+                logger.debug("paced sleep:%0.2f (%s)"%(pt,pacer.state()))
+                rt = pt
+            if rt:
                 time.sleep(rt)
 
         return fetchresp
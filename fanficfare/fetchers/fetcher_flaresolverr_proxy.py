@@ -18,6 +18,8 @@
 import base64
 import time
 import json
+import threading
+import atexit
 import logging
 logger = logging.getLogger(__name__)
 
@@ -29,7 +31,7 @@ from .base_fetcher import FetcherResponse
 from .fetcher_requests import RequestsFetcher
 
 from ..six.moves.http_cookiejar import Cookie
-from ..six.moves.urllib.parse import urlencode
+from ..six.moves.urllib.parse import urlencode, urlparse
 from ..six import string_types as basestring, text_type, binary_type
 from ..six import ensure_binary, ensure_text
 
@@ -42,7 +44,6 @@ class FlareSolverr_ProxyFetcher(RequestsFetcher):
         super(FlareSolverr_ProxyFetcher, self).__init__(getConfig_fn,
                                                  getConfigList_fn)
         self.super_request = super(FlareSolverr_ProxyFetcher,self).request
-        self.fs_session = None
 
     def make_retries(self):
         retry = super(FlareSolverr_ProxyFetcher, self).make_retries()
@@ -51,46 +52,79 @@ class FlareSolverr_ProxyFetcher(RequestsFetcher):
         retry.total = 0
         return retry
 
-    def do_fs_request(self, cmd, url=None, headers=None, parameters=None):
-        if self.getConfig("use_flaresolverr_session",False) and not self.fs_session:
-            # manually setting the session causes FS to use that
-            # string as the session id.
-            resp = self.super_request('POST',
-                                      self.getConfig("flaresolverr_proxy_protocol", "http")+'://'+\
-                                      self.getConfig("flaresolverr_proxy_address", "localhost")+\
-                                          ':'+self.getConfig("flaresolverr_proxy_port", '8191')+'/v1',
-                                      headers={'Content-Type':'application/json'},
-                                      json={'cmd':'sessions.create',
-                                            'session':self.getConfig("flaresolverr_session",FLARESOLVERR_SESSION)}
-                                      )
-            # XXX check resp for error?  What errors could occur?
-            # logger.debug(json.dumps(resp.json, sort_keys=True,
-            #                         indent=2, separators=(',', ':')))
-            self.fs_session = resp.json['session']
+    def fs_url(self):
+        return self.getConfig("flaresolverr_proxy_protocol", "http")+'://'+\
+            self.getConfig("flaresolverr_proxy_address", "localhost")+\
+            ':'+self.getConfig("flaresolverr_proxy_port", '8191')+'/v1'
+
+    def fs_command(self, fs_data):
+        return self.super_request('POST',
+                                  self.fs_url(),
+                                  headers={'Content-Type':'application/json'},
+                                  json=fs_data,
+                                  )
+
+    def get_session_pool(self):
+        """
+        Sessions pools are shared by all fetchers in the process using
+        the same FlareSolverr server, so solved browser contexts
+        survive between stories.
+        """
+        try:
+            size = int(self.getConfig("flaresolverr_session_pool_size",4))
+        except ValueError:
+            size = 4
+        return get_session_pool(self.fs_url(),
+                                self.getConfig("flaresolverr_session",FLARESOLVERR_SESSION),
+                                size)
+
+    def create_session(self, name):
+        # manually setting the session causes FS to use that
+        # string as the session id.
+        resp = self.fs_command({'cmd':'sessions.create',
+                                'session':name})
+        # logger.debug(json.dumps(resp.json, sort_keys=True,
+        #                         indent=2, separators=(',', ':')))
+        if not resp.json or resp.json.get('status') != 'ok':
+            raise exceptions.FailedToDownload("FlareSolverr failed to create session %s: %s"%
+                                              (name,resp.json and resp.json.get('message')))
+        return resp.json.get('session',name)
 
+    def destroy_session(self, name):
+        try:
+            self.fs_command({'cmd':'sessions.destroy',
+                             'session':name})
+        except Exception as e:
+            logger.debug("FlareSolverr sessions.destroy(%s) failed: %s"%(name,e))
+
+    def do_fs_request(self, cmd, url=None, headers=None, parameters=None, fs_session=None):
+        cookies = filter_cookies(self.get_cookiejar(),url)
+        if fs_session:
+            ## the session's browser already has the cookies it was
+            ## given or set itself, only send the ones that changed.
+            cookies = fs_session.changed_cookies(cookies)
         fs_data = {'cmd': cmd,
                    'url':url,
                    #'userAgent': 'Mozilla/5.0',
                    'maxTimeout': int(self.getConfig("flaresolverr_proxy_timeout","59000")),
                    # download:True causes response to be base64 encoded
                    # which makes images work.
-                   'cookies':cookiejar_to_jsonable(filter_cookies(self.get_cookiejar(),url)),
+                   'cookies':cookiejar_to_jsonable(cookies),
                    'postData':encode_params(parameters),
                    }
         if self.getConfig('use_flaresolverr_proxy') == 'withimages':
             # download param removed in FlareSolverr v2+, but optional
             # for FFF users still on FlareSolver v1.
             fs_data['download'] = True
-        if self.fs_session:
-            fs_data['session']=self.fs_session
+        if fs_session:
+            fs_data['session']=fs_session.name
 
-        return self.super_request('POST',
-                                  self.getConfig("flaresolverr_proxy_protocol", "http")+'://'+\
-                                  self.getConfig("flaresolverr_proxy_address", "localhost")+\
-                                      ':'+self.getConfig("flaresolverr_proxy_port", '8191')+'/v1',
-                                  headers={'Content-Type':'application/json'},
-                                  json=fs_data,
-                                  )
+        resp = self.fs_command(fs_data)
+        if fs_session and resp.json and resp.json.get('status') == 'ok':
+            ## only a successful request is known to have given the
+            ## session's browser the cookies.
+            fs_session.update_cookies(cookies)
+        return resp
 
     def request(self, method, url, headers=None, parameters=None):
         '''Returns a FetcherResponse regardless of mechanism'''
@@ -101,8 +135,19 @@ class FlareSolverr_ProxyFetcher(RequestsFetcher):
             make_log('FlareSolverr_ProxyFetcher', method, url, hit='REQ', bar='-'))
         cmd = ('request.'+method).lower()
 
+        fs_session = None
+        pool = None
+        fs_ok = False
         try:
-            resp = self.do_fs_request(cmd, url, headers, parameters)
+            if self.getConfig("use_flaresolverr_session",False):
+                pool = self.get_session_pool()
+                fs_session = pool.acquire(urlparse(url).hostname,
+                                          self.create_session,
+                                          self.destroy_session)
+            resp = self.do_fs_request(cmd, url, headers, parameters, fs_session)
+            fs_ok = resp.json and resp.json.get('status') == 'ok'
+            if fs_session and fs_ok:
+                fs_session.update_cookies(cookiejson_to_jarable(resp.json.get('solution',{}).get('cookies',[])))
         except requests.exceptions.ConnectionError as ce:
             raise exceptions.FailedToDownload("Connection to flaresolverr proxy server failed.  Is flaresolverr started?")
         except exceptions.HTTPErrorFFF as he:
@@ -113,6 +158,13 @@ class FlareSolverr_ProxyFetcher(RequestsFetcher):
                                               "Flaresolverr says: "+jdata['message'])
             except:
                 raise
+        finally:
+            if fs_session:
+                ## don't keep sessions that errored, FlareSolverr may
+                ## have been restarted or the browser may be stuck.
+                pool.release(fs_session, discard=not fs_ok)
+                if not fs_ok:
+                    self.destroy_session(fs_session.name)
 
         if( resp.json['status'] == 'ok' and
             'solution' in resp.json and
@@ -177,14 +229,167 @@ class FlareSolverr_ProxyFetcher(RequestsFetcher):
 ## flaresolverr passes *all* cookies, not just domain appropriate
 ## ones.
 def filter_cookies(cookiejar,url):
+    """
+    Return cookies from cookiejar that a browser would send to url:
+    RFC 6265 domain-match and path-match, secure only over https and
+    not expired.
+    """
     retval = []
     logger.debug("url:%s"%url)
+    parsed = urlparse(url)
+    host = (parsed.hostname or '').lower()
+    path = parsed.path or '/'
+    now = time.time()
     for c in cookiejar:
         # logger.debug("domain: %s"%c.domain)
-        if c.domain in url:
-            retval.append(c)
+        if not domain_match(host,c.domain):
+            continue
+        if not path_match(path,c.path):
+            continue
+        if c.secure and parsed.scheme != 'https':
+            continue
+        if c.expires and c.expires > 0 and c.expires < now:
+            continue
+        retval.append(c)
     return retval
 
+def domain_match(host,domain):
+    domain = (domain or '').lower()
+    if domain.startswith('.'):
+        domain = domain[1:]
+    return host == domain or host.endswith('.'+domain)
+
+def path_match(path,cookie_path):
+    if not cookie_path or cookie_path == '/' or path == cookie_path:
+        return True
+    if path.startswith(cookie_path):
+        return cookie_path.endswith('/') or path[len(cookie_path)] == '/'
+    return False
+
+class FlareSolverrSession(object):
+    """
+    One named FlareSolverr session and the cookie state its browser
+    is known to have.
+    """
+    def __init__(self, name, domain):
+        self.name = name
+        self.domain = domain
+        self.busy = False
+        self.last_used = time.time()
+        ## (domain, path, name) -> value
+        self.cookies = {}
+
+    def changed_cookies(self, cookies):
+        return [ c for c in cookies
+                 if self.cookies.get((c.domain,c.path,c.name)) != c.value ]
+
+    def update_cookies(self, cookies):
+        for c in cookies:
+            self.cookies[(c.domain,c.path,c.name)] = c.value
+
+class FlareSolverrSessionPool(object):
+    """
+    Pool of up to max_sessions FlareSolverr sessions.  Sessions are
+    handed out per domain, one request at a time, so parallel
+    downloads each get their own browser context.  The least recently
+    used idle session is destroyed to make room for a new one.
+    """
+    def __init__(self, prefix, max_sessions):
+        self.prefix = prefix
+        self.max_sessions = max(1,max_sessions)
+        self.sessions = []
+        self.counter = 0
+        self.cond = threading.Condition()
+
+    def acquire(self, domain, create_fn, destroy_fn):
+        evict = None
+        with self.cond:
+            while True:
+                idle = [ s for s in self.sessions if not s.busy ]
+                for s in idle:
+                    if s.domain == domain:
+                        s.busy = True
+                        return s
+                if len(self.sessions) < self.max_sessions:
+                    break
+                if idle:
+                    evict = min(idle, key=lambda s:s.last_used)
+                    self.sessions.remove(evict)
+                    break
+                self.cond.wait()
+            self.counter += 1
+            session = FlareSolverrSession('%s-%s-%s'%(self.prefix,domain,self.counter),
+                                          domain)
+            session.busy = True
+            self.sessions.append(session)
+        ## FlareSolverr calls outside the lock, they can be slow.
+        if evict:
+            logger.debug("destroying FlareSolverr session %s"%evict.name)
+            destroy_fn(evict.name)
+        try:
+            logger.debug("creating FlareSolverr session %s"%session.name)
+            session.name = create_fn(session.name)
+        except:
+            with self.cond:
+                self.sessions.remove(session)
+                self.cond.notify()
+            raise
+        return session
+
+    def release(self, session, discard=False):
+        with self.cond:
+            session.busy = False
+            session.last_used = time.time()
+            if discard and session in self.sessions:
+                self.sessions.remove(session)
+            self.cond.notify()
+
+    def destroy_all(self, destroy_fn):
+        with self.cond:
+            sessions = self.sessions
+            self.sessions = []
+            self.cond.notify_all()
+        for session in sessions:
+            logger.debug("destroying FlareSolverr session %s"%session.name)
+            destroy_fn(session.name)
+
+_session_pools = {}
+_session_pools_lock = threading.Lock()
+
+def get_session_pool(fs_url, prefix, max_sessions):
+    with _session_pools_lock:
+        key = (fs_url, prefix)
+        if not _session_pools:
+            ## FlareSolverr keeps a browser open for every session
+            ## until told otherwise.
+            atexit.register(destroy_session_pools)
+        if key not in _session_pools:
+            _session_pools[key] = FlareSolverrSessionPool(prefix, max_sessions)
+        pool = _session_pools[key]
+        pool.max_sessions = max(1,max_sessions)
+        return pool
+
+def destroy_session_pools():
+    """
+    Destroy all the FlareSolverr sessions created by this process.
+    Registered with atexit when the first pool is made.
+    """
+    with _session_pools_lock:
+        pools = list(_session_pools.items())
+        _session_pools.clear()
+        if hasattr(atexit,'unregister'): # py3 only
+            atexit.unregister(destroy_session_pools)
+    for ((fs_url, prefix), pool) in pools:
+        def destroy_fn(name):
+            try:
+                requests.post(fs_url,
+                              json={'cmd':'sessions.destroy',
+                                    'session':name},
+                              timeout=10)
+            except Exception as e:
+                logger.debug("FlareSolverr sessions.destroy(%s) failed: %s"%(name,e))
+        pool.destroy_all(destroy_fn)
+
 def cookiejar_to_jsonable(cookiejar):
     retval = []
     for c in cookiejar:
@@ -16,6 +16,7 @@
 #
 
 import base64
+import binascii
 import time
 import logging
 
@@ -27,124 +28,93 @@ from .base_fetcher import FetcherResponse
 from .fetcher_requests import RequestsFetcher
 
 import socket
+import selectors
+
+END_OF_HEADER = b'$END_OF_HEADER$'
+## Requests on a persistent (nsapa_proxy_keepalive) connection are
+## framed by a newline so the proxy can tell where each URL ends.
+END_OF_REQUEST = b'\n'
+## header is size||type, a 1K limit is generous.
+MAX_HEADER_SIZE = 1024
+RECV_SIZE = 65536
 
 class NSAPA_ProxyFetcher(RequestsFetcher):
 
     def __init__(self, getConfig_fn, getConfigList_fn):
         super(NSAPA_ProxyFetcher, self).__init__(getConfig_fn,
                                                  getConfigList_fn)
+        ## only kept with nsapa_proxy_keepalive:true
+        self.proxy_socket = None
 
-    def proxy_request(self, url, timeout=5):
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.setblocking(True)
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    def proxy_address(self):
+        return (self.getConfig("nsapa_proxy_address", "127.0.0.1"),
+                int(self.getConfig("nsapa_proxy_port", 8888)))
 
+    def connect_proxy(self, timeout):
         try:
-            s.connect((self.getConfig("nsapa_proxy_address", "127.0.0.1"),
-                       int(self.getConfig("nsapa_proxy_port", 8888))))
-
+            s = socket.create_connection(self.proxy_address(), timeout)
         except socket.error as e:
             logger.error("proxy unavailable, socket error: %s", str(e))
             raise ConnectionError(
-                "nsapa_proxy: proxy %s:%i unavailable" %
-                (self.getConfig("nsapa_proxy_address", "127.0.0.1"),
-                 int(self.getConfig("nsapa_proxy_port", 8888))))
-
-        sent = s.sendall(url.encode('utf-8'))
-        if sent == 0:
-            logger.debug('connection lost while sending command')
-
-        header_raw = s.recv(1024)
-        header = header_raw.split(b'$END_OF_HEADER$')[0].decode('utf-8')
-
-        # If we received a part of the payload here, save it
-        # so we can inject it before the payload receive loop
-        pre_data = None
-        if len(header_raw.split(b'$END_OF_HEADER$')) > 1:
-            pre_data = header_raw.split(b'$END_OF_HEADER$')[1]
-
-        header_splited = header.split('||')
-        if len(header_splited) < 2:
-            raise exceptions.FailedToDownload(
-                'nsapa_proxy: proxy protocol violation; only %d headers' %
-                len(header_splited))
-
-        size_expected = 0
-        if header_splited[0].isnumeric():
-            size_expected = int(header_splited[0])
-        else:
-            raise exceptions.FailedToDownload(
-                'nsapa_proxy: proxy protocol violation; invalid size')
-
-        if size_expected == 0:
-            raise exceptions.FailedToDownload(
-                'nsapa_proxy: proxy sent empty content')
-
-        type_expected = header_splited[1]
-        if not type_expected.strip():
-            raise exceptions.FailedToDownload(
-                'nsapa_proxy: proxy protocol violation; invalid type')
-
-        logger.debug('expecting %i bytes of %s', size_expected, type_expected)
-
-        # Payload receive loop
-        bytes_recd = 0
-
-        #Based on code from https://code.activestate.com/recipes/408859/
-        #Licenced under PSF by John Nielsen
+                "nsapa_proxy: proxy %s:%i unavailable" % self.proxy_address())
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        ## reads are done through a selector with an explicit timeout.
         s.setblocking(False)
-        total_data = []
-        data = ''
-        begin = time.time()
-
-        if pre_data is not None:
-            if len(pre_data) > 0:
-                total_data.append(pre_data)
-                bytes_recd += len(pre_data)
-                logger.debug("injecting %i bytes from the first recv()",
-                             bytes_recd)
+        return s
 
-        while True:
-            # We received everything we expected
-            if bytes_recd == size_expected:
-                logger.debug('exiting receive loop after %i bytes', bytes_recd)
-                break
-            #if you got some data, then break after wait sec
-            if total_data and time.time() - begin > timeout:
-                logger.debug("timeout while receiving data")
-                break
-            #if you got no data at all, wait a little longer
-            elif time.time() - begin > timeout * 2:
-                logger.debug("socket timeout (%i seconds)", timeout)
-                break
+    def close_proxy_socket(self):
+        if self.proxy_socket is not None:
             try:
-                data = s.recv(8192)
-                if data:
-                    total_data.append(data)
-                    bytes_recd += len(data)
-                    begin = time.time()
-                else:
-                    time.sleep(0.1)
-            except:
+                self.proxy_socket.close()
+            except socket.error:
                 pass
-        #End of Code from https://code.activestate.com/recipes/408859/
-        logger.debug('leaving receive loop after %i bytes', bytes_recd)
-
-        s.close()
+            self.proxy_socket = None
 
-        if bytes_recd != size_expected:
-            # Truncated reply, log the issue
-            logger.error(
-                'truncated reply from proxy! Expected %i bytes, received %i!' %
-                (size_expected, bytes_recd))
+    def proxy_request(self, url, timeout=5):
+        keepalive = self.getConfig("nsapa_proxy_keepalive", False)
+        reused = keepalive and self.proxy_socket is not None
+        if reused:
+            s = self.proxy_socket
+        else:
+            s = self.connect_proxy(timeout)
+        try:
+            try:
+                (type_expected, payload) = self.proxy_exchange(s, url, timeout,
+                                                               keepalive)
+            except (socket.error, _ProxyConnectionClosed) as e:
+                if not reused or isinstance(e, socket.timeout):
+                    raise
+                ## proxy likely dropped the idle connection, try once
+                ## more on a new one.
+                logger.debug("persistent proxy connection lost (%s), reconnecting", e)
+                s.close()
+                s = self.connect_proxy(timeout)
+                (type_expected, payload) = self.proxy_exchange(s, url, timeout,
+                                                               keepalive)
+        except (socket.timeout, _ProxyConnectionClosed) as e:
+            ## short reads of the payload are already reported as
+            ## truncated by proxy_exchange(), this is before the header.
+            s.close()
+            self.proxy_socket = None
+            logger.error('no reply from proxy: %s', e)
             raise exceptions.FailedToDownload(
-                'nsapa_proxy: truncated reply from proxy')
+                'nsapa_proxy: no reply from proxy')
+        except (socket.error, exceptions.FailedToDownload):
+            ## includes connect_proxy() failing to reconnect.
+            ## connection state unknown, don't reuse.
+            s.close()
+            self.proxy_socket = None
+            raise
+        if keepalive:
+            self.proxy_socket = s
+        else:
+            s.close()
 
         if type_expected == 'text':
-            content = b''.join(total_data).decode("utf-8")
+            content = payload.decode("utf-8")
 
         if type_expected == 'text-b64':
-            content = b''.join(total_data).decode("utf-8")
+            content = payload.decode("utf-8")
             try:
                 content = base64.standard_b64decode(content)
             except binascii.Error:
@@ -152,7 +122,7 @@ class NSAPA_ProxyFetcher(RequestsFetcher):
                     'nsapa_proxy: base64 decoding failed')
 
         if type_expected == 'image':
-            content = b''.join(total_data)
+            content = payload
             #logger.debug('Got %i bytes of image', len(content))
 
         if type_expected == 'binary':
@@ -161,6 +131,82 @@ class NSAPA_ProxyFetcher(RequestsFetcher):
 
         return (type_expected, content)
 
+    def proxy_exchange(self, s, url, timeout, keepalive):
+        """
+        Send one request on socket s and return (type, payload bytes).
+        Reads exactly the size the proxy declares in its header.
+        """
+        request = url.encode('utf-8')
+        if keepalive:
+            request += END_OF_REQUEST
+        with selectors.DefaultSelector() as sel:
+            s.settimeout(timeout)
+            s.sendall(request)
+            s.setblocking(False)
+            sel.register(s, selectors.EVENT_READ)
+
+            # Header: size||type$END_OF_HEADER$, possibly followed by
+            # the start of the payload in the same read.
+            buf = b''
+            while END_OF_HEADER not in buf:
+                if len(buf) > MAX_HEADER_SIZE:
+                    raise exceptions.FailedToDownload(
+                        'nsapa_proxy: proxy protocol violation; header too long')
+                buf += _recv_some(sel, s, RECV_SIZE, timeout)
+            (header, pre_data) = buf.split(END_OF_HEADER, 1)
+            header = header.decode('utf-8')
+
+            header_splited = header.split('||')
+            if len(header_splited) < 2:
+                raise exceptions.FailedToDownload(
+                    'nsapa_proxy: proxy protocol violation; only %d headers' %
+                    len(header_splited))
+
+            size_expected = 0
+            if header_splited[0].isnumeric():
+                size_expected = int(header_splited[0])
+            else:
+                raise exceptions.FailedToDownload(
+                    'nsapa_proxy: proxy protocol violation; invalid size')
+
+            if size_expected == 0:
+                raise exceptions.FailedToDownload(
+                    'nsapa_proxy: proxy sent empty content')
+
+            type_expected = header_splited[1]
+            if not type_expected.strip():
+                raise exceptions.FailedToDownload(
+                    'nsapa_proxy: proxy protocol violation; invalid type')
+
+            logger.debug('expecting %i bytes of %s', size_expected, type_expected)
+
+            if len(pre_data) > size_expected:
+                ## only possible if the proxy sends more than one
+                ## reply per request.
+                raise exceptions.FailedToDownload(
+                    'nsapa_proxy: proxy protocol violation; reply longer than declared')
+            if pre_data:
+                logger.debug("injecting %i bytes from the first recv()",
+                             len(pre_data))
+            total_data = [pre_data]
+            bytes_recd = len(pre_data)
+            try:
+                while bytes_recd < size_expected:
+                    data = _recv_some(sel, s,
+                                      min(RECV_SIZE, size_expected - bytes_recd),
+                                      timeout)
+                    total_data.append(data)
+                    bytes_recd += len(data)
+            except (socket.timeout, _ProxyConnectionClosed) as e:
+                # Truncated reply, log the issue
+                logger.error(
+                    'truncated reply from proxy! Expected %i bytes, received %i! (%s)' %
+                    (size_expected, bytes_recd, e))
+                raise exceptions.FailedToDownload(
+                    'nsapa_proxy: truncated reply from proxy')
+            logger.debug('leaving receive loop after %i bytes', bytes_recd)
+        return (type_expected, b''.join(total_data))
+
     def request(self, method, url, headers=None, parameters=None):
         if method != 'GET':
             raise NotImplementedError
@@ -204,3 +250,26 @@ class NSAPA_ProxyFetcher(RequestsFetcher):
                 retry_count)
 
         return FetcherResponse(content, url, False)
+
+    def __del__(self):
+        self.close_proxy_socket()
+        super(NSAPA_ProxyFetcher, self).__del__()
+
+class _ProxyConnectionClosed(Exception):
+    pass
+
+def _recv_some(sel, s, size, timeout):
+    """
+    Wait up to timeout seconds for socket s to be readable, then
+    return what's available, up to size bytes.  Raises socket.timeout
+    if nothing arrives and _ProxyConnectionClosed on EOF.
+    """
+    if not sel.select(timeout):
+        raise socket.timeout("nsapa_proxy: no data in %s seconds" % timeout)
+    try:
+        data = s.recv(size)
+    except (BlockingIOError, InterruptedError):
+        return b''
+    if not data:
+        raise _ProxyConnectionClosed("connection closed by proxy")
+    return data
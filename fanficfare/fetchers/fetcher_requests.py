@@ -35,6 +35,11 @@ from requests_file import FileAdapter
 
 from .log import make_log
 from .base_fetcher import FetcherResponse, Fetcher
+from .pacing import get_pacer, parse_retry_after, THROTTLE_CODES, MAX_RETRY_AFTER
+
+## Retries for 429/503 responses, which are paced by HostPacer instead
+## of urllib3's Retry backoff.
+THROTTLE_RETRIES = 4
 
 class RequestsFetcher(Fetcher):
     def __init__(self,getConfig_fn,getConfigList_fn):
@@ -53,7 +58,10 @@ class RequestsFetcher(Fetcher):
                      other=0, # rather fail SSL errors/etc quick
                      backoff_factor=2,# factor 2=4,8,16sec
                      allowed_methods={'GET','POST'},
-                     status_forcelist={413, 429, 500, 502, 503, 504},
+                     ## 429 & 503 and Retry-After handled by
+                     ## HostPacer in request()
+                     status_forcelist={413, 500, 502, 504},
+                     respect_retry_after_header=False,
                      raise_on_status=False) # to match w/o retries behavior
 
     def make_sesssion(self):
@@ -118,13 +126,33 @@ class RequestsFetcher(Fetcher):
                 timeout = float(self.getConfig("connect_timeout",timeout))
             except Exception as e:
                 logger.error("connect_timeout setting failed: %s -- Using default value(%s)"%(e,timeout))
-            resp = self.get_requests_session().request(method, url,
-                                                       headers=headers,
-                                                       data=parameters,
-                                                       json=json,
-                                                       verify=self.use_verify(),
-                                                       timeout=timeout)
-            logger.debug("response code:%s"%resp.status_code)
+            ## no pacing for local files.
+            pacer = None if url.startswith('file:') else get_pacer(url)
+            throttle_retries = 0
+            while True:
+                if pacer:
+                    pacer.wait()
+                resp = self.get_requests_session().request(method, url,
+                                                           headers=headers,
+                                                           data=parameters,
+                                                           json=json,
+                                                           verify=self.use_verify(),
+                                                           timeout=timeout)
+                logger.debug("response code:%s"%resp.status_code)
+                if pacer is None:
+                    break
+                if resp.status_code not in THROTTLE_CODES:
+                    if resp.status_code < 400:
+                        pacer.succeeded()
+                    break
+                retry_after = parse_retry_after(resp.headers.get('Retry-After'))
+                pacer.throttled(retry_after)
+                if throttle_retries >= THROTTLE_RETRIES or \
+                        (retry_after is not None and retry_after > MAX_RETRY_AFTER):
+                    break
+                throttle_retries += 1
+                logger.debug("retry %s of %s after %s (Retry-After:%s)"%
+                             (throttle_retries,THROTTLE_RETRIES,resp.status_code,retry_after))
             resp.raise_for_status() # raises RequestsHTTPError if error code.
             # consider 'cached' if from file.
             fromcache = resp.url.startswith('file:')
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2026 FanFicFare team
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from __future__ import absolute_import
+import time
+import threading
+import email.utils
+import logging
+logger = logging.getLogger(__name__)
+
+from ..six.moves.urllib.parse import urlparse
+
+## HTTP codes that mean 'slow down' rather than 'broken'.
+THROTTLE_CODES = (429, 503)
+
+## First learned delay after a throttle with no Retry-After, and
+## ceiling for learned delays.  Seconds.
+MIN_DELAY = 1.0
+MAX_DELAY = 120.0
+## Longest Retry-After FFF will wait out.  Longer than this and the
+## request fails instead.
+MAX_RETRY_AFTER = 300.0
+## After this many successes in a row, delay is multiplied by
+## SPEEDUP_FACTOR.
+SPEEDUP_AFTER = 10
+SPEEDUP_FACTOR = 0.75
+
+def parse_retry_after(value, now=None):
+    """
+    Return seconds to wait from a Retry-After header value, either
+    delta-seconds or an HTTP-date.  None if missing or unparsable.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_tz(value)
+        if date is None:
+            return None
+        if now is None:
+            now = time.time()
+        return max(0.0, email.utils.mktime_tz(date) - now)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+class HostPacer(object):
+    """
+    Adaptive pace for requests to one host.  A throttle response
+    (429/503) doubles the delay kept between requests and honors
+    Retry-After.  SPEEDUP_AFTER successes in a row shrink it again,
+    so long batches settle near the fastest pace the site accepts.
+    """
+    def __init__(self, host):
+        self.host = host
+        self.delay = 0.0
+        self.successes = 0
+        self.throttles = 0
+        self.last_request = 0.0
+        self.not_before = 0.0
+        self.lock = threading.Lock()
+
+    def wait_time(self, now=None):
+        if now is None:
+            now = time.time()
+        with self.lock:
+            return max(0.0,
+                       self.not_before - now,
+                       self.last_request + self.delay - now)
+
+    def wait(self):
+        """Sleep until the next request to host is allowed."""
+        t = self.wait_time()
+        if t > 0:
+            logger.debug("pacing %s: waiting %0.2f (%s)"%(self.host,t,self.state()))
+            time.sleep(t)
+        with self.lock:
+            self.last_request = time.time()
+
+    def throttled(self, retry_after=None):
+        with self.lock:
+            self.successes = 0
+            self.throttles += 1
+            self.delay = min(MAX_DELAY, max(MIN_DELAY, self.delay * 2))
+            if retry_after is not None:
+                ## requests asked to wait longer than MAX_RETRY_AFTER
+                ## fail, but shouldn't hold up the rest of the batch
+                ## for that long.
+                self.not_before = max(self.not_before,
+                                      time.time() + min(retry_after, MAX_RETRY_AFTER))
+        logger.info("%s throttled, slowing down (%s)"%(self.host,self.state()))
+
+    def succeeded(self):
+        with self.lock:
+            if self.delay <= 0.0:
+                return
+            self.successes += 1
+            if self.successes >= SPEEDUP_AFTER:
+                self.successes = 0
+                self.delay *= SPEEDUP_FACTOR
+                if self.delay < MIN_DELAY / 4:
+                    self.delay = 0.0
+                logger.debug("%s speeding up (delay:%0.2f)"%(self.host,self.delay))
+
+    def state(self):
+        return {'host':self.host,
+                'delay':round(self.delay,2),
+                'successes':self.successes,
+                'throttles':self.throttles,
+                'retry_after_remaining':round(max(0.0,self.not_before-time.time()),2)}
+
+## host -> HostPacer.  Kept for the life of the process so what's
+## learned carries over to the next story from the same site.
+_pacers = {}
+_pacers_lock = threading.Lock()
+
+def get_pacer(url):
+    host = (urlparse(url).hostname or '').lower()
+    with _pacers_lock:
+        if host not in _pacers:
+            _pacers[host] = HostPacer(host)
+        return _pacers[host]
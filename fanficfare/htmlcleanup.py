@@ -30,8 +30,11 @@ from .six import unichr
 from .six import PY2
 if PY2:
     from cgi import escape as htmlescape
+    from HTMLParser import HTMLParser
+    htmlunescape = HTMLParser().unescape
 else: # PY3
     from html import escape as htmlescape
+    from html import unescape as htmlunescape
 
 def _unirepl(match):
     "Return the unicode string for a decimal number"
@@ -167,23 +170,63 @@ def fix_excess_space(text):
 
     return text
 
+import sys
 import unicodedata
 ZALGO_CHAR_CATEGORIES = ['Mn', 'Me']
+
+## Patterns matching one ZALGO_CHAR_CATEGORIES code point, BMP only
+## and all, and compiled regexps by (max_zalgo,astral), made on
+## first use.  re is much slower with astral ranges in a class, so
+## they're only tried for astral characters in text that has any.
+_zalgo_classes = None
+_zalgo_res = {}
+_astral_re = re.compile(r'[^\u0000-\uffff]')
+
+def zalgo_char_classes():
+    global _zalgo_classes
+    if _zalgo_classes is None:
+        ranges = []
+        for i in range(sys.maxunicode+1):
+            if unicodedata.category(unichr(i)) in ZALGO_CHAR_CATEGORIES:
+                if ranges and ranges[-1][1] == i-1:
+                    ranges[-1][1] = i
+                else:
+                    ranges.append([i,i])
+        def char_class(ranges):
+            return '[' + ''.join( re.escape(unichr(a)) if a == b else
+                                  re.escape(unichr(a))+'-'+re.escape(unichr(b))
+                                  for (a,b) in ranges ) + ']'
+        bmp = char_class([ r for r in ranges if r[1] <= 0xffff ])
+        astral = [ r for r in ranges if r[1] > 0xffff ]
+        if astral:
+            _zalgo_classes = (bmp, '(?:%s|(?=%s)%s)'%(bmp,_astral_re.pattern,char_class(astral)))
+        else:
+            _zalgo_classes = (bmp, bmp)
+    return _zalgo_classes
+
+def zalgo_re(max_zalgo,astral):
+    if (max_zalgo,astral) not in _zalgo_res:
+        marks = zalgo_char_classes()[astral]
+        if max_zalgo > 0:
+            ## keep the first max_zalgo of each run of marks.
+            _zalgo_res[(max_zalgo,astral)] = (re.compile('(%s{%d})%s+'%(marks,max_zalgo,marks)),r'\1')
+        else:
+            _zalgo_res[(max_zalgo,astral)] = (re.compile(marks+'+'),'')
+    return _zalgo_res[(max_zalgo,astral)]
+
 def reduce_zalgo(text,max_zalgo=1):
     # borrows from https://stackoverflow.com/questions/22277052/how-can-zalgo-text-be-prevented
     # Also applies unicodedata.normalize('NFD')
     # See: https://docs.python.org/2/library/unicodedata.html#unicodedata.normalize
-    lineout=[]
-    count=0
-    for c in unicodedata.normalize('NFD', text):
-        if unicodedata.category(c) not in ZALGO_CHAR_CATEGORIES:
-            lineout.append(c)
-            count=0
-        else:
-            if count < max_zalgo:
-                lineout.append(c)
-            count+=1
-    return ''.join(lineout)
+    ## Same result as keeping at most max_zalgo of each run of
+    ## combining marks one character at a time, but done by regexp.
+    ## ASCII and already NFD text don't need normalizing.
+    if not text or (hasattr(text,'isascii') and text.isascii()):
+        return text
+    if not (hasattr(unicodedata,'is_normalized') and unicodedata.is_normalized('NFD', text)):
+        text = unicodedata.normalize('NFD', text)
+    (regexp,replacement) = zalgo_re(max_zalgo,bool(_astral_re.search(text)))
+    return regexp.sub(replacement,text)
 
 def parse_hex(n, c):
     r = n[c:c+2]
@@ -562,3 +605,98 @@ entities = { '&aacute;' : 'á',
          '&zwj;' : '‍',  # strange spacing control character, not just a space
          '&zwnj;' : '‌',  # strange spacing control character, not just a space
          }
+
+def a_tag_attrs(html,start):
+    '''
+    Reads the attributes of the tag name ending at html[start].
+    Returns ({name:(value start, value end)}, index of '>') with
+    value ends pointing just past any quotes, or None if the tag
+    isn't closed.
+    '''
+    attrs = {}
+    i = start
+    end = len(html)
+    while True:
+        while i < end and html[i] in ' \t\n\r\f/':
+            i += 1
+        if i >= end:
+            return None
+        if html[i] == '>':
+            return (attrs,i)
+        j = i
+        while j < end and html[j] not in ' \t\n\r\f/>=':
+            j += 1
+        name = html[i:j].lower()
+        while j < end and html[j] in ' \t\n\r\f':
+            j += 1
+        if j < end and html[j] == '=':
+            j += 1
+            while j < end and html[j] in ' \t\n\r\f':
+                j += 1
+            vstart = j
+            if j < end and html[j] in '"\'':
+                j = html.find(html[j],j+1)
+                if j < 0:
+                    return None
+                j += 1
+            else:
+                while j < end and html[j] not in ' \t\n\r\f>':
+                    j += 1
+            attrs.setdefault(name,(vstart,j))
+        else:
+            attrs.setdefault(name,None)
+        i = j
+
+def attr_value(html,span):
+    value = html[span[0]:span[1]]
+    if value[:1] in ('"',"'"):
+        value = value[1:-1]
+    return htmlunescape(value)
+
+def internalize_text_links(html,chapurlmap,keep_orighref=True):
+    '''
+    Points <a href>s to chapters in chapurlmap (url -> new href)
+    at the new href, scanning the text once without parsing it.
+    With keep_orighref, the original href is kept in data-orighref
+    and used instead of href when present, so links still work
+    when chapters are inserted on update.
+    '''
+    out = []
+    done = 0
+    pos = html.find('<a')
+    while pos >= 0:
+        found = a_tag_attrs(html,pos+2) if html[pos+2:pos+3] in (' ','\t','\n','\r','\f') else None
+        if found is None:
+            pos = html.find('<a',pos+2)
+            continue
+        (attrs,tagend) = found
+        ## new attributes go before the closing > or />
+        insert = tagend-1 if html[tagend-1] == '/' else tagend
+        href = attrs.get('href')
+        orighref = attrs.get('data-orighref') if keep_orighref else None
+        ## (start, end, new text) in order.
+        edits = []
+        if orighref and attr_value(html,orighref) in chapurlmap:
+            newhref = '"%s"'%chapurlmap[attr_value(html,orighref)]
+            if href:
+                edits.append((href[0],href[1],newhref))
+            else:
+                edits.append((insert,insert,' href='+newhref))
+        elif href and attr_value(html,href) in chapurlmap:
+            value = attr_value(html,href)
+            edits.append((href[0],href[1],'"%s"'%chapurlmap[value]))
+            if keep_orighref and not value.startswith('file'):
+                # only save orig href if not already internal.
+                if orighref:
+                    edits.append((orighref[0],orighref[1],html[href[0]:href[1]]))
+                else:
+                    edits.append((insert,insert,' data-orighref='+html[href[0]:href[1]]))
+        for (start,end,text) in sorted(edits):
+            out.append(html[done:start])
+            out.append(text)
+            done = end
+        pos = html.find('<a',tagend)
+    if not out:
+        return html
+    out.append(html[done:])
+    return ''.join(out)
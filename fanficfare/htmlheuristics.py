@@ -25,7 +25,7 @@ import bs4 as bs
 from .six import text_type as unicode
 from .six.moves import range
 
-from . import HtmlTagStack as stack
+from .HtmlTagStack import HtmlTagStack, get_tag_name
 
 def logdebug(s):
     # uncomment for debug output
@@ -71,8 +71,7 @@ def replace_br_with_p(body):
 
     # Find all existing blocks with p, pre and blockquote tags, we need to shields break tags inside those.
     # This is for "lenient" mode, however it is also used to clear break tags before and after the block elements.
-    blocksRegex = re.compile(r'(\s*<br\ />\s*)*\s*<(pre|p|blockquote|table)([^>]*)>(.+?)</\2>\s*(\s*<br\ />\s*)*', re.DOTALL)
-    body = blocksRegex.sub(r'\n<\2\3>\4</\2>\n', body)
+    body = shield_blocks(body)
 
     # if aggressive mode = true
         # blocksRegex = re.compile(r'(\s*<br\ */*>\s*)*\s*<(pre)([^>]*)>(.+?)</\2>\s*(\s*<br\ */*>\s*)*', re.DOTALL)
@@ -80,16 +79,6 @@ def replace_br_with_p(body):
         # body = re.sub(r'<blockquote([^>]*)>(.+?)</blockquote>', r'<blockquote\1><p>\2</p></blockquote>', body, re.DOTALL)
     # end aggressive mode
 
-    blocks = blocksRegex.finditer(body)
-    # For our replacements to work, we need to work backwards, so we reverse the iterator.
-    blocksList = []
-    for match in blocks:
-        blocksList.insert(0, match)
-
-    for match in blocksList:
-        group4 =  match.group(4).replace(u'<br />', u'{br /}')
-        body = body[:match.start(4)] + group4 + body[match.end(4):]
-
     # change surrounding div to a p and remove attrs Top surrounding
     # tag in all cases now should be div, to just strip the first and
     # last tags.
@@ -103,9 +92,12 @@ def replace_br_with_p(body):
     body = re.sub(r'\s*<hr[^>]+>\s*', r'\n<hr />\n', body)
 
     # Remove leading and trailing breaks from HR tags
-    body = re.sub(r'\s*(<br\ \/>)*\s*<hr\ \/>\s*(<br\ \/>)*\s*', r'\n<hr />\n', body)
+    # (these backtrack over every run of breaks, skip when they can't match.)
+    if u'<hr />' in body:
+        body = re.sub(r'\s*(<br\ \/>)*\s*<hr\ \/>\s*(<br\ \/>)*\s*', r'\n<hr />\n', body)
     # Nuking breaks leading paragraps that may be in the body. They are eventually treated as <p><br /></p>
-    body = re.sub(r'\s*(<br\ \/>)+\s*<p', r'\n<p></p>\n<p', body)
+    if u'<p' in body:
+        body = re.sub(r'\s*(<br\ \/>)+\s*<p', r'\n<p></p>\n<p', body)
     # Nuking breaks trailing paragraps that may be in the body. They are eventually treated as <p><br /></p>
     body = re.sub(r'</p>\s*(<br\ \/>)+\s*', r'</p>\n<p></p>\n', body)
 
@@ -116,112 +108,7 @@ def replace_br_with_p(body):
     # logdebug(u'BODY.......: ' + body)
     # logdebug(u'--- 2 ---')
 
-    # Because a leading or trailing non break tag will break the following code, we have to mess around rather badly for a few lines.
-    body = body.replace(u'[',u'&squareBracketStart;')
-    body = body.replace(u']',u'&squareBracketEnd;')
-    body = body.replace(u'<br />',u'[br /]')
-
-    breaksRegexp = [
-        re.compile(r'([^\]])(\[br\ \/\])([^\[])'),
-        re.compile(r'([^\]])(\[br\ \/\]){2}([^\[])'),
-        re.compile(r'([^\]])(\[br\ \/\]){3}([^\[])'),
-        re.compile(r'([^\]])(\[br\ \/\]){4}([^\[])'),
-        re.compile(r'([^\]])(\[br\ \/\]){5}([^\[])'),
-        re.compile(r'([^\]])(\[br\ \/\]){6}([^\[])'),
-        re.compile(r'([^\]])(\[br\ \/\]){7}([^\[])'),
-        re.compile(r'([^\]])(\[br\ \/\]){8}([^\[])'),
-        re.compile(r'(\[br\ \/\]){9,}')]
-
-    breaksCount = [
-        len(breaksRegexp[0].findall(body)),
-        len(breaksRegexp[1].findall(body)),
-        len(breaksRegexp[2].findall(body)),
-        len(breaksRegexp[3].findall(body)),
-        len(breaksRegexp[4].findall(body)),
-        len(breaksRegexp[5].findall(body)),
-        len(breaksRegexp[6].findall(body)),
-        len(breaksRegexp[7].findall(body))]
-
-    breaksMax = 0
-    breaksMaxIndex = 0;
-
-    for i in range(1,len(breaksCount)):
-        if breaksCount[i] >= breaksMax:
-            breaksMax = breaksCount[i]
-            breaksMaxIndex = i
-
-    lines = body.split(u'[br /]')
-    contentLines = 0;
-    contentLinesSum = 0;
-    longestLineLength = 0;
-    averageLineLength = 0;
-
-    for line in lines:
-        lineLen = len(line.strip())
-        if lineLen > 0:
-            contentLines += 1
-            contentLinesSum += lineLen
-            if lineLen > longestLineLength:
-                longestLineLength = lineLen
-
-    if contentLines == 0:
-        contentLines = 1
-
-    averageLineLength = contentLinesSum/contentLines
-
-    logdebug(u'---')
-    logdebug(u'Lines.............: ' + unicode(len(lines)))
-    logdebug(u'contentLines......: ' + unicode(contentLines))
-    logdebug(u'contentLinesSum...: ' + unicode(contentLinesSum))
-    logdebug(u'longestLineLength.: ' + unicode(longestLineLength))
-    logdebug(u'averageLineLength.: ' + unicode(averageLineLength))
-    logdebug(u'---')
-    logdebug(u'breaksMaxIndex....: ' + unicode(breaksMaxIndex))
-    logdebug(u'len(breaksCount)-1: ' + unicode(len(breaksCount)-1))
-    logdebug(u'breaksMax.........: ' + unicode(breaksMax))
-
-    if breaksMaxIndex == len(breaksCount)-1 and breaksMax < 2:
-        breaksMaxIndex = 0
-        breaksMax = breaksCount[0]
-
-    logdebug(u'---')
-    logdebug(u'breaks 1: ' + unicode(breaksCount[0]))
-    logdebug(u'breaks 2: ' + unicode(breaksCount[1]))
-    logdebug(u'breaks 3: ' + unicode(breaksCount[2]))
-    logdebug(u'breaks 4: ' + unicode(breaksCount[3]))
-    logdebug(u'breaks 5: ' + unicode(breaksCount[4]))
-    logdebug(u'breaks 6: ' + unicode(breaksCount[5]))
-    logdebug(u'breaks 7: ' + unicode(breaksCount[6]))
-    logdebug(u'breaks 8: ' + unicode(breaksCount[7]))
-    logdebug(u'----')
-    logdebug(u'max found: ' + unicode(breaksMax))
-    logdebug(u'max Index: ' + unicode(breaksMaxIndex))
-    logdebug(u'----')
-
-    if breaksMaxIndex > 0 and breaksCount[0] > breaksMax and averageLineLength < 90:
-        body = breaksRegexp[0].sub(r'\1 \n\3', body)
-
-    # Find all instances of consecutive breaks less than otr equal to the max count use most often
-    #  replase those tags to inverted p tag pairs, those with more connsecutive breaks are replaced them with a horisontal line
-    for i in range(len(breaksCount)):
-        # if i > 0 or breaksMaxIndex == 0:
-        if i <= breaksMaxIndex:
-            logdebug(unicode(i) + u' <= breaksMaxIndex (' + unicode(breaksMaxIndex) + u')')
-            body = breaksRegexp[i].sub(r'\1</p>\n<p>\3', body)
-        elif i == breaksMaxIndex+1:
-            logdebug(unicode(i) + u' == breaksMaxIndex+1 (' + unicode(breaksMaxIndex+1) + u')')
-            body = breaksRegexp[i].sub(r'\1</p>\n<p><br/></p>\n<p>\3', body)
-        else:
-            logdebug(unicode(i) + u' > breaksMaxIndex+1 (' + unicode(breaksMaxIndex+1) + u')')
-            body = breaksRegexp[i].sub(r'\1</p>\n<hr />\n<p>\3', body)
-
-    body = breaksRegexp[8].sub(r'</p>\n<hr />\n<p>', body)
-
-    # Reverting the square brackets
-    body = body.replace(u'[', u'<')
-    body = body.replace(u']', u'>')
-    body = body.replace(u'&squareBracketStart;', u'[')
-    body = body.replace(u'&squareBracketEnd;', u']')
+    body = replace_break_runs(body)
 
     body = body.replace(u'{p}', u'<p>')
     body = body.replace(u'{/p}', u'</p>')
@@ -265,6 +152,150 @@ def replace_br_with_p(body):
     ## will be.
     return u'<!-- ' +was_run_marker+ u' -->\n' + tag_sanitizer(body)
 
+BR = u'<br />'
+break_runs_re = re.compile(r'(?:<br\ />)+')
+
+def matching_runs(body,runs,length,replaced):
+    """
+    Indexes of the runs of exactly length breaks that one pass of
+    ([^\]])(\[br\ \/\]){length}([^\[]) over the old bracketed body
+    matched: not at the start or end, not already replaced, and not
+    when the one character before it was taken as the character after
+    the last match.  Runs are (start,end,count).
+    """
+    retval = []
+    lastend = None
+    for (i,(start,end,count)) in enumerate(runs):
+        if count == length and i not in replaced and start > 0 and end < len(body):
+            ## [ and ] were more than one character in the bracketed body.
+            if lastend is not None and start - lastend == 1 and body[lastend] not in u'[]':
+                continue
+            retval.append(i)
+            lastend = end
+    return retval
+
+def replace_break_runs(body):
+    """
+    Replace runs of <br /> with paragraph breaks, extra space or <hr />
+    by how often each length of run is used.  This used to be one
+    regexp over a copy of the body with <br /> as [br /] (and [ and ]
+    as &squareBracketStart; &squareBracketEnd;) for each length of
+    run, plus a split for line lengths.  Now the runs and line lengths
+    are found in one scan and the runs replaced in one more, with the
+    same result.
+    """
+    runs = [ (m.start(),m.end(),(m.end()-m.start())//len(BR)) for m in break_runs_re.finditer(body) ]
+
+    contentLines = 0
+    contentLinesSum = 0
+    longestLineLength = 0
+    linestart = 0
+    for (start,end,count) in runs + [(len(body),len(body),0)]:
+        line = body[linestart:start]
+        lineLen = len(line.strip())
+        if lineLen > 0:
+            # counted as &squareBracketStart; and &squareBracketEnd;
+            lineLen += 19*line.count(u'[') + 17*line.count(u']')
+            contentLines += 1
+            contentLinesSum += lineLen
+            if lineLen > longestLineLength:
+                longestLineLength = lineLen
+        linestart = end
+
+    if contentLines == 0:
+        contentLines = 1
+
+    averageLineLength = contentLinesSum/contentLines
+
+    breaksCount = [ len(matching_runs(body,runs,i,())) for i in range(1,9) ]
+
+    breaksMax = 0
+    breaksMaxIndex = 0
+
+    for i in range(1,len(breaksCount)):
+        if breaksCount[i] >= breaksMax:
+            breaksMax = breaksCount[i]
+            breaksMaxIndex = i
+
+    if breaksMaxIndex == len(breaksCount)-1 and breaksMax < 2:
+        breaksMaxIndex = 0
+        breaksMax = breaksCount[0]
+
+    # logdebug(u'lines:%s contentLines:%s contentLinesSum:%s longestLineLength:%s averageLineLength:%s'%(len(runs)+1, contentLines, contentLinesSum, longestLineLength, averageLineLength))
+    # logdebug(u'breaksCount:%s breaksMax:%s breaksMaxIndex:%s'%(breaksCount, breaksMax, breaksMaxIndex))
+
+    # run index -> replacement
+    replaced = {}
+
+    if breaksMaxIndex > 0 and breaksCount[0] > breaksMax and averageLineLength < 90:
+        for i in matching_runs(body,runs,1,replaced):
+            replaced[i] = u' \n'
+
+    # Find all instances of consecutive breaks less than otr equal to the max count use most often
+    #  replase those tags to inverted p tag pairs, those with more connsecutive breaks are replaced them with a horisontal line
+    for i in range(len(breaksCount)):
+        if i <= breaksMaxIndex:
+            replacement = u'</p>\n<p>'
+        elif i == breaksMaxIndex+1:
+            replacement = u'</p>\n<p><br/></p>\n<p>'
+        else:
+            replacement = u'</p>\n<hr />\n<p>'
+        for j in matching_runs(body,runs,i+1,replaced):
+            replaced[j] = replacement
+
+    for (i,(start,end,count)) in enumerate(runs):
+        if count > len(breaksCount):
+            replaced[i] = u'</p>\n<hr />\n<p>'
+
+    pieces = []
+    pos = 0
+    for (i,(start,end,count)) in enumerate(runs):
+        if i in replaced:
+            pieces.append(body[pos:start])
+            pieces.append(replaced[i])
+            pos = end
+    pieces.append(body[pos:])
+    return u''.join(pieces)
+
+blocks_re = re.compile(r'<(pre|p|blockquote|table)([^>]*)>(.+?)</\1>', re.DOTALL)
+
+def shield_blocks(body):
+    """
+    Put p, pre, blockquote and table blocks on their own lines,
+    dropping breaks and whitespace around them, and change breaks
+    inside them to {br /} so they're left alone.  Same result as
+    re.sub() with (\s*<br\ />\s*)*\s*<(pre|p|blockquote|table)([^>]*)>(.+?)</\2>\s*(\s*<br\ />\s*)*
+    but without that backtracking over every run of breaks.
+    """
+    pieces = []
+    pos = 0
+    for m in blocks_re.finditer(body):
+        if m.start() < pos:
+            continue
+        # breaks and whitespace before, back to the last block.
+        start = m.start()
+        while start > pos:
+            if body[start-1].isspace():
+                start -= 1
+            elif body.endswith(BR,pos,start):
+                start -= len(BR)
+            else:
+                break
+        # and after.
+        end = m.end()
+        while end < len(body):
+            if body[end].isspace():
+                end += 1
+            elif body.startswith(BR,end):
+                end += len(BR)
+            else:
+                break
+        pieces.append(body[pos:start])
+        pieces.append(u'\n<%s%s>%s</%s>\n'%(m.group(1),m.group(2),m.group(3).replace(BR,u'{br /}'),m.group(1)))
+        pos = end
+    pieces.append(body[pos:])
+    return u''.join(pieces)
+
 def is_valid_block(block):
     return unicode(block).find('<') == 0 and unicode(block).find('<!') != 0
 
@@ -339,11 +370,13 @@ def is_closed_tag(tag):
 def tag_sanitizer(html):
     blockTags = ['address', 'blockquote', 'del', 'div', 'dl', 'fieldset', 'form', 'ins', 'noscript', 'ol', 'pre', 'table', 'ul']
 
-    body = u''
+    ## open tags for this call only.
+    stack = HtmlTagStack()
+    body = []
     tags = re.findall(r'(<[^>]+>)([^<]*)', html)
 
     for rTag in tags:
-        name = stack.get_tag_name(rTag[0])
+        name = get_tag_name(rTag[0])
         is_end = is_end_tag(rTag[0])
         is_closed = is_closed_tag(rTag[0]) or is_comment_tag(rTag[0])
 
@@ -352,34 +385,33 @@ def tag_sanitizer(html):
         # logdebug(u'> %s%s\n'%(rTag[0], rTag[1]))
 
         if name in blockTags:
-            body += rTag[0]
-            body += rTag[1]
+            body.append(rTag[0])
+            body.append(rTag[1])
         elif name == u'p':
             if is_end:
-                body += stack.spool_end()
-                body += rTag[0]
-                body += rTag[1]
+                body.append(stack.spool_end())
+                body.append(rTag[0])
+                body.append(rTag[1])
             elif is_closed:
-                body += rTag[0]
-                body += rTag[1]
+                body.append(rTag[0])
+                body.append(rTag[1])
             else:
-                body += rTag[0]
-                body += stack.spool_start()
-                body += rTag[1]
+                body.append(rTag[0])
+                body.append(stack.spool_start())
+                body.append(rTag[1])
         else:
             if is_end:
                 t = stack.get_last()
-                tn = stack.get_tag_name(t)
-                rTn = stack.get_tag_name(rTag[0])
+                tn = get_tag_name(t)
+                rTn = get_tag_name(rTag[0])
                 if tn == rTn:
-                    body += rTag[0]
+                    body.append(rTag[0])
                     stack.pop()
             elif not is_closed:
                 stack.push(rTag[0])
-                body += rTag[0]
+                body.append(rTag[0])
             else:
-                body += rTag[0]
+                body.append(rTag[0])
 
-            body += rTag[1]
-    stack.flush()
-    return body
+            body.append(rTag[1])
+    return u''.join(body)
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2026 FanFicFare team
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from __future__ import absolute_import
+import os
+import hashlib
+import tempfile
+import threading
+import logging
+logger = logging.getLogger(__name__)
+
+from .six import ensure_binary
+
+## Evict down to this fraction of max_size so every new entry
+## doesn't trigger another directory scan.
+EVICT_TO = 0.9
+
+class ConvertedImageCache(object):
+    """
+    On-disk cache of convert_image output, kept between runs.  Each
+    entry is one file named by a digest of the key, the source image
+    digest plus conversion settings.  When the directory grows past
+    max_size bytes, least recently used entries are removed.
+    """
+    def __init__(self,cachedir,max_size):
+        self.cachedir = cachedir
+        self.max_size = max_size
+        self.size = None # unknown until first scan.
+        self.lock = threading.Lock()
+
+    def make_filename(self,key,ext):
+        return os.path.join(self.cachedir,
+                            hashlib.sha256(repr(key).encode('utf-8')).hexdigest()+'.'+ext)
+
+    def get(self,key,ext):
+        """Return cached data or None."""
+        filename = self.make_filename(key,ext)
+        try:
+            with open(filename,'rb') as f:
+                data = f.read()
+            # mtime marks recent use for eviction.
+            os.utime(filename,None)
+            return data
+        except (IOError, OSError):
+            return None
+
+    def set(self,key,ext,data):
+        filename = self.make_filename(key,ext)
+        try:
+            if not os.path.isdir(self.cachedir):
+                os.makedirs(self.cachedir)
+            ## write then rename so other processes never see part of
+            ## a file.
+            (fd, tmpname) = tempfile.mkstemp(dir=self.cachedir,suffix='.tmp')
+            with os.fdopen(fd,'wb') as f:
+                f.write(ensure_binary(data))
+            os.replace(tmpname,filename)
+        except (IOError, OSError) as e:
+            logger.warning("Failed to save converted image to cache %s: %s"%(self.cachedir,e))
+            return
+        with self.lock:
+            if self.size is not None:
+                self.size += len(data)
+            if self.size is None or self.size > self.max_size:
+                self.evict()
+
+    def evict(self):
+        ## called with lock held.  Other processes may share the
+        ## directory, so it's rescanned rather than trusting
+        ## self.size.
+        entries = []
+        for entry in os.scandir(self.cachedir):
+            if entry.name.endswith('.tmp'):
+                continue
+            try:
+                stat = entry.stat()
+                entries.append((stat.st_mtime,stat.st_size,entry.path))
+            except OSError:
+                pass
+        self.size = sum( e[1] for e in entries )
+        if self.size <= self.max_size:
+            return
+        entries.sort()
+        target = self.max_size * EVICT_TO
+        count = 0
+        for (mtime,size,path) in entries:
+            if self.size <= target:
+                break
+            try:
+                os.remove(path)
+                count += 1
+            except OSError:
+                pass
+            self.size -= size
+        logger.debug("Evicted %s converted images from %s"%(count,self.cachedir))
+
+## (cachedir,max_size) -> ConvertedImageCache.  Shared by all stories
+## in the process.
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_converted_image_cache(cachedir,max_size):
+    with _caches_lock:
+        if (cachedir,max_size) not in _caches:
+            _caches[(cachedir,max_size)] = ConvertedImageCache(cachedir,max_size)
+        return _caches[(cachedir,max_size)]
@@ -6,6 +6,7 @@
 from __future__ import absolute_import
 
 import struct
+from bisect import bisect_right
 import time
 import random
 import logging
@@ -16,7 +17,7 @@ from io import BytesIO
 
 logger = logging.getLogger(__name__)
 
-from .mobihtml import HtmlProcessor
+from .mobihtml import HtmlProcessor, FileposAnchors
 
 # http://wiki.mobileread.com/wiki/MOBI
 # http://membres.lycos.fr/microfirst/palm/pdb.html
@@ -33,26 +34,113 @@ languages = {"en-us" : 0x0409,
              "en-gb" : 0x0809}
 
 class _SubEntry:
-  def __init__(self, pos, html_data):
+  def __init__(self, pos, html_data, anchors):
     self.pos = pos
-    self.html = HtmlProcessor(html_data)
-    self.title = self.html.title
+    html = HtmlProcessor(html_data)
+    self.title = html.title
     self._name = 'mobi_article_%d' % pos
     if not self.title:
       self.title = 'Article %d' % self.pos
+    # only the cleaned body is kept, not the whole soup.
+    self.body = html.CleanBody(self._name + '_', anchors)
 
-  def TocLink(self):
-    return '<a href="#%s_MOBI_START">%.80s</a>' % (self._name, self.title)
+  def TocLink(self, anchors):
+    return '<a filepos="%s">%s</a>' % (anchors.Stub('#%s_MOBI_START' % self._name),
+                                       _EscapeText('%.80s' % self.title))
 
   def Anchor(self):
-    return '<a name="%s_MOBI_START">' % self._name
-
-  def Body(self):
-    return self.html.RenameAnchors(self._name + '_')
+    return '<a name="%s_MOBI_START"></a>' % self._name
+
+def _EscapeText(text):
+  return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+## How many earlier copies of a repeat's first 3 bytes PalmDocCompress
+## looks at for the longest.  More gains very little on text.
+# How many of the nearest earlier copies of a 3 byte string
+# PalmDocCompress compares before settling for the longest so far.
+MAX_PALMDOC_TRIES = 16
+
+def PalmDocCompress(data):
+  """Compresses one text record with PalmDoc's LZ77 variant.  Repeats
+  of 3 to 10 bytes up to 2047 bytes back become 2 byte references, a
+  space and following 0x40-0x7f byte become one byte, and other bytes
+  are copied, runs of those that need it prefixed with their count.
+  """
+  keys = bytes(data)
+  data = bytearray(data)
+  out = bytearray()
+  length = len(data)
+  # Positions of each 3 byte string in the record, in order, so
+  # repeats are looked up rather than searched for.
+  positions = {}
+  for p in range(length - 2):
+    key = keys[p:p+3]
+    if key in positions:
+      positions[key].append(p)
+    else:
+      positions[key] = [p]
+  i = 0
+  while i < length:
+    # Take the longest repeat, the nearest of those.  Only whole
+    # copies before i, so readers needn't handle overlap.
+    candidates = positions.get(keys[i:i+3])
+    if candidates and candidates[0] + 3 <= i:
+      match = -1
+      n = 2
+      window = i - 2047
+      limit = min(10, length - i)
+      end = bisect_right(candidates, i - 3)
+      for found in candidates[max(0, end - MAX_PALMDOC_TRIES):end][::-1]:
+        if found < window:
+          break
+        if found + limit <= i and keys[found:found+limit] == keys[i:i+limit]:
+          match = found
+          n = limit
+          break
+        if n >= 3 and (found + n >= i or data[found+n] != data[i+n]):
+          continue  # can't be longer than match
+        size = 3
+        while size < limit and found + size < i and data[found+size] == data[i+size]:
+          size += 1
+        if size > n:
+          match = found
+          n = size
+      if match >= 0:
+        out += struct.pack('>H', 0x8000 | ((i - match) << 3) | (n - 3))
+        i += n
+        continue
+
+    c = data[i]
+    if c == 0x20 and i + 1 < length and 0x40 <= data[i+1] < 0x80:
+      out.append(data[i+1] ^ 0x80)
+      i += 2
+    elif c == 0 or 0x09 <= c < 0x80:
+      out.append(c)
+      i += 1
+    else:
+      # 0x01-0x08 and 0x80-0xff mean something else, so up to 8 of
+      # them go out as a count and the bytes.
+      j = i + 1
+      while j < length and j - i < 8 and not (data[j] == 0 or 0x09 <= data[j] < 0x80):
+        j += 1
+      out.append(j - i)
+      out += data[i:j]
+      i = j
+  return bytes(out)
+
+def _MultibyteOverlap(data, end):
+  """Returns the rest of the UTF-8 character cut off at end, which
+  readers expect after the record as a trailing entry."""
+  overlap = end
+  while overlap < len(data) and overlap - end < 3 and ord(data[overlap:overlap+1]) & 0xC0 == 0x80:
+    overlap += 1
+  return data[end:overlap]
 
 class Converter:
-  def __init__(self, refresh_url='', title='Unknown', author='Unknown', publisher='Unknown'):
-    self._header = Header()
+  def __init__(self, refresh_url='', title='Unknown', author='Unknown', publisher='Unknown',
+               compression=True):
+    self._header = Header(compression)
+    self._compression = compression
     self._header.SetTitle(title)
     self._header.SetAuthor(author)
     self._header.SetPublisher(publisher)
@@ -77,64 +165,50 @@ class Converter:
     self._ConvertStringsToFile(html_strs, open(out_file, 'wb'))
 
   def MakeOneHTML(self, html_strs):
-    """This takes a list of HTML strings and returns a big HTML file with
-    all contents consolidated.  It constructs a table of contents and adds
-    anchors within the text
+    """This takes a list of HTML strings and returns a big utf-8 HTML
+    file with all contents consolidated and cleaned.  It constructs a
+    table of contents and adds anchors within the text.  Each string
+    is parsed and cleaned on its own, so only one is ever a soup.
     """
-    title_html = []
-    toc_html = []
-    body_html = []
+    anchors = FileposAnchors()
 
-    ## This gets broken by html5lib/bs4fixed being helpful, but we'll
-    ## fix it inside mobihtml.py
-    PAGE_BREAK = '<mbp:pagebreak/>'
+    ## html5lib/bs4fixed would break this, so it's written as-is.
+    PAGE_BREAK = b'<mbp:pagebreak/>'
 
     # pull out the title page, assumed first html_strs.
-    htmltitle = html_strs[0]
-    entrytitle = _SubEntry(1, htmltitle)
-    title_html.append(entrytitle.Body())
-
-    title_html.append(PAGE_BREAK)
-    toc_html.append(PAGE_BREAK)
-    toc_html.append('<a name="TOCTOP"><h3>Table of Contents</h3><br />')
-
-    for pos, html in enumerate(html_strs[1:]):
-      entry = _SubEntry(pos+1, html)
-      toc_html.append('%s<br />' % entry.TocLink())
-
-      # give some space between bodies of work.
-      body_html.append(PAGE_BREAK)
-
-      body_html.append(entry.Anchor())
-
-      body_html.append(entry.Body())
+    entrytitle = _SubEntry(1, html_strs[0], anchors)
+    entries = [_SubEntry(pos+1, html, anchors)
+               for pos, html in enumerate(html_strs[1:])]
 
     # TODO: this title can get way too long with RSS feeds. Not sure how to fix
     # cheat slightly and use the <a href> code to set filepos in references.
-    header = '''<html>
-<head>
+    anchors.Append('''<html><head>
 <title>Bibliorize %s GMT</title>
   <guide>
-    <reference href="#TOCTOP" type="toc" title="Table of Contents"/>
-  </guide>
-</head>
-<body>
-''' % time.ctime(time.time())
-
-    footer = '</body></html>'
-    # logger.debug("header:%s"%header)
-    # logger.debug("title_html:%s"%title_html)
-    # logger.debug("toc_html:%s"%toc_html)
-    # logger.debug("body_html:%s"%body_html)
-    # logger.debug("footer:%s"%footer)
-    all_html = header + '\n'.join(title_html + toc_html + body_html) + footer
-    #print "%s" % all_html.encode('utf8')
-    return all_html
+    <reference filepos="%s" title="Table of Contents" type="toc"/>
+  </guide></head><body>
+''' % (time.ctime(time.time()), anchors.Stub('#TOCTOP')))
+
+    anchors.Append(entrytitle.body)
+    anchors.Append(b'\n' + PAGE_BREAK)
+
+    toc_html = [PAGE_BREAK,
+                b'<a name="TOCTOP"></a><h3>Table of Contents</h3><br/>']
+    for entry in entries:
+      toc_html.append(ensure_binary('%s<br/>' % entry.TocLink(anchors)))
+    anchors.Append(b'\n' + b'\n'.join(toc_html))
+
+    for entry in entries:
+      # give some space between bodies of work.
+      anchors.Append(b'\n'.join([b'', PAGE_BREAK, ensure_binary(entry.Anchor()), entry.body]))
+      del entry.body
+
+    anchors.Append(b'</body></html>')
+    return anchors.Text()
 
   def _ConvertStringsToFile(self, html_strs, out_file):
     try:
-      tmp = self.MakeOneHTML(html_strs)
-      self._ConvertStringToFile(tmp, out_file)
+      self._WriteText(self.MakeOneHTML(html_strs), out_file)
     except Exception as e:
       raise
       logger.error('Error %s', e)
@@ -142,22 +216,9 @@ class Converter:
 
   def _ConvertStringToFile(self, html_data, out):
     html = HtmlProcessor(html_data)
-    data = ensure_binary(html.CleanHtml())
-
-    # collect offsets of '<mbp:pagebreak>' tags, use to make index list.
-    # indexlist = [] # list of (offset,length) tuples.
-    # not in current use.
-
-    # j=0
-    # lastj=0
-    # while True:
-    #   j=data.find('<mbp:pagebreak>',lastj+10) # plus a bit so we find the next.
-    #   if j < 0:
-    #     break
-    #   indexlist.append((lastj,j-lastj))
-    #   print "index offset: %d length: %d" % (lastj,j-lastj)
-    #   lastj=j
+    self._WriteText(html.CleanHtml(), out)
 
+  def _WriteText(self, data, out):
     records = []
 #    title = html.title
 #    if title:
@@ -167,7 +228,15 @@ class Converter:
     for start_pos in range(0, len(data), Record.MAX_SIZE):
       end = min(len(data), start_pos + Record.MAX_SIZE)
       record_data = data[start_pos:end]
-      records.append(self._header.AddRecord(record_data, record_id))
+      # Each text record is followed by its multibyte trailing entry:
+      # any bytes finishing its last character and then their count.
+      overlap = _MultibyteOverlap(data, end)
+      trailer = overlap + struct.pack('>B', len(overlap))
+      if self._compression:
+        records.append(self._header.AddRecord(PalmDocCompress(record_data), record_id,
+                                              trailer, len(record_data)))
+      else:
+        records.append(self._header.AddRecord(record_data, record_id, trailer))
       # logger.debug("HTML Record %03d: (size:%d) [[%s ... %s]]" % ( record_id, len(record_data), record_data[:20], record_data[-20:] ))
       record_id += 1
     self._header.SetImageRecordIndex(record_id)
@@ -178,28 +247,23 @@ class Converter:
     for record in records:
       record.WriteHeader(out, rec_offset)
       # logger.debug("rec_offset: %d len(record.data): %d" % (rec_offset,len(record.data)))
-      rec_offset += (len(record.data)+1) # plus one for trailing null
+      rec_offset += len(record.data) + len(record.trailer)
 
     # Write to nuls for some reason
     out.write(b'\0\0')
     for record in records:
       record.WriteData(out)
-      out.write(b'\0')
-      # needs a trailing null, I believe it indicates zero length 'overlap'.
-      # otherwise, the readers eat the last char of each html record.
-      # Calibre writes another 6-7 bytes of stuff after that, but we seem
-      # to be getting along without it.
+      # Calibre writes another 6-7 bytes of stuff after the trailing
+      # entry, but we seem to be getting along without it.
 
 class Record:
   MAX_SIZE = 4096
   INDEX_LEN = 8
   _unique_id_seed = 28  # should be arbitrary, but taken from MobiHeader
 
-  # TODO(chatham): Record compression doesn't look that hard.
-
-  def __init__(self, data, record_id):
-    assert len(data) <= self.MAX_SIZE
+  def __init__(self, data, record_id, trailer=b'\0'):
     self.data = data
+    self.trailer = trailer
     if record_id != 0:
       self._id = record_id
     else:
@@ -216,6 +280,7 @@ class Record:
 
   def WriteData(self, out):
     out.write(ensure_binary(self.data))
+    out.write(self.trailer)
 
   def WriteHeader(self, out, rec_offset):
     attributes =  64 # dirty?
@@ -234,7 +299,8 @@ EXTH_HEADER_FIELDS = {
 class Header:
   EPOCH_1904 = 2082844800
 
-  def __init__(self):
+  def __init__(self, compression=True):
+    self._compression = compression
     self._length = 0
     self._record_count = 0
     self._title = '2008_2_34'
@@ -254,18 +320,22 @@ class Header:
   def SetPublisher(self, publisher):
     self._publisher = publisher.encode('ascii','ignore')
 
-  def AddRecord(self, data, record_id):
-    self.max_record_size = max(Record.MAX_SIZE, len(data))
+  def AddRecord(self, data, record_id, trailer=b'\0', text_length=None):
+    # text_length is the size before compression.
+    if text_length is None:
+      text_length = len(data)
+    assert text_length <= Record.MAX_SIZE
+    self.max_record_size = max(Record.MAX_SIZE, text_length)
     self._record_count += 1
     # logger.debug("len(data):%s"%len(data))
-    self._length += len(data)
-    return Record(data, record_id)
+    self._length += text_length
+    return Record(data, record_id, trailer)
 
   def _ReplaceWord(self, data, pos, word):
     return data[:pos] + struct.pack('>I', word) + data[pos+4:]
 
   def PalmDocHeader(self):
-    compression = 1  # no compression
+    compression = 2 if self._compression else 1  # PalmDoc or none
     unused = 0
     encryption_type = 0  # no ecryption
     records = self._record_count + 1  # the header record itself
@@ -393,6 +463,9 @@ class Header:
     # Set some magic offsets to be 0xFFFFFFF.
     for pos in (0x94, 0x98, 0xb0, 0xb8, 0xc0, 0xc8, 0xd0, 0xd8, 0xdc):
       mobi_header = self._ReplaceWord(mobi_header, pos, fs)
+    # Extra record data flags: text records end with multibyte
+    # trailing entries.
+    mobi_header = self._ReplaceWord(mobi_header, 0xe0, 1)
 
     # 16 bytes?
     padding = b'\0' * 48 * 4 # why?
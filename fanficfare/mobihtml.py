@@ -18,10 +18,71 @@ from .six import ensure_binary
 
 # import bs4
 # BeautifulSoup = bs4.BeautifulSoup
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString
 
 logger = logging.getLogger(__name__)
 
+class FileposAnchors:
+  '''Points internal anchors at the byte offsets of their targets.
+
+  Each <a href="#myanchor"> is replaced with a fixed-size stub like
+  <a filepos="0000000050">.  The text is then appended a piece at a
+  time, noting where each name="..." tag and each stub lands, so the
+  stubs can all be filled in with one pass at the end.'''
+  NAME_RE = re.compile(br'<[^<>]*?\sname="([^"]*)"')
+  FILEPOS_RE = re.compile(br'<(?:a|reference)\s(?:[^<>]*?\s)?filepos="(\d{10})"')
+
+  def __init__(self):
+    self._refs = []
+    self._names = {}
+    self._stubs = []
+    self._chunks = []
+    self._length = 0
+
+  def Stub(self, href):
+    '''Returns the filepos stub for a link to href.'''
+    self._refs.append(href)
+    return '%.10d' % (len(self._refs) - 1)
+
+  def StubInternalAnchors(self, soup):
+    '''Replace each internal anchor in soup with a filepos stub.'''
+    # anchor links
+    anchorlist = soup.find_all('a', href=re.compile('^#'))
+    # treat reference tags like a tags for TOCTOP.
+    anchorlist.extend(soup.find_all('reference', href=re.compile('^#')))
+    for anchor in anchorlist:
+      anchor['filepos'] = self.Stub(anchor['href'])
+      del anchor['href']
+
+  def Append(self, text):
+    text = ensure_binary(text)
+    for m in self.NAME_RE.finditer(text):
+      # the first tag with the name, and go right in front of it
+      # instead of somewhere slightly *after* it.
+      self._names.setdefault(m.group(1), self._length + m.start())
+    for m in self.FILEPOS_RE.finditer(text):
+      self._stubs.append((self._length + m.start(1), int(m.group(1))))
+    self._chunks.append(text)
+    self._length += len(text)
+
+  def Text(self):
+    '''Returns all the text appended with the stubs filled in.'''
+    # TODO: Browsers allow extra whitespace in the href names.
+    text = bytearray(b''.join(self._chunks))
+    del self._chunks
+    for pos, anchor_num in self._stubs:
+      if anchor_num >= len(self._refs):
+        continue
+      original_ref = self._refs[anchor_num]
+      ref = ensure_binary(unquote(original_ref[1:])) # remove leading '#'
+      newpos = self._names.get(ref)
+      if newpos is None:
+        logger.warning('Could not find anchor "%s"' % original_ref)
+        continue
+      # logger.debug("Anchor Pos: %s %s"%(anchor_num, newpos))
+      text[pos:pos+10] = b'%.10d' % newpos
+    return bytes(text)
+
 class HtmlProcessor:
   WHITESPACE_RE = re.compile(r'\s')
   # Look for </blockquote  <p>
@@ -51,52 +112,6 @@ class HtmlProcessor:
   #     print >>sys.stderr, 'Replaced %d bad tags' % count
   #   return new_html
 
-  def _StubInternalAnchors(self):
-    '''Replace each internal anchor with a fixed-size filepos anchor.
-
-    Looks for every anchor with <a href="#myanchor"> and replaces that
-    with <a filepos="00000000050">. Stores anchors in self._anchor_references'''
-    self._anchor_references = []
-    anchor_num = 0
-    # anchor links
-    anchorlist = self._soup.find_all('a', href=re.compile('^#'))
-    # treat reference tags like a tags for TOCTOP.
-    anchorlist.extend(self._soup.find_all('reference', href=re.compile('^#')))
-    for anchor in anchorlist:
-      self._anchor_references.append((anchor_num, anchor['href']))
-      anchor['filepos'] = '%.10d' % anchor_num
-      # logger.debug("Add anchor: %s %s"%((anchor_num, anchor)))
-      del anchor['href']
-      anchor_num += 1
-
-  def _ReplaceAnchorStubs(self):
-    # TODO: Browsers allow extra whitespace in the href names.
-
-    assembled_text = ensure_binary(unicode(self._soup))
-    # html5lib/bs4 creates close tags for <mbp:pagebreak>
-    assembled_text = assembled_text.replace(b'<mbp:pagebreak>',b'<mbp:pagebreak/>')
-    assembled_text = assembled_text.replace(b'</mbp:pagebreak>',b'')
-
-    del self._soup # shouldn't touch this anymore
-    for anchor_num, original_ref in self._anchor_references:
-      ref = unquote(original_ref[1:]) # remove leading '#'
-      # Find the position of ref in the utf-8 document.
-      # TODO(chatham): Using regexes and looking for name= would be better.
-      newpos = assembled_text.find(b'name="'+ensure_binary(ref)) # .encode('utf-8')
-      if newpos == -1:
-        logger.warning('Could not find anchor "%s"' % original_ref)
-        continue
-      # instead of somewhere slightly *after* the <a> tag pointed to,
-      # let's go right in front of it instead by looking for the page
-      # break before it.
-      newpos = assembled_text.rfind(b'<',0,newpos)
-      # logger.debug("Anchor Pos: %s %s '%s|%s'"%((anchor_num, newpos,assembled_text[newpos-15:newpos],assembled_text[newpos:newpos+15])))
-      old_filepos = b'filepos="%.10d"' % anchor_num
-      new_filepos = b'filepos="%.10d"' % newpos
-      assert assembled_text.find(old_filepos) != -1
-      assembled_text = assembled_text.replace(old_filepos, new_filepos, 1)
-    return assembled_text
-
   def _FixPreTags(self):
     '''Replace <pre> tags with HTML-ified text.'''
     pres = self._soup.find_all('pre')
@@ -123,15 +138,23 @@ class HtmlProcessor:
       for element in self._soup.find_all(tag_type):
         element.extract()
 
-  def RenameAnchors(self, prefix):
-    '''Rename every internal anchor to have the given prefix, then
-    return the contents of the body tag.'''
+  def _RenameAnchors(self, prefix):
     for anchor in self._soup.find_all('a', href=re.compile('^#')):
       anchor['href'] = '#' + prefix + anchor['href'][1:]
     for a in self._soup.find_all('a'):
       if a.get('name'):
         a['name'] = prefix + a['name']
 
+  def _FixPageBreaks(self, text):
+    # html5lib/bs4 creates close tags for <mbp:pagebreak>
+    text = ensure_binary(text)
+    text = text.replace(b'<mbp:pagebreak>',b'<mbp:pagebreak/>')
+    return text.replace(b'</mbp:pagebreak>',b'')
+
+  def RenameAnchors(self, prefix):
+    '''Rename every internal anchor to have the given prefix, then
+    return the contents of the body tag.'''
+    self._RenameAnchors(prefix)
     # TODO(chatham): figure out how to fix this. sometimes body comes out
     # as NoneType.
     content = []
@@ -139,12 +162,35 @@ class HtmlProcessor:
       content = [unicode(c) for c in self._soup.body.contents]
     return '\n'.join(content)
 
+  def CleanBody(self, prefix, anchors):
+    '''Clean this page as one part of a bigger book: rename its
+    internal anchors to have the given prefix and stub them in
+    anchors, then return the utf-8 contents of the body tag.'''
+    self._RemoveUnsupported()
+    self._RenameAnchors(prefix)
+    anchors.StubInternalAnchors(self._soup)
+    self._FixPreTags()
+    content = []
+    if self._soup.body is not None:
+      # output_ready() so the strings _FixPreTags left are escaped
+      # as they would be in the whole body.
+      content = [c.output_ready() if isinstance(c, NavigableString) else unicode(c)
+                 for c in self._soup.body.contents]
+    body = self._FixPageBreaks('\n'.join(content))
+    # break up the soup now rather than leave it for the garbage collector.
+    self._soup.decompose()
+    del self._soup # shouldn't touch this anymore
+    return body
+
   def CleanHtml(self):
     # TODO(chatham): fix_html_br, fix_html
     self._RemoveUnsupported()
-    self._StubInternalAnchors()
+    anchors = FileposAnchors()
+    anchors.StubInternalAnchors(self._soup)
     self._FixPreTags()
-    return self._ReplaceAnchorStubs()
+    anchors.Append(self._FixPageBreaks(unicode(self._soup)))
+    del self._soup # shouldn't touch this anymore
+    return anchors.Text()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2026 FanFicFare team
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from __future__ import absolute_import
+import tempfile
+import threading
+import logging
+logger = logging.getLogger(__name__)
+
+class SpillFile(object):
+    """
+    Append-only temporary file for byte strings that don't need to
+    stay in memory.  Created on first use and deleted when closed or
+    garbage collected.
+    """
+    def __init__(self):
+        self.tmpfile = None
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def add(self,data):
+        with self.lock:
+            if self.tmpfile is None:
+                self.tmpfile = tempfile.TemporaryFile(prefix='fff-spill-')
+                logger.debug("Spilling to temporary file")
+            self.tmpfile.seek(self.size)
+            self.tmpfile.write(data)
+            spilled = SpilledData(self,self.size,len(data))
+            self.size += len(data)
+        return spilled
+
+    def read(self,offset,length):
+        with self.lock:
+            self.tmpfile.seek(offset)
+            return self.tmpfile.read(length)
+
+    def close(self):
+        with self.lock:
+            if self.tmpfile is not None:
+                self.tmpfile.close()
+                self.tmpfile = None
+                self.size = 0
+
+class SpilledData(object):
+    """
+    Stands in for a byte string written to a SpillFile.
+    """
+    __slots__ = ('spillfile','offset','length')
+
+    def __init__(self,spillfile,offset,length):
+        self.spillfile = spillfile
+        self.offset = offset
+        self.length = length
+
+    def read(self):
+        return self.spillfile.read(self.offset,self.length)
+
+    def __len__(self):
+        return self.length
+
+class SpilledText(SpilledData):
+    """
+    SpilledData for unicode text, kept as utf-8.
+    """
+    __slots__ = ()
+
+    def read(self):
+        return SpilledData.read(self).decode('utf-8')
+
+class MemoryBudget(object):
+    """
+    Keeps byte strings in memory until budget bytes are held, then
+    writes the rest to a SpillFile.  budget None never spills.
+    """
+    def __init__(self,budget=None):
+        self.budget = budget
+        self.in_memory = 0
+        self.spillfile = SpillFile()
+
+    def keep(self,data):
+        """Return data itself or a SpilledData for it."""
+        if self.budget is None or self.in_memory + len(data) <= self.budget:
+            self.in_memory += len(data)
+            return data
+        return self.spillfile.add(data)
+
+    def keep_text(self,text):
+        """keep() for unicode text.  Return text or a SpilledText."""
+        if self.budget is None:
+            return text
+        data = text.encode('utf-8')
+        if self.in_memory + len(data) <= self.budget:
+            self.in_memory += len(data)
+            return text
+        spilled = self.spillfile.add(data)
+        return SpilledText(self.spillfile,spilled.offset,spilled.length)
+
+class SpillDict(dict):
+    """
+    dict of byte string values that spill to disk past a
+    MemoryBudget.  Values are read back when looked up with [].
+    """
+    def __init__(self,budget=None):
+        dict.__init__(self)
+        self.memory = MemoryBudget(budget)
+
+    def __setitem__(self,key,data):
+        dict.__setitem__(self,key,self.memory.keep(data))
+
+    def __getitem__(self,key):
+        return unspill(dict.__getitem__(self,key))
+
+def unspill(value):
+    if isinstance(value,SpilledData):
+        return value.read()
+    return value
+
+def parse_budget(value):
+    """
+    image_memory_budget/chapter_memory_budget setting, in megabytes, to bytes.  None
+    for unset or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return int(float(value)*1024*1024)
+    except ValueError:
+        logger.warning("Ignoring invalid memory budget(%s)"%value)
+        return None
@@ -17,12 +17,15 @@
 
 from __future__ import absolute_import
 import os, re, sys
+import copy
 from collections import defaultdict, OrderedDict
 import string
 import datetime
 from math import floor
 import base64
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future
 import logging
 logger = logging.getLogger(__name__)
 
@@ -40,6 +43,8 @@ from .htmlcleanup import conditionalRemoveEntities, removeEntities, removeAllEnt
 from .requestable import Requestable
 from .configurable import re_compile
 from .htmlheuristics import was_run_marker
+from .spillfile import MemoryBudget, unspill, parse_budget
+from .imagecache import get_converted_image_cache
 
 SPACE_REPLACE=r'\s'
 SPLIT_META=r'\,'
@@ -62,6 +67,7 @@ try:
         set_image_allocation_limit
     )
     convtype = {'jpg':'JPG', 'png':'PNG'}
+    image_lib = 'calibre'
 
     # Calibre function that increases qt image processing buffer size
     # for larger than 32 megapixel images.  At time of writing,
@@ -126,6 +132,7 @@ except:
         from PIL import Image
         from .six import BytesIO
         convtype = {'jpg':'JPEG', 'png':'PNG'}
+        image_lib = 'pillow'
 
         def get_image_size(data):
             img = Image.open(BytesIO(data))
@@ -174,6 +181,8 @@ except:
                 return (data,imgtype,imagetypes[imgtype])
 
     except:
+        image_lib = None
+
         # No calibre or PIL, give a random largish size.
         def get_image_size(data):
             return 1000,1000
@@ -248,6 +257,129 @@ def fit_image(width, height, pwidth, pheight):
 
     return scaled, int(width), int(height)
 
+def img_digest(data):
+    return hashlib.sha256(ensure_binary(data)).digest()
+
+def fetch_convert_image(fetch,imgurl,refererurl,imgdata,convargs,
+                        process_pool=None,img_store=None,disk_cache=None):
+    '''
+    Fetch(unless imgdata already given) and convert one image.
+    convargs is None for no_image_processing, otherwise the
+    (sizes,grayscale,removetrans,imgtype,background,jpg_quality)
+    args to convert_image.  If img_store or disk_cache(a
+    ConvertedImageCache) is given, data already converted the same way
+    isn't converted again.  Safe to call from worker threads.
+    '''
+    if not imgdata:
+        imgdata = fetch(imgurl,referer=refererurl,image=True)
+    if convargs is None:
+        ## ext comes from the URL, cheap anyway.
+        return no_convert_image(imgurl,imgdata)
+    (sizes,grayscale,removetrans,imgtype,background,jpg_quality) = convargs
+    if img_store or disk_cache:
+        ## calibre rejects .svg by URL, so that's part of the key.
+        svgurl = imgurl.lower().endswith('.svg') or '.svg?' in imgurl.lower()
+        key = (img_digest(imgdata),svgurl,tuple(sizes),grayscale,
+               removetrans,imgtype,background,jpg_quality)
+    if img_store:
+        converted = img_store.get_converted(key)
+        if converted:
+            logger.debug("Image data already converted, reusing for (%s)"%imgurl)
+            return converted
+    if disk_cache:
+        ## calibre and Pillow output differ.
+        data = disk_cache.get((image_lib,)+key,imgtype)
+        if data:
+            logger.debug("Converted image found in cache for (%s)"%imgurl)
+            converted = (data,imgtype,imagetypes[imgtype])
+            if img_store:
+                img_store.add_converted(key,converted)
+            return converted
+    if process_pool:
+        (converted,error) = process_pool.submit(convert_image_job,
+                                                imgurl,imgdata,convargs).result()
+        if error:
+            raise exceptions.RejectImage(error)
+    else:
+        converted = convert_image(imgurl,imgdata,*convargs)
+    if img_store:
+        img_store.add_converted(key,converted)
+    if disk_cache:
+        disk_cache.set((image_lib,)+key,converted[1],converted[0])
+    return converted
+
+def convert_image_job(imgurl,imgdata,convargs):
+    ## Runs in a worker process.  Exceptions are returned as strings
+    ## because not all of them survive pickling.
+    try:
+        return (convert_image(imgurl,imgdata,*convargs),None)
+    except Exception as e:
+        return (None,"%s"%e)
+
+def apply_chapter_text_replacements(data,chapter_text_replacements):
+    for replaceline in chapter_text_replacements:
+        (repl_line,regexp,replacement) = replaceline
+        if regexp.search(data):
+            data = regexp.sub(replacement,data)
+    return data
+
+def clean_chapter_html(html,chapter_text_replacements):
+    '''
+    The chapter html clean up Story.addChapter() does.  Doesn't use
+    the story so it can also run in a chapter_text_processes
+    worker process.
+    '''
+    html = removeEntities(html)
+    return apply_chapter_text_replacements(html,chapter_text_replacements)
+
+## (executor class, workers) -> executor.  Shared by all stories in
+## the process and created when first needed.
+_img_pools = {}
+_img_pools_lock = threading.Lock()
+
+def get_img_pool(executor,workers):
+    with _img_pools_lock:
+        if (executor,workers) not in _img_pools:
+            _img_pools[(executor,workers)] = executor(workers)
+        return _img_pools[(executor,workers)]
+
+def get_chapter_text_pool(configurable):
+    '''
+    Returns (pool,processes) for chapter_text_processes, pool
+    is None when it's not set.
+    '''
+    try:
+        processes = int(configurable.getConfig('chapter_text_processes',0) or 0)
+    except ValueError as e:
+        logger.warning("Bad chapter_text_processes: %s"%e)
+        processes = 0
+    if processes > 0:
+        return (get_img_pool(ProcessPoolExecutor,processes),processes)
+    return (None,0)
+
+def fill_img_placeholders(html,results):
+    '''
+    Replaces queueImgUrl() placeholders in html with the (src,
+    longdesc) values from Story.take_img_results().
+    '''
+    if not results or not html:
+        return html
+    def repl(m):
+        if int(m.group(2)) not in results:
+            return m.group(0)
+        (src,longdesc) = results[int(m.group(2))]
+        return quoted_attr_value(src if m.group(1) == 'src' else longdesc)
+    return re.sub(r'="ffdlpending(src|desc)(\d+)"',repl,html)
+
+def quoted_attr_value(value):
+    '''
+    Return '="value"' quoted and escaped exactly as bs4 would output
+    it in an attribute, or '' for None.
+    '''
+    tag = bs4.element.Tag(name='img')
+    tag['src'] = value
+    return unicode(tag)[len('<img src'):-len('></img>')]
+
 try:
     from calibre.library.comments import sanitize_comments_html
 except:
@@ -455,6 +587,10 @@ class InExMatch:
             self.match = self.match.replace(SPACE_REPLACE,' ')
             self.negate = True
         self.keys = [x.strip() for x in self.keys.split(",")]
+        if self.regex:
+            self.test = self.regex.search
+        else:
+            self.test = lambda value : self.match == value
 
     # For conditional, only one key
     def is_key(self,key):
@@ -473,14 +609,8 @@ class InExMatch:
         retval = False
         # print(param)
         for value in param:
-            if self.regex:
-                if self.regex.search(value):
-                    retval |= True
-                #print(">>>>>>>>>>>>>%s=~%s r: %s,%s=%s"%(self.match,value,self.negate,retval,self.negate != retval))
-            else:
-                retval |= self.match == value
-                #print(">>>>>>>>>>>>>%s==%s r: %s,%s=%s"%(self.match,value,self.negate,retval, self.negate != retval))
-
+            if self.test(value):
+                retval = True
         return self.negate != retval
 
     def __str__(self):
@@ -552,6 +682,35 @@ def make_replacements(replace):
     # print("replace lines:%s"%len(retval))
     return retval
 
+class ReplacementRules:
+    '''
+    replace_metadata lines from make_replacements() indexed by
+    metadata key.  Lines naming keys go in a per-key bucket, lines
+    without keys apply to every key.  rules_for(key) merges the two
+    back into original line order, once per key.
+    '''
+    def __init__(self,replacements):
+        self.replacements = replacements
+        self.by_key = defaultdict(list)
+        self.wildcard = []
+        for i, replaceline in enumerate(replacements):
+            metakeys = replaceline[1]
+            if metakeys == None:
+                self.wildcard.append(i)
+            else:
+                for key in set(metakeys):
+                    self.by_key[key].append(i)
+        self.buckets = {}
+
+    def rules_for(self,key):
+        if key not in self.buckets:
+            self.buckets[key] = [ self.replacements[i] for i in
+                                  sorted(self.by_key.get(key,[])+self.wildcard) ]
+        return self.buckets[key]
+
+    def has_conditional(self,key):
+        return any( replaceline[4] for replaceline in self.rules_for(key) )
+
 def make_chapter_text_replacements(replace):
     retval=[]
     for repl_line in replace.splitlines():
@@ -578,11 +737,103 @@ def make_chapter_text_replacements(replace):
     # print("replace lines:%s"%len(retval))
     return retval
 
+## characters that make a replace_chapter_text regexp more than a
+## literal string.
+REGEX_META = set('.^$*+?{}[]\\|()')
+
+def overlaps(a,b):
+    '''
+    True if strings a and b can share characters where they occur in
+    some text.  '' overlaps everything.
+    '''
+    if a in b or b in a:
+        return True
+    for i in range(1,min(len(a),len(b))):
+        if a[-i:] == b[:i] or b[-i:] == a[:i]:
+            return True
+    return False
+
+class LiteralReplacement(object):
+    '''
+    The replacement for a combined run of literals: looks up the
+    matched literal's replacement.  A class rather than a lambda so it
+    can be pickled for chapter_text_processes.
+    '''
+    def __init__(self,table):
+        self.table = table
+
+    def __call__(self,m):
+        return self.table[m.group(0)]
+
+def combine_chapter_text_replacements(replacements):
+    '''
+    Merge runs of replace_chapter_text lines that are plain strings
+    into one alternation regexp so the text is scanned once per run
+    instead of once per line.
+
+    Lines are only merged when doing them together gives the same
+    result as doing them in order: the literals don't overlap each
+    other and no replacement overlaps a later literal, so no line can
+    make or break a match for another.  Regexps and replacements with
+    backrefs are left as they are.
+    '''
+    retval=[]
+    run=[]
+    def end_run():
+        if len(run) > 1:
+            table = dict( (r[1],r[2]) for r in run )
+            regexp = re.compile('|'.join( re.escape(r[1]) for r in run ))
+            retval.append(['\n'.join( r[0] for r in run ),
+                           regexp,
+                           LiteralReplacement(table)])
+        elif run:
+            retval.append(run[0][3])
+        del run[:]
+
+    for replaceline in replacements:
+        (repl_line,regexp,replacement) = replaceline
+        literal = regexp.pattern
+        if not literal or REGEX_META & set(literal) or '\\' in replacement:
+            end_run()
+            retval.append(replaceline)
+            continue
+        for r in run:
+            if overlaps(r[1],literal) or overlaps(r[2],literal):
+                end_run()
+                break
+        run.append((repl_line,literal,replacement,replaceline))
+    end_run()
+    return retval
+
 class StoryImage(dict):
-    pass
+    '''
+    Info dict for one image.  'data' may have been spilled to disk,
+    it's read back each time it's looked up.
+    '''
+    def __getitem__(self,key):
+        return unspill(dict.__getitem__(self,key))
+
+class StoryChapter(defaultdict):
+    '''
+    Chapter dict, unknown keys default to empty string.  'html' may
+    have been spilled to disk, it's read back each time it's looked
+    up.
+    '''
+    def __getitem__(self,key):
+        return unspill(defaultdict.__getitem__(self,key))
+
+    def get(self,key,default=None):
+        return unspill(defaultdict.get(self,key,default))
+
+    def items(self):
+        return [ (k,self[k]) for k in self.keys() ]
+
+    def copy(self):
+        ## keeps spilled values spilled.
+        return StoryChapter(unicode,self)
 
 class ImageStore:
-    def __init__(self):
+    def __init__(self,memory_budget=None):
         self.prefix='ffdl'
         self.cover_name='cover'
 
@@ -590,18 +841,24 @@ class ImageStore:
         self.infos=[]
         ## index of image urls, not including cover.
         self.url_index={}
-        ## dict of img sizes -> lists of info dicts
-        ## size_index contains list for case of different images of same size.
-        self.size_index=defaultdict(list)
+        ## digest of img data -> first info dict with that data, for
+        ## dedup_img_files.  Not including cover.
+        self.digest_index={}
+        ## (digest of fetched data, conversion args) -> (digest of
+        ## converted data,ext,mime) so identical images aren't
+        ## converted again.  Data itself is found with digest_index.
+        self.converted_index={}
         self.cover = None
+        ## image data past memory_budget bytes goes to a temp file.
+        self.memory = MemoryBudget(memory_budget)
 
     # returns newsrc
     def add_img(self,url,ext,mime,data,cover=False,):
-        info = {'url':url,
-                'ext':ext,
-                #'newsrc':newsrc, # set below
-                'mime':mime,
-                'data':data}
+        info = StoryImage({'url':url,
+                           'ext':ext,
+                           #'newsrc':newsrc, # set below
+                           'mime':mime,
+                           'data':self.memory.keep(data)})
         if cover:
             info['newsrc'] = "images/%s.%s"%(self.cover_name,ext)
             if self.cover and 'cover' in self.infos[0]['newsrc']:
@@ -619,15 +876,33 @@ class ImageStore:
                 ext)
             self.infos.append(info)
             self.url_index[url]=info
-            self.size_index[len(data)].append(info)
+            self.digest_index.setdefault(img_digest(data),info)
         return info['newsrc']
 
     def get_img_by_url(self,url):
         # logger.debug("get_img_by_url(%s):%s"%(url,self.url_index.get(url,None)))
         return self.url_index.get(url,None)
 
-    def get_imgs_by_size(self,size):
-        return self.size_index[size]
+    def get_img_by_data(self,data):
+        info = self.digest_index.get(img_digest(data),None)
+        # paranoia about digest collisions.
+        if info and info['data'] == data:
+            return info
+        return None
+
+    def get_converted(self,key):
+        if key not in self.converted_index:
+            return None
+        (digest,ext,mime) = self.converted_index[key]
+        info = self.digest_index.get(digest,None)
+        if not info:
+            # converted, but not stored (yet).
+            return None
+        return (info['data'],ext,mime)
+
+    def add_converted(self,key,converted):
+        (data,ext,mime) = converted
+        self.converted_index.setdefault(key,(img_digest(data),ext,mime))
 
     def get_imgs(self):
         return self.infos
@@ -639,6 +914,14 @@ class ImageStore:
         # logger.debug("\n"+("\n".join([ x['newsrc'] for x in self.infos])))
 
 
+def copy_metadata(metadata):
+    '''
+    Copy of a metadata dict with its list values copied too, so
+    callers can change it without changing cached values.
+    '''
+    return dict( (key, list(value) if isinstance(value,list) else value)
+                 for (key, value) in metadata.items() )
+
 class MetadataCache:
     def __init__(self):
         # save processed metadata, dicts keyed by 'key', then (removeentities,dorepl)
@@ -648,6 +931,14 @@ class MetadataCache:
         ## there was a reason.
         self.processed_metadata_list_cache = {}
 
+        ## getAllMetadata() results keyed by its args.  Any
+        ## invalidate drops them all.
+        self.all_metadata_cache = {}
+
+        ## getChapters() results keyed by fortoc.  Dropped with
+        ## all_metadata_cache and by addChapter().
+        self.chapters_cache = {}
+
         ## lists of entries that depend on key value--IE, the ones
         ## that should also be cache invalided when key is.
         # {'key':['name','name',...]
@@ -656,31 +947,35 @@ class MetadataCache:
     def clear(self):
         self.processed_metadata_cache = {}
         self.processed_metadata_list_cache = {}
+        self.all_metadata_cache = {}
+        self.chapters_cache = {}
 
-    def invalidate(self,key,seen_list={}):
+    def invalidate(self,key):
+        '''
+        Drop cached values for key and every entry downstream of it
+        in dependent_entries.  Loops in the dependencies (include_in_
+        A in B and B in A) are fine, each entry is only visited once.
+        '''
         # logger.debug("invalidate(%s)"%key)
-        # logger.debug("seen_list(%s)"%seen_list)
-        if key in seen_list:
-            raise exceptions.CacheCleared('replace all')
-        try:
-            new_seen_list = dict(seen_list)
-            new_seen_list[key]=True
-            if key in self.processed_metadata_cache:
-                del self.processed_metadata_cache[key]
-            if key in self.processed_metadata_list_cache:
-                del self.processed_metadata_list_cache[key]
-
-            for entry in self.dependent_entries.get(key,[]):
-                ## replace_metadata lines without keys apply to all
-                ## entries--special key '' used to clear deps on *all*
-                ## cache sets.
-                if entry == '':
-                    # logger.debug("clear in invalidate(%s)"%key)
-                    raise exceptions.CacheCleared('recursed')
-                self.invalidate(entry,new_seen_list)
-        except exceptions.CacheCleared as e:
-            # logger.debug(e)
-            self.clear()
+        self.all_metadata_cache = {}
+        self.chapters_cache = {}
+        seen = set()
+        todo = [key]
+        while todo:
+            key = todo.pop()
+            if key in seen:
+                continue
+            seen.add(key)
+            ## replace_metadata lines without keys apply to all
+            ## entries--special key '' used to clear deps on *all*
+            ## cache sets.
+            if key == '':
+                # logger.debug("clear in invalidate(%s)"%key)
+                self.clear()
+                return
+            self.processed_metadata_cache.pop(key,None)
+            self.processed_metadata_list_cache.pop(key,None)
+            todo.extend(self.dependent_entries.get(key,[]))
         # logger.debug(self.dependent_entries)
 
     def add_dependencies(self,include_key,list_keys):
@@ -714,6 +1009,12 @@ class MetadataCache:
     def get_cached_list(self,key,removeallentities,doreplacements):
         return self.processed_metadata_list_cache[key][(removeallentities,doreplacements)]
 
+    def set_cached_all(self,args,value):
+        self.all_metadata_cache[args] = value
+
+    def get_cached_all(self,args):
+        return self.all_metadata_cache.get(args,None)
+
 
 class Story(Requestable):
 
@@ -726,6 +1027,11 @@ class Story(Requestable):
             self.metadata = {'version':'unknown'}
         self.metadata['python_version']=sys.version
         self.replacements = []
+        self.replacement_rules = ReplacementRules([])
+        ## (key,value,seen_list) -> doReplacements list, only for
+        ## keys without conditionals.  Reset with the rules.
+        self.replacements_memo = {}
+        self.replacements_conditional = {}
         self.chapter_text_replacements = []
         self.in_ex_cludes = {}
         self.chapters = [] # chapters will be dict containing(url,title,html,etc)
@@ -733,15 +1039,18 @@ class Story(Requestable):
         self.chapter_first = None
         self.chapter_last = None
 
-        self.img_store = ImageStore()
+        self.img_store = ImageStore(parse_budget(self.getConfig('image_memory_budget')))
+        ## chapter html past chapter_memory_budget goes to a temp file.
+        self.chapter_memory = MemoryBudget(parse_budget(self.getConfig('chapter_memory_budget')))
+        ## see queueImgUrl()
+        self.img_queue = []
+        self.img_futures = {}
+        self.img_results = {}
+        self.img_placeholder_count = 0
 
         self.metadata_cache = MetadataCache()
 
-        ## set include_in_ cache dependencies
-        for entry in self.getValidMetaList():
-            if self.hasConfig("include_in_"+entry):
-                self.metadata_cache.add_dependencies(entry,
-                  [ k.replace('.NOREPL','') for k in self.getConfigList("include_in_"+entry) ])
+        self.add_metadata_dependencies()
 
         self.cover=None # *href* of new cover image--need to create html.
         self.oldcover=None # (oldcoverhtmlhref,oldcoverhtmltype,oldcoverhtmldata,oldcoverimghref,oldcoverimgtype,oldcoverimgdata)
@@ -764,6 +1073,8 @@ class Story(Requestable):
             from . import fetchers
             fetcher = fetchers.RequestsFetcher(self.getConfig,
                                                self.getConfigList)
+            if self.getConfig('use_negative_cache'):
+                fetchers.NegativeCacheDecorator().decorate_fetcher(fetcher)
             def get_request_raw(url,
                                 referer=None,
                                 usecache=True,
@@ -775,6 +1086,19 @@ class Story(Requestable):
                     image=image)[0]
             self.direct_fetcher = get_request_raw
 
+    def add_metadata_dependencies(self):
+        ## set include_in_ cache dependencies
+        for entry in self.getValidMetaList():
+            if self.hasConfig("include_in_"+entry):
+                self.metadata_cache.add_dependencies(entry,
+                  [ k.replace('.NOREPL','') for k in self.getConfigList("include_in_"+entry) ])
+
+        ## values getMetadata/getList compute from other entries.
+        if self.getConfig("title_chapter_range_pattern"):
+            self.metadata_cache.add_dependencies('title',['numChapters'])
+        if self.getConfig('add_genre_when_multi_category'):
+            self.metadata_cache.add_dependencies('genre',['category'])
+
     def prepare_replacements(self):
         if not self.replacements_prepped and not self.is_lightweight():
             # logger.debug("prepare_replacements")
@@ -790,6 +1114,9 @@ class Story(Requestable):
                     self.addToList(metadata,val)
 
             self.replacements =  make_replacements(self.getConfig('replace_metadata'))
+            self.replacement_rules = ReplacementRules(self.replacements)
+            self.replacements_memo = {}
+            self.replacements_conditional = {}
 
             ## set replace_metadata conditional key cache dependencies
             for replaceline in self.replacements:
@@ -802,7 +1129,7 @@ class Story(Requestable):
                 for key in metakeys:
                     if cond_match:
                         self.metadata_cache.add_dependencies(key.replace('_LIST',''),
-                                                             [ cond_match.key() ])
+                                                             [ cond_match.key().replace('_LIST','') ])
 
             in_ex_clude_list = ['include_metadata_pre','exclude_metadata_pre',
                                 'include_metadata_post','exclude_metadata_post']
@@ -819,23 +1146,38 @@ class Story(Requestable):
                     for key in match.keys:
                         if cond_match:
                             self.metadata_cache.add_dependencies(key.replace('_LIST',''),
-                                                                 [ cond_match.key() ])
+                                                                 [ cond_match.key().replace('_LIST','') ])
 
     def clear_processed_metadata_cache(self):
         self.metadata_cache.clear()
 
+    def copy_for_configuration(self,configuration):
+        '''
+        Returns a Story sharing this one's chapters and images, but
+        with its own metadata and caches, so replace_metadata,
+        include_in_*, etc from configuration apply.  Chapter text
+        isn't redone--replace_chapter_text was applied by addChapter.
+        '''
+        story = copy.copy(self)
+        story.configuration = configuration
+        story.metadata = copy_metadata(self.metadata)
+        story.in_ex_cludes = {}
+        story.replacements_prepped = False
+        story.metadata_cache = MetadataCache()
+        story.add_metadata_dependencies()
+        return story
+
     def set_chapters_range(self,first=None,last=None):
         self.chapter_first=first
         self.chapter_last=last
+        # title_chapter_range_pattern
+        self.metadata_cache.invalidate('title')
 
     def join_list(self, key, vallist):
         return self.getConfig("join_string_"+key,u", ").replace(SPACE_REPLACE,' ').join([ unicode(x) for x in vallist if x is not None ])
 
     def setMetadata(self, key, value, condremoveentities=True):
 
-        # delete cached replace'd value.
-        self.metadata_cache.invalidate(key)
-
         # Fixing everything downstream to handle bool primatives is a
         # pain.
         if isinstance(value,bool):
@@ -846,8 +1188,12 @@ class Story(Requestable):
         else:
             ## still keeps &lt; &lt; and &amp;
             if condremoveentities:
-                self.metadata[key]=conditionalRemoveEntities(value)
-            else:
+                value = conditionalRemoveEntities(value)
+            ## getAllMetadata re-sets authorHTML etc every call,
+            ## only invalidate on a real change.
+            if key not in self.metadata or not same_value(self.metadata[key],value):
+                # delete cached replace'd value.
+                self.metadata_cache.invalidate(key)
                 self.metadata[key]=value
 
         if key == "language":
@@ -868,6 +1214,10 @@ class Story(Requestable):
                                             # ignored if config
                                             # is_lightweight()
             self.replacements_prepped = False
+            self.chapter_text_replacements_prepped = False
+            ## new config may mean new include_in_s, etc.
+            self.add_metadata_dependencies()
+            self.metadata_cache.clear()
 
     def getMetadataForConditional(self,key,seen_list={}):
         if self.getConfig("conditionals_use_lists",True) and not key.endswith("_LIST"):
@@ -911,22 +1261,53 @@ class Story(Requestable):
                 value = None
         return value
 
+    def has_replacement_conditional(self,key):
+        '''
+        True if any replace_metadata or include/exclude line for key
+        has a conditional, making its result depend on other metadata.
+        '''
+        if key not in self.replacements_conditional:
+            cond = self.replacement_rules.has_conditional(key)
+            for which in self.in_ex_cludes.values():
+                for (line,match,cond_match) in which:
+                    cond = cond or (cond_match and match.in_keys(key))
+            self.replacements_conditional[key] = bool(cond)
+        return self.replacements_conditional[key]
+
     def doReplacements(self,value,key,return_list=False,seen_list={}):
         # logger.debug("doReplacements(%s,%s,%s)"%(value,key,seen_list))
         # sets self.replacements and self.in_ex_cludes if needed
         self.prepare_replacements()
 
+        ## Results without conditionals only depend on the rules, so
+        ## are kept until they change.
+        memokey = None
+        if isinstance(value,basestring) and not self.has_replacement_conditional(key):
+            memokey = (key,value,frozenset(seen_list))
+        if memokey in self.replacements_memo:
+            retlist = list(self.replacements_memo[memokey])
+        else:
+            retlist = self.do_replacements_list(value,key,seen_list)
+            if memokey:
+                self.replacements_memo[memokey] = list(retlist)
+
+        if return_list:
+            return retlist
+        else:
+            return self.join_list(key,retlist)
+
+    def do_replacements_list(self,value,key,seen_list):
         value = self.do_in_ex_clude('include_metadata_pre',value,key,seen_list)
         value = self.do_in_ex_clude('exclude_metadata_pre',value,key,seen_list)
 
         retlist = [value]
-        for replaceline in self.replacements:
+        ## only the lines for key, in order.
+        for replaceline in self.replacement_rules.rules_for(key):
             (repl_line,metakeys,regexp,replacement,cond_match) = replaceline
             # logger.debug("replacement tuple:%s"%replaceline)
             # logger.debug("key:%s value:%s"%(key,value))
             # logger.debug("value class:%s"%value.__class__.__name__)
-            if (metakeys == None or key in metakeys) \
-                    and isinstance(value,basestring) \
+            if isinstance(value,basestring) \
                     and regexp.search(value):
                 # recursion on pattern, bail -- Compare by original text
                 # line because I saw an issue with duplicate lines in a
@@ -977,10 +1358,7 @@ class Story(Requestable):
             retlist = [ self.do_in_ex_clude('include_metadata_post',x,key=key,seen_list=seen_list) for x in retlist ]
             retlist = [ self.do_in_ex_clude('exclude_metadata_post',x,key=key,seen_list=seen_list) for x in retlist ]
 
-        if return_list:
-            return retlist
-        else:
-            return self.join_list(key,retlist)
+        return retlist
 
     # for saving an html-ified copy of metadata.
     def dump_html_metadata(self):
@@ -1052,6 +1430,8 @@ class Story(Requestable):
             if val != None:
                 self.metadata[tag['id']]=val
 
+        self.metadata_cache.clear()
+
         # self.metadata = json.loads(s, object_hook=datetime_decoder)
 
     def getChapterCount(self):
@@ -1131,6 +1511,12 @@ class Story(Requestable):
         All single value *and* list value metadata as strings (unless
         keeplists=True, then keep lists).
         '''
+        ## Writers call this a lot.  Kept until metadata changes.
+        args = (removeallentities,doreplacements,keeplists)
+        allmetadata = self.metadata_cache.get_cached_all(args)
+        if allmetadata is not None:
+            return copy_metadata(allmetadata)
+
         allmetadata = {}
 
         # special handling for authors/authorUrls
@@ -1184,7 +1570,8 @@ class Story(Requestable):
             else:
                 allmetadata[k] = self.getMetadata(k, removeallentities, doreplacements)
 
-        return allmetadata
+        self.metadata_cache.set_cached_all(args,allmetadata)
+        return copy_metadata(allmetadata)
 
     def get_sanitized_description(self):
         '''
@@ -1212,19 +1599,23 @@ class Story(Requestable):
             self.addToList(listname,v.strip())
 
     def addToList(self,listname,value,condremoveentities=True,clear=False):
-        # delete cached replace'd value.
-        self.metadata_cache.invalidate(listname)
-
         if value==None:
             return
         if condremoveentities:
             value = conditionalRemoveEntities(value)
         if clear or not self.isList(listname) or not listname in self.metadata:
             # Calling addToList to a non-list meta will overwrite it.
-            self.metadata[listname]=[]
+            changed = not same_value(self.metadata.get(listname),[value])
+            self.metadata[listname]=[value]
         # prevent duplicates.
-        if not value in self.metadata[listname]:
+        elif not value in self.metadata[listname]:
+            changed = True
             self.metadata[listname].append(value)
+        else:
+            changed = False
+        if changed:
+            # delete cached replace'd value.
+            self.metadata_cache.invalidate(listname)
 
     def isList(self,listname):
         'Everything set with an include_in_* is considered a list.'
@@ -1426,13 +1817,22 @@ class Story(Requestable):
         # logger.debug("getSubjectTags:%s"%subjectset.keys())
         return list(subjectset.keys())
 
-    def addChapter(self, chap, newchap=False):
+    def addChapter(self, chap, newchap=False, html_cleaned=False):
         # logger.debug("addChapter(%s,%s)"%(chap,newchap))
-        chapter = defaultdict(unicode,chap) # default unknown to empty string
-        chapter['html'] = removeEntities(chapter['html'])
+        chapter = StoryChapter(unicode,chap) # default unknown to empty string
         if self.getConfig('strip_chapter_numbers') and \
                 self.getConfig('chapter_title_strip_pattern'):
             chapter['title'] = re.sub(self.getConfig('chapter_title_strip_pattern'),"",chapter['title'])
+        ## replace_chapter_text is done once here rather than each
+        ## time getChapters() is called.
+        chapter['title'] = self.do_chapter_text_replacements(chapter['title'])
+        ## html_cleaned when clean_chapter_html() was already done in
+        ## a chapter_text_processes worker.
+        if not html_cleaned:
+            chapter['html'] = clean_chapter_html(chapter['html'],
+                                                 self.get_chapter_text_replacements())
+        if chapter['html']:
+            chapter['html'] = self.chapter_memory.keep_text(chapter['html'])
         chapter.update({'origtitle':chapter['title'],
                         'toctitle':chapter['title'],
                         'new':newchap,
@@ -1444,9 +1844,16 @@ class Story(Requestable):
         ## pre-existing settings.
         chapter['index']=chapter['index04']
         self.chapters.append(chapter)
+        self.metadata_cache.chapters_cache = {}
 
     def getChapters(self,fortoc=False):
-        "Chapters will be defaultdicts(unicode)"
+        '''
+        Chapters will be defaultdicts(unicode), in a tuple that is
+        kept until chapters, config or metadata change.  Callers
+        should copy a chapter before changing it.
+        '''
+        if fortoc in self.metadata_cache.chapters_cache:
+            return self.metadata_cache.chapters_cache[fortoc]
         retval = []
 
         ## only add numbers if more than one chapter.  Ditto (new) marks.
@@ -1479,44 +1886,45 @@ class Story(Requestable):
         newtempl = string.Template(newpattern)
         toctempl = string.Template(tocpattern)
 
+        newforanthology = self.getMetadata('newforanthology')
         for index, chap in enumerate(self.chapters):
-            if chap['new'] or self.getMetadata('newforanthology'):
+            if chap['new'] or newforanthology:
                 usetempl = newtempl
             else:
                 usetempl = templ
             # logger.debug("chap(%s)"%chap)
-            chapter = defaultdict(unicode,chap)
+            chapter = StoryChapter(unicode,chap)
             ## Due to poor planning on my part,
             ## chapter_title_*_pattern expect index==1 not
             ## index=0001 like output settings.  index04 is now
             ## used, but index is still included for backward
             ## compatibility.
-            chapter['title'] = self.do_chapter_text_replacements(chapter['title'])
             chapter['index'] = chapter['number']
             chapter['chapter'] = usetempl.substitute(chapter)
             chapter['origtitle'] = templ.substitute(chapter)
             chapter['toctitle'] = toctempl.substitute(chapter)
             # set after, otherwise changes origtitle and toctitle
             chapter['title'] = chapter['chapter']
-            ## chapter['html'] is a string.
-            chapter['html'] = self.do_chapter_text_replacements(chapter['html'])
             retval.append(chapter)
+        retval = tuple(retval)
+        self.metadata_cache.chapters_cache[fortoc] = retval
         return retval
 
+    def get_chapter_text_replacements(self):
+        # only compile chapter_text_replacements once.
+        if not self.chapter_text_replacements_prepped:
+            self.chapter_text_replacements = combine_chapter_text_replacements(
+                make_chapter_text_replacements(self.getConfig('replace_chapter_text')))
+            self.chapter_text_replacements_prepped = True
+            # logger.debug(self.chapter_text_replacements)
+        return self.chapter_text_replacements
+
     def do_chapter_text_replacements(self,data):
         '''
         'Undocumented' feature.  This is a shotgun with a stirrup on
         the end--you *will* shoot yourself in the foot a lot with it.
         '''
-        # only compile chapter_text_replacements once.
-        if not self.chapter_text_replacements and self.getConfig('replace_chapter_text'):
-            self.chapter_text_replacements = make_chapter_text_replacements(self.getConfig('replace_chapter_text'))
-            # logger.debug(self.chapter_text_replacements)
-        for replaceline in self.chapter_text_replacements:
-            (repl_line,regexp,replacement) = replaceline
-            if regexp.search(data):
-                data = regexp.sub(replacement,data)
-        return data
+        return apply_chapter_text_replacements(data,self.get_chapter_text_replacements())
 
     def get_filename_safe_metadata(self,pattern=None):
         origvalues = self.getAllMetadata()
@@ -1559,6 +1967,30 @@ class Story(Requestable):
     def addImgUrl(self,parenturl,url,fetch,cover=None,coverexclusion=None):
         logger.debug("addImgUrl(parenturl=%s,url=%s,cover=%s,coverexclusion=%s"%(parenturl,url,cover,coverexclusion))
 
+        ## keep images in the order they were found.
+        self.flush_img_queue()
+
+        (retval,job) = self.prepare_img(parenturl,url,fetch,cover,coverexclusion)
+        if retval:
+            return retval
+
+        def fetch_convert():
+            convargs = self.img_convert_args(job['imgurl'])
+            return fetch_convert_image(job['fetch'],
+                                       job['imgurl'],
+                                       self.img_referer(job),
+                                       job['imgdata'],
+                                       convargs,
+                                       img_store=self.dedup_img_store(),
+                                       disk_cache=self.converted_image_cache())
+        return self.store_img(job,cover,coverexclusion,fetch_convert)
+
+    def prepare_img(self,parenturl,url,fetch,cover,coverexclusion):
+        '''
+        Returns (retval,None) if the image is decided without
+        fetching it, otherwise (None,job) where job is a dict of what
+        fetching and storing it needs.
+        '''
         ## flaresolverr can't download images and browser_cache can be setup to ignore image,
         ## so this directly downloads them using RequestsFetcher.
         if self.direct_fetcher:
@@ -1569,12 +2001,11 @@ class Story(Requestable):
         # isn't used anywhere.
         if cover and self.getConfig('never_make_cover'):
             logger.debug("%s rejected as cover by never_make_cover"%url)
-            return (None,None)
+            return ((None,None),None)
 
         url = url.strip() # ran across an image with a space in the
                           # src. Browser handled it, so we'd better, too.
 
-        newsrc = None
         imgdata = None
         if url.startswith("data:image"):
             if 'base64' in url and self.getConfig("convert_inline_images",True):
@@ -1588,7 +2019,7 @@ class Story(Requestable):
                 imgurl = "file:///fakefile/img-data-image/"+hashlib.md5(imgdata).hexdigest()+"."+file_ext
             else:
                 # don't do anything to in-line images.
-                return (url, "inline image")
+                return ((url, "inline image"),None)
         else:
             ## Mistakenly ended up with some // in image urls, like:
             ## https://forums.spacebattles.com//styles/default/xenforo/clear.png
@@ -1628,7 +2059,80 @@ class Story(Requestable):
         ## (Note that default and force covers don't pass cover_exclusion_regexp)
         if cover and coverexclusion and re.search(coverexclusion,imgurl):
             logger.debug("%s rejected as cover by cover_exclusion_regexp"%imgurl)
-            return (None,None)
+            return ((None,None),None)
+
+        return (None,{'parenturl':parenturl,
+                      'url':url,
+                      'imgurl':imgurl,
+                      'imgdata':imgdata,
+                      'fetch':fetch})
+
+    def dedup_img_store(self):
+        ## reusing conversions only matters for duplicates.
+        if self.getConfig('dedup_img_files',False):
+            return self.img_store
+        return None
+
+    def converted_image_cache(self):
+        cachedir = self.getConfig('converted_image_cache_dir')
+        if not cachedir:
+            return None
+        max_size = parse_budget(self.getConfig('converted_image_cache_max_size','200'))
+        if max_size is None:
+            max_size = 200*1024*1024
+        return get_converted_image_cache(os.path.expanduser(cachedir),max_size)
+
+    def img_referer(self,job):
+        # allow referer to be forced for a few image sites
+        # and authors who link images that watermark or
+        # don't work anymore.
+        refererurl = job['parenturl']
+        if( self.getConfig("force_img_self_referer_regexp") and
+            re.search(self.getConfig("force_img_self_referer_regexp"),
+                      job['url']) ):
+            refererurl = job['url']
+            logger.debug("Use Referer:%s"%refererurl)
+        return refererurl
+
+    def img_convert_args(self,imgurl):
+        '''
+        Returns None for no image processing, otherwise the args
+        convert_image needs after url and data.
+        '''
+        if self.no_image_processing(imgurl):
+            return None
+        logger.debug("Doing image processing on (%s)"%imgurl)
+        try:
+            sizes = [ int(x) for x in self.getConfigList('image_max_size',['580', '725']) ]
+        except Exception as e:
+            raise exceptions.FailedToDownload("Failed to parse image_max_size from personal.ini:%s\nException: %s"%(self.getConfigList('image_max_size'),e))
+        grayscale = self.getConfig('grayscale_images')
+        imgtype = self.getConfig('convert_images_to')
+        if not imgtype:
+            imgtype = "jpg"
+        removetrans = self.getConfig('remove_transparency')
+        removetrans = removetrans or grayscale or imgtype=="jpg"
+        if 'ffdl-' in imgurl:
+            raise exceptions.FailedToDownload("ffdl image is internal only...")
+        bgcolor = self.getConfig('background_color','ffffff')
+        if not bgcolor or len(bgcolor)<3 or len(bgcolor)>6 or not re.match(r"^[0-9a-fA-F]+$",bgcolor):
+            logger.info("background_color(%s) needs to be a hexidecimal color--using ffffff instead."%bgcolor)
+            bgcolor = 'ffffff'
+        try:
+            jpg_quality = int(self.getConfig('jpg_quality', '95'))
+        except Exception as e:
+            raise exceptions.FailedToDownload("Failed to parse jpg_quality as int from personal.ini:%s\nException: %s"%(self.getConfig('jpg_quality'),e))
+        return (sizes,grayscale,removetrans,imgtype,"#"+bgcolor,jpg_quality)
+
+    def store_img(self,job,cover,coverexclusion,fetch_convert):
+        '''
+        Store the image from job, dedup and pick cover.
+        fetch_convert() is only called if the image isn't already
+        stored and returns (data,ext,mime) or raises.
+        '''
+        parenturl = job['parenturl']
+        imgurl = job['imgurl']
+        newsrc = None
 
         self.img_store.debug_out()
         imginfo = self.img_store.get_img_by_url(imgurl)
@@ -1636,54 +2140,7 @@ class Story(Requestable):
             try:
                 if imgurl.endswith('failedtoload'):
                     return ("failedtoload","failedtoload")
-
-                if not imgdata:
-                    # might already have from data:image in-line allow
-
-                    # allow referer to be forced for a few image sites
-                    # and authors who link images that watermark or
-                    # don't work anymore.
-                    refererurl = parenturl
-                    if( self.getConfig("force_img_self_referer_regexp") and
-                        re.search(self.getConfig("force_img_self_referer_regexp"),
-                                  url) ):
-                        refererurl = url
-                        logger.debug("Use Referer:%s"%refererurl)
-                    imgdata = fetch(imgurl,referer=refererurl,image=True)
-
-                if self.no_image_processing(imgurl):
-                    (data,ext,mime) = no_convert_image(imgurl,
-                                                       imgdata)
-                else:
-                    logger.debug("Doing image processing on (%s)"%imgurl)
-                    try:
-                        sizes = [ int(x) for x in self.getConfigList('image_max_size',['580', '725']) ]
-                    except Exception as e:
-                        raise exceptions.FailedToDownload("Failed to parse image_max_size from personal.ini:%s\nException: %s"%(self.getConfigList('image_max_size'),e))
-                    grayscale = self.getConfig('grayscale_images')
-                    imgtype = self.getConfig('convert_images_to')
-                    if not imgtype:
-                        imgtype = "jpg"
-                    removetrans = self.getConfig('remove_transparency')
-                    removetrans = removetrans or grayscale or imgtype=="jpg"
-                    if 'ffdl-' in imgurl:
-                        raise exceptions.FailedToDownload("ffdl image is internal only...")
-                    bgcolor = self.getConfig('background_color','ffffff')
-                    if not bgcolor or len(bgcolor)<3 or len(bgcolor)>6 or not re.match(r"^[0-9a-fA-F]+$",bgcolor):
-                        logger.info("background_color(%s) needs to be a hexidecimal color--using ffffff instead."%bgcolor)
-                        bgcolor = 'ffffff'
-                    try:
-                        jpg_quality = int(self.getConfig('jpg_quality', '95'))
-                    except Exception as e:
-                        raise exceptions.FailedToDownload("Failed to parse jpg_quality as int from personal.ini:%s\nException: %s"%(self.getConfig('jpg_quality'),e))
-                    (data,ext,mime) = convert_image(imgurl,
-                                                    imgdata,
-                                                    sizes,
-                                                    grayscale,
-                                                    removetrans,
-                                                    imgtype,
-                                                    background="#"+bgcolor,
-                                                    jpg_quality=jpg_quality)
+                (data,ext,mime) = fetch_convert()
             except Exception as e:
                 try:
                     logger.info("Failed to load or convert image, \nparent:%s\nskipping:%s\nException: %s"%(parenturl,imgurl,e))
@@ -1691,15 +2148,14 @@ class Story(Requestable):
                     logger.info("Failed to load or convert image, \nparent:%s\nskipping:%s\n(Exception output also caused exception)"%(parenturl,imgurl))
                 return ("failedtoload","failedtoload")
 
-            ## (cover images never included in get_imgs_by_size)
+            ## (cover images never included in get_img_by_data)
             if self.getConfig('dedup_img_files',False):
-                same_sz_imgs = self.img_store.get_imgs_by_size(len(data))
-                for szimg in same_sz_imgs:
-                    if data == szimg['data']:
-                        # matching data, duplicate file with a different URL.
-                        logger.info("found duplicate image: %s, %s"%(szimg['newsrc'],
-                                                                     szimg['url']))
-                        return (szimg['newsrc'],szimg['url'])
+                dupimg = self.img_store.get_img_by_data(data)
+                if dupimg:
+                    # matching data, duplicate file with a different URL.
+                    logger.info("found duplicate image: %s, %s"%(dupimg['newsrc'],
+                                                                 dupimg['url']))
+                    return (dupimg['newsrc'],dupimg['url'])
             if not cover: # cover now handled below
                 newsrc = self.img_store.add_img(imgurl,
                                                 ext,
@@ -1758,6 +2214,87 @@ class Story(Requestable):
         # logger.debug("%s,%s"%(newsrc,imgurl))
         return (newsrc, imgurl)
 
+    ## With image_fetch_threads set, chapter images are fetched and
+    ## converted in the background while the rest of the chapter is
+    ## processed.  queueImgUrl returns placeholder src/longdesc values
+    ## that resolve_img_placeholders() replaces once the chapter is
+    ## done.  Images are still stored in the order found, so
+    ## numbering, dedup and cover choice come out the same as with
+    ## addImgUrl.
+    def queueImgUrl(self,parenturl,url,fetch,coverexclusion=None):
+        try:
+            threads = int(self.getConfig('image_fetch_threads',0) or 0)
+            processes = int(self.getConfig('image_convert_processes',0) or 0)
+        except ValueError as e:
+            logger.warning("Bad image_fetch_threads/image_convert_processes: %s"%e)
+            threads = 0
+        if threads < 1:
+            return self.addImgUrl(parenturl,url,fetch,coverexclusion=coverexclusion)
+        logger.debug("queueImgUrl(parenturl=%s,url=%s,coverexclusion=%s"%(parenturl,url,coverexclusion))
+
+        (retval,job) = self.prepare_img(parenturl,url,fetch,None,coverexclusion)
+        if retval:
+            return retval
+
+        imgurl = job['imgurl']
+        if( imgurl not in self.img_futures and
+            not imgurl.endswith('failedtoload') and
+            not self.img_store.get_img_by_url(imgurl) ):
+            try:
+                ## calibre's image routines aren't usable from
+                ## separate processes, only Pillow's.
+                process_pool = None
+                if processes > 0 and image_lib == 'pillow':
+                    process_pool = get_img_pool(ProcessPoolExecutor,processes)
+                self.img_futures[imgurl] = get_img_pool(ThreadPoolExecutor,threads).submit(
+                    fetch_convert_image,
+                    job['fetch'],
+                    imgurl,
+                    self.img_referer(job),
+                    job['imgdata'],
+                    self.img_convert_args(imgurl),
+                    process_pool,
+                    self.dedup_img_store(),
+                    self.converted_image_cache())
+            except Exception as e:
+                ## bad config, same as failing in addImgUrl.
+                self.img_futures[imgurl] = Future()
+                self.img_futures[imgurl].set_exception(e)
+
+        job['coverexclusion'] = coverexclusion
+        job['placeholder'] = self.img_placeholder_count
+        self.img_placeholder_count += 1
+        self.img_queue.append(job)
+        return ("ffdlpendingsrc%d"%job['placeholder'],
+                "ffdlpendingdesc%d"%job['placeholder'])
+
+    def flush_img_queue(self):
+        if not self.img_queue:
+            return
+        queue = self.img_queue
+        self.img_queue = []
+        for job in queue:
+            future = self.img_futures.get(job['imgurl'])
+            self.img_results[job['placeholder']] = self.store_img(
+                job,
+                None,
+                job['coverexclusion'],
+                future.result if future else None)
+        self.img_futures = {}
+
+    def resolve_img_placeholders(self,html):
+        return fill_img_placeholders(html,self.take_img_results())
+
+    def take_img_results(self):
+        '''
+        Waits for queued images and returns placeholder -> (src,
+        longdesc) for them, for fill_img_placeholders().
+        '''
+        self.flush_img_queue()
+        results = self.img_results
+        self.img_results = {}
+        return results
+
     def check_cover_min_size(self,imgdata):
         cover_big_enough = True
         if not self.no_image_processing():
@@ -1792,6 +2329,10 @@ class Story(Requestable):
     def __str__(self):
         return "Metadata: " +unicode(self.metadata)
 
+def same_value(a,b):
+    ## type check so 1 != '1' and 'a' != ['a'].
+    return type(a) == type(b) and a == b
+
 def commaGroups(s):
     groups = []
     while s and s[-1].isdigit():
@@ -18,7 +18,11 @@
 from __future__ import absolute_import
 import logging
 import string
-from zipfile import ZipFile, ZIP_STORED, ZIP_DEFLATED
+import struct
+import time
+import zlib
+from zipfile import ZipFile, ZipInfo, ZIP_STORED, ZIP_DEFLATED
+from concurrent.futures import ThreadPoolExecutor
 import re
 
 # py2 vs py3 transition
@@ -27,15 +31,10 @@ from ..six import string_types as basestring
 from ..six import ensure_binary
 from io import BytesIO
 
-## XML isn't as forgiving as HTML, so rather than generate as strings,
-## use DOM to generate the XML files.
-from xml.dom.minidom import getDOMImplementation
-
-import bs4
-
 from .base_writer import BaseStoryWriter
-from ..htmlcleanup import stripHTML,removeEntities
-from ..story import commaGroups
+from ..htmlcleanup import stripHTML,removeEntities,internalize_text_links
+from ..story import commaGroups, get_img_pool
+from ..exceptions import FailedToWriteOutput
 
 logger = logging.getLogger(__name__)
 
@@ -354,22 +353,33 @@ div { margin: 0pt; padding: 0pt; }
         outputepub.close()
 
         ## Re-open file for content.
-        outputepub = ZipFile(zipio, 'a', compression=ZIP_DEFLATED)
-        outputepub.debug=3
+        epubzip = ZipFile(zipio, 'a', compression=ZIP_DEFLATED)
+        epubzip.debug=3
+        try:
+            level = int(self.getConfig('epub_compression_level') or zlib.Z_DEFAULT_COMPRESSION)
+            threads = int(self.getConfig('epub_compress_threads',0) or 0)
+        except ValueError as e:
+            logger.warning("Bad epub_compression_level/epub_compress_threads: %s"%e)
+            level = zlib.Z_DEFAULT_COMPRESSION
+            threads = 0
+        outputepub = EpubEntries(epubzip,
+                                 zipio,
+                                 level,
+                                 get_img_pool(ThreadPoolExecutor,threads) if threads > 0 else None,
+                                 self.getConfig('epub_deflate_images'))
 
         ## Create META-INF/container.xml file.  The only thing it does is
         ## point to content.opf
-        containerdom = getDOMImplementation().createDocument(None, "container", None)
-        containertop = containerdom.documentElement
-        containertop.setAttribute("version","1.0")
-        containertop.setAttribute("xmlns","urn:oasis:names:tc:opendocument:xmlns:container")
-        rootfiles = containerdom.createElement("rootfiles")
-        containertop.appendChild(rootfiles)
-        rootfiles.appendChild(newTag(containerdom,"rootfile",{"full-path":"content.opf",
-                                                              "media-type":"application/oebps-package+xml"}))
-        outputepub.writestr("META-INF/container.xml",containerdom.toxml(encoding='utf-8'))
-        containerdom.unlink()
-        del containerdom
+        containerxml = XMLBuilder()
+        containerxml.start("container",{"version":"1.0",
+                                        "xmlns":"urn:oasis:names:tc:opendocument:xmlns:container"})
+        containerxml.start("rootfiles")
+        containerxml.tag("rootfile",{"full-path":"content.opf",
+                                     "media-type":"application/oebps-package+xml"})
+        containerxml.end("rootfiles")
+        containerxml.end("container")
+        outputepub.writestr("META-INF/container.xml",containerxml.toxml())
+        del containerxml
 
         ## Epub has two metadata files with real data.  We're putting
         ## them in content.opf (pointed to by META-INF/container.xml)
@@ -384,29 +394,29 @@ div { margin: 0pt; padding: 0pt; }
             self.story.getList('authorId')[0],
             self.getMetadata('storyId'))
 
-        contentdom = getDOMImplementation().createDocument(None, "package", None)
-        package = contentdom.documentElement
+        contentxml = XMLBuilder()
         ## might want 3.1 or something in future.
         epub3 = self.getConfig("epub_version",default="2.0").startswith("3")
         if epub3:
-            package.setAttribute("version","3.0")
+            version = "3.0"
         else:
-            package.setAttribute("version","2.0")
-        logger.info("Saving EPUB Version "+package.getAttribute("version"))
-        package.setAttribute("xmlns","http://www.idpf.org/2007/opf")
-        package.setAttribute("unique-identifier","fanficfare-uid")
-        metadata=newTag(contentdom,"metadata",
-                        attrs={"xmlns:dc":"http://purl.org/dc/elements/1.1/",
-                               "xmlns:opf":"http://www.idpf.org/2007/opf"})
-        package.appendChild(metadata)
-
-        metadata.appendChild(newTag(contentdom,"dc:identifier",
-                                    text=uniqueid,
-                                    attrs={"id":"fanficfare-uid"}))
+            version = "2.0"
+        logger.info("Saving EPUB Version "+version)
+        contentxml.start("package",{"version":version,
+                                    "xmlns":"http://www.idpf.org/2007/opf",
+                                    "unique-identifier":"fanficfare-uid"})
+        ## metadata is left open until the cover meta tag is added below.
+        contentxml.start("metadata",
+                         attrs={"xmlns:dc":"http://purl.org/dc/elements/1.1/",
+                                "xmlns:opf":"http://www.idpf.org/2007/opf"})
+
+        contentxml.tag("dc:identifier",
+                       text=uniqueid,
+                       attrs={"id":"fanficfare-uid"})
 
         if self.getMetadata('title'):
-            metadata.appendChild(newTag(contentdom,"dc:title",text=self.getMetadata('title'),
-                                        attrs={"id":"id"}))
+            contentxml.tag("dc:title",text=self.getMetadata('title'),
+                           attrs={"id":"id"})
 
         def creator_attrs(idnum):
             if epub3:
@@ -417,25 +427,25 @@ div { margin: 0pt; padding: 0pt; }
         if self.getMetadata('author'):
             if self.story.isList('author'):
                 for auth in self.story.getList('author'):
-                    metadata.appendChild(newTag(contentdom,"dc:creator",
-                                                attrs=creator_attrs(idnum),
-                                                text=auth))
+                    contentxml.tag("dc:creator",
+                                   attrs=creator_attrs(idnum),
+                                   text=auth)
                     idnum += 1
             else:
-                metadata.appendChild(newTag(contentdom,"dc:creator",
-                                            attrs=creator_attrs(idnum),
-                                            text=self.getMetadata('author')))
+                contentxml.tag("dc:creator",
+                               attrs=creator_attrs(idnum),
+                               text=self.getMetadata('author'))
                 idnum += 1
 
-        metadata.appendChild(newTag(contentdom,"dc:contributor",text="FanFicFare [https://github.com/JimmXinu/FanFicFare]",
-                                    attrs={"id":"id-%d"%idnum}))
+        contentxml.tag("dc:contributor",text="FanFicFare [https://github.com/JimmXinu/FanFicFare]",
+                       attrs={"id":"id-%d"%idnum})
         idnum += 1
-        # metadata.appendChild(newTag(contentdom,"dc:rights",text=""))
+        # contentxml.tag("dc:rights",text="")
         if self.story.getMetadata('langcode'):
             langcode=self.story.getMetadata('langcode')
         else:
             langcode='en'
-        metadata.appendChild(newTag(contentdom,"dc:language",text=langcode))
+        contentxml.tag("dc:language",text=langcode)
 
         #  published, created, updated, calibre
         #  Leave calling self.story.getMetadataRaw directly in case date format changes.
@@ -443,27 +453,27 @@ div { margin: 0pt; padding: 0pt; }
             ## epub3 requires an updated modified date on every change of
             ## any kind, not just *content* change.
             from ..dateutils import utcnow
-            metadata.appendChild(newTag(contentdom,"meta",
-                                        attrs={"property":"dcterms:modified"},
-                                        text=utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")))
+            contentxml.tag("meta",
+                           attrs={"property":"dcterms:modified"},
+                           text=utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"))
         else:
             if self.story.getMetadataRaw('datePublished'):
-                metadata.appendChild(newTag(contentdom,"dc:date",
-                                            attrs={"opf:event":"publication"},
-                                            text=self.story.getMetadataRaw('datePublished').strftime("%Y-%m-%d")))
+                contentxml.tag("dc:date",
+                               attrs={"opf:event":"publication"},
+                               text=self.story.getMetadataRaw('datePublished').strftime("%Y-%m-%d"))
 
             if self.story.getMetadataRaw('dateCreated'):
-                metadata.appendChild(newTag(contentdom,"dc:date",
-                                            attrs={"opf:event":"creation"},
-                                            text=self.story.getMetadataRaw('dateCreated').strftime("%Y-%m-%d")))
+                contentxml.tag("dc:date",
+                               attrs={"opf:event":"creation"},
+                               text=self.story.getMetadataRaw('dateCreated').strftime("%Y-%m-%d"))
 
             if self.story.getMetadataRaw('dateUpdated'):
-                metadata.appendChild(newTag(contentdom,"dc:date",
-                                            attrs={"opf:event":"modification"},
-                                            text=self.story.getMetadataRaw('dateUpdated').strftime("%Y-%m-%d")))
-                metadata.appendChild(newTag(contentdom,"meta",
-                                            attrs={"name":"calibre:timestamp",
-                                                   "content":self.story.getMetadataRaw('dateUpdated').strftime("%Y-%m-%dT%H:%M:%S")}))
+                contentxml.tag("dc:date",
+                               attrs={"opf:event":"modification"},
+                               text=self.story.getMetadataRaw('dateUpdated').strftime("%Y-%m-%d"))
+                contentxml.tag("meta",
+                               attrs={"name":"calibre:timestamp",
+                                      "content":self.story.getMetadataRaw('dateUpdated').strftime("%Y-%m-%dT%H:%M:%S")})
 
         series = self.story.getMetadata('series')
         if series and self.getConfig('calibre_series_meta'):
@@ -480,62 +490,62 @@ div { margin: 0pt; padding: 0pt; }
                 ## calibre series is the only float at this time)
                 series_index = "%.2f" % float(series_index)
 
-            metadata.appendChild(newTag(contentdom,"meta",
-                                        attrs={"name":"calibre:series",
-                                               "content":series}))
-            metadata.appendChild(newTag(contentdom,"meta",
-                                        attrs={"name":"calibre:series_index",
-                                               "content":series_index}))
+            contentxml.tag("meta",
+                           attrs={"name":"calibre:series",
+                                  "content":series})
+            contentxml.tag("meta",
+                           attrs={"name":"calibre:series_index",
+                                  "content":series_index})
 
         if self.getMetadata('description'):
-            metadata.appendChild(newTag(contentdom,"dc:description",text=
-                                        self.getMetadata('description')))
+            contentxml.tag("dc:description",text=
+                           self.getMetadata('description'))
 
         for subject in self.story.getSubjectTags():
-            metadata.appendChild(newTag(contentdom,"dc:subject",text=subject))
+            contentxml.tag("dc:subject",text=subject)
 
 
         if self.getMetadata('site'):
-            metadata.appendChild(newTag(contentdom,"dc:publisher",
-                                        text=self.getMetadata('site')))
+            contentxml.tag("dc:publisher",
+                           text=self.getMetadata('site'))
 
         if self.getMetadata('storyUrl'):
             if epub3:
-                metadata.appendChild(newTag(contentdom,"dc:identifier",
-                                            text="URL:"+self.getMetadata('storyUrl')))
+                contentxml.tag("dc:identifier",
+                               text="URL:"+self.getMetadata('storyUrl'))
             else:
-                metadata.appendChild(newTag(contentdom,"dc:identifier",
-                                            attrs={"opf:scheme":"URL"},
-                                            text=self.getMetadata('storyUrl')))
-            metadata.appendChild(newTag(contentdom,"dc:source",
-                                        text=self.getMetadata('storyUrl')))
+                contentxml.tag("dc:identifier",
+                               attrs={"opf:scheme":"URL"},
+                               text=self.getMetadata('storyUrl'))
+            contentxml.tag("dc:source",
+                           text=self.getMetadata('storyUrl'))
 
         if epub3:
             # <meta refines="#id" property="title-type">main</meta>
-            metadata.appendChild(newTag(contentdom,"meta",
-                                        attrs={"property":"title-type",
-                                               "refines":"#id",
-                                               },
-                                        text="main"))
+            contentxml.tag("meta",
+                           attrs={"property":"title-type",
+                                  "refines":"#id",
+                                  },
+                           text="main")
 
             # epub3 removes attrs that identify dc:creator and
             # dc:contributor types and instead put them here.
             # 'aut' for 1-(idnum-1)
             for j in range(1,idnum-1):
                 #<meta property="role" refines="#id-1" scheme="marc:relators">aut</meta>
-                metadata.appendChild(newTag(contentdom,"meta",
-                                            attrs={"property":"role",
-                                                   "refines":"#id-%d"%j,
-                                                   "scheme":"marc:relators",
-                                                   },
-                                            text="aut"))
-
-            metadata.appendChild(newTag(contentdom,"meta",
-                                        attrs={"property":"role",
-                                               "refines":"#id-%d"%(idnum-1),
-                                               "scheme":"marc:relators",
-                                               },
-                                        text="bkp"))
+                contentxml.tag("meta",
+                               attrs={"property":"role",
+                                      "refines":"#id-%d"%j,
+                                      "scheme":"marc:relators",
+                                      },
+                               text="aut")
+
+            contentxml.tag("meta",
+                           attrs={"property":"role",
+                                  "refines":"#id-%d"%(idnum-1),
+                                  "scheme":"marc:relators",
+                                  },
+                           text="bkp")
 
         ## end of metadata, create manifest.
         items = [] # list of (id, href, type, title) tuples(all strings)
@@ -543,7 +553,7 @@ div { margin: 0pt; padding: 0pt; }
         items.append(("ncx","toc.ncx","application/x-dtbncx+xml",None)) ## we'll generate the toc.ncx file,
                                                                    ## but it needs to be in the items manifest.
 
-        guide = None
+        guidehref = None # guide only exists if there's a cover.
         coverIO = None
 
         coverimgid = "image0000"
@@ -556,7 +566,7 @@ div { margin: 0pt; padding: 0pt; }
              oldcoverimgtype,
              oldcoverimgdata) = self.story.oldcover
             outputepub.writestr(oldcoverhtmlhref,oldcoverhtmldata)
-            outputepub.writestr(oldcoverimghref,oldcoverimgdata)
+            outputepub.writestr(oldcoverimghref,oldcoverimgdata,mime=oldcoverimgtype)
 
             coverimgid = "image0"
             items.append((coverimgid,
@@ -565,12 +575,9 @@ div { margin: 0pt; padding: 0pt; }
                           None))
             items.append(("cover",oldcoverhtmlhref,oldcoverhtmltype,None))
             itemrefs.append("cover")
-            metadata.appendChild(newTag(contentdom,"meta",{"content":"image0",
-                                                           "name":"cover"}))
-            guide = newTag(contentdom,"guide")
-            guide.appendChild(newTag(contentdom,"reference",attrs={"type":"cover",
-                                                                   "title":"Cover",
-                                                                   "href":oldcoverhtmlhref}))
+            contentxml.tag("meta",{"content":"image0",
+                                   "name":"cover"})
+            guidehref = oldcoverhtmlhref
 
 
 
@@ -580,7 +587,7 @@ div { margin: 0pt; padding: 0pt; }
                 imgfile = "OEBPS/"+imgmap['newsrc']
                 # don't overwrite old cover.
                 if not self.use_oldcover or imgfile != oldcoverimghref:
-                    outputepub.writestr(imgfile,imgmap['data'])
+                    outputepub.writestr(imgfile,imgmap['data'],mime=imgmap['mime'])
                     items.append(("image%04d"%imgcount,
                                   imgfile,
                                   imgmap['mime'],
@@ -601,17 +608,14 @@ div { margin: 0pt; padding: 0pt; }
             itemrefs.append("cover")
             #
             # <meta name="cover" content="cover.jpg"/>
-            metadata.appendChild(newTag(contentdom,"meta",{"content":coverimgid,
-                                                           "name":"cover"}))
+            contentxml.tag("meta",{"content":coverimgid,
+                                   "name":"cover"})
             # cover stuff for later:
             # at end of <package>:
             # <guide>
             # <reference type="cover" title="Cover" href="Text/cover.xhtml"/>
             # </guide>
-            guide = newTag(contentdom,"guide")
-            guide.appendChild(newTag(contentdom,"reference",attrs={"type":"cover",
-                                                       "title":"Cover",
-                                                       "href":"OEBPS/cover.xhtml"}))
+            guidehref = "OEBPS/cover.xhtml"
 
             if self.hasConfig("cover_content"):
                 COVER = string.Template(self.getConfig("cover_content"))
@@ -619,6 +623,7 @@ div { margin: 0pt; padding: 0pt; }
                 COVER = self.EPUB_COVER
             coverIO = BytesIO()
             self._write(coverIO,COVER.substitute(dict(list(self.story.getAllMetadata().items())+list({'coverimg':self.story.cover}.items()))))
+        contentxml.end("metadata")
 
         if self.getConfig("include_titlepage"):
             items.append(("title_page","OEBPS/title_page.xhtml","application/xhtml+xml","Title Page"))
@@ -653,68 +658,68 @@ div { margin: 0pt; padding: 0pt; }
             items.insert(logpage_indices[0],("log_page","OEBPS/log_page.xhtml","application/xhtml+xml","Update Log"))
             itemrefs.insert(logpage_indices[1],"log_page")
 
-        manifest = contentdom.createElement("manifest")
-        package.appendChild(manifest)
+        contentxml.start("manifest")
         for item in items:
             (id,href,type,title)=item
-            manifest.appendChild(newTag(contentdom,"item",
-                                        attrs={'id':id,
-                                               'href':href,
-                                               'media-type':type}))
+            contentxml.tag("item",
+                           attrs={'id':id,
+                                  'href':href,
+                                  'media-type':type})
         if epub3:
             # epub3 nav
             # <item href="nav.xhtml" id="nav" media-type="application/xhtml+xml" properties="nav"/>
-            manifest.appendChild(newTag(contentdom,"item",
-                                        attrs={'href':'nav.xhtml',
-                                               'id':'nav',
-                                               'media-type':'application/xhtml+xml',
-                                               'properties':'nav'
-                                               }))
-
-
-        spine = newTag(contentdom,"spine",attrs={"toc":"ncx"})
-        package.appendChild(spine)
+            contentxml.tag("item",
+                           attrs={'href':'nav.xhtml',
+                                  'id':'nav',
+                                  'media-type':'application/xhtml+xml',
+                                  'properties':'nav'
+                                  })
+        contentxml.end("manifest")
+
+        contentxml.start("spine",attrs={"toc":"ncx"})
         for itemref in itemrefs:
-            spine.appendChild(newTag(contentdom,"itemref",
-                                     attrs={"idref":itemref,
-                                            "linear":"yes"}))
-        # guide only exists if there's a cover.
-        if guide:
-            package.appendChild(guide)
+            contentxml.tag("itemref",
+                           attrs={"idref":itemref,
+                                  "linear":"yes"})
+        contentxml.end("spine")
+        if guidehref:
+            contentxml.start("guide")
+            contentxml.tag("reference",attrs={"type":"cover",
+                                              "title":"Cover",
+                                              "href":guidehref})
+            contentxml.end("guide")
+        contentxml.end("package")
 
         # write content.opf to zip.
-        contentxml = contentdom.toxml(encoding='utf-8')
+        contentxml = contentxml.toxml()
         # tweak for brain damaged Nook STR.  Nook insists on name before content.
         contentxml = contentxml.replace(ensure_binary('<meta content="%s" name="cover"/>'%coverimgid),
                                         ensure_binary('<meta name="cover" content="%s"/>'%coverimgid))
 
         outputepub.writestr("content.opf",contentxml)
 
-        contentdom.unlink()
-        del contentdom
+        del contentxml
 
         ## create toc.ncx file
-        tocncxdom = getDOMImplementation().createDocument(None, "ncx", None)
-        ncx = tocncxdom.documentElement
-        ncx.setAttribute("version","2005-1")
-        ncx.setAttribute("xmlns","http://www.daisy.org/z3986/2005/ncx/")
-        head = tocncxdom.createElement("head")
-        ncx.appendChild(head)
-        head.appendChild(newTag(tocncxdom,"meta",
-                                attrs={"name":"dtb:uid", "content":uniqueid}))
-        head.appendChild(newTag(tocncxdom,"meta",
-                                attrs={"name":"dtb:depth", "content":"1"}))
-        head.appendChild(newTag(tocncxdom,"meta",
-                                attrs={"name":"dtb:totalPageCount", "content":"0"}))
-        head.appendChild(newTag(tocncxdom,"meta",
-                                attrs={"name":"dtb:maxPageNumber", "content":"0"}))
-
-        docTitle = tocncxdom.createElement("docTitle")
-        docTitle.appendChild(newTag(tocncxdom,"text",text=self.getMetadata('title')))
-        ncx.appendChild(docTitle)
-
-        tocnavMap = tocncxdom.createElement("navMap")
-        ncx.appendChild(tocnavMap)
+        tocncxxml = XMLBuilder()
+        tocncxxml.start("ncx",{"version":"2005-1",
+                               "xmlns":"http://www.daisy.org/z3986/2005/ncx/"})
+        tocncxxml.start("head")
+        tocncxxml.tag("meta",
+                      attrs={"name":"dtb:uid", "content":uniqueid})
+        tocncxxml.tag("meta",
+                      attrs={"name":"dtb:depth", "content":"1"})
+        tocncxxml.tag("meta",
+                      attrs={"name":"dtb:totalPageCount", "content":"0"})
+        tocncxxml.tag("meta",
+                      attrs={"name":"dtb:maxPageNumber", "content":"0"})
+        tocncxxml.end("head")
+
+        tocncxxml.start("docTitle")
+        tocncxxml.tag("text",text=self.getMetadata('title'))
+        tocncxxml.end("docTitle")
+
+        tocncxxml.start("navMap")
 
         # <navPoint id="<id>" playOrder="<risingnumberfrom0>">
         #   <navLabel>
@@ -727,58 +732,57 @@ div { margin: 0pt; padding: 0pt; }
             (id,href,type,title)=item
             # only items to be skipped, cover.xhtml, images, toc.ncx, stylesheet.css, should have no title.
             if title :
-                navPoint = newTag(tocncxdom,"navPoint",
-                                  attrs={'id':id,
-                                         'playOrder':unicode(index)})
-                tocnavMap.appendChild(navPoint)
-                navLabel = newTag(tocncxdom,"navLabel")
-                navPoint.appendChild(navLabel)
-                ## the xml library will re-escape as needed.
-                navLabel.appendChild(newTag(tocncxdom,"text",text=stripHTML(title)))
-                navPoint.appendChild(newTag(tocncxdom,"content",attrs={"src":href}))
+                tocncxxml.start("navPoint",
+                                attrs={'id':id,
+                                       'playOrder':unicode(index)})
+                tocncxxml.start("navLabel")
+                ## XMLBuilder will re-escape as needed.
+                tocncxxml.tag("text",text=stripHTML(title))
+                tocncxxml.end("navLabel")
+                tocncxxml.tag("content",attrs={"src":href})
+                tocncxxml.end("navPoint")
                 index=index+1
+        tocncxxml.end("navMap")
+        tocncxxml.end("ncx")
 
         # write toc.ncx to zip file
-        outputepub.writestr("toc.ncx",tocncxdom.toxml(encoding='utf-8'))
-        tocncxdom.unlink()
-        del tocncxdom
+        outputepub.writestr("toc.ncx",tocncxxml.toxml())
+        del tocncxxml
 
         if epub3:
             ##############################################################################################################
             ## create nav.xhtml file
-            tocnavdom = getDOMImplementation().createDocument(None, "html", None)
-            navxhtml = tocnavdom.documentElement
-            navxhtml.setAttribute("xmlns","http://www.w3.org/1999/xhtml")
-            navxhtml.setAttribute("xmlns:epub","http://www.idpf.org/2007/ops")
-            navxhtml.setAttribute("lang",langcode)
-            navxhtml.setAttribute("xml:lang",langcode)
-            head = tocnavdom.createElement("head")
-            navxhtml.appendChild(head)
-            head.appendChild(newTag(tocnavdom,"title",text="Navigation"))
+            tocnavxml = XMLBuilder()
+            ## No plain lang attribute--minidom replaced it with
+            ## xml:lang when this was built as a DOM.
+            tocnavxml.start("html",{"xmlns":"http://www.w3.org/1999/xhtml",
+                                    "xmlns:epub":"http://www.idpf.org/2007/ops",
+                                    "xml:lang":langcode})
+            tocnavxml.start("head")
+            tocnavxml.tag("title",text="Navigation")
             # <meta http-equiv="Content-Type" content="text/html; charset=utf-8"/>
-            head.appendChild(newTag(tocnavdom,"meta",
-                                    attrs={"http-equiv":"Content-Type",
-                                           "content":"text/html; charset=utf-8"}))
-
-            body = tocnavdom.createElement("body")
-            navxhtml.appendChild(body)
-            nav = newTag(tocnavdom,"nav",
-                         attrs={"epub:type":"toc"})
-            body.appendChild(nav)
-            ol = newTag(tocnavdom,"ol")
-            nav.appendChild(ol)
+            tocnavxml.tag("meta",
+                          attrs={"http-equiv":"Content-Type",
+                                 "content":"text/html; charset=utf-8"})
+            tocnavxml.end("head")
+
+            tocnavxml.start("body")
+            tocnavxml.start("nav",
+                            attrs={"epub:type":"toc"})
+            tocnavxml.start("ol")
 
             for item in items:
                 (id,href,type,title)=item
                 # only items to be skipped, cover.xhtml, images, toc.nav,
                 # stylesheet.css, should have no title.
                 if title:
-                    li = newTag(tocnavdom,"li")
-                    ol.appendChild(li)
-                    atag = newTag(tocnavdom,"a",
+                    tocnavxml.start("li")
+                    tocnavxml.tag("a",
                                   attrs={"href":href},
                                   text=stripHTML(title))
-                    li.appendChild(atag)
+                    tocnavxml.end("li")
+            tocnavxml.end("ol")
+            tocnavxml.end("nav")
 
             if self.story.cover and not self.use_oldcover:
                 # <nav epub:type="landmarks" hidden="">
@@ -786,24 +790,24 @@ div { margin: 0pt; padding: 0pt; }
                 #     <li><a href="OEBPS/cover.xhtml" epub:type="cover">Cover</a></li>
                 #   </ol>
                 # </nav>
-                nav = newTag(tocnavdom,"nav",
-                             attrs={"epub:type":"landmarks",
-                                    "hidden":""})
-                body.appendChild(nav)
-                ol = newTag(tocnavdom,"ol")
-                nav.appendChild(ol)
-                li = newTag(tocnavdom,"li")
-                ol.appendChild(li)
-                atag = newTag(tocnavdom,"a",
+                tocnavxml.start("nav",
+                                attrs={"epub:type":"landmarks",
+                                       "hidden":""})
+                tocnavxml.start("ol")
+                tocnavxml.start("li")
+                tocnavxml.tag("a",
                               attrs={"href":"OEBPS/cover.xhtml",
                                      "epub:type":"cover"},
                               text="Cover")
-                li.appendChild(atag)
+                tocnavxml.end("li")
+                tocnavxml.end("ol")
+                tocnavxml.end("nav")
+            tocnavxml.end("body")
+            tocnavxml.end("html")
 
             # write nav.xhtml to zip file
-            outputepub.writestr("nav.xhtml",tocnavdom.toxml(encoding='utf-8'))
-            tocnavdom.unlink()
-            del tocnavdom
+            outputepub.writestr("nav.xhtml",tocnavxml.toxml())
+            del tocnavxml
             ##############################################################################################################
 
         # write stylesheet.css file.
@@ -870,31 +874,14 @@ div { margin: 0pt; padding: 0pt; }
             if chap['html']:
                 chap_data = chap['html']
                 if self.getConfig('internalize_text_links'):
-                    soup = bs4.BeautifulSoup(chap['html'],'html5lib')
-                    changed=False
-                    for alink in soup.find_all('a'):
-                        ## Chapters can be inserted in the middle
-                        ## which can break existing internal links.
-                        ## So let's save the original href and update.
-                        # logger.debug("found %s"%alink)
-                        if alink.has_attr('data-orighref') and alink['data-orighref'] in chapurlmap:
-                            alink['href']=chapurlmap[alink['data-orighref']]
-                            # logger.debug("set1  %s"%alink)
-                            changed=True
-                        elif alink.has_attr('href') and alink['href'] in chapurlmap:
-                            if not alink['href'].startswith('file'):
-                                # only save orig href if not already internal.
-                                alink['data-orighref']=alink['href']
-                            alink['href']=chapurlmap[alink['href']]
-                            # logger.debug("set2  %s"%alink)
-                            changed=True
-                    if changed:
-                        chap_data = unicode(soup)
-                        # Don't want html, head or body tags in
-                        # chapter html--bs4 insists on adding them.
-                        chap_data = re.sub(r"</?(html|head|body)[^>]*>\r?\n?","",chap_data)
+                    ## Chapters can be inserted in the middle which
+                    ## can break existing internal links.  So the
+                    ## original href is saved in data-orighref.
+                    chap_data = internalize_text_links(chap_data,chapurlmap)
 
                 # logger.debug('Writing chapter text for: %s' % chap.title)
+                ## getChapters() is shared, don't change it.
+                chap = chap.copy()
                 chap['url']=removeEntities(chap['url'])
                 chap['chapter']=removeEntities(chap['chapter'])
                 chap['title']=removeEntities(chap['title'])
@@ -920,20 +907,161 @@ div { margin: 0pt; padding: 0pt; }
         if self.story.calibrebookmark:
             outputepub.writestr("META-INF/calibre_bookmarks.txt",self.story.calibrebookmark)
 
+        outputepub.flush()
         # declares all the files created by Windows.  otherwise, when
         # it runs in appengine, windows unzips the files as 000 perms.
-        for zf in outputepub.filelist:
+        for zf in epubzip.filelist:
             zf.create_system = 0
-        outputepub.close()
+        epubzip.close()
         out.write(zipio.getvalue())
         zipio.close()
 
-## Utility method for creating new tags.
-def newTag(dom,name,attrs=None,text=None):
-    tag = dom.createElement(name)
-    if( attrs is not None ):
-        for attr in attrs.keys():
-            tag.setAttribute(attr,attrs[attr])
-    if( text is not None ):
-        tag.appendChild(dom.createTextNode(text))
-    return tag
+## Already compressed, deflate doesn't gain anything on these.
+COMPRESSED_IMAGE_TYPES = ('image/jpeg','image/png','image/gif','image/webp')
+
+def deflate(data,level):
+    ## the same raw deflate stream zipfile makes.
+    compressor = zlib.compressobj(level,zlib.DEFLATED,-15)
+    return compressor.compress(data) + compressor.flush()
+
+## zip64 entries have a longer local header, leave those to zipfile.
+ZIP64_LIMIT = 0x7fffffff
+
+def local_file_header(zinfo):
+    '''
+    The zip local file header (APPNOTE.TXT 4.3.7) for zinfo, made
+    from its documented attributes.  No extra field, so not for zip64
+    entries.
+    '''
+    try:
+        filename = zinfo.filename.encode('ascii')
+        flag_bits = zinfo.flag_bits
+    except UnicodeEncodeError:
+        filename = zinfo.filename.encode('utf-8')
+        flag_bits = zinfo.flag_bits | 0x800
+    dt = zinfo.date_time
+    dostime = dt[3] << 11 | dt[4] << 5 | (dt[5] // 2)
+    dosdate = (dt[0] - 1980) << 9 | dt[1] << 5 | dt[2]
+    return struct.pack('<4s2B4HL2L2H', b'PK\003\004',
+                       max(zinfo.extract_version,20), zinfo.reserved,
+                       flag_bits, zinfo.compress_type, dostime, dosdate,
+                       zinfo.CRC, zinfo.compress_size, zinfo.file_size,
+                       len(filename), 0) + filename
+
+class EpubEntries(object):
+    '''
+    Adds files to the epub zip in the order given.  With a thread
+    pool, files are compressed in it (zlib releases the GIL) while
+    the rest of the epub is made, and are written out as soon as the
+    ones before them are.
+
+    Deflating ahead of time needs to rewrite local headers in stream,
+    the file zipfile is writing to.  When stream can't seek, zipfile
+    compresses everything itself instead.
+    '''
+    def __init__(self,zipfile,stream,level,pool=None,deflate_images=False):
+        self.zipfile = zipfile
+        self.stream = stream
+        self.level = level
+        self.pool = pool
+        self.deflate_images = deflate_images
+        self.pending = []
+        try:
+            self.seekable = stream.seekable()
+        except AttributeError:
+            self.seekable = hasattr(stream,'seek')
+
+    def writestr(self,name,data,mime=None):
+        data = ensure_binary(data)
+        zinfo = ZipInfo(name,time.localtime(time.time())[:6])
+        zinfo.external_attr = 0o600 << 16
+        compressed = None
+        if mime in COMPRESSED_IMAGE_TYPES and not self.deflate_images:
+            zinfo.compress_type = ZIP_STORED
+        else:
+            zinfo.compress_type = ZIP_DEFLATED
+            if self.seekable and len(data) <= ZIP64_LIMIT:
+                if self.pool:
+                    compressed = self.pool.submit(deflate,data,self.level)
+                else:
+                    compressed = deflate(data,self.level)
+        self.pending.append((zinfo,data,compressed))
+        self.flush(wait=False)
+
+    def flush(self,wait=True):
+        while self.pending:
+            (zinfo,data,compressed) = self.pending[0]
+            if hasattr(compressed,'result'):
+                if not wait and not compressed.done():
+                    return
+                compressed = compressed.result()
+            self.pending.pop(0)
+            self.write(zinfo,data,compressed)
+
+    def write(self,zinfo,data,compressed):
+        if compressed is None or len(compressed) > ZIP64_LIMIT:
+            ## stored, can't seek or needs zip64.  Let zipfile do it.
+            self.zipfile.writestr(zinfo,data,compresslevel=self.level)
+            return
+        ## zipfile can't take data that's already deflated, so it's
+        ## written stored and the local header is rewritten to
+        ## describe it as deflated afterwards.  Central directory
+        ## entries are made from zinfo when the zip is closed.
+        zinfo.compress_type = ZIP_STORED
+        self.zipfile.writestr(zinfo,compressed)
+        zinfo.compress_type = ZIP_DEFLATED
+        zinfo.CRC = zlib.crc32(data) & 0xffffffff
+        zinfo.file_size = len(data)
+        zinfo.compress_size = len(compressed)
+        header = local_file_header(zinfo)
+        end = self.stream.tell()
+        if end - zinfo.header_offset != len(header) + len(compressed):
+            raise FailedToWriteOutput("Unexpected zip entry layout for %s"%zinfo.filename)
+        self.stream.seek(zinfo.header_offset)
+        self.stream.write(header)
+        self.stream.seek(end)
+
+def xml_escape(data):
+    ## escapes the same characters minidom does, in text and
+    ## attributes both.
+    return data.replace("&", "&amp;").replace("<", "&lt;"). \
+        replace("\"", "&quot;").replace(">", "&gt;")
+
+class XMLBuilder(object):
+    '''
+    Writes an XML document as a list of strings, the same way
+    xml.dom.minidom's toxml(encoding='utf-8') writes the equivalent
+    DOM: attributes in the order given, no added whitespace and
+    elements without content closed as <name/>.  A 5000 chapter
+    story needs hundreds of thousands of DOM nodes otherwise.
+    '''
+    def __init__(self):
+        self.parts = ['<?xml version="1.0" encoding="utf-8"?>']
+        self.open_at = []
+
+    def _open(self,name,attrs):
+        parts = ['<',name]
+        if attrs is not None:
+            for attr in attrs.keys():
+                parts.extend((' ',attr,'="',xml_escape(attrs[attr]),'"'))
+        return ''.join(parts)
+
+    def start(self,name,attrs=None):
+        self.open_at.append(len(self.parts))
+        self.parts.append(self._open(name,attrs)+'>')
+
+    def end(self,name):
+        if self.open_at.pop() == len(self.parts)-1:
+            # nothing added since start().
+            self.parts[-1] = self.parts[-1][:-1]+'/>'
+        else:
+            self.parts.append('</%s>'%name)
+
+    def tag(self,name,attrs=None,text=None):
+        if text is None:
+            self.parts.append(self._open(name,attrs)+'/>')
+        else:
+            self.parts.append('%s>%s</%s>'%(self._open(name,attrs),xml_escape(text),name))
+
+    def toxml(self):
+        return ''.join(self.parts).encode('utf-8','xmlcharrefreplace')
@@ -23,9 +23,8 @@ import re
 # py2 vs py3 transition
 from ..six import text_type as unicode
 
-import bs4
-
 from .base_writer import BaseStoryWriter
+from ..htmlcleanup import internalize_text_links
 class HTMLWriter(BaseStoryWriter):
 
     @staticmethod
@@ -149,18 +148,8 @@ ${output_css}
                 if self.getConfig('internalize_text_links'):
                     # html doesn't need data-orighref because it
                     # doesn't do updates.
-                    soup = bs4.BeautifulSoup(chap['html'],'html5lib')
-                    changed=False
-                    for alink in soup.find_all('a'):
-                        if alink.has_attr('href') and alink['href'] in chapurlmap:
-                            alink['href']=chapurlmap[alink['href']]
-                            changed=True
-                    if changed:
-                        chap_data = unicode(soup)
-                        # Don't want html, head or body tags in
-                        # chapter html--bs4 insists on adding them.
-                        chap_data = re.sub(r"</?(html|head|body)[^>]*>\r?\n?","",chap_data)
-
+                    chap_data = internalize_text_links(chap_data,chapurlmap,
+                                                       keep_orighref=False)
 
                 logging.debug('Writing chapter text for: %s' % chap['title'])
                 self._write(out,CHAPTER_START.substitute(chap))
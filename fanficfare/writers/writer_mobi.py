@@ -175,7 +175,8 @@ ${value}<br />
 
         c = Converter(title=self.getMetadata('title'),
                       author=self.getMetadata('author'),
-                      publisher=self.getMetadata('site'))
+                      publisher=self.getMetadata('site'),
+                      compression=bool(self.getConfig('mobi_compression',True)))
         mobidata = c.ConvertStrings(files)
         if len(mobidata) < 1:
             raise FailedToWriteOutput("Zero length mobi output")
@@ -22,6 +22,7 @@ from textwrap import wrap
 
 from .base_writer import BaseStoryWriter
 from ..htmlcleanup import removeAllEntities
+from ..story import get_chapter_text_pool
 logger = logging.getLogger(__name__)
 
 from html2text import html2text
@@ -115,6 +116,7 @@ End file.
             self.wrap_width = 0
         else:
             self.wrap_width = int(self.wrap_width)
+        self.windows_eol = self.getConfig("windows_eol")
         
         wrapout = KludgeStringIO()
         
@@ -128,24 +130,23 @@ End file.
         else:
             FILE_END = self.TEXT_FILE_END
             
-        wrapout.write(FILE_START.substitute(self.story.getAllMetadata()))
+        allmetadata = self.story.getAllMetadata()
+        wrapout.write(FILE_START.substitute(allmetadata))
 
         self.writeTitlePage(wrapout,
                             self.TEXT_TITLE_PAGE_START,
                             self.TEXT_TITLE_ENTRY,
                             self.TEXT_TITLE_PAGE_END)
-        towrap = wrapout.getvalue()
         
         self.writeTOCPage(wrapout,
                           self.TEXT_TOC_PAGE_START,
                           self.TEXT_TOC_ENTRY,
                           self.TEXT_TOC_PAGE_END)
 
-        towrap = wrapout.getvalue()
+        towrap = removeAllEntities(wrapout.getvalue())
         wrapout.close()
-        towrap = removeAllEntities(towrap)
-        
-        self._write(out,self.lineends(self.wraplines(towrap)))
+        self.writewrapped(out,towrap)
+        del towrap
 
         if self.hasConfig('chapter_start'):
             CHAPTER_START = string.Template(self.getConfig("chapter_start"))
@@ -157,36 +158,75 @@ End file.
         else:
             CHAPTER_END = self.TEXT_CHAPTER_END
         
-        for index, chap in enumerate(self.story.getChapters()):
-            if chap['html']:
-                # logger.debug('Writing chapter text for: %s' % chap['title'])
-                self._write(out,self.lineends(self.wraplines(removeAllEntities(CHAPTER_START.substitute(chap)))))
-                self._write(out,self.lineends(html2text(chap['html'],bodywidth=self.wrap_width)))
-                self._write(out,self.lineends(self.wraplines(removeAllEntities(CHAPTER_END.substitute(chap)))))
-
-        self._write(out,self.lineends(self.wraplines(FILE_END.substitute(self.story.getAllMetadata()))))
+        for (chap, text) in self.chapter_texts():
+            # logger.debug('Writing chapter text for: %s' % chap['title'])
+            self.writewrapped(out,removeAllEntities(CHAPTER_START.substitute(chap)))
+            self._write(out,self.lineends(text))
+            self.writewrapped(out,removeAllEntities(CHAPTER_END.substitute(chap)))
+
+        self.writewrapped(out,FILE_END.substitute(allmetadata))
+
+    def chapter_texts(self):
+        """
+        Yields (chapter, html2text of its html) for each chapter with
+        html, in order.  With chapter_text_processes, html2text
+        runs in worker processes a few chapters ahead.
+        """
+        (pool,processes) = get_chapter_text_pool(self)
+        pending = []
+        for chap in self.story.getChapters():
+            html = chap['html']
+            if not html:
+                continue
+            future = None
+            if pool is not None:
+                try:
+                    future = pool.submit(html2text,html,bodywidth=self.wrap_width)
+                except Exception as e:
+                    logger.warning("chapter_text_processes failed, converting chapter here: %s"%e)
+            pending.append((chap,html,future))
+            while len(pending) > processes*2:
+                yield self.chapter_text(*pending.pop(0))
+        for args in pending:
+            yield self.chapter_text(*args)
+
+    def chapter_text(self, chap, html, future):
+        if future is not None:
+            try:
+                return (chap,future.result())
+            except Exception as e:
+                logger.warning("chapter_text_processes failed, converting chapter here: %s"%e)
+        return (chap,html2text(html,bodywidth=self.wrap_width))
+
+    def wrapparas(self, text):
+        """
+        Yields each paragraph (line) of text word wrapped to wrap_width.
+        """
+        for para in text.split(u"\n"):
+            yield u"\n".join(wrap(para, self.wrap_width)) + u"\n"
 
     def wraplines(self, text):
         
         if not self.wrap_width:
             return text
         
-        result=''
-        for para in text.split("\n"):
-            first=True
-            for line in wrap(para, self.wrap_width):
-                if first:
-                    first=False
-                else:
-                    result += u"\n"
-                result += line
-            result += u"\n"
-        return result 
+        return u"".join(self.wrapparas(text))
+
+    def writewrapped(self, out, text):
+        """
+        Word wrap text and write it to out a paragraph at a time rather
+        than building it all up first.
+        """
+        if not self.wrap_width:
+            self._write(out,self.lineends(text))
+        else:
+            for para in self.wrapparas(text):
+                self._write(out,self.lineends(para))
 
     ## The appengine will return unix line endings.
     def lineends(self, txt):
         txt = txt.replace('\r','')
-        if self.getConfig("windows_eol"):
+        if self.windows_eol:
             txt = txt.replace('\n',u'\r\n')
         return txt
                        
@@ -0,0 +1,138 @@
+import pytest
+import requests
+
+from fanficfare import exceptions
+from fanficfare.fetchers.base_fetcher import Fetcher, FetcherResponse
+from fanficfare.fetchers.cache_negative import NegativeCache, NegativeCacheDecorator
+
+
+class FakeFetcher(Fetcher):
+    '''
+    Fetcher whose responses are set per URL: bytes, an HTTP error
+    code or an exception instance.
+    '''
+    def __init__(self, config=None):
+        config = dict(config or {})
+        super(FakeFetcher, self).__init__(lambda key, default=None: config.get(key, default),
+                                          lambda key, default=None: [])
+        self.pages = {}
+        self.calls = []
+
+    def request(self, method, url, headers=None, parameters=None):
+        self.calls.append(url)
+        page = self.pages.get(url, b'page')
+        if isinstance(page, int):
+            raise exceptions.HTTPErrorFFF(url, page, 'HTTP Error', b'')
+        if isinstance(page, Exception):
+            raise page
+        return FetcherResponse(page, url, False)
+
+
+class TestNegativeCache:
+    def setup_method(self):
+        self.cache = NegativeCache()
+        self.fetcher = FakeFetcher({'negative_cache_ttl': '600',
+                                    'negative_cache_host_threshold': '2'})
+        NegativeCacheDecorator(self.cache).decorate_fetcher(self.fetcher)
+
+    def test_404_cached(self):
+        # Given
+        url = 'https://example.com/gone.jpg'
+        self.fetcher.pages[url] = 404
+
+        # When
+        for i in range(3):
+            with pytest.raises(exceptions.HTTPErrorFFF) as e:
+                self.fetcher.get_request_redirected(url)
+            assert e.value.status_code == 404
+            assert e.value.url == url
+
+        # Then
+        assert self.fetcher.calls == [url]
+
+    def test_fresh_exception_raised(self):
+        # Given
+        url = 'https://example.com/down'
+        self.fetcher.pages[url] = requests.exceptions.ConnectionError('refused')
+        raised = []
+
+        # When
+        for i in range(3):
+            with pytest.raises(requests.exceptions.ConnectionError) as e:
+                self.fetcher.get_request_redirected(url)
+            raised.append(e.value)
+
+        # Then
+        assert self.fetcher.calls == [url]
+        assert len(set(id(e) for e in raised)) == 3
+        assert [e.args for e in raised] == [('refused',)] * 3
+        assert all(e is not self.cache.get_failure(url) for e in raised[1:])
+
+    def test_other_errors_not_cached(self):
+        # Given
+        url = 'https://example.com/busy'
+        self.fetcher.pages[url] = 500
+
+        # When
+        for i in range(2):
+            with pytest.raises(exceptions.HTTPErrorFFF):
+                self.fetcher.get_request_redirected(url)
+
+        # Then
+        assert self.fetcher.calls == [url, url]
+
+    def test_dead_host_threshold(self):
+        # Given
+        urls = ['https://dead.example.com/%d.jpg' % i for i in range(5)]
+        for url in urls:
+            self.fetcher.pages[url] = requests.exceptions.ConnectionError('Name or service not known')
+
+        # When
+        for url in urls:
+            with pytest.raises(requests.exceptions.ConnectionError):
+                self.fetcher.get_request_redirected(url)
+
+        # Then
+        assert self.fetcher.calls == urls[:2]
+
+    def test_success_resets_host(self):
+        # Given
+        self.fetcher.pages['https://flaky.example.com/1'] = requests.exceptions.ConnectionError('refused')
+
+        # When
+        with pytest.raises(requests.exceptions.ConnectionError):
+            self.fetcher.get_request_redirected('https://flaky.example.com/1')
+        self.fetcher.get_request_redirected('https://flaky.example.com/2')
+
+        # Then
+        assert self.cache.hosts == {}
+
+    def test_usecache_false_refetches(self):
+        # Given
+        url = 'https://example.com/gone'
+        self.fetcher.pages[url] = 410
+        with pytest.raises(exceptions.HTTPErrorFFF):
+            self.fetcher.get_request_redirected(url)
+
+        # When
+        with pytest.raises(exceptions.HTTPErrorFFF):
+            self.fetcher.get_request_redirected(url, usecache=False)
+
+        # Then
+        assert self.fetcher.calls == [url, url]
+
+    def test_ttl_expires(self):
+        # Given
+        url = 'https://example.com/gone'
+        self.fetcher.pages[url] = 404
+        with pytest.raises(exceptions.HTTPErrorFFF):
+            self.fetcher.get_request_redirected(url)
+        (expires, exc) = self.cache.urls[url]
+        self.cache.urls[url] = (0, exc)
+        self.fetcher.pages[url] = b'back'
+
+        # When
+        data = self.fetcher.get_request_redirected(url)[0]
+
+        # Then
+        assert data == b'back'
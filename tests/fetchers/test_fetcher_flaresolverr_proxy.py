@@ -0,0 +1,300 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from fanficfare.six.moves.http_cookiejar import Cookie
+from fanficfare.fetchers import fetcher_flaresolverr_proxy
+from fanficfare.fetchers.fetcher_flaresolverr_proxy import (
+    FlareSolverr_ProxyFetcher,
+    FlareSolverrSessionPool,
+    filter_cookies,
+)
+
+
+class FakeFlareSolverr(object):
+    '''
+    Minimal stand-in for a FlareSolverr server's /v1 API.  Keeps
+    the commands it received and gives each session its own cookie
+    "browser" state.
+    '''
+    def __init__(self):
+        self.commands = []
+        self.sessions = {}
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                data = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                fake.commands.append(data)
+                reply = fake.handle(data)
+                body = json.dumps(reply).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = HTTPServer(('127.0.0.1', 0), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def handle(self, data):
+        cmd = data['cmd']
+        if cmd == 'sessions.create':
+            self.sessions[data['session']] = {}
+            return {'status': 'ok', 'message': 'Session created successfully.',
+                    'session': data['session']}
+        if cmd == 'sessions.destroy':
+            self.sessions.pop(data['session'], None)
+            return {'status': 'ok', 'message': 'The session has been removed.'}
+        if cmd == 'request.get' and 'error' in data['url']:
+            return {'status': 'error', 'message': 'Error solving the challenge.'}
+        if cmd == 'request.get':
+            if 'session' in data and data['session'] not in self.sessions:
+                return {'status': 'error', 'message': 'This session does not exist.'}
+            browser = self.sessions.get(data.get('session'), {})
+            for c in data['cookies']:
+                browser[c['name']] = c
+            browser['cf_clearance'] = {'name': 'cf_clearance', 'value': 'solved',
+                                       'domain': '.fanfiction.net', 'path': '/',
+                                       'secure': True, 'expires': time.time() + 3600}
+            return {'status': 'ok', 'message': '',
+                    'solution': {'url': data['url'], 'status': 200,
+                                 'cookies': list(browser.values()),
+                                 'headers': {'content-type': 'text/html'},
+                                 'response': '<html>%s</html>' % data['url']}}
+        return {'status': 'error', 'message': 'Unknown cmd %s' % cmd}
+
+    def requests(self):
+        return [c for c in self.commands if c['cmd'] == 'request.get']
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_cookie(name, domain, path='/', secure=False, expires=None):
+    return Cookie(0, name, 'v', None, False, domain, True, domain.startswith('.'),
+                  path, True, secure, expires, False, None, None, {})
+
+
+class TestFlareSolverrProxyFetcher:
+    @pytest.fixture(autouse=True)
+    def setup_env(self):
+        self.fs = FakeFlareSolverr()
+        fetcher_flaresolverr_proxy._session_pools.clear()
+        yield
+        self.fs.close()
+        fetcher_flaresolverr_proxy._session_pools.clear()
+
+    def make_fetcher(self, **kargs):
+        config = {
+            'use_flaresolverr_proxy': 'true',
+            'flaresolverr_proxy_address': '127.0.0.1',
+            'flaresolverr_proxy_port': str(self.fs.port),
+            'connect_timeout': '5',
+        }
+        config.update(kargs)
+        return FlareSolverr_ProxyFetcher(lambda key, default=None: config.get(key, default),
+                                         lambda key, default=None: [])
+
+    def test_without_sessions(self):
+        # Given
+        fetcher = self.make_fetcher()
+
+        # When
+        resp = fetcher.request('GET', 'https://www.fanfiction.net/s/1/1/')
+
+        # Then
+        assert resp.content == '<html>https://www.fanfiction.net/s/1/1/</html>'
+        assert [c['cmd'] for c in self.fs.commands] == ['request.get']
+        assert 'session' not in self.fs.commands[0]
+
+    def test_session_reused_per_domain(self):
+        # Given
+        fetcher = self.make_fetcher(use_flaresolverr_session=True)
+
+        # When
+        for i in range(3):
+            fetcher.request('GET', 'https://www.fanfiction.net/s/1/%d/' % i)
+        fetcher.request('GET', 'https://www.fictionpress.com/s/2/1/')
+
+        # Then
+        creates = [c['session'] for c in self.fs.commands if c['cmd'] == 'sessions.create']
+        assert len(creates) == 2
+        sessions = [c['session'] for c in self.fs.requests()]
+        assert sessions[0] == sessions[1] == sessions[2] != sessions[3]
+
+    def test_session_shared_between_fetchers(self):
+        # Given
+        fetcher1 = self.make_fetcher(use_flaresolverr_session=True)
+        fetcher2 = self.make_fetcher(use_flaresolverr_session=True)
+
+        # When
+        fetcher1.request('GET', 'https://www.fanfiction.net/s/1/1/')
+        fetcher2.request('GET', 'https://www.fanfiction.net/s/2/1/')
+
+        # Then
+        assert len([c for c in self.fs.commands if c['cmd'] == 'sessions.create']) == 1
+
+    def test_session_cookies_mirrored(self):
+        # Given
+        fetcher = self.make_fetcher(use_flaresolverr_session=True)
+
+        # When
+        fetcher.request('GET', 'https://www.fanfiction.net/s/1/1/')
+        fetcher.request('GET', 'https://www.fanfiction.net/s/1/2/')
+
+        # Then
+        assert 'cf_clearance' in [c.name for c in fetcher.get_cookiejar()]
+        # session browser already has cf_clearance, not sent again.
+        assert self.fs.requests()[1]['cookies'] == []
+
+    def test_no_session_sends_jar_cookies(self):
+        # Given
+        fetcher = self.make_fetcher()
+
+        # When
+        fetcher.request('GET', 'https://www.fanfiction.net/s/1/1/')
+        fetcher.request('GET', 'https://www.fanfiction.net/s/1/2/')
+
+        # Then
+        assert [c['name'] for c in self.fs.requests()[1]['cookies']] == ['cf_clearance']
+
+    def test_pool_size_evicts_lru(self):
+        # Given
+        fetcher = self.make_fetcher(use_flaresolverr_session=True,
+                                    flaresolverr_session_pool_size='2')
+
+        # When
+        fetcher.request('GET', 'https://a.example.com/1')
+        fetcher.request('GET', 'https://b.example.com/1')
+        fetcher.request('GET', 'https://c.example.com/1')
+
+        # Then
+        destroyed = [c['session'] for c in self.fs.commands if c['cmd'] == 'sessions.destroy']
+        assert len(destroyed) == 1
+        assert 'a.example.com' in destroyed[0]
+        assert len(self.fs.sessions) == 2
+
+    def test_lost_session_replaced(self):
+        # Given
+        fetcher = self.make_fetcher(use_flaresolverr_session=True)
+        fetcher.request('GET', 'https://www.fanfiction.net/s/1/1/')
+        self.fs.sessions.clear() # FlareSolverr restarted
+
+        # When
+        with pytest.raises(Exception):
+            fetcher.request('GET', 'https://www.fanfiction.net/s/1/2/')
+        fetcher.request('GET', 'https://www.fanfiction.net/s/1/3/')
+
+        # Then
+        assert len([c for c in self.fs.commands if c['cmd'] == 'sessions.create']) == 2
+
+    def test_failed_request_cookies_not_kept(self):
+        # Given
+        fetcher = self.make_fetcher(use_flaresolverr_session=True)
+        fetcher.get_cookiejar().set_cookie(make_cookie('login', '.fanfiction.net'))
+        session = fetcher.get_session_pool().acquire('www.fanfiction.net',
+                                                     fetcher.create_session,
+                                                     fetcher.destroy_session)
+
+        # When
+        fetcher.do_fs_request('request.get', 'https://www.fanfiction.net/error', fs_session=session)
+
+        # Then
+        assert session.cookies == {}
+        fetcher.do_fs_request('request.get', 'https://www.fanfiction.net/s/1/1/', fs_session=session)
+        assert list(session.cookies.values()) == ['v']
+
+    def test_sessions_destroyed(self):
+        # Given
+        fetcher = self.make_fetcher(use_flaresolverr_session=True)
+        fetcher.request('GET', 'https://www.fanfiction.net/s/1/1/')
+        fetcher.request('GET', 'https://www.fictionpress.com/s/2/1/')
+        assert len(self.fs.sessions) == 2
+
+        # When
+        fetcher_flaresolverr_proxy.destroy_session_pools()
+
+        # Then
+        assert self.fs.sessions == {}
+        assert fetcher_flaresolverr_proxy._session_pools == {}
+        fetcher.request('GET', 'https://www.fanfiction.net/s/1/2/')
+        assert len(self.fs.sessions) == 1
+
+
+    def test_sessions_destroyed_without_atexit_unregister(self, monkeypatch):
+        # Given
+        fetcher = self.make_fetcher(use_flaresolverr_session=True)
+        fetcher.request('GET', 'https://www.fanfiction.net/s/1/1/')
+        monkeypatch.delattr(fetcher_flaresolverr_proxy.atexit, 'unregister') # as on py2
+
+        # When
+        fetcher_flaresolverr_proxy.destroy_session_pools()
+
+        # Then
+        assert self.fs.sessions == {}
+        assert fetcher_flaresolverr_proxy._session_pools == {}
+
+class TestSessionPool:
+    def test_parallel_requests_get_separate_sessions(self):
+        # Given
+        pool = FlareSolverrSessionPool('test', 2)
+        create = lambda name: name
+        destroy = lambda name: None
+
+        # When
+        s1 = pool.acquire('www.fanfiction.net', create, destroy)
+        s2 = pool.acquire('www.fanfiction.net', create, destroy)
+        pool.release(s1)
+        s3 = pool.acquire('www.fanfiction.net', create, destroy)
+
+        # Then
+        assert s1.name != s2.name
+        assert s3 is s1
+
+    def test_acquire_waits_when_full(self):
+        # Given
+        pool = FlareSolverrSessionPool('test', 1)
+        create = lambda name: name
+        destroy = lambda name: None
+        s1 = pool.acquire('www.fanfiction.net', create, destroy)
+        got = []
+
+        # When
+        t = threading.Thread(target=lambda: got.append(pool.acquire('www.fanfiction.net', create, destroy)))
+        t.start()
+        time.sleep(0.1)
+        assert got == []
+        pool.release(s1)
+        t.join(2)
+
+        # Then
+        assert got == [s1]
+
+
+class TestFilterCookies:
+    def test_domain_matching(self):
+        # Given
+        jar = [make_cookie('a', '.fanfiction.net'),
+               make_cookie('b', 'www.fanfiction.net'),
+               make_cookie('c', 'm.fanfiction.net'),
+               make_cookie('d', 'fiction.net'),
+               make_cookie('e', 'net.com'),
+               make_cookie('f', '.fanfiction.net', path='/s/'),
+               make_cookie('g', '.fanfiction.net', path='/u/'),
+               make_cookie('h', '.fanfiction.net', secure=True),
+               make_cookie('i', '.fanfiction.net', expires=1)]
+
+        # When
+        names = [c.name for c in filter_cookies(jar, 'http://www.fanfiction.net/s/1/1/')]
+
+        # Then
+        assert names == ['a', 'b', 'f']
@@ -0,0 +1,198 @@
+import base64
+import socket
+import threading
+import time
+
+import pytest
+
+from fanficfare import exceptions
+from fanficfare.fetchers.fetcher_nsapa_proxy import NSAPA_ProxyFetcher
+
+PAGES = {
+    'https://www.fanfiction.net/s/1/1/': ('text', 'Chapter one. ' * 5000),
+    'https://www.fanfiction.net/s/1/2/': ('text', 'Chapitre deux, très court.'),
+    'https://www.fanfiction.net/image.png': ('image', bytes(range(256)) * 40),
+    'https://www.fanfiction.net/b64': ('text-b64', base64.standard_b64encode(b'some bytes').decode('ascii')),
+}
+
+
+class FakeNsapaProxy(object):
+    '''
+    Stand-in for nsapa's fanfictionnet_ff_proxy.  Replies to a URL
+    with size||type$END_OF_HEADER$payload.  A request ending in a
+    newline is treated as a persistent connection, otherwise the
+    connection is closed after one reply like the original proxy.
+    '''
+    def __init__(self, chunk_size=None, truncate=False):
+        self.chunk_size = chunk_size
+        self.truncate = truncate
+        self.connections = 0
+        self.requests = []
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(5)
+        self.port = self.sock.getsockname()[1]
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        while True:
+            try:
+                conn, addr = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def handle(self, conn):
+        buf = b''
+        with conn:
+            while True:
+                data = conn.recv(4096)
+                if not data:
+                    return
+                buf += data
+                if not buf.endswith(b'\n'):
+                    self.reply(conn, buf.decode('utf-8'))
+                    return
+                while b'\n' in buf:
+                    (url, buf) = buf.split(b'\n', 1)
+                    self.reply(conn, url.decode('utf-8'))
+
+    def reply(self, conn, url):
+        self.requests.append(url)
+        (ptype, payload) = PAGES.get(url, ('text', 'Version page'))
+        if not isinstance(payload, bytes):
+            payload = payload.encode('utf-8')
+        size = len(payload)
+        if self.truncate:
+            payload = payload[:size // 2]
+        data = ('%d||%s' % (size, ptype)).encode('utf-8') + b'$END_OF_HEADER$' + payload
+        if self.chunk_size:
+            for i in range(0, len(data), self.chunk_size):
+                conn.sendall(data[i:i + self.chunk_size])
+                time.sleep(0.001)
+        else:
+            conn.sendall(data)
+
+    def close(self):
+        self.sock.close()
+
+
+class TestNsapaProxyFetcher:
+    def make_fetcher(self, proxy, keepalive=False):
+        config = {
+            'nsapa_proxy_address': '127.0.0.1',
+            'nsapa_proxy_port': str(proxy.port),
+            'nsapa_proxy_keepalive': keepalive,
+        }
+        return NSAPA_ProxyFetcher(lambda key, default=None: config.get(key, default),
+                                  lambda key, default=None: [])
+
+    @pytest.fixture
+    def proxy(self):
+        proxy = FakeNsapaProxy()
+        yield proxy
+        proxy.close()
+
+    @pytest.mark.parametrize("keepalive", [False, True])
+    def test_pages(self, proxy, keepalive):
+        # Given
+        fetcher = self.make_fetcher(proxy, keepalive)
+
+        # When
+        for url, (ptype, payload) in PAGES.items():
+            (type_expected, content) = fetcher.proxy_request(url)
+
+            # Then
+            assert type_expected == ptype
+            if ptype == 'text-b64':
+                assert content == b'some bytes'
+            else:
+                assert content == payload
+
+    def test_new_connection_per_request(self, proxy):
+        # Given
+        fetcher = self.make_fetcher(proxy)
+
+        # When
+        for url in PAGES:
+            fetcher.proxy_request(url)
+
+        # Then
+        assert proxy.connections == len(PAGES)
+
+    def test_keepalive_reuses_connection(self, proxy):
+        # Given
+        fetcher = self.make_fetcher(proxy, keepalive=True)
+
+        # When
+        for url in list(PAGES) * 3:
+            fetcher.proxy_request(url)
+
+        # Then
+        assert proxy.connections == 1
+        assert proxy.requests == list(PAGES) * 3
+
+    def test_keepalive_reconnects_when_dropped(self, proxy):
+        # Given
+        fetcher = self.make_fetcher(proxy, keepalive=True)
+        fetcher.proxy_request('https://www.fanfiction.net/s/1/2/')
+        fetcher.proxy_socket.shutdown(socket.SHUT_RDWR)
+
+        # When
+        (type_expected, content) = fetcher.proxy_request('https://www.fanfiction.net/s/1/2/')
+
+        # Then
+        assert content == PAGES['https://www.fanfiction.net/s/1/2/'][1]
+        assert proxy.connections == 2
+
+    def test_keepalive_proxy_gone(self, proxy):
+        # Given
+        fetcher = self.make_fetcher(proxy, keepalive=True)
+        fetcher.proxy_request('https://www.fanfiction.net/s/1/2/')
+        fetcher.proxy_socket.shutdown(socket.SHUT_RDWR)
+        unused = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        unused.bind(('127.0.0.1', 0))
+        address = unused.getsockname()
+        unused.close()
+        fetcher.proxy_address = lambda: address
+
+        # When/Then
+        with pytest.raises(ConnectionError, match='unavailable'):
+            fetcher.proxy_request('https://www.fanfiction.net/s/1/2/')
+        assert fetcher.proxy_socket is None
+
+    def test_chunked_reply(self):
+        # Given
+        proxy = FakeNsapaProxy(chunk_size=7)
+        fetcher = self.make_fetcher(proxy)
+
+        # When
+        (type_expected, content) = fetcher.proxy_request('https://www.fanfiction.net/s/1/2/')
+
+        # Then
+        assert content == PAGES['https://www.fanfiction.net/s/1/2/'][1]
+        proxy.close()
+
+    def test_truncated_reply(self):
+        # Given
+        proxy = FakeNsapaProxy(truncate=True)
+        fetcher = self.make_fetcher(proxy)
+
+        # When/Then
+        with pytest.raises(exceptions.FailedToDownload, match='truncated'):
+            fetcher.proxy_request('https://www.fanfiction.net/s/1/1/', timeout=1)
+        proxy.close()
+
+    def test_fast_request(self, proxy):
+        # Given
+        fetcher = self.make_fetcher(proxy)
+
+        # When
+        start = time.time()
+        for i in range(20):
+            fetcher.request('GET', 'https://www.fanfiction.net/s/1/2/')
+
+        # Then -- no more sleep(0.1) polling per request.
+        assert time.time() - start < 1.0
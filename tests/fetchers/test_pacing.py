@@ -0,0 +1,181 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from fanficfare import exceptions
+from fanficfare.fetchers import pacing
+from fanficfare.fetchers.pacing import HostPacer, parse_retry_after
+from fanficfare.fetchers.fetcher_requests import RequestsFetcher
+
+
+class ThrottlingServer(object):
+    '''
+    Local HTTP server that answers the first `throttle` requests with
+    429 (and Retry-After, if given) and then 200.
+    '''
+    def __init__(self, throttle=1, retry_after=None, code=429):
+        self.throttle = throttle
+        self.retry_after = retry_after
+        self.code = code
+        self.times = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fake.times.append(time.time())
+                if len(fake.times) <= fake.throttle:
+                    self.send_response(fake.code)
+                    if fake.retry_after is not None:
+                        self.send_header('Retry-After', fake.retry_after)
+                    body = b'slow down'
+                else:
+                    self.send_response(200)
+                    body = b'ok'
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = HTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:%s/story' % self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestParseRetryAfter:
+    def test_seconds(self):
+        assert parse_retry_after('120') == 120.0
+        assert parse_retry_after(' 0 ') == 0.0
+
+    def test_http_date(self):
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:30 GMT', now=1445412480) == 30.0
+
+    def test_past_date(self):
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT', now=1445412480) == 0.0
+
+    def test_invalid(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after('soon') is None
+
+
+class TestHostPacer:
+    def test_throttle_and_speedup(self):
+        # Given
+        pacer = HostPacer('example.com')
+
+        # When
+        pacer.throttled()
+        pacer.throttled()
+
+        # Then
+        assert pacer.delay == 2 * pacing.MIN_DELAY
+
+        # When
+        for i in range(pacing.SPEEDUP_AFTER):
+            pacer.succeeded()
+
+        # Then
+        assert pacer.delay == 2 * pacing.MIN_DELAY * pacing.SPEEDUP_FACTOR
+
+    def test_retry_after_sets_wait(self):
+        # Given
+        pacer = HostPacer('example.com')
+
+        # When
+        pacer.throttled(30)
+
+        # Then
+        assert 29 < pacer.wait_time() <= 30
+        assert pacer.state()['throttles'] == 1
+
+    def test_retry_after_caps(self):
+        # Given
+        pacer = HostPacer('example.com')
+
+        # When
+        pacer.throttled(86400)
+
+        # Then
+        assert pacing.MAX_RETRY_AFTER - 1 < pacer.wait_time() <= pacing.MAX_RETRY_AFTER
+
+    def test_delay_caps(self):
+        # Given
+        pacer = HostPacer('example.com')
+
+        # When
+        for i in range(20):
+            pacer.throttled()
+
+        # Then
+        assert pacer.delay == pacing.MAX_DELAY
+
+
+class TestRequestsFetcherPacing:
+    @pytest.fixture(autouse=True)
+    def setup_env(self, monkeypatch):
+        monkeypatch.setattr(pacing, 'MIN_DELAY', 0.05)
+        pacing._pacers.clear()
+        yield
+        pacing._pacers.clear()
+
+    def make_fetcher(self):
+        config = {'connect_timeout': '5'}
+        return RequestsFetcher(lambda key, default=None: config.get(key, default),
+                               lambda key, default=None: [])
+
+    def test_retry_after_honored(self):
+        # Given
+        server = ThrottlingServer(throttle=1, retry_after='1')
+        fetcher = self.make_fetcher()
+
+        # When
+        resp = fetcher.request('GET', server.url)
+
+        # Then
+        assert resp.content == b'ok'
+        assert len(server.times) == 2
+        assert server.times[1] - server.times[0] >= 0.95
+        server.close()
+
+    def test_throttle_without_retry_after(self):
+        # Given
+        server = ThrottlingServer(throttle=2, code=503)
+        fetcher = self.make_fetcher()
+
+        # When
+        resp = fetcher.request('GET', server.url)
+
+        # Then
+        assert resp.content == b'ok'
+        assert len(server.times) == 3
+        assert pacing.get_pacer(server.url).state()['throttles'] == 2
+        server.close()
+
+    def test_gives_up(self):
+        # Given
+        server = ThrottlingServer(throttle=100)
+        fetcher = self.make_fetcher()
+
+        # When/Then
+        with pytest.raises(exceptions.HTTPErrorFFF):
+            fetcher.request('GET', server.url)
+        server.close()
+
+    def test_long_retry_after_not_waited(self):
+        # Given
+        server = ThrottlingServer(throttle=1, retry_after='3600')
+        fetcher = self.make_fetcher()
+
+        # When/Then
+        with pytest.raises(exceptions.HTTPErrorFFF):
+            fetcher.request('GET', server.url)
+        assert len(server.times) == 1
+        assert pacing.get_pacer(server.url).wait_time() <= pacing.MAX_RETRY_AFTER
+        server.close()
@@ -0,0 +1,1500 @@
+# -*- coding: utf-8 -*-
+## (input, expected) pairs for htmlheuristics.replace_br_with_p, made
+## with the regexp-per-break-count implementation.
+replace_br_with_p_cases = [('<div><br/><br/>start</div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><br/></p>\n'
+  '<p>start</p></div>\n'),
+ ('<div>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of text.<br/>Line of '
+  'text.<br/></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p>\n'
+  '<p>Line of text.</p></div>\n'),
+ ('<div>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/>Short.<br/><br/></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p>\n'
+  '<p>Short.</p></div>\n'),
+ ('<div>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.<br/>A much longer line of prose that goes on for a while, more than ninety characters '
+  'in all, surely.<br/>A much longer line of prose that goes on for a while, more than ninety '
+  'characters in all, surely.<br/>A much longer line of prose that goes on for a while, more than '
+  'ninety characters in all, surely.<br/>A much longer line of prose that goes on for a while, '
+  'more than ninety characters in all, surely.<br/>A much longer line of prose that goes on for a '
+  'while, more than ninety characters in all, surely.<br/>A much longer line of prose that goes on '
+  'for a while, more than ninety characters in all, surely.<br/>A much longer line of prose that '
+  'goes on for a while, more than ninety characters in all, surely.<br/>A much longer line of '
+  'prose that goes on for a while, more than ninety characters in all, surely.<br/>A much longer '
+  'line of prose that goes on for a while, more than ninety characters in all, surely.<br/>A much '
+  'longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.<br/>A much longer line of prose that goes on for a while, more than ninety characters '
+  'in all, surely.<br/>A much longer line of prose that goes on for a while, more than ninety '
+  'characters in all, surely.<br/>A much longer line of prose that goes on for a while, more than '
+  'ninety characters in all, surely.<br/>A much longer line of prose that goes on for a while, '
+  'more than ninety characters in all, surely.<br/>A much longer line of prose that goes on for a '
+  'while, more than ninety characters in all, surely.<br/>A much longer line of prose that goes on '
+  'for a while, more than ninety characters in all, surely.<br/>A much longer line of prose that '
+  'goes on for a while, more than ninety characters in all, surely.<br/>A much longer line of '
+  'prose that goes on for a while, more than ninety characters in all, surely.<br/>A much longer '
+  'line of prose that goes on for a while, more than ninety characters in all, surely.<br/>A much '
+  'longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.<br/>A much longer line of prose that goes on for a while, more than ninety characters '
+  'in all, surely.<br/>A much longer line of prose that goes on for a while, more than ninety '
+  'characters in all, surely.<br/>A much longer line of prose that goes on for a while, more than '
+  'ninety characters in all, surely.<br/>A much longer line of prose that goes on for a while, '
+  'more than ninety characters in all, surely.<br/>A much longer line of prose that goes on for a '
+  'while, more than ninety characters in all, surely.<br/>A much longer line of prose that goes on '
+  'for a while, more than ninety characters in all, surely.<br/>A much longer line of prose that '
+  'goes on for a while, more than ninety characters in all, surely.<br/>A much longer line of '
+  'prose that goes on for a while, more than ninety characters in all, surely.<br/>A much longer '
+  'line of prose that goes on for a while, more than ninety characters in all, surely.<br/></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p>\n'
+  '<p>A much longer line of prose that goes on for a while, more than ninety characters in all, '
+  'surely.</p></div>\n'),
+ ('<div>a<br/>b<br/>c<br/>d<br/>e<br/>f</div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>a</p>\n'
+  '<p>b<br />c</p>\n'
+  '<p>d<br />e</p>\n'
+  '<p>f</p></div>\n'),
+ ('<div>aa<br/><br/>b<br/><br/>c<br/><br/>dd</div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>aa</p>\n'
+  '<p>b<br /><br />c</p>\n'
+  '<p>dd</p></div>\n'),
+ ('<div><br/><br/><br/><br/><br/><br/><br/><br/><br/><br/><br/><br/><br/><br/><br/><br/><br/><br/><br/><br/>x<br/><br/><br/><br/><br/><br/><br/><br/><br/>y<br/><br/><br/><br/><br/><br/><br/><br/>z</div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><br/></p>\n'
+  '<hr />\n'
+  '<p>x</p>\n'
+  '<hr />\n'
+  '<p>y</p>\n'
+  '<hr />\n'
+  '<p>z</p></div>\n'),
+ ('<div><p>para one</p><br/><br/><p>para two</p><br/><hr/><br/>after</div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>para one</p>\n'
+  '<p><br/></p>\n'
+  '<p>para two</p>\n'
+  '<hr />\n'
+  '<p>afte</p></div>\n'),
+ ('<div>[bracketed] text<br/>more [x]<br/><br/>done</div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>[bracketed] text</p>\n'
+  '<p>more [x]</p>\n'
+  '<p>done</p></div>\n'),
+ ('<div>Entities &amp; &lt;tag&gt; &#8212;<br/>&nbsp;&nbsp;next</div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>Entities &amp; &lt;tag&gt; &#8212;</p>\n'
+  '<p>&nbsp;&nbsp;next</p></div>\n'),
+ ('<div><blockquote>quoted<br/>lines<br/>here</blockquote>text<br/>more</div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<blockquote>\n'
+  '<p>quoted<br />lines<br />here</p>\n'
+  '</blockquote>\n'
+  '<p>text</p>\n'
+  '<p>more</p></div>\n'),
+ ('<div><pre>code<br/>line</pre><br/><br/>tail</div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<pre>code<br />line</pre>\n'
+  '<p><br/></p>\n'
+  '<p>tail</p></div>\n'),
+ ('<div>no breaks at all, just text</div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>no breaks at all, just text</p></div>\n'),
+ ('plain text with no tags', 'plain text with no tags'),
+ ('<div>\xa0\xa0spaces\xa0<br/>\xa0</div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>space</p></div>\n'),
+ ('<div><b>bold<br/>still bold</b><br/><i>ital</i></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><b>bold</b></p>\n'
+  '<p><b>still bold</b></p>\n'
+  '<p><i>ital</i></p></div>\n'),
+ ('<div><p>unclosed para<br/>text<br/><br/>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>unclosed para<br />text<br /></p></div>\n'),
+ ('<span><br/><div class="inner">brown over lazy café into quick quick quick café &gt; <br/> said '
+  'over and dog the — 4 into</div>5 jumps over — brown Harry  jumps looked<br><br /><br '
+  'class="x"/><center><b>… quick — jumps the him said &gt;</b></center><p>fox jumps 4</p>walked '
+  'said quick café dog … said looked 5brown and Harry said looked<i>5 brown [author<br>him 5 &gt; '
+  'brown &gt; "hello" &nbsp; …</i><em>dog and AT&amp;T &lt;3 dog</em><center><b>4 '
+  '[author</b></center><em>then café lazy "hello" Harry said at &nbsp; jumps over note]</em>brown '
+  'away — over atjumps night jumps &lt;3 then lazy note] then<p>— into naïve walked — AT&amp;T and '
+  'walked</p>女 said 4  &gt; him"hello"<center><b>jumps at "hello" the fox over said walked '
+  'brown</b></center><br /><br class="x"/>\n'
+  '<br/>\n'
+  '<center><b>女 looked &lt;3 at said</b></center><blockquote>night Harry\n'
+  '<br/>\n'
+  'Harry … dog [author Harry walked looked</blockquote><p>note] fox café &nbsp; away 4 "hello" '
+  '[author looked the</p>looked &lt;3 &gt; and note] &gt; "hello"café walked "hello" … 5 &gt;<p>5 '
+  'lazy quick naïve &gt; jumps she him café Hermione looked him</p></span>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><span></span></p>\n'
+  '<p><span><div class="inner">brown over lazy café into quick quick quick café &gt;</span></p>\n'
+  '<p><span>said over and dog the — 4 into</div>5 jumps over — brown Harry  jumps '
+  'looked</span></p>\n'
+  '<p><span><center><b>… quick — jumps the him said &gt;</b></center>\n'
+  '<p><span>fox jumps 4</span></p>\n'
+  'walked said quick café dog … said looked 5brown and Harry said looked<i>5 brown '
+  '[author</i></span></p>\n'
+  '<p><span><i>him 5 &gt; brown &gt; "hello" &nbsp; …</i><em>dog and AT&amp;T &lt;3 '
+  'dog</em><center><b>4 [author</b></center><em>then café lazy "hello" Harry said at &nbsp; jumps '
+  'over note]</em>brown away — over atjumps night jumps &lt;3 then lazy note] then\n'
+  '<p><span>— into naïve walked — AT&amp;T and walked</span></p>\n'
+  '女 said 4  &gt; him"hello"<center><b>jumps at "hello" the fox over said walked '
+  'brown</b></center></span></p>\n'
+  '<p><span><center><b>女 looked &lt;3 at said</b></center>\n'
+  '<blockquote>night Harry<br />Harry … dog [author Harry walked looked</blockquote>\n'
+  '<p><span>note] fox café &nbsp; away 4 "hello" [author looked the</span></p>\n'
+  'looked &lt;3 &gt; and note] &gt; "hello"café walked "hello" … 5 &gt;\n'
+  '<p><span>5 lazy quick naïve &gt; jumps she him café Hermione looked him</span></p>\n'
+  '</span></p></div>\n'),
+ ('<br class="x"/><br><br/> <br/> <br class="x"/> <br/> <br /><br>\n'
+  '<br/>\n'
+  '<br><br/><hr/><blockquote>naïve she quick note] brown<br class="x"/>walked</blockquote><p>… '
+  'café &lt;3 — jumps looked</p>away café — over quick him away "hello"<br class="x"/><br /> '
+  '<br/>  <br/>  <br/> <br/><br /> <br/> <br /><br class="x"/><br /> <br/> <hr><pre>she  女 &nbsp; '
+  'brown naïve\n'
+  'naïve AT&amp;T<br/>x</pre><table><tr><td>jumps at away then café … [author 4 fox quick<br/>over '
+  'Hermione &lt;3 him said 4 into quick</td></tr></table>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<hr />\n'
+  '<blockquote>\n'
+  '<p>naïve she quick note] brown<br />walked</p>\n'
+  '</blockquote>\n'
+  '<p>… café &lt;3 — jumps looked</p>\n'
+  '<p>away café — over quick him away "hello"</p>\n'
+  '<hr />\n'
+  '<pre>she  女 &nbsp; brown naïve\n'
+  'naïve AT&amp;T<br />x</pre>\n'
+  '\n'
+  '<table><tbody><tr><td>jumps at away then café … [author 4 fox quick<br />over Hermione &lt;3 '
+  'him said 4 into quick</td></tr></tbody></table></div>\n'),
+ ('<div id="x">\n'
+  '<br/>b<hr class="x"/><br class="x"/><div class="inner">fox 5 naïve naïve Hermione note] '
+  'AT&amp;T naïve away Hermione the<br>Harry dog 女 brown walked 女 naïve 女 and at</div>and 5 '
+  '"hello" the 女<p>then &nbsp; Harry and</p>\n'
+  '<br/>\n'
+  ' <br/> \n'
+  '<br/>\n'
+  ' <br/>  <br/> \n'
+  '<br/>\n'
+  '\n'
+  '<br/>\n'
+  ' <br/> \n'
+  '<br/>\n'
+  '<p class="c3">lazy … note] she lazy &gt;\n'
+  '<br/>\n'
+  '女 </p>into jumps him note] Hermione<p>note]  then &gt; 5 at</p><i>lazy 女 5 over jumps then and '
+  'him and\n'
+  '<br/>\n'
+  'then night quick "hello" at</i>anight &lt;3 at him looked &lt;3 "hello" [author note] the '
+  'Hermione<br class="x"/><br><center><b>into said then &nbsp; &nbsp; AT&amp;T — him … '
+  'Harry</b></center><strong>night 4 at into Hermione "hello" "hello"</strong><div '
+  'class="inner">brown away 女<br>女 walked &lt;3 &nbsp; quick  note] jumps jumps jumps '
+  'into</div><blockquote>4 [author into looked — at … <br/> jumps looked quick — and said said '
+  '[author</blockquote>\n'
+  '</div>\n',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><br/></p>\n'
+  '<p>b</p>\n'
+  '<hr />\n'
+  '<div class="inner">\n'
+  '<p>fox 5 naïve naïve Hermione note] AT&amp;T naïve away Hermione the</p>\n'
+  '<p>Harry dog 女 brown walked 女 naïve 女 and at</p>\n'
+  '</div>\n'
+  '<p>and 5 "hello" the 女</p>\n'
+  '<p>then &nbsp; Harry and</p>\n'
+  '<p><br/></p>\n'
+  '<p class="c3">lazy … note] she lazy &gt;<br />女</p>\n'
+  '<p>into jumps him note] Hermione</p>\n'
+  '<p>note]  then &gt; 5 at</p>\n'
+  '<p><i>lazy 女 5 over jumps then and him and</i></p>\n'
+  '<p><i>then night quick "hello" at</i>anight &lt;3 at him looked &lt;3 "hello" [author note] the '
+  'Hermione</p>\n'
+  '<p><center><b>into said then &nbsp; &nbsp; AT&amp;T — him … Harry</b></center><strong>night 4 '
+  'at into Hermione "hello" "hello"</strong></p>\n'
+  '<div class="inner">\n'
+  '<p>brown away 女</p>\n'
+  '<p>女 walked &lt;3 &nbsp; quick  note] jumps jumps jumps into</p>\n'
+  '</div>\n'
+  '<blockquote>\n'
+  '<p>4 [author into looked — at …<br />jumps looked quick — and said said [autho</p>\n'
+  '</blockquote></div>\n'),
+ ('<div><br/>\n'
+  '<br/>\n'
+  ' <br/> <br /><br><pre>&gt; Harry at "hello" jumps &nbsp; away\n'
+  'into jumps Harry said  Harry said note]<br/>x</pre><!-- comment -->said walked him AT&amp;T the '
+  '… café then away<blockquote>quick<br>into the AT&amp;T &lt;3 4 AT&amp;T him '
+  '…</blockquote></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><br/></p>\n'
+  '<pre>&gt; Harry at "hello" jumps &nbsp; away\n'
+  'into jumps Harry said  Harry said note]<br />x</pre>\n'
+  '<p>said walked him AT&amp;T the … café then away</p>\n'
+  '<blockquote>\n'
+  '<p>quick<br />into the AT&amp;T &lt;3 4 AT&amp;T him …</p>\n'
+  '</blockquote></div>\n'),
+ ('<div><br class="x"/> <br/> \n'
+  '<br/>\n'
+  '<br>\n'
+  '<br/>\n'
+  ' <br/> <br/><br/><br><p>&nbsp; into</p><br/>\n'
+  '<br/>\n'
+  '<br /><br /> <br/> <br/><div class="inner">naïve "hello" away jumps — [author brown she Harry — '
+  'quick café <br/> Harry</div><p class="c1">AT&amp;T\n'
+  '<br/>\n'
+  'Hermione</p><table><tr><td>4 fox Hermione into<br/>5 and night "hello" AT&amp;T looked … '
+  'the</td></tr></table><div class="inner">at walked and brown looked 4 quick &lt;3 "hello" &lt;3 '
+  'him <br/> lazy over AT&amp;T him …</div><p>AT&amp;T</p><i>and note] lazy  … him … 女 then<br '
+  'class="x"/>lazy note] over at — she jumps him &gt;</i>jumps &nbsp;<b>brown walked lazy &nbsp;  '
+  'and</b><center><b>Harry</b></center> <br/> \n'
+  '<br/>\n'
+  '<br> <br/>  <br/> <br/><br class="x"/> <br/> <br class="x"/><br> <br/> <br><p class="c1">into '
+  'lazy looked quick jumps over quick looked  <br/> &lt;3 quick note] 5 over walked</p>him café '
+  '[author café lazy quick she she &nbsp; café she"hello" brown him  4\n'
+  '<br/>\n'
+  '<br class="x"/><br><br/>\n'
+  '<br/>\n'
+  '<br><br /> <br/> away &lt;3 "hello" &lt;3 4 she [author — &gt; [authornight said café she '
+  'nightb5 fox night<br>a <br/> <br></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><br/></p>\n'
+  '<p>&nbsp; into</p>\n'
+  '<p><br/></p>\n'
+  '<div class="inner">\n'
+  '<p>naïve "hello" away jumps — [author brown she Harry — quick café</p>\n'
+  '<p>Harry</p>\n'
+  '</div>\n'
+  '<p class="c1">AT&amp;T<br />Hermione</p>\n'
+  '<table><tbody><tr><td>4 fox Hermione into<br />5 and night "hello" AT&amp;T looked … '
+  'the</td></tr></tbody></table>\n'
+  '<div class="inner">\n'
+  '<p>at walked and brown looked 4 quick &lt;3 "hello" &lt;3 him</p>\n'
+  '<p>lazy over AT&amp;T him …</p>\n'
+  '</div>\n'
+  '<p>AT&amp;T</p>\n'
+  '<p><i>and note] lazy  … him … 女 then</i></p>\n'
+  '<p><i>lazy note] over at — she jumps him &gt;</i>jumps &nbsp;<b>brown walked lazy &nbsp;  '
+  'and</b><center><b>Harry</b></center></p>\n'
+  '<p class="c1">into lazy looked quick jumps over quick looked<br />&lt;3 quick note] 5 over '
+  'walked</p>\n'
+  '<p>him café [author café lazy quick she she &nbsp; café she"hello" brown him  4</p>\n'
+  '<hr />\n'
+  '<p>away &lt;3 "hello" &lt;3 4 she [author — &gt; [authornight said café she nightb5 fox '
+  'night</p>\n'
+  '<p>a</p></div>\n'),
+ ('<span><blockquote>Hermione at  [author AT&amp;T Harry &nbsp;<br class="x"/>fox him night then '
+  'at lazy note] naïve naïve</blockquote>\n'
+  '<br/>\n'
+  '<br class="x"/><br><br><p>"hello" 5 café then — and fox [author 5 she</p>naïve AT&amp;T night '
+  'away at<br class="x"/><br/><br class="x"/><p class="c1"> night and note] &nbsp; night Harry '
+  '&nbsp; over "hello" … 5\n'
+  '<br/>\n'
+  'fox fox looked walked [author she AT&amp;T jumps then said Hermione</p><br /> <br/> <br/><br /> '
+  '<br/>  <br/> \n'
+  '<br/>\n'
+  '<i>"hello" fox<br/>said she</i>lazy  quick over walked she&lt;3 Hermione naïve &nbsp; '
+  'awaywalked<p>note] … naïve … 4 looked night "hello" and at quick</p>— him naïve 5 dog '
+  '&lt;3Hermione AT&amp;T … lazy at she note] Harry &gt; brown [authoraway</span>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><span>\n'
+  '<blockquote>Hermione at  [author AT&amp;T Harry &nbsp;<br />fox him night then at lazy note] '
+  'naïve naïve</blockquote>\n'
+  '<p><span>"hello" 5 café then — and fox [author 5 she</span></p>\n'
+  'naïve AT&amp;T night away at\n'
+  '<p class="c1"><span>night and note] &nbsp; night Harry &nbsp; over "hello" … 5<br />fox fox '
+  'looked walked [author she AT&amp;T jumps then said Hermione</span></p>\n'
+  '<i>"hello" fox</i></span></p>\n'
+  '<p><span><i>said she</i>lazy  quick over walked she&lt;3 Hermione naïve &nbsp; awaywalked\n'
+  '<p><span>note] … naïve … 4 looked night "hello" and at quick</span></p>\n'
+  '— him naïve 5 dog &lt;3Hermione AT&amp;T … lazy at she note] Harry &gt; brown '
+  '[authoraway</span></p></div>\n'),
+ (' <br/> naïve 4 brown fox the quickb<pre>[author Harry\n'
+  ' away night looked jumps jumps Hermione him him<br/>x</pre><br/>\n'
+  '<br/>\n'
+  '\n'
+  '<br/>\n'
+  ' <br/> <br><br class="x"/><br /><br /><br class="x"/><br /><br><br/><p>… quick 5 the Harry '
+  '&lt;3 the</p><!-- comment --> <br/>  &nbsp; into<div class="inner">away<br class="x"/>night '
+  'the</div>note] [author  quick then said lazy him lazy 女<img src="a.png"/>&nbsp; brownnote] then '
+  'him him fox fox AT&amp;T 女 AT&amp;T &nbsp; away\n'
+  '<br/>\n'
+  ' <br/> <br class="x"/><br> <br/> <br class="x"/> <br/> <br class="x"/><br><br class="x"/> <br/> '
+  '<br><br>\n'
+  '<br/>\n'
+  '<br>\n'
+  '<br/>\n'
+  '<br><br/><br /><br /><i>Harry AT&amp;T<br>— Harry Harry over   brown &gt;</i><p class="c2">lazy '
+  '女 fox into brown walked over lazy note]\n'
+  '<br/>\n'
+  'him lazy Harry then 女 she</p>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><br/></p>\n'
+  '<p>naïve 4 brown fox the quick</p>\n'
+  '<pre>[author Harry\n'
+  ' away night looked jumps jumps Hermione him him<br />x</pre>\n'
+  '<p><br/></p>\n'
+  '<p>… quick 5 the Harry &lt;3 the</p>\n'
+  '<p><br/></p>\n'
+  '<p>&nbsp; into</p>\n'
+  '<div class="inner">\n'
+  '<p>away</p>\n'
+  '<p>night the</p>\n'
+  '</div>\n'
+  '<p>note] [author  quick then said lazy him lazy 女<img src="a.png"/>&nbsp; brownnote] then him '
+  'him fox fox AT&amp;T 女 AT&amp;T &nbsp; away</p>\n'
+  '<hr />\n'
+  '<p><i>Harry AT&amp;T</i></p>\n'
+  '<p><i>— Harry Harry over   brown &gt;</i></p>\n'
+  '<p class="c2">lazy 女 fox into brown walked over lazy note]<br />him lazy Harry then 女 '
+  'she</p></div>\n'),
+ ('<div>&gt; brown … 5 brown &lt;3 quick then dog<p>and night … &lt;3 "hello"</p>— '
+  'jumps<blockquote>5 lazy 5 dog 4 4\n'
+  '<br/>\n'
+  'Hermione Hermione jumps AT&amp;T away brown … … — looked said 4</blockquote>… at into into '
+  '&nbsp; … 女 lazy note] dog over then[author looked into note] and then then she into '
+  'dog<p>looked</p>she fox Hermione [authorinto "hello" said 女 &lt;3 4 she at&nbsp; him café and '
+  'away walked dog night\n'
+  '<br/>\n'
+  '<br class="x"/><br><br /> <br/>  <br/> \n'
+  '<br/>\n'
+  '<br/><br>\n'
+  '<br/>\n'
+  '<br class="x"/>\n'
+  '<br/>\n'
+  '<br><br></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>&gt; brown … 5 brown &lt;3 quick then dog</p>\n'
+  '<p>and night … &lt;3 "hello"</p>\n'
+  '<p>— jump</p>\n'
+  '<blockquote>\n'
+  '<p>5 lazy 5 dog 4 4<br />Hermione Hermione jumps AT&amp;T away brown … … — looked said 4</p>\n'
+  '</blockquote>\n'
+  '<p>… at into into &nbsp; … 女 lazy note] dog over then[author looked into note] and then then '
+  'she into dog</p>\n'
+  '<p>looked</p>\n'
+  '<p>she fox Hermione [authorinto "hello" said 女 &lt;3 4 she at&nbsp; him café and away walked '
+  'dog night</p></div>\n'),
+ ('<div><br> <br/> \n'
+  '<br/>\n'
+  '<br>\n'
+  '<br/>\n'
+  '<br/><br/><br>fox brown lazy quick jumps &gt; night away night andjumps dog him quick naïve '
+  'looked she 5 &nbsp; lazy<i>&nbsp; dog &gt; "hello" &nbsp; … she<br> quick walked — into quick '
+  'she café café</i></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><br/></p>\n'
+  '<hr />\n'
+  '<p>fox brown lazy quick jumps &gt; night away night andjumps dog him quick naïve looked she 5 '
+  '&nbsp; lazy<i>&nbsp; dog &gt; "hello" &nbsp; … she</i></p>\n'
+  '<p><i>quick walked — into quick she café café</i></p></div>\n'),
+ ('<div><!-- comment --></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '</div>\n'),
+ ('<div class="storytext"><img src="a.png"/><p>walked over looked him note] naïve jumps night '
+  'Harry café [author she</p></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><img src="a.png"/></p>\n'
+  '<p>walked over looked him note] naïve jumps night Harry café [author she</p></div>\n'),
+ ('女 brown said lazy\n'
+  '<br/>\n'
+  ' <br/> <br class="x"/><br> <br/> <br> <br/> \n'
+  '<br/>\n'
+  ' <br/> <br/>\n'
+  '<br/>\n'
+  '<br>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>女 brown said lazy</p></div>\n'),
+ ('<div>bcafé &nbsp; over Hermione … &lt;3 &nbsp; 女 into dog … walked <br/> <br '
+  'class="x"/><br><br><br/>naïve lazy night 5 naïve looked lazy <br/> café 4 "hello" then  fox '
+  '[author café him brown café<blockquote>Harry 5 away 5 quick brown 4 lazy at dog walked '
+  'night<br>&lt;3 then brown 女 looked night naïve … note]</blockquote><pre>at into and AT&amp;T '
+  'the Harry &gt; Hermione\n'
+  'looked him — Harry 女 naïve — note] and<br/>x</pre><i>… "hello" lazy she quick<br/>at … … quick '
+  'lazy Hermione</i><div class="inner">女 him &gt; &lt;3 into fox she AT&amp;T\n'
+  '<br/>\n'
+  'AT&amp;T night him … dog &lt;3 and quick Hermione</div><br class="x"/><br class="x"/>\n'
+  '<br/>\n'
+  '<br/><br><br />\n'
+  '<br/>\n'
+  '<br><br class="x"/><br class="x"/><div class="inner">[author\n'
+  '<br/>\n'
+  'fox brown him at fox Hermione café away dog note] —</div>  .and brown note] jumps &nbsp; said '
+  'jumps nightinto &lt;3 at quick 女 walked sheHermione café naïve into   … "hello" nightlazy Harry '
+  'she lazy quick brownquick quick AT&amp;T<blockquote>him café said 4 said 5 night café <br/> 4 '
+  'Harry dog 5 Harry quick</blockquote></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>bcafé &nbsp; over Hermione … &lt;3 &nbsp; 女 into dog … walked</p>\n'
+  '<p>naïve lazy night 5 naïve looked lazy</p>\n'
+  '<p>café 4 "hello" then  fox [author café him brown café</p>\n'
+  '<blockquote>\n'
+  '<p>Harry 5 away 5 quick brown 4 lazy at dog walked night<br />&lt;3 then brown 女 looked night '
+  'naïve … note</p>\n'
+  '</blockquote>\n'
+  '<pre>at into and AT&amp;T the Harry &gt; Hermione\n'
+  'looked him — Harry 女 naïve — note] and<br />x</pre>\n'
+  '<p><i>… "hello" lazy she quick</i></p>\n'
+  '<p><i>at … … quick lazy Hermione</i></p>\n'
+  '<div class="inner">\n'
+  '<p>女 him &gt; &lt;3 into fox she AT&amp;T</p>\n'
+  '<p>AT&amp;T night him … dog &lt;3 and quick Hermione</p>\n'
+  '</div>\n'
+  '<p><br/></p>\n'
+  '<div class="inner">\n'
+  '<p>[author</p>\n'
+  '<p>fox brown him at fox Hermione café away dog note] —</p>\n'
+  '</div>\n'
+  '<p>.and brown note] jumps &nbsp; said jumps nightinto &lt;3 at quick 女 walked sheHermione café '
+  'naïve into   … "hello" nightlazy Harry she lazy quick brownquick quick AT&amp;T</p>\n'
+  '<blockquote>\n'
+  '<p>him café said 4 said 5 night café<br />4 Harry dog 5 Harry quick</p>\n'
+  '</blockquote></div>\n'),
+ ('<div class="storytext"><i>night fox looked  night into &gt; [author<br> — brown — "hello"</i>a女 '
+  'brown [author café night 4.<center><b>[author 女 fox 4 naïve 女 — … dog</b></center>AT&amp;T him '
+  'she jumps  jumps lazy   &nbsp; café 4<hr class="x"/>away "hello" she she —<table><tr><td>quick '
+  '4 &lt;3 into "hello" night &lt;3 AT&amp;T jumps<br/>said café — him night 女 said naïve '
+  '&lt;3</td></tr></table>— 女 over … quick<p>said &lt;3 then looked [author said lazy &nbsp; '
+  'away</p><br/><br> <br/> <br class="x"/>b— … night <br/> <br />\n'
+  '<br/>\n'
+  '</div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><i>night fox looked  night into &gt; [author</i></p>\n'
+  '<p><i>— brown — "hello"</i>a女 brown [author café night 4.<center><b>[author 女 fox 4 naïve 女 — … '
+  'dog</b></center>AT&amp;T him she jumps  jumps lazy   &nbsp; café 4</p>\n'
+  '<hr />\n'
+  '<p>away "hello" she she —</p>\n'
+  '<table><tbody><tr><td>quick 4 &lt;3 into "hello" night &lt;3 AT&amp;T jumps<br />said café — '
+  'him night 女 said naïve &lt;3</td></tr></tbody></table>\n'
+  '<p>— 女 over … quick</p>\n'
+  '<p>said &lt;3 then looked [author said lazy &nbsp; away</p>\n'
+  '<p><br/></p>\n'
+  '<p>b— … night</p></div>\n'),
+ ('<div class="storytext"><blockquote>over 5 [author &lt;3 Harry AT&amp;T Harry looked and "hello" '
+  'Hermione<br>… — into him</blockquote>night 5 at note] looked &lt;3 fox him Hermione nightbrown '
+  'fox brown</div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<blockquote>\n'
+  '<p>over 5 [author &lt;3 Harry AT&amp;T Harry looked and "hello" Hermione<br />… — into him</p>\n'
+  '</blockquote>\n'
+  '<p>night 5 at note] looked &lt;3 fox him Hermione nightbrown fox brown</p></div>\n'),
+ ('<span>and night café naïve lazy lazy brown &nbsp;walked quick she she — &lt;3 Harry— walked '
+  'lazy him &lt;3 into 女 AT&amp;T 5 &gt;<hr/><p>lazy dog him  night Harry 5 jumps 女 looked '
+  'jumps</p><pre>café — quick\n'
+  'jumps brown quick 5 … —<br/>x</pre>dog<div class="sep"><hr/></div><p>at said brown</p>女 '
+  'away"hello" Hermione quick quick 5<div class="inner">she walked<br class="x"/>4 '
+  'quick</div><strong>him then "hello" then at over said</strong>&gt; AT&amp;T … looked Hermione '
+  'note]Hermione AT&amp;T then into AT&amp;T<!-- comment -->him naïve into said him Harry then — '
+  'then4 quick&lt;3 quick at café<i>女 lazy Hermione over naïve fox said <br/> at she walked into '
+  'naïve</i>\n'
+  '<br/>\n'
+  '<br /><br class="x"/>… lazy dog &nbsp; said quick … &nbsp; — "hello"— Hermione the then naïve '
+  '<br/> <span>[author fox into &nbsp; — the the</span><img src="a.png"/>away AT&amp;T dog over '
+  'fox lazy looked<pre>then\n'
+  '5 女 AT&amp;T and she lazy naïve into him<br/>x</pre><i> Harry<br />[author quick into '
+  'lazy</i>&gt;</span>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><span>and night café naïve lazy lazy brown &nbsp;walked quick she she — &lt;3 Harry— walked '
+  'lazy him &lt;3 into 女 AT&amp;T 5 &gt;</span></p>\n'
+  '<hr />\n'
+  '<p><span>lazy dog him  night Harry 5 jumps 女 looked jumps</span></p>\n'
+  '<pre>café — quick\n'
+  'jumps brown quick 5 … —<br />x</pre>\n'
+  'dog</span></p>\n'
+  '<hr />\n'
+  '<p><span>at said brown</span></p>\n'
+  '女 away"hello" Hermione quick quick 5<div class="inner">she walked</span></p>\n'
+  '<p><span>4 quick</div><strong>him then "hello" then at over said</strong>&gt; AT&amp;T … looked '
+  'Hermione note]Hermione AT&amp;T then into AT&amp;T<!-- comment -->him naïve into said him Harry '
+  'then — then4 quick&lt;3 quick at café<i>女 lazy Hermione over naïve fox said</i></span></p>\n'
+  '<p><span><i>at she walked into naïve</i></span></p>\n'
+  '<p><span>… lazy dog &nbsp; said quick … &nbsp; — "hello"— Hermione the then naïve</span></p>\n'
+  '<p><span><span>[author fox into &nbsp; — the the</span><img src="a.png"/>away AT&amp;T dog over '
+  'fox lazy looked\n'
+  '<pre>then\n'
+  '5 女 AT&amp;T and she lazy naïve into him<br />x</pre>\n'
+  '<i> Harry</i></span></p>\n'
+  '<p><span><i>[author quick into lazy</i>&gt;</span></p></div>\n'),
+ ('<div class="storytext">5 looked Hermione away Harry at the over AT&amp;T Harry &lt;3 '
+  'Hermione<br><!-- comment --> <br/> <br><br><br><br><br class="x"/><br><br /><br /><hr '
+  'class="x"/><br/><br/>\n'
+  '<br/>\n'
+  '\n'
+  '<br/>\n'
+  '<br class="x"/><br> <br/> \n'
+  '<br/>\n'
+  '<!-- comment --> into note] — then the said café 5<div class="inner">AT&amp;T 女 she [author … '
+  'over "hello" then AT&amp;T and fox at<br class="x"/>&nbsp;</div>\n'
+  '<br/>\n'
+  '<blockquote>over said … naïve away 女 [author she at lazy 4<br class="x"/>looked 女 café '
+  'and</blockquote><br class="x"/><br/><br/><br/><br /><br><br /><br class="x"/><br>jumps …  she '
+  'him —looked fox 5 … at naïve quick night AT&amp;T<hr/> she &gt; she quickdog night into '
+  'AT&amp;T Harry  lazy walked quick she quick &lt;3brown … walked AT&amp;T saidshe brown\n'
+  '<br/>\n'
+  '<br />\n'
+  '<br/>\n'
+  ' <br/> <p class="c2">she said walked night Hermione lazy quick brown fox said\n'
+  '<br/>\n'
+  'night jumps Harry looked night walked the … lazy away over fox</p><br/><br/><br> <br/> <br/><br '
+  '/> <br/> <br><br/>\n'
+  '<br/>\n'
+  '<br class="x"/> <br/> walked quick lazy AT&amp;T then him</div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>5 looked Hermione away Harry at the over AT&amp;T Harry &lt;3 Hermione</p>\n'
+  '<hr />\n'
+  '<p>into note] — then the said café 5</p>\n'
+  '<div class="inner">\n'
+  '<p>AT&amp;T 女 she [author … over "hello" then AT&amp;T and fox at</p>\n'
+  '<p>&nbsp;</p>\n'
+  '</div>\n'
+  '<p><br/></p>\n'
+  '<blockquote>\n'
+  '<p>over said … naïve away 女 [author she at lazy 4<br />looked 女 café and</p>\n'
+  '</blockquote>\n'
+  '<p><br/></p>\n'
+  '<hr />\n'
+  '<p>jumps …  she him —looked fox 5 … at naïve quick night AT&amp;T</p>\n'
+  '<hr />\n'
+  '<p>she &gt; she quickdog night into AT&amp;T Harry  lazy walked quick she quick &lt;3brown … '
+  'walked AT&amp;T saidshe brown</p>\n'
+  '<p class="c2">she said walked night Hermione lazy quick brown fox said<br />night jumps Harry '
+  'looked night walked the … lazy away over fox</p>\n'
+  '<p><br/></p>\n'
+  '<hr />\n'
+  '<p>walked quick lazy AT&amp;T then him</p></div>\n'),
+ ('<div class="inner">she 4 4 [author fox into — naïve naïve night<br/>Hermione — over &lt;3 into '
+  '&lt;3 and looked</div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>she 4 4 [author fox into — naïve naïve night</p>\n'
+  '<p>Hermione — over &lt;3 into &lt;3 and looked</p></div>\n'),
+ ('<div id="x">\n'
+  '<blockquote>into dog AT&amp;T naïve at — Hermione\n'
+  '<br/>\n'
+  'note] Hermione</blockquote>"hello" Harry 女 Harry away jumps<div class="inner">&nbsp; into brown '
+  '&nbsp; the &nbsp; 女 fox dog 5<br class="x"/>note] — into fox and said 4 lazy looked …</div><hr '
+  'class="x"/><br class="x"/><br class="x"/> <br/> <br>\n'
+  '<br/>\n'
+  '<br class="x"/> <br/> \n'
+  '<br/>\n'
+  ' <br/> \n'
+  '<br/>\n'
+  '<br />\n'
+  '<br/>\n'
+  '<br/><hr><br /><br/> <br/> 5 at into lazy — 女 AT&amp;T<span>night at &nbsp; fox into café '
+  '&gt;</span><i>"hello" fox said she … and<br />note]</i><div class="inner">&nbsp; &gt;  &nbsp; '
+  'the lazy brown said café and <br/> jumps 4 naïve</div>\n'
+  '<br/>\n'
+  '<br/><br />and looked café and brown [author night<p>naïve [author naïve '
+  'she</p><hr/><blockquote>at 5 quick  <br/> into — &nbsp; café then night</blockquote>\n'
+  '</div>\n',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<blockquote>\n'
+  '<p>into dog AT&amp;T naïve at — Hermione<br />note] Hermione</p>\n'
+  '</blockquote>\n'
+  '<p>"hello" Harry 女 Harry away jump</p>\n'
+  '<div class="inner">\n'
+  '<p>&nbsp; into brown &nbsp; the &nbsp; 女 fox dog 5</p>\n'
+  '<p>note] — into fox and said 4 lazy looked …</p>\n'
+  '</div>\n'
+  '<hr />\n'
+  '<hr />\n'
+  '<p>5 at into lazy — 女 AT&amp;T<span>night at &nbsp; fox into café &gt;</span><i>"hello" fox '
+  'said she … and</i></p>\n'
+  '<p><i>note]</i></p>\n'
+  '<div class="inner">\n'
+  '<p>&nbsp; &gt;  &nbsp; the lazy brown said café and</p>\n'
+  '<p>jumps 4 naïve</p>\n'
+  '</div>\n'
+  '<p><br/></p>\n'
+  '<p>and looked café and brown [author night</p>\n'
+  '<p>naïve [author naïve she</p>\n'
+  '<hr />\n'
+  '<blockquote>\n'
+  '<p>at 5 quick<br />into — &nbsp; café then night</p>\n'
+  '</blockquote></div>\n'),
+ ('<span><table><tr><td>AT&amp;T then she<br/>dog at and café jumps  AT&amp;T '
+  'quick</td></tr></table>女 <br/> <br/>b<b>女 &lt;3  said the &nbsp; 4 &gt; lazy jumps note] at</b> '
+  '<br/> <br class="x"/><br class="x"/>\n'
+  '<br/>\n'
+  '<br><br>\n'
+  '<br/>\n'
+  '<br/>\n'
+  '<br/>\n'
+  '<br/><br/><br class="x"/><br/><span>note] 女 &lt;3 him café note] —   … AT&amp;T '
+  '5</span><p>&nbsp; over lazy</p>— then him and &gt;"hello" naïve into over 4<p class="c3">looked '
+  'said <br/> … into [author Hermione over Hermione 女 …  him</p>女 [author fox away brown dog said '
+  'she dog 5<p>女 him lazy Harry  night café</p>him Harry 5 note] Hermione … AT&amp;T she 女 &lt;3  '
+  '&gt; … [author she &gt; then &lt;3 walked 女the quick naïve &gt; night Hermione<div '
+  'class="inner">naïve 5 4 into lazy "hello" away &gt; said<br />note]</div><br><br/> <br/> '
+  '<br>thenshe &lt;3<pre>naïve 女 café AT&amp;T\n'
+  '&nbsp; fox &lt;3 the "hello" café Hermione brown quick at 女<br/>x</pre>… quick fox <br/> '
+  '<br><br><br/>\n'
+  '<br/>\n'
+  '<br/><br><br /><br /><br />\n'
+  '<br/>\n'
+  '<br/>— said Harry over fox 4 &gt; &nbsp; she him jumps thenote] naïve looked<i>jumps into jumps '
+  'quick "hello" 女 女 away away</i><br/><br />Hermione then — lazy fox at  [author</span>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><span>\n'
+  '<table><tbody><tr><td>AT&amp;T then she<br />dog at and café jumps  AT&amp;T '
+  'quick</td></tr></tbody></table>\n'
+  '女</span></p>\n'
+  '<p><span>b<b>女 &lt;3  said the &nbsp; 4 &gt; lazy jumps note] at</b></span></p>\n'
+  '<hr />\n'
+  '<p><span><span>note] 女 &lt;3 him café note] —   … AT&amp;T 5</span>\n'
+  '<p><span>&nbsp; over lazy</span></p>\n'
+  '— then him and &gt;"hello" naïve into over 4\n'
+  '<p class="c3"><span>looked said<br />… into [author Hermione over Hermione 女 …  him</span></p>\n'
+  '女 [author fox away brown dog said she dog 5\n'
+  '<p><span>女 him lazy Harry  night café</span></p>\n'
+  'him Harry 5 note] Hermione … AT&amp;T she 女 &lt;3  &gt; … [author she &gt; then &lt;3 walked '
+  '女the quick naïve &gt; night Hermione<div class="inner">naïve 5 4 into lazy "hello" away &gt; '
+  'said</span></p>\n'
+  '<p><span>note]</div></span></p>\n'
+  '<hr />\n'
+  '<p><span>thenshe &lt;3\n'
+  '<pre>naïve 女 café AT&amp;T\n'
+  '&nbsp; fox &lt;3 the "hello" café Hermione brown quick at 女<br />x</pre>\n'
+  '… quick fox</span></p>\n'
+  '<hr />\n'
+  '<p><span>— said Harry over fox 4 &gt; &nbsp; she him jumps thenote] naïve looked<i>jumps into '
+  'jumps quick "hello" 女 女 away away</i></span></p>\n'
+  '<p><span>Hermione then — lazy fox at  [author</span></p></div>\n'),
+ ('<div id="x">\n<br><p>jumps Harry "hello" looked &nbsp; naïve &gt; him night naïve</p>\n</div>\n',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><br/></p>\n'
+  '<p>jumps Harry "hello" looked &nbsp; naïve &gt; him night naïve</p></div>\n'),
+ ('<p>quick looked lazy  walked 5 then &gt; she over</p><br/><br>café then brown  4 she note] 5 '
+  'Hermione away<center><b>note] 4 quick note] AT&amp;T lazy 女 night fox "hello" lazy</b></center> '
+  '<br/>  <br/> \n'
+  '<br/>\n'
+  '<p>&gt;</p> <b>AT&amp;T said  him Harry into looked &lt;3 quick</b><hr class="x"/><br /><br '
+  '/><br/><br class="x"/><br /><br>\n'
+  '<br/>\n'
+  '<br class="x"/><br class="x"/><br><br />\n'
+  '<br/>\n'
+  '<br class="x"/><br/><br /><br />\n'
+  '<br/>\n',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>quick looked lazy  walked 5 then &gt; she over</p>\n'
+  '<p><br/></p>\n'
+  '<p>café then brown  4 she note] 5 Hermione away<center><b>note] 4 quick note] AT&amp;T lazy 女 '
+  'night fox "hello" lazy</b></center></p>\n'
+  '<p>&gt;</p>\n'
+  '<p><b>AT&amp;T said  him Harry into looked &lt;3 quick</b></p>\n'
+  '<hr /></div>\n'),
+ ('<div>.\n'
+  '<br/>\n'
+  '\n'
+  '<br/>\n'
+  '<br /><p>at over 5 女 &lt;3  jumps night night jumps &nbsp; away</p>&gt; —  AT&amp;T over<p '
+  'class="c2">fox <br/> naïve note] over</p>&nbsp; AT&amp;T dog away 女 fox &gt; said café note]<br '
+  'class="x"/> <br/> <p>lazy  at naïve</p></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>.</p>\n'
+  '<p>at over 5 女 &lt;3  jumps night night jumps &nbsp; away</p>\n'
+  '<p>&gt; —  AT&amp;T ove</p>\n'
+  '<p class="c2">fox<br />naïve note] over</p>\n'
+  '<p>&nbsp; AT&amp;T dog away 女 fox &gt; said café note</p>\n'
+  '<p>lazy  at naïve</p></div>\n'),
+ ('<br>\n'
+  '<br/>\n'
+  '\n'
+  '<br/>\n'
+  '<br/>looked [author over away<br />brown &nbsp; — 4 looked Hermione dog<b>she</b><br '
+  'class="x"/><br> <br/> <br /> <br/> \n'
+  '<br/>\n'
+  '<br /><br /><i>&gt; him —  and she she<br class="x"/>then</i><blockquote>… café the walked '
+  '"hello" at fox &lt;3 into<br>naïve café 5 café jumps … AT&amp;T …</blockquote><br />\n'
+  '<br/>\n'
+  '\n'
+  '<br/>\n'
+  '<br><br/>\n'
+  '<br/>\n'
+  '<br />\n'
+  '<br/>\n'
+  '<p>jumps Hermione</p><br>away brown "hello" said she 女 note] and &lt;3 &gt; "hello" '
+  '女<center><b>over</b></center>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><br/></p>\n'
+  '<hr />\n'
+  '<p>looked [author over away</p>\n'
+  '<p>brown &nbsp; — 4 looked Hermione dog<b>she</b></p>\n'
+  '<hr />\n'
+  '<p><i>&gt; him —  and she she</i></p>\n'
+  '<p><i>then</i></p>\n'
+  '<blockquote>\n'
+  '<p>… café the walked "hello" at fox &lt;3 into<br />naïve café 5 café jumps … AT&amp;T …</p>\n'
+  '</blockquote>\n'
+  '<p><br/></p>\n'
+  '<p>jumps Hermione</p>\n'
+  '<p><br/></p>\n'
+  '<p>away brown "hello" said she 女 note] and &lt;3 &gt; "hello" '
+  '女<center><b>over</b></center></p></div>\n'),
+ ('<div class="storytext">4 jumps &nbsp;<blockquote>walked<br/>&lt;3 … then over the and 女 over '
+  '—</blockquote><b> brown brown note] AT&amp;T — AT&amp;T Hermione note] "hello"</b>\n'
+  '<br/>\n'
+  '\n'
+  '<br/>\n'
+  '\n'
+  '<br/>\n'
+  '<br class="x"/>\n'
+  '<br/>\n'
+  '<br/><br><br>\n'
+  '<br/>\n'
+  '[author him into into shethen "hello" dog into and note] the fox she<br>b\n'
+  '<br/>\n'
+  ' <br/> <br/> naïve  the 5 over &lt;3 Harry 5 and <br/> <br>\n'
+  '<br/>\n'
+  '<br/><br class="x"/>\n'
+  '<br/>\n'
+  '<br><br><br><br/><br /><br><blockquote>over 4 café &lt;3 walked<br>naïve AT&amp;T '
+  'at</blockquote><b>fox the</b>\n'
+  '<br/>\n'
+  '<br><br/> <br/> <br /><br class="x"/><br /><br /><br /> <br/> <br><br><br/><br/><br /><br '
+  'class="x"/> <br/>  <br/> <br class="x"/><br /><br class="x"/><br class="x"/><img src="a.png"/>\n'
+  '<br/>\n'
+  'the … at naïve then dog Hermione she 4 … looked 4dog  AT&amp;T night  the night 4\n'
+  '<br/>\n'
+  '<br/><p>quick over then — AT&amp;T then café</p>&gt; fox &nbsp;<center><b>then and Hermione '
+  'looked quick café him fox then then she naïve</b></center><i>naïve note] lazy — at looked  lazy '
+  'lazy<br/>looked the the at jumps over dog 5 over brown</i>\n'
+  '<br/>\n'
+  '<br />\n'
+  '<br/>\n'
+  'jumps dog <br/> <br><br /> <br/> <br />night the …  … [author &lt;3<blockquote>5 café said \n'
+  '<br/>\n'
+  '&gt; "hello" lazy</blockquote></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>4 jumps &nbsp;</p>\n'
+  '<blockquote>\n'
+  '<p>walked<br />&lt;3 … then over the and 女 over —</p>\n'
+  '</blockquote>\n'
+  '<p><b> brown brown note] AT&amp;T — AT&amp;T Hermione note] "hello"</b></p>\n'
+  '<hr />\n'
+  '<p>[author him into into shethen "hello" dog into and note] the fox she</p>\n'
+  '<p>b</p>\n'
+  '<p>naïve  the 5 over &lt;3 Harry 5 and</p>\n'
+  '<blockquote>\n'
+  '<p>over 4 café &lt;3 walked<br />naïve AT&amp;T at</p>\n'
+  '</blockquote>\n'
+  '<p><b>fox the</b></p>\n'
+  '<hr />\n'
+  '<p><img src="a.png"/></p>\n'
+  '<p>the … at naïve then dog Hermione she 4 … looked 4dog  AT&amp;T night  the night 4</p>\n'
+  '<p>quick over then — AT&amp;T then café</p>\n'
+  '<p>&gt; fox &nbsp;<center><b>then and Hermione looked quick café him fox then then she '
+  'naïve</b></center><i>naïve note] lazy — at looked  lazy lazy</i></p>\n'
+  '<p><i>looked the the at jumps over dog 5 over brown</i></p>\n'
+  '<p>jumps dog</p>\n'
+  '<hr />\n'
+  '<p>night the …  … [author &lt;3</p>\n'
+  '<blockquote>\n'
+  '<p>5 café said<br />&gt; "hello" lazy</p>\n'
+  '</blockquote></div>\n'),
+ ('<span> <br/> <table><tr><td>and into 5 "hello" him looked [author at —<br/>naïve looked [author '
+  'at she café</td></tr></table><pre>&nbsp; over naïve  Harry and fox &lt;3\n'
+  'brown 4<br/>x</pre><div class="inner">女 Hermione 5 &gt; AT&amp;T night 5 <br/> quick at jumps '
+  'she</div>looked saidbrown saidthen quick [author and … "hello" at over then Harry foxlazy café  '
+  'night note] fox &gt; — "hello" fox overhim 4 … fox<hr class="x"/>and — brown then …</span>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><span>\n'
+  '<table><tbody><tr><td>and into 5 "hello" him looked [author at —<br />naïve looked [author at '
+  'she café</td></tr></tbody></table>\n'
+  '<pre>&nbsp; over naïve  Harry and fox &lt;3\n'
+  'brown 4<br />x</pre>\n'
+  '<div class="inner">女 Hermione 5 &gt; AT&amp;T night 5</span></p>\n'
+  '<p><span>quick at jumps she</div>looked saidbrown saidthen quick [author and … "hello" at over '
+  'then Harry foxlazy café  night note] fox &gt; — "hello" fox overhim 4 … fox</span></p>\n'
+  '<hr />\n'
+  '<p><span>and — brown then …</span></p></div>\n'),
+ ('<span><br/>him dog Hermione dog 4 4<i>lazy &gt; night at<br />brown "hello" note]  女 5</i>Harry '
+  '— quick 5 into naïve 5then jumps him quick and "hello" looked over &lt;3 looked over note]at '
+  '"hello" naïve note] fox walked brown … brown note]&nbsp; note]</span>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><span></span></p>\n'
+  '<p><span>him dog Hermione dog 4 4<i>lazy &gt; night at</i></span></p>\n'
+  '<p><span><i>brown "hello" note]  女 5</i>Harry — quick 5 into naïve 5then jumps him quick and '
+  '"hello" looked over &lt;3 looked over note]at "hello" naïve note] fox walked brown … brown '
+  'note]&nbsp; note]</span></p></div>\n'),
+ ('<div class="storytext">\n'
+  '<br/>\n'
+  '<br>\n'
+  '<br/>\n'
+  'the and him dog then<p>and &lt;3 Hermione</p>she\n'
+  '<br/>\n'
+  '<br/><br/><br /><br class="x"/><p>and 5 4 then AT&amp;T "hello" then lazy  away '
+  'and</p><br><br/><br class="x"/><br />\n'
+  '<br/>\n'
+  'she she 女<div class="sep"><hr/></div>AT&amp;T Hermione fox at said lazy lazy dog walked&nbsp; '
+  'note] she&gt; quick quick brown she lazy AT&amp;T<p>over — him fox lazy the 5 AT&amp;T quick '
+  'the</p><img src="a.png"/><i>café<br/>Harry 女 naïve</i><div class="inner">naïve Harry dog &nbsp; '
+  'over 女 naïve café dog  — —<br />she said café and café café then &lt;3 said AT&amp;T '
+  'brown</div>b<br/></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><br/></p>\n'
+  '<p>the and him dog then</p>\n'
+  '<p>and &lt;3 Hermione</p>\n'
+  '<p>she</p>\n'
+  '<p>and 5 4 then AT&amp;T "hello" then lazy  away and</p>\n'
+  '<p><br/></p>\n'
+  '<p>she she 女</p>\n'
+  '<div class="sep">\n'
+  '<hr />\n'
+  '</div>\n'
+  '<p>AT&amp;T Hermione fox at said lazy lazy dog walked&nbsp; note] she&gt; quick quick brown she '
+  'lazy AT&amp;T</p>\n'
+  '<p>over — him fox lazy the 5 AT&amp;T quick the</p>\n'
+  '<p><img src="a.png"/><i>café</i></p>\n'
+  '<p><i>Harry 女 naïve</i></p>\n'
+  '<div class="inner">\n'
+  '<p>naïve Harry dog &nbsp; over 女 naïve café dog  — —</p>\n'
+  '<p>she said café and café café then &lt;3 said AT&amp;T brown</p>\n'
+  '</div>\n'
+  '<p><br/></p></div>\n'),
+ ('<div><br /><pre>away naïve quick away the jumps she 女 &gt; said\n'
+  'Harry fox Harry Harry<br/>x</pre><pre>away away and 女 … Harry looked\n'
+  'AT&amp;T at quick at said<br/>x</pre><!-- comment --><table><tr><td>[author '
+  '4<br/>&lt;3</td></tr></table><p>AT&amp;T  night night 女 naïve</p>quick &gt; AT&amp;T 5 &nbsp; '
+  'jumps then &gt; atnaïve looked [author 4 naïve saidlooked — note] brown jumps"hello" him and '
+  'café jumpsa<div class="sep"><hr/></div><i>… &nbsp; &gt; him note] Harry &nbsp; then the [author '
+  'Hermione 4</i>night 5 away over\n'
+  '<br/>\n'
+  '<br class="x"/><br><br/><br class="x"/><br class="x"/><br /><br/><p>night night '
+  'him</p><center><b>walked over brown and and into 女 naïve looked &gt;</b></center><p '
+  'class="c1">"hello" into … away she into<br>over quick … dog "hello" &gt; jumps</p>lazy naïve at '
+  '5 quick lazy lazy &nbsp; 女4 "hello" lazy … she …  5 dog and<img src="a.png"/>… "hello" him '
+  'Harry night she over<pre>at at dog \n'
+  'quick lazy<br/>x</pre>b<br class="x"/><p>away</p>night the lazy away café naïve — lazy then '
+  'looked over<div class="sep"><hr/></div></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><br/></p>\n'
+  '<pre>away naïve quick away the jumps she 女 &gt; said\n'
+  'Harry fox Harry Harry<br />x</pre>\n'
+  '<pre>away away and 女 … Harry looked\n'
+  'AT&amp;T at quick at said<br />x</pre>\n'
+  '\n'
+  '<table><tbody><tr><td>[author 4<br />&lt;3</td></tr></tbody></table>\n'
+  '<p>AT&amp;T  night night 女 naïve</p>\n'
+  '<p>quick &gt; AT&amp;T 5 &nbsp; jumps then &gt; atnaïve looked [author 4 naïve saidlooked — '
+  'note] brown jumps"hello" him and café jumpsa</p>\n'
+  '<div class="sep">\n'
+  '<hr />\n'
+  '</div>\n'
+  '<p><i>… &nbsp; &gt; him note] Harry &nbsp; then the [author Hermione 4</i>night 5 away ove</p>\n'
+  '<p>night night him</p>\n'
+  '<p><center><b>walked over brown and and into 女 naïve looked &gt;</b></center></p>\n'
+  '<p class="c1">"hello" into … away she into<br />over quick … dog "hello" &gt; jumps</p>\n'
+  '<p>lazy naïve at 5 quick lazy lazy &nbsp; 女4 "hello" lazy … she …  5 dog and<img src="a.png"/>… '
+  '"hello" him Harry night she ove</p>\n'
+  '<pre>at at dog \n'
+  'quick lazy<br />x</pre>\n'
+  '<p><br/></p>\n'
+  '<p>away</p>\n'
+  '<p>night the lazy away café naïve — lazy then looked ove</p>\n'
+  '<div class="sep">\n'
+  '<hr />\n'
+  '</div></div>\n'),
+ ('<div id="x">\n'
+  'away &lt;3 fox over quick &nbsp; she —\n'
+  '<br/>\n'
+  '<br /><br/><br><br /> <br/> <br/><br><br/><br class="x"/><br /> <br/> <p>Harry lazy him &lt;3 '
+  'brown she [author fox</p>\n'
+  '</div>\n',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>away &lt;3 fox over quick &nbsp; she —</p>\n'
+  '<p>Harry lazy him &lt;3 brown she [author fox</p></div>\n'),
+ ('<span> <br/> <br/><br><br />.\n'
+  '<br/>\n'
+  '<!-- comment --><p> away</p>over brown him brown and 4<i>&lt;3 away  [author '
+  'Hermione<br/>[author Hermione then &nbsp; jumps — … night</i><p>at Harry at into away "hello" '
+  'brown lazy quick &nbsp;</p>— &lt;3 &gt; dog walked note] AT&amp;T lazy 4 jumps '
+  'note]<blockquote>looked 5 quick  "hello" over "hello" the 5 brown\n'
+  '<br/>\n'
+  'night and the Harry dog 5 AT&amp;T</blockquote><br class="x"/><br> <br/>  <br/> <br '
+  'class="x"/><br class="x"/><br class="x"/><br/> <br/> <br/> <br/> <br/>\n'
+  '<br/>\n'
+  '<br class="x"/><br class="x"/><br /><br class="x"/><br><br /><br><br /> into at awayshe over '
+  'away over him quick walked Hermione<br class="x"/><br><!-- comment --><p class="c3">"hello" '
+  'café away fox him Hermione brown him said at<br class="x"/>note] the &gt; then &gt;  walked '
+  'Harry … over away</p>\n'
+  '<br/>\n'
+  '<br><br><blockquote>then said him then 5 the walked she quick\n'
+  '<br/>\n'
+  'naïve  &gt; jumps</blockquote>5 looked <p class="c1">dog café quick <br>&lt;3 lazy night jumps '
+  'brown &gt; jumps him naïve dog</p>the walked [author into<p>Hermione 4 — at brown brown away '
+  'quick</p><p>&gt; quick walked dog the and AT&amp;T 女</p>[author and into said and jumps '
+  'note]<br /><i>&gt;<br/>&gt; over quick note] AT&amp;T Harry Hermione </i><br class="x"/></span>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><span></span></p>\n'
+  '<p><span>.</span></p>\n'
+  '<p><span><!-- comment -->\n'
+  '<p><span>away</span></p>\n'
+  'over brown him brown and 4<i>&lt;3 away  [author Hermione</i></span></p>\n'
+  '<p><span><i>[author Hermione then &nbsp; jumps — … night</i>\n'
+  '<p><span>at Harry at into away "hello" brown lazy quick &nbsp;</span></p>\n'
+  '— &lt;3 &gt; dog walked note] AT&amp;T lazy 4 jumps note]\n'
+  '<blockquote>looked 5 quick  "hello" over "hello" the 5 brown<br />night and the Harry dog 5 '
+  'AT&amp;T</blockquote>\n'
+  'into at awayshe over away over him quick walked Hermione</span></p>\n'
+  '<p><span><!-- comment -->\n'
+  '<p class="c3"><span>"hello" café away fox him Hermione brown him said at<br />note] the &gt; '
+  'then &gt;  walked Harry … over away</span></p>\n'
+  '<blockquote>then said him then 5 the walked she quick<br />naïve  &gt; jumps</blockquote>\n'
+  '5 looked\n'
+  '<p class="c1"><span>dog café quick<br />&lt;3 lazy night jumps brown &gt; jumps him naïve '
+  'dog</span></p>\n'
+  'the walked [author into\n'
+  '<p><span>Hermione 4 — at brown brown away quick</span></p>\n'
+  '<p><span>&gt; quick walked dog the and AT&amp;T 女</span></p>\n'
+  '[author and into said and jumps note]</span></p>\n'
+  '<p><span><i>&gt;</i></span></p>\n'
+  '<p><span><i>&gt; over quick note] AT&amp;T Harry Hermione </i></span></p>\n'
+  '<p><span></span></p></div>\n'),
+ ('<div id="x">\n'
+  '<br/>\n'
+  '<br/>\n'
+  '<br class="x"/><br/><br><br>\n'
+  '<br/>\n'
+  '<br/> <br/> <br /> <br/> <br class="x"/><img src="a.png"/><br> <br/> <br class="x"/> <br/>  '
+  '<br/> <br><br class="x"/><br><br class="x"/> <br/> <br>\n'
+  '<br/>\n'
+  '<br class="x"/><br /><br><br /><br><br class="x"/> <br/> <br class="x"/><br '
+  '/><p>brown</p><p>night over the &nbsp; night "hello" Hermione looked &gt; note]</p> '
+  '<br><br><br/><br class="x"/>at brown over looked &gt; dog "hello" … AT&amp;T lazy &lt;3<div '
+  'class="inner">女 away naïve naïve Harry him lazy<br>café dog 5 … into</div>"hello" into she &gt; '
+  'overover … — into<!-- comment --><p>lazy dog 5  AT&amp;T 女 &lt;3 [author "hello"</p>b <br '
+  'class="x"/><br/>note] into AT&amp;T him she— AT&amp;T Harry him looked and "hello" away 4 dog 女 '
+  '5<br />5 and over lazy "hello" said away she note] away &lt;3&gt; at\n'
+  '</div>\n',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><br/></p>\n'
+  '<hr />\n'
+  '<p><img src="a.png"/></p>\n'
+  '<p>brown</p>\n'
+  '<p>night over the &nbsp; night "hello" Hermione looked &gt; note]</p>\n'
+  '<p><br/></p>\n'
+  '<p>at brown over looked &gt; dog "hello" … AT&amp;T lazy &lt;3</p>\n'
+  '<div class="inner">\n'
+  '<p>女 away naïve naïve Harry him lazy</p>\n'
+  '<p>café dog 5 … into</p>\n'
+  '</div>\n'
+  '<p>"hello" into she &gt; overover … — into</p>\n'
+  '<p>lazy dog 5  AT&amp;T 女 &lt;3 [author "hello"</p>\n'
+  '<p>b</p>\n'
+  '<p>note] into AT&amp;T him she— AT&amp;T Harry him looked and "hello" away 4 dog 女 5</p>\n'
+  '<p>5 and over lazy "hello" said away she note] away &lt;3&gt; at</p></div>\n'),
+ ('<div id="x">\n'
+  '<i>&gt; Hermione 女 Hermione Hermione jumps</i>at Harry 5 said said<p>fox brown 5 walked — jumps '
+  'walked AT&amp;T &lt;3 4 lazy fox</p><br /><br/><br/>\n'
+  '<br/>\n'
+  ' <br/> — him<br /><div class="inner">— 4 said … over then\n'
+  '<br/>\n'
+  'Hermione</div>looked 女 "hello"<br class="x"/>\n'
+  '<br/>\n'
+  ' <br/> <br><br><blockquote>&lt;3 &lt;3 Hermione naïve dog lazy &lt;3<br />&lt;3 the into 4 '
+  'note]</blockquote>then Harry and &gt; brown<br/>\n'
+  '<br/>\n'
+  '<br/><div class="inner">him café she AT&amp;T <br/> brown into then night she "hello" 4 [author '
+  '&nbsp; into over</div>café said … jumps over jumps at Harry 4 quick —<p class="c3">AT&amp;T '
+  'naïve &nbsp; quick [author over &gt; AT&amp;T then note]<br class="x"/>AT&amp;T into lazy &lt;3 '
+  'away said AT&amp;T</p>over looked dog brown she night  looked [author\n'
+  '</div>\n',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><i>&gt; Hermione 女 Hermione Hermione jumps</i>at Harry 5 said said</p>\n'
+  '<p>fox brown 5 walked — jumps walked AT&amp;T &lt;3 4 lazy fox</p>\n'
+  '<p><br/></p>\n'
+  '<p>— him</p>\n'
+  '<div class="inner">\n'
+  '<p>— 4 said … over then</p>\n'
+  '<p>Hermione</p>\n'
+  '</div>\n'
+  '<p>looked 女 "hello"</p>\n'
+  '<blockquote>\n'
+  '<p>&lt;3 &lt;3 Hermione naïve dog lazy &lt;3<br />&lt;3 the into 4 note</p>\n'
+  '</blockquote>\n'
+  '<p>then Harry and &gt; brown</p>\n'
+  '<div class="inner">\n'
+  '<p>him café she AT&amp;T</p>\n'
+  '<p>brown into then night she "hello" 4 [author &nbsp; into ove</p>\n'
+  '</div>\n'
+  '<p>café said … jumps over jumps at Harry 4 quick —</p>\n'
+  '<p class="c3">AT&amp;T naïve &nbsp; quick [author over &gt; AT&amp;T then note]<br />AT&amp;T '
+  'into lazy &lt;3 away said AT&amp;T</p>\n'
+  '<p>over looked dog brown she night  looked [autho</p></div>\n'),
+ ('<span><i>— said<br>&lt;3 walked 女 dog Harry dog jumps &nbsp; &gt;</i><br><br><br/><br />\n'
+  '<br/>\n'
+  '<br class="x"/><br /><br />\n'
+  '<br/>\n'
+  '&nbsp; she<!-- comment -->athen overb<br><br class="x"/> <br/> <br><br/>\n'
+  '<br/>\n'
+  ' <br/> <br /><br/> 4 away said the AT&amp;T away intoHarry   Harry … 5 AT&amp;T<div '
+  'class="sep"><hr/></div><br /> <br/> \n'
+  '<br/>\n'
+  '<pre>5 said the and &gt; and the 5 then\n'
+  'looked note] dog 女 she &nbsp; Harry she she Harry Harry then<br/>x</pre><div class="inner">and '
+  '— naïve fox "hello" night\n'
+  '<br/>\n'
+  'into 女 him 4 lazy note] Hermione — Harry</div>\n'
+  '<br/>\n'
+  '<br>alazy  night the [author quick the<br/>the over into [author caféthe then 女 into 5 &nbsp; '
+  'naïve</span>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><span><i>— said \n'
+  '&lt;3 walked 女 dog Harry dog jumps &nbsp; &gt;</i></span></p>\n'
+  '<hr />\n'
+  '<p><span>&nbsp; she<!-- comment -->athen overb</span></p>\n'
+  '<hr />\n'
+  '<p><span>4 away said the AT&amp;T away intoHarry   Harry … 5 AT&amp;T</span></p>\n'
+  '<hr />\n'
+  '<pre>5 said the and &gt; and the 5 then\n'
+  'looked note] dog 女 she &nbsp; Harry she she Harry Harry then<br />x</pre>\n'
+  '<div class="inner">and — naïve fox "hello" night \n'
+  'into 女 him 4 lazy note] Hermione — Harry</div></span></p>\n'
+  '<p><span>alazy  night the [author quick the \n'
+  'the over into [author caféthe then 女 into 5 &nbsp; naïve</span></p></div>\n'),
+ ('<span><em>  女 over "hello" naïve [author Hermione AT&amp;T 4 quick &nbsp;</em>Harry walked '
+  'walkedjumps 女 over  note] &nbsp; night<img src="a.png"/><strong>[author &nbsp; note] she away '
+  'into</strong> <br/> <br/><br class="x"/><br/><br class="x"/><br/>\n'
+  '<br/>\n'
+  '<br/><br> <br/> \n'
+  '<br/>\n'
+  '\n'
+  '<br/>\n'
+  '<br class="x"/>at jumps Harry  café Harry &nbsp; 4<br/>\n'
+  '<br/>\n'
+  ' <br/> \n'
+  '<br/>\n'
+  '<p>brown away</p><br><hr class="x"/><pre>note] then looked over [author over she note] &nbsp; '
+  'fox\n'
+  ' Harry 4<br/>x</pre>naïve &nbsp; &lt;3 said brown over brown quick [author"hello" and she and '
+  'she<br /><br><br /><p>[author then brown</p><blockquote>5 AT&amp;T note] the at note] '
+  'café<br>night AT&amp;T 4 café Harry said</blockquote><p>5 brown then into</p><p '
+  'class="c2">[author said — dog [author 5 then Harry [author into night [author<br />… 4 … brown '
+  'and at into note] 4</p><br /><br /> <br/> Hermione<em>quick walked</em><p>— 4 looked the 5 '
+  'said</p></span>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><span><em>  女 over "hello" naïve [author Hermione AT&amp;T 4 quick &nbsp;</em>Harry walked '
+  'walkedjumps 女 over  note] &nbsp; night<img src="a.png"/><strong>[author &nbsp; note] she away '
+  'into</strong></span></p>\n'
+  '<hr />\n'
+  '<p><span>at jumps Harry  café Harry &nbsp; 4\n'
+  '<p><span>brown away</span></p>\n'
+  '<hr />\n'
+  '<pre>note] then looked over [author over she note] &nbsp; fox\n'
+  ' Harry 4<br />x</pre>\n'
+  'naïve &nbsp; &lt;3 said brown over brown quick [author"hello" and she and she\n'
+  '<p><span>[author then brown</span></p>\n'
+  '<blockquote>5 AT&amp;T note] the at note] café<br />night AT&amp;T 4 café Harry '
+  'said</blockquote>\n'
+  '<p><span>5 brown then into</span></p>\n'
+  '<p class="c2"><span>[author said — dog [author 5 then Harry [author into night [author<br />… 4 '
+  '… brown and at into note] 4</span></p>\n'
+  'Hermione<em>quick walked</em>\n'
+  '<p><span>— 4 looked the 5 said</span></p>\n'
+  '</span></p></div>\n'),
+ ('<i>&lt;3 &gt; <br/> &gt; the at naïve into 5 lazy into note] café 5 fox</i>looked  jumps said '
+  'lazy at brown<br> <br/> <br/><br/><br class="x"/><br class="x"/><br><br class="x"/><br>away<br '
+  'class="x"/><br class="x"/>fox into— AT&amp;T 女night over Hermione<i>at night 4 Harry walked '
+  'away  fox [author\n'
+  '<br/>\n'
+  'dog note] said</i><br><br /><blockquote>brown she café she café night dog over note] into 5 '
+  'café <br/> away dog night fox AT&amp;T  naïve</blockquote><br class="x"/><br/><br '
+  'class="x"/><br class="x"/>\n'
+  '<br/>\n'
+  '<div class="inner">… dog said AT&amp;T night 5 note]<br>quick away &gt; &lt;3 brown into and '
+  'the quick</div> <br/> <br><br/><br><br class="x"/>note] café brown at — she — quick quick dog '
+  'lazy café<p>at walked — café Harry fox dog she  &nbsp; quick</p>\n'
+  '<br/>\n'
+  '<br />4 quick — &gt; naïve said 5 Harry jumps lazy4 &nbsp;<img src="a.png"/><br/><br/><br '
+  '/><center><b>lazy fox and note] dog naïve Hermione at 4 Hermione &gt; &gt;</b></center>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><i>&lt;3 &gt;</i></p>\n'
+  '<p><i>&gt; the at naïve into 5 lazy into note] café 5 fox</i>looked  jumps said lazy at '
+  'brown</p>\n'
+  '<hr />\n'
+  '<p>away</p>\n'
+  '<p>fox into— AT&amp;T 女night over Hermione<i>at night 4 Harry walked away  fox [author</i></p>\n'
+  '<p><i>dog note] said</i></p>\n'
+  '<blockquote>\n'
+  '<p>brown she café she café night dog over note] into 5 café<br />away dog night fox AT&amp;T  '
+  'naïve</p>\n'
+  '</blockquote>\n'
+  '<p><br/></p>\n'
+  '<div class="inner">\n'
+  '<p>… dog said AT&amp;T night 5 note]</p>\n'
+  '<p>quick away &gt; &lt;3 brown into and the quick</p>\n'
+  '</div>\n'
+  '<p><br/></p>\n'
+  '<hr />\n'
+  '<p>note] café brown at — she — quick quick dog lazy café</p>\n'
+  '<p>at walked — café Harry fox dog she  &nbsp; quick</p>\n'
+  '<p><br/></p>\n'
+  '<p>4 quick — &gt; naïve said 5 Harry jumps lazy4 &nbsp;<img src="a.png"/></p>\n'
+  '<p><br/></p>\n'
+  '<p><center><b>lazy fox and note] dog naïve Hermione at 4 Hermione &gt; '
+  '&gt;</b></center></p></div>\n'),
+ ('<div class="storytext">jumps she &gt; —<br /><br/><br class="x"/><br class="x"/><br><pre>Harry '
+  '5 said into \n'
+  'over then 5  brown at the &gt; him Harry looked<br/>x</pre><br><p>lazy AT&amp;T note] at</p>4 '
+  'Hermione Harry dog note]fox … &nbsp; naïve [author fox "hello"dogand<center><b>jumps lazy fox '
+  'the said … and quick —</b></center>\n'
+  '<br/>\n'
+  '<p>AT&amp;T</p>\n'
+  '<br/>\n'
+  '<br/><br><br />— 4 AT&amp;T walked at lazy note] 4 away&lt;3 Harryaway AT&amp;T dog café then '
+  'AT&amp;T<div class="inner">at note] note] — &lt;3  fox &nbsp; note] AT&amp;T said<br/>AT&amp;T '
+  'into walked naïve jumps walked jumps café brown she away note]</div> then fox the note] Harry '
+  'naïve 4 &gt; AT&amp;T brown5 — [author dog the brown café brown 5 4 fox Hermione \n'
+  '<br/>\n'
+  '<br><!-- comment -->the<p>&gt; Hermione walked him &gt; 女 away naïve</p></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>jumps she &gt; —</p>\n'
+  '<pre>Harry 5 said into \n'
+  'over then 5  brown at the &gt; him Harry looked<br />x</pre>\n'
+  '<p><br/></p>\n'
+  '<p>lazy AT&amp;T note] at</p>\n'
+  '<p>4 Hermione Harry dog note]fox … &nbsp; naïve [author fox "hello"dogand<center><b>jumps lazy '
+  'fox the said … and quick —</b></center></p>\n'
+  '<p>AT&amp;T</p>\n'
+  '<p><br/></p>\n'
+  '<p>— 4 AT&amp;T walked at lazy note] 4 away&lt;3 Harryaway AT&amp;T dog café then AT&amp;T</p>\n'
+  '<div class="inner">\n'
+  '<p>at note] note] — &lt;3  fox &nbsp; note] AT&amp;T said</p>\n'
+  '<p>AT&amp;T into walked naïve jumps walked jumps café brown she away note</p>\n'
+  '</div>\n'
+  '<p>then fox the note] Harry naïve 4 &gt; AT&amp;T brown5 — [author dog the brown café brown 5 4 '
+  'fox Hermione</p>\n'
+  '<p>the</p>\n'
+  '<p>&gt; Hermione walked him &gt; 女 away naïve</p></div>\n'),
+ ('<div>she jumps — lazy naïve quick naïve [author and and himand 5 night Harry naïve him jumps '
+  'night quick<p>then she — she him café 4 fox away into quick</p><br><br class="x"/><br> <br/> '
+  '<br><br /><br /><br><br /><br class="x"/>\n'
+  '<br/>\n'
+  '<br><br class="x"/><br><table><tr><td>Harry naïve 女 lazy<br/>café  "hello" naïve '
+  '女</td></tr></table><div class="inner">… Harry over &nbsp; the Harry Hermione "hello" AT&amp;T '
+  'walked note] <br/> said looked &gt; AT&amp;T 4 … &lt;3 note] said into him</div>naïve lazy dog '
+  'note] … into over café … brown4 quick Harry "hello" the him Harry at note] saida<pre>him away '
+  '[author\n'
+  '5 女<br/>x</pre>fox night — and 5 &nbsp; jumps 女 fox&gt; 4 5 &lt;3 5<br/>\n'
+  '<br/>\n'
+  '<br /></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p>she jumps — lazy naïve quick naïve [author and and himand 5 night Harry naïve him jumps '
+  'night quick</p>\n'
+  '<p>then she — she him café 4 fox away into quick</p>\n'
+  '<p><br/></p>\n'
+  '<table><tbody><tr><td>Harry naïve 女 lazy<br />café  "hello" naïve 女</td></tr></tbody></table>\n'
+  '<div class="inner">\n'
+  '<p>… Harry over &nbsp; the Harry Hermione "hello" AT&amp;T walked note]</p>\n'
+  '<p>said looked &gt; AT&amp;T 4 … &lt;3 note] said into him</p>\n'
+  '</div>\n'
+  '<p>naïve lazy dog note] … into over café … brown4 quick Harry "hello" the him Harry at note] '
+  'saida</p>\n'
+  '<pre>him away [author\n'
+  '5 女<br />x</pre>\n'
+  '<p>fox night — and 5 &nbsp; jumps 女 fox&gt; 4 5 &lt;3 5</p></div>\n'),
+ ('<span>4 looked and looked note] then  </span>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<p><span>4 looked and looked note] then  </span></p></div>\n'),
+ ('<div class="storytext"><table><tr><td>walked AT&amp;T lazy<br/>Hermione '
+  'walked</td></tr></table><div class="inner">"hello" 女  and Hermione over "hello" &lt;3<br '
+  '/>note] 女 she Hermione [author lazy</div><br><br /><br>\n'
+  '<br/>\n'
+  '<br class="x"/> <br/>  <br/>  <br/> <br><center><b>… Hermione note] him jumps [author she '
+  '&gt;</b></center><br/>at naïve fox — Harry then then him "hello" and\n'
+  '<br/>\n'
+  '\n'
+  '<br/>\n'
+  '<br/><p>the over</p>said him café &lt;3 over café the away &gt; and 女 女 then into5 "hello"<br '
+  'class="x"/>\n'
+  '<br/>\n'
+  '<br/> <br/> \n'
+  '<br/>\n'
+  '<br/>\n'
+  '<br/>\n'
+  '<br /> <br/> <br><br> <br/> said — then said fox<span>over &gt; &nbsp; — brown '
+  'into</span></div>',
+  '<!-- FFF_replace_br_with_p_has_been_run -->\n'
+  '<div id="FFF_replace_br_with_p_has_been_run">\n'
+  '<table><tbody><tr><td>walked AT&amp;T lazy<br />Hermione walked</td></tr></tbody></table>\n'
+  '<div class="inner">\n'
+  '<p>"hello" 女  and Hermione over "hello" &lt;3</p>\n'
+  '<p>note] 女 she Hermione [author lazy</p>\n'
+  '</div>\n'
+  '<p><br/></p>\n'
+  '<hr />\n'
+  '<p><center><b>… Hermione note] him jumps [author she &gt;</b></center></p>\n'
+  '<p>at naïve fox — Harry then then him "hello" and</p>\n'
+  '<p>the over</p>\n'
+  '<p>said him café &lt;3 over café the away &gt; and 女 女 then into5 "hello"</p>\n'
+  '<hr />\n'
+  '<p>said — then said fox<span>over &gt; &nbsp; — brown into</span></p></div>\n')]
@@ -0,0 +1,556 @@
+# -*- coding: utf-8 -*-
+## (sid, settings, {file name: data}) for test1.com stories,
+## content.opf, toc.ncx, nav.xhtml and container.xml as written
+## with xml.dom.minidom.  Dates are replaced with DATE.
+epub_xml_cases = [('664',
+  'epub_version:2.0\n',
+  {'META-INF/container.xml': b'<?xml version="1.0" encoding="utf-8"?><container version="1.0" xmlns'
+                             b'="urn:oasis:names:tc:opendocument:xmlns:container"><rootfiles><rootf'
+                             b'ile full-path="content.opf" media-type="application/oebps-package+xm'
+                             b'l"/></rootfiles></container>',
+   'content.opf': b'<?xml version="1.0" encoding="utf-8"?><package version="2.0" xmlns="http://w'
+                  b'ww.idpf.org/2007/opf" unique-identifier="fanficfare-uid"><metadata xmlns:dc='
+                  b'"http://purl.org/dc/elements/1.1/" xmlns:opf="http://www.idpf.org/2007/opf">'
+                  b'<dc:identifier id="fanficfare-uid">fanficfare-uid:test1.com-u98765-s664</dc:'
+                  b'identifier><dc:title id="id">Test Story Title 664tests:[bare amp(&amp;) qt(\''
+                  b') amp(&amp;) gt(&gt;) lt(&lt;) ATnT(AT&amp;T) L(\xc2\xa3) Onna(\xe5\xa5\xb3)]</'
+                  b'dc:title><dc:creator opf:role="aut">Test Author aa bare amp(&amp;amp;) quote'
+                  b'(\') amp(&amp;amp;)</dc:creator><dc:contributor id="id-2">FanFicFare [https:/'
+                  b'/github.com/JimmXinu/FanFicFare]</dc:contributor><dc:language>en</dc:languag'
+                  b'e><dc:date opf:event="publication">DATE</dc:date><dc:date opf:event="creatio'
+                  b'n">DATE</dc:date><dc:date opf:event="modification">DATE</dc:date><meta name='
+                  b'"calibre:timestamp" content="DATE"/><dc:description>Description tests:[bare '
+                  b"amp(&amp;) qt(') amp(&amp;) gt(&gt;) lt(&lt;) ATnT(AT&amp;T) L(\xc2\xa3) Onna("
+                  b'\xe5\xa5\xb3)] Done\n\nSome more longer description.  &quot;I suck at summaries'
+                  b'!&quot;  &quot;Better than it sounds!&quot; A span!  &quot;My first fic&quot'
+                  b';</dc:description><dc:publisher>test1.com</dc:publisher><dc:identifier opf:s'
+                  b'cheme="URL">http://test1.com?sid=664</dc:identifier><dc:source>http://test1.'
+                  b'com?sid=664</dc:source></metadata><manifest><item id="ncx" href="toc.ncx" me'
+                  b'dia-type="application/x-dtbncx+xml"/><item id="style" href="OEBPS/stylesheet'
+                  b'.css" media-type="text/css"/><item id="file0001" href="OEBPS/file0001.xhtml"'
+                  b' media-type="application/xhtml+xml"/><item id="file0002" href="OEBPS/file000'
+                  b'2.xhtml" media-type="application/xhtml+xml"/><item id="file0003" href="OEBPS'
+                  b'/file0003.xhtml" media-type="application/xhtml+xml"/><item id="file0004" hre'
+                  b'f="OEBPS/file0004.xhtml" media-type="application/xhtml+xml"/><item id="file0'
+                  b'005" href="OEBPS/file0005.xhtml" media-type="application/xhtml+xml"/><item i'
+                  b'd="file0006" href="OEBPS/file0006.xhtml" media-type="application/xhtml+xml"/'
+                  b'><item id="file0007" href="OEBPS/file0007.xhtml" media-type="application/xht'
+                  b'ml+xml"/><item id="file0008" href="OEBPS/file0008.xhtml" media-type="applica'
+                  b'tion/xhtml+xml"/><item id="file0009" href="OEBPS/file0009.xhtml" media-type='
+                  b'"application/xhtml+xml"/></manifest><spine toc="ncx"><itemref idref="file000'
+                  b'1" linear="yes"/><itemref idref="file0002" linear="yes"/><itemref idref="fil'
+                  b'e0003" linear="yes"/><itemref idref="file0004" linear="yes"/><itemref idref='
+                  b'"file0005" linear="yes"/><itemref idref="file0006" linear="yes"/><itemref id'
+                  b'ref="file0007" linear="yes"/><itemref idref="file0008" linear="yes"/><itemre'
+                  b'f idref="file0009" linear="yes"/></spine></package>',
+   'toc.ncx': b'<?xml version="1.0" encoding="utf-8"?><ncx version="2005-1" xmlns="http://www.da'
+              b'isy.org/z3986/2005/ncx/"><head><meta name="dtb:uid" content="fanficfare-uid:test'
+              b'1.com-u98765-s664"/><meta name="dtb:depth" content="1"/><meta name="dtb:totalPag'
+              b'eCount" content="0"/><meta name="dtb:maxPageNumber" content="0"/></head><docTitl'
+              b"e><text>Test Story Title 664tests:[bare amp(&amp;) qt(') amp(&amp;) gt(&gt;) lt("
+              b'&lt;) ATnT(AT&amp;T) L(\xc2\xa3) Onna(\xe5\xa5\xb3)]</text></docTitle><navMap><navP'
+              b'oint id="file0001" playOrder="0"><navLabel><text>Prologue tests:[bare amp(&amp;)'
+              b" qt(') amp(&amp;) gt(&gt;) lt(&lt;) ATnT(AT&amp;T) L(\xc2\xa3) Onna(\xe5\xa5\xb3)]<"
+              b'/text></navLabel><content src="OEBPS/file0001.xhtml"/></navPoint><navPoint id="f'
+              b'ile0002" playOrder="1"><navLabel><text>Chapter 1, Xenos on Cinnabar</text></navL'
+              b'abel><content src="OEBPS/file0002.xhtml"/></navPoint><navPoint id="file0003" pla'
+              b'yOrder="2"><navLabel><text>Chapter 2, Sinmay on Kintikin</text></navLabel><conte'
+              b'nt src="OEBPS/file0003.xhtml"/></navPoint><navPoint id="file0004" playOrder="3">'
+              b'<navLabel><text>Chapter 3, &quot;Over&quot; Cinnabar</text></navLabel><content s'
+              b'rc="OEBPS/file0004.xhtml"/></navPoint><navPoint id="file0005" playOrder="4"><nav'
+              b'Label><text>Chapter 4 &amp; 4.5</text></navLabel><content src="OEBPS/file0005.xh'
+              b'tml"/></navPoint><navPoint id="file0006" playOrder="5"><navLabel><text>Chapter 5'
+              b' &lt; 5.4</text></navLabel><content src="OEBPS/file0006.xhtml"/></navPoint><navP'
+              b'oint id="file0007" playOrder="6"><navLabel><text>Chapter A &amp; B &lt; C &gt; D'
+              b'</text></navLabel><content src="OEBPS/file0007.xhtml"/></navPoint><navPoint id="'
+              b'file0008" playOrder="7"><navLabel><text>Chapter 7</text></navLabel><content src='
+              b'"OEBPS/file0008.xhtml"/></navPoint><navPoint id="file0009" playOrder="8"><navLab'
+              b'el><text>Chapter 8</text></navLabel><content src="OEBPS/file0009.xhtml"/></navPo'
+              b'int></navMap></ncx>'}),
+ ('664',
+  'epub_version:3.0\n',
+  {'META-INF/container.xml': b'<?xml version="1.0" encoding="utf-8"?><container version="1.0" xmlns'
+                             b'="urn:oasis:names:tc:opendocument:xmlns:container"><rootfiles><rootf'
+                             b'ile full-path="content.opf" media-type="application/oebps-package+xm'
+                             b'l"/></rootfiles></container>',
+   'content.opf': b'<?xml version="1.0" encoding="utf-8"?><package version="3.0" xmlns="http://w'
+                  b'ww.idpf.org/2007/opf" unique-identifier="fanficfare-uid"><metadata xmlns:dc='
+                  b'"http://purl.org/dc/elements/1.1/" xmlns:opf="http://www.idpf.org/2007/opf">'
+                  b'<dc:identifier id="fanficfare-uid">fanficfare-uid:test1.com-u98765-s664</dc:'
+                  b'identifier><dc:title id="id">Test Story Title 664tests:[bare amp(&amp;) qt(\''
+                  b') amp(&amp;) gt(&gt;) lt(&lt;) ATnT(AT&amp;T) L(\xc2\xa3) Onna(\xe5\xa5\xb3)]</'
+                  b'dc:title><dc:creator id="id-1">Test Author aa bare amp(&amp;amp;) quote(\') a'
+                  b'mp(&amp;amp;)</dc:creator><dc:contributor id="id-2">FanFicFare [https://gith'
+                  b'ub.com/JimmXinu/FanFicFare]</dc:contributor><dc:language>en</dc:language><me'
+                  b'ta property="dcterms:modified">DATE</meta><dc:description>Description tests:'
+                  b"[bare amp(&amp;) qt(') amp(&amp;) gt(&gt;) lt(&lt;) ATnT(AT&amp;T) L(\xc2\xa3)"
+                  b' Onna(\xe5\xa5\xb3)] Done\n\nSome more longer description.  &quot;I suck at sum'
+                  b'maries!&quot;  &quot;Better than it sounds!&quot; A span!  &quot;My first fi'
+                  b'c&quot;</dc:description><dc:publisher>test1.com</dc:publisher><dc:identifier'
+                  b'>URL:http://test1.com?sid=664</dc:identifier><dc:source>http://test1.com?sid'
+                  b'=664</dc:source><meta property="title-type" refines="#id">main</meta><meta p'
+                  b'roperty="role" refines="#id-1" scheme="marc:relators">aut</meta><meta proper'
+                  b'ty="role" refines="#id-2" scheme="marc:relators">bkp</meta></metadata><manif'
+                  b'est><item id="ncx" href="toc.ncx" media-type="application/x-dtbncx+xml"/><it'
+                  b'em id="style" href="OEBPS/stylesheet.css" media-type="text/css"/><item id="f'
+                  b'ile0001" href="OEBPS/file0001.xhtml" media-type="application/xhtml+xml"/><it'
+                  b'em id="file0002" href="OEBPS/file0002.xhtml" media-type="application/xhtml+x'
+                  b'ml"/><item id="file0003" href="OEBPS/file0003.xhtml" media-type="application'
+                  b'/xhtml+xml"/><item id="file0004" href="OEBPS/file0004.xhtml" media-type="app'
+                  b'lication/xhtml+xml"/><item id="file0005" href="OEBPS/file0005.xhtml" media-t'
+                  b'ype="application/xhtml+xml"/><item id="file0006" href="OEBPS/file0006.xhtml"'
+                  b' media-type="application/xhtml+xml"/><item id="file0007" href="OEBPS/file000'
+                  b'7.xhtml" media-type="application/xhtml+xml"/><item id="file0008" href="OEBPS'
+                  b'/file0008.xhtml" media-type="application/xhtml+xml"/><item id="file0009" hre'
+                  b'f="OEBPS/file0009.xhtml" media-type="application/xhtml+xml"/><item href="nav'
+                  b'.xhtml" id="nav" media-type="application/xhtml+xml" properties="nav"/></mani'
+                  b'fest><spine toc="ncx"><itemref idref="file0001" linear="yes"/><itemref idref'
+                  b'="file0002" linear="yes"/><itemref idref="file0003" linear="yes"/><itemref i'
+                  b'dref="file0004" linear="yes"/><itemref idref="file0005" linear="yes"/><itemr'
+                  b'ef idref="file0006" linear="yes"/><itemref idref="file0007" linear="yes"/><i'
+                  b'temref idref="file0008" linear="yes"/><itemref idref="file0009" linear="yes"'
+                  b'/></spine></package>',
+   'nav.xhtml': b'<?xml version="1.0" encoding="utf-8"?><html xmlns="http://www.w3.org/1999/xhtml"'
+                b' xmlns:epub="http://www.idpf.org/2007/ops" xml:lang="en"><head><title>Navigation'
+                b'</title><meta http-equiv="Content-Type" content="text/html; charset=utf-8"/></he'
+                b'ad><body><nav epub:type="toc"><ol><li><a href="OEBPS/file0001.xhtml">Prologue te'
+                b"sts:[bare amp(&amp;) qt(') amp(&amp;) gt(&gt;) lt(&lt;) ATnT(AT&amp;T) L"
+                b'(\xc2\xa3) Onna(\xe5\xa5\xb3)]</a></li><li><a href="OEBPS/file0002.xhtml">Chapt'
+                b'er 1, Xenos on Cinnabar</a></li><li><a href="OEBPS/file0003.xhtml">Chapter 2, Si'
+                b'nmay on Kintikin</a></li><li><a href="OEBPS/file0004.xhtml">Chapter 3, &quot;Ove'
+                b'r&quot; Cinnabar</a></li><li><a href="OEBPS/file0005.xhtml">Chapter 4 &amp; 4.5<'
+                b'/a></li><li><a href="OEBPS/file0006.xhtml">Chapter 5 &lt; 5.4</a></li><li><a hre'
+                b'f="OEBPS/file0007.xhtml">Chapter A &amp; B &lt; C &gt; D</a></li><li><a href="OE'
+                b'BPS/file0008.xhtml">Chapter 7</a></li><li><a href="OEBPS/file0009.xhtml">Chapter'
+                b' 8</a></li></ol></nav></body></html>',
+   'toc.ncx': b'<?xml version="1.0" encoding="utf-8"?><ncx version="2005-1" xmlns="http://www.da'
+              b'isy.org/z3986/2005/ncx/"><head><meta name="dtb:uid" content="fanficfare-uid:test'
+              b'1.com-u98765-s664"/><meta name="dtb:depth" content="1"/><meta name="dtb:totalPag'
+              b'eCount" content="0"/><meta name="dtb:maxPageNumber" content="0"/></head><docTitl'
+              b"e><text>Test Story Title 664tests:[bare amp(&amp;) qt(') amp(&amp;) gt(&gt;) lt("
+              b'&lt;) ATnT(AT&amp;T) L(\xc2\xa3) Onna(\xe5\xa5\xb3)]</text></docTitle><navMap><navP'
+              b'oint id="file0001" playOrder="0"><navLabel><text>Prologue tests:[bare amp(&amp;)'
+              b" qt(') amp(&amp;) gt(&gt;) lt(&lt;) ATnT(AT&amp;T) L(\xc2\xa3) Onna(\xe5\xa5\xb3)]<"
+              b'/text></navLabel><content src="OEBPS/file0001.xhtml"/></navPoint><navPoint id="f'
+              b'ile0002" playOrder="1"><navLabel><text>Chapter 1, Xenos on Cinnabar</text></navL'
+              b'abel><content src="OEBPS/file0002.xhtml"/></navPoint><navPoint id="file0003" pla'
+              b'yOrder="2"><navLabel><text>Chapter 2, Sinmay on Kintikin</text></navLabel><conte'
+              b'nt src="OEBPS/file0003.xhtml"/></navPoint><navPoint id="file0004" playOrder="3">'
+              b'<navLabel><text>Chapter 3, &quot;Over&quot; Cinnabar</text></navLabel><content s'
+              b'rc="OEBPS/file0004.xhtml"/></navPoint><navPoint id="file0005" playOrder="4"><nav'
+              b'Label><text>Chapter 4 &amp; 4.5</text></navLabel><content src="OEBPS/file0005.xh'
+              b'tml"/></navPoint><navPoint id="file0006" playOrder="5"><navLabel><text>Chapter 5'
+              b' &lt; 5.4</text></navLabel><content src="OEBPS/file0006.xhtml"/></navPoint><navP'
+              b'oint id="file0007" playOrder="6"><navLabel><text>Chapter A &amp; B &lt; C &gt; D'
+              b'</text></navLabel><content src="OEBPS/file0007.xhtml"/></navPoint><navPoint id="'
+              b'file0008" playOrder="7"><navLabel><text>Chapter 7</text></navLabel><content src='
+              b'"OEBPS/file0008.xhtml"/></navPoint><navPoint id="file0009" playOrder="8"><navLab'
+              b'el><text>Chapter 8</text></navLabel><content src="OEBPS/file0009.xhtml"/></navPo'
+              b'int></navMap></ncx>'}),
+ ('673',
+  'epub_version:3.0\ninclude_titlepage:true\ninclude_tocpage:true\ninclude_logpage:true\n',
+  {'META-INF/container.xml': b'<?xml version="1.0" encoding="utf-8"?><container version="1.0" xmlns'
+                             b'="urn:oasis:names:tc:opendocument:xmlns:container"><rootfiles><rootf'
+                             b'ile full-path="content.opf" media-type="application/oebps-package+xm'
+                             b'l"/></rootfiles></container>',
+   'content.opf': b'<?xml version="1.0" encoding="utf-8"?><package version="3.0" xmlns="http://w'
+                  b'ww.idpf.org/2007/opf" unique-identifier="fanficfare-uid"><metadata xmlns:dc='
+                  b'"http://purl.org/dc/elements/1.1/" xmlns:opf="http://www.idpf.org/2007/opf">'
+                  b'<dc:identifier id="fanficfare-uid">fanficfare-uid:test1.com-u98765-s673</dc:'
+                  b'identifier><dc:title id="id">Test Story Title 673</dc:title><dc:creator id="'
+                  b'id-1">Test Author aa</dc:creator><dc:creator id="id-2">Author From List 1</d'
+                  b'c:creator><dc:creator id="id-3">Author From List 2</dc:creator><dc:creator i'
+                  b'd="id-4">Author From List 3</dc:creator><dc:creator id="id-5">Author From Li'
+                  b'st 4</dc:creator><dc:creator id="id-6">Author From List 5</dc:creator><dc:cr'
+                  b'eator id="id-7">Author From List 6</dc:creator><dc:creator id="id-8">Author '
+                  b'From List 7</dc:creator><dc:creator id="id-9">Author From List 8</dc:creator'
+                  b'><dc:creator id="id-10">Author From List 9</dc:creator><dc:creator id="id-11'
+                  b'">Author From List 0</dc:creator><dc:creator id="id-12">Author From List q</'
+                  b'dc:creator><dc:creator id="id-13">Author From List w</dc:creator><dc:creator'
+                  b' id="id-14">Author From List e</dc:creator><dc:creator id="id-15">Author Fro'
+                  b'm List r</dc:creator><dc:creator id="id-16">Author From List t</dc:creator><'
+                  b'dc:creator id="id-17">Author From List y</dc:creator><dc:creator id="id-18">'
+                  b'Author From List u</dc:creator><dc:creator id="id-19">Author From List i</dc'
+                  b':creator><dc:creator id="id-20">Author From List o</dc:creator><dc:contribut'
+                  b'or id="id-21">FanFicFare [https://github.com/JimmXinu/FanFicFare]</dc:contri'
+                  b'butor><dc:language>en</dc:language><meta property="dcterms:modified">DATE</m'
+                  b"eta><dc:description>Description tests:[bare amp(&amp;) qt(') amp(&amp;) gt(&"
+                  b'gt;) lt(&lt;) ATnT(AT&amp;T) L(\xc2\xa3) Onna(\xe5\xa5\xb3)] Done\n\nSome mor'
+                  b'e longer description.  &quot;I suck at summaries!&quot;  &quot;Better than i'
+                  b't sounds!&quot; A span!  &quot;My first fic&quot;</dc:description><dc:publis'
+                  b'her>test1.com</dc:publisher><dc:identifier>URL:http://test1.com?sid=673</dc:'
+                  b'identifier><dc:source>http://test1.com?sid=673</dc:source><meta property="ti'
+                  b'tle-type" refines="#id">main</meta><meta property="role" refines="#id-1" sch'
+                  b'eme="marc:relators">aut</meta><meta property="role" refines="#id-2" scheme="'
+                  b'marc:relators">aut</meta><meta property="role" refines="#id-3" scheme="marc:'
+                  b'relators">aut</meta><meta property="role" refines="#id-4" scheme="marc:relat'
+                  b'ors">aut</meta><meta property="role" refines="#id-5" scheme="marc:relators">'
+                  b'aut</meta><meta property="role" refines="#id-6" scheme="marc:relators">aut</'
+                  b'meta><meta property="role" refines="#id-7" scheme="marc:relators">aut</meta>'
+                  b'<meta property="role" refines="#id-8" scheme="marc:relators">aut</meta><meta'
+                  b' property="role" refines="#id-9" scheme="marc:relators">aut</meta><meta prop'
+                  b'erty="role" refines="#id-10" scheme="marc:relators">aut</meta><meta property'
+                  b'="role" refines="#id-11" scheme="marc:relators">aut</meta><meta property="ro'
+                  b'le" refines="#id-12" scheme="marc:relators">aut</meta><meta property="role" '
+                  b'refines="#id-13" scheme="marc:relators">aut</meta><meta property="role" refi'
+                  b'nes="#id-14" scheme="marc:relators">aut</meta><meta property="role" refines='
+                  b'"#id-15" scheme="marc:relators">aut</meta><meta property="role" refines="#id'
+                  b'-16" scheme="marc:relators">aut</meta><meta property="role" refines="#id-17"'
+                  b' scheme="marc:relators">aut</meta><meta property="role" refines="#id-18" sch'
+                  b'eme="marc:relators">aut</meta><meta property="role" refines="#id-19" scheme='
+                  b'"marc:relators">aut</meta><meta property="role" refines="#id-20" scheme="mar'
+                  b'c:relators">aut</meta><meta property="role" refines="#id-21" scheme="marc:re'
+                  b'lators">bkp</meta></metadata><manifest><item id="ncx" href="toc.ncx" media-t'
+                  b'ype="application/x-dtbncx+xml"/><item id="style" href="OEBPS/stylesheet.css"'
+                  b' media-type="text/css"/><item id="title_page" href="OEBPS/title_page.xhtml" '
+                  b'media-type="application/xhtml+xml"/><item id="toc_page" href="OEBPS/toc_page'
+                  b'.xhtml" media-type="application/xhtml+xml"/><item id="log_page" href="OEBPS/'
+                  b'log_page.xhtml" media-type="application/xhtml+xml"/><item id="file0001" href'
+                  b'="OEBPS/file0001.xhtml" media-type="application/xhtml+xml"/><item id="file00'
+                  b'02" href="OEBPS/file0002.xhtml" media-type="application/xhtml+xml"/><item id'
+                  b'="file0003" href="OEBPS/file0003.xhtml" media-type="application/xhtml+xml"/>'
+                  b'<item id="file0004" href="OEBPS/file0004.xhtml" media-type="application/xhtm'
+                  b'l+xml"/><item id="file0005" href="OEBPS/file0005.xhtml" media-type="applicat'
+                  b'ion/xhtml+xml"/><item id="file0006" href="OEBPS/file0006.xhtml" media-type="'
+                  b'application/xhtml+xml"/><item id="file0007" href="OEBPS/file0007.xhtml" medi'
+                  b'a-type="application/xhtml+xml"/><item id="file0008" href="OEBPS/file0008.xht'
+                  b'ml" media-type="application/xhtml+xml"/><item id="file0009" href="OEBPS/file'
+                  b'0009.xhtml" media-type="application/xhtml+xml"/><item href="nav.xhtml" id="n'
+                  b'av" media-type="application/xhtml+xml" properties="nav"/></manifest><spine t'
+                  b'oc="ncx"><itemref idref="title_page" linear="yes"/><itemref idref="toc_page"'
+                  b' linear="yes"/><itemref idref="log_page" linear="yes"/><itemref idref="file0'
+                  b'001" linear="yes"/><itemref idref="file0002" linear="yes"/><itemref idref="f'
+                  b'ile0003" linear="yes"/><itemref idref="file0004" linear="yes"/><itemref idre'
+                  b'f="file0005" linear="yes"/><itemref idref="file0006" linear="yes"/><itemref '
+                  b'idref="file0007" linear="yes"/><itemref idref="file0008" linear="yes"/><item'
+                  b'ref idref="file0009" linear="yes"/></spine></package>',
+   'nav.xhtml': b'<?xml version="1.0" encoding="utf-8"?><html xmlns="http://www.w3.org/1999/xhtml"'
+                b' xmlns:epub="http://www.idpf.org/2007/ops" xml:lang="en"><head><title>Navigation'
+                b'</title><meta http-equiv="Content-Type" content="text/html; charset=utf-8"/></he'
+                b'ad><body><nav epub:type="toc"><ol><li><a href="OEBPS/title_page.xhtml">Title Pag'
+                b'e</a></li><li><a href="OEBPS/toc_page.xhtml">Table of Contents</a></li><li><a hr'
+                b'ef="OEBPS/log_page.xhtml">Update Log</a></li><li><a href="OEBPS/file0001.xhtml">'
+                b"Prologue tests:[bare amp(&amp;) qt(') amp(&amp;) gt(&gt;) lt(&lt;) ATnT(AT&amp;T"
+                b') L(\xc2\xa3) Onna(\xe5\xa5\xb3)]</a></li><li><a href="OEBPS/file0002.xhtml">Ch'
+                b'apter 1, Xenos on Cinnabar</a></li><li><a href="OEBPS/file0003.xhtml">Chapter 2,'
+                b' Sinmay on Kintikin</a></li><li><a href="OEBPS/file0004.xhtml">Chapter 3, &quot;'
+                b'Over&quot; Cinnabar</a></li><li><a href="OEBPS/file0005.xhtml">Chapter 4 &amp; 4'
+                b'.5</a></li><li><a href="OEBPS/file0006.xhtml">Chapter 5 &lt; 5.4</a></li><li><a '
+                b'href="OEBPS/file0007.xhtml">Chapter A &amp; B &lt; C &gt; D</a></li><li><a href='
+                b'"OEBPS/file0008.xhtml">Chapter 7</a></li><li><a href="OEBPS/file0009.xhtml">Chap'
+                b'ter 8</a></li></ol></nav></body></html>',
+   'toc.ncx': b'<?xml version="1.0" encoding="utf-8"?><ncx version="2005-1" xmlns="http://www.da'
+              b'isy.org/z3986/2005/ncx/"><head><meta name="dtb:uid" content="fanficfare-uid:test'
+              b'1.com-u98765-s673"/><meta name="dtb:depth" content="1"/><meta name="dtb:totalPag'
+              b'eCount" content="0"/><meta name="dtb:maxPageNumber" content="0"/></head><docTitl'
+              b'e><text>Test Story Title 673</text></docTitle><navMap><navPoint id="title_page" '
+              b'playOrder="0"><navLabel><text>Title Page</text></navLabel><content src="OEBPS/ti'
+              b'tle_page.xhtml"/></navPoint><navPoint id="toc_page" playOrder="1"><navLabel><tex'
+              b't>Table of Contents</text></navLabel><content src="OEBPS/toc_page.xhtml"/></navP'
+              b'oint><navPoint id="log_page" playOrder="2"><navLabel><text>Update Log</text></na'
+              b'vLabel><content src="OEBPS/log_page.xhtml"/></navPoint><navPoint id="file0001" p'
+              b'layOrder="3"><navLabel><text>Prologue tests:[bare amp(&amp;) qt(\') amp(&amp;) gt'
+              b'(&gt;) lt(&lt;) ATnT(AT&amp;T) L(\xc2\xa3) Onna(\xe5\xa5\xb3)]</text></navLabel><co'
+              b'ntent src="OEBPS/file0001.xhtml"/></navPoint><navPoint id="file0002" playOrder="'
+              b'4"><navLabel><text>Chapter 1, Xenos on Cinnabar</text></navLabel><content src="O'
+              b'EBPS/file0002.xhtml"/></navPoint><navPoint id="file0003" playOrder="5"><navLabel'
+              b'><text>Chapter 2, Sinmay on Kintikin</text></navLabel><content src="OEBPS/file00'
+              b'03.xhtml"/></navPoint><navPoint id="file0004" playOrder="6"><navLabel><text>Chap'
+              b'ter 3, &quot;Over&quot; Cinnabar</text></navLabel><content src="OEBPS/file0004.x'
+              b'html"/></navPoint><navPoint id="file0005" playOrder="7"><navLabel><text>Chapter '
+              b'4 &amp; 4.5</text></navLabel><content src="OEBPS/file0005.xhtml"/></navPoint><na'
+              b'vPoint id="file0006" playOrder="8"><navLabel><text>Chapter 5 &lt; 5.4</text></na'
+              b'vLabel><content src="OEBPS/file0006.xhtml"/></navPoint><navPoint id="file0007" p'
+              b'layOrder="9"><navLabel><text>Chapter A &amp; B &lt; C &gt; D</text></navLabel><c'
+              b'ontent src="OEBPS/file0007.xhtml"/></navPoint><navPoint id="file0008" playOrder='
+              b'"10"><navLabel><text>Chapter 7</text></navLabel><content src="OEBPS/file0008.xht'
+              b'ml"/></navPoint><navPoint id="file0009" playOrder="11"><navLabel><text>Chapter 8'
+              b'</text></navLabel><content src="OEBPS/file0009.xhtml"/></navPoint></navMap></ncx'
+              b'>'}),
+ ('5',
+  'epub_version:2.0\ncalibre_series_meta:true\ninclude_logpage:true\nlogpage_at_end:true\n',
+  {'META-INF/container.xml': b'<?xml version="1.0" encoding="utf-8"?><container version="1.0" xmlns'
+                             b'="urn:oasis:names:tc:opendocument:xmlns:container"><rootfiles><rootf'
+                             b'ile full-path="content.opf" media-type="application/oebps-package+xm'
+                             b'l"/></rootfiles></container>',
+   'content.opf': b'<?xml version="1.0" encoding="utf-8"?><package version="2.0" xmlns="http://w'
+                  b'ww.idpf.org/2007/opf" unique-identifier="fanficfare-uid"><metadata xmlns:dc='
+                  b'"http://purl.org/dc/elements/1.1/" xmlns:opf="http://www.idpf.org/2007/opf">'
+                  b'<dc:identifier id="fanficfare-uid">fanficfare-uid:test1.com-u98765-s5</dc:id'
+                  b'entifier><dc:title id="id">Test Story Title 5</dc:title><dc:creator opf:role'
+                  b'="aut">Test Author aa</dc:creator><dc:contributor id="id-2">FanFicFare [http'
+                  b's://github.com/JimmXinu/FanFicFare]</dc:contributor><dc:language>en</dc:lang'
+                  b'uage><dc:date opf:event="publication">DATE</dc:date><dc:date opf:event="crea'
+                  b'tion">DATE</dc:date><dc:date opf:event="modification">DATE</dc:date><meta na'
+                  b'me="calibre:timestamp" content="DATE"/><dc:description>Description tests:[ba'
+                  b"re amp(&amp;) qt(') amp(&amp;) gt(&gt;) lt(&lt;) ATnT(AT&amp;T) L(\xc2\xa3) On"
+                  b'na(\xe5\xa5\xb3)] Done\n\nSome more longer description.  &quot;I suck at summar'
+                  b'ies!&quot;  &quot;Better than it sounds!&quot; A span!  &quot;My first fic&q'
+                  b'uot;</dc:description><dc:publisher>test1.com</dc:publisher><dc:identifier op'
+                  b'f:scheme="URL">http://test1.com?sid=5</dc:identifier><dc:source>http://test1'
+                  b'.com?sid=5</dc:source></metadata><manifest><item id="ncx" href="toc.ncx" med'
+                  b'ia-type="application/x-dtbncx+xml"/><item id="style" href="OEBPS/stylesheet.'
+                  b'css" media-type="text/css"/><item id="file0001" href="OEBPS/file0001.xhtml" '
+                  b'media-type="application/xhtml+xml"/><item id="file0002" href="OEBPS/file0002'
+                  b'.xhtml" media-type="application/xhtml+xml"/><item id="file0003" href="OEBPS/'
+                  b'file0003.xhtml" media-type="application/xhtml+xml"/><item id="file0004" href'
+                  b'="OEBPS/file0004.xhtml" media-type="application/xhtml+xml"/><item id="file00'
+                  b'05" href="OEBPS/file0005.xhtml" media-type="application/xhtml+xml"/><item id'
+                  b'="file0006" href="OEBPS/file0006.xhtml" media-type="application/xhtml+xml"/>'
+                  b'<item id="file0007" href="OEBPS/file0007.xhtml" media-type="application/xhtm'
+                  b'l+xml"/><item id="file0008" href="OEBPS/file0008.xhtml" media-type="applicat'
+                  b'ion/xhtml+xml"/><item id="file0009" href="OEBPS/file0009.xhtml" media-type="'
+                  b'application/xhtml+xml"/><item id="log_page" href="OEBPS/log_page.xhtml" medi'
+                  b'a-type="application/xhtml+xml"/></manifest><spine toc="ncx"><itemref idref="'
+                  b'file0001" linear="yes"/><itemref idref="file0002" linear="yes"/><itemref idr'
+                  b'ef="file0003" linear="yes"/><itemref idref="file0004" linear="yes"/><itemref'
+                  b' idref="file0005" linear="yes"/><itemref idref="file0006" linear="yes"/><ite'
+                  b'mref idref="file0007" linear="yes"/><itemref idref="file0008" linear="yes"/>'
+                  b'<itemref idref="file0009" linear="yes"/><itemref idref="log_page" linear="ye'
+                  b's"/></spine></package>',
+   'toc.ncx': b'<?xml version="1.0" encoding="utf-8"?><ncx version="2005-1" xmlns="http://www.da'
+              b'isy.org/z3986/2005/ncx/"><head><meta name="dtb:uid" content="fanficfare-uid:test'
+              b'1.com-u98765-s5"/><meta name="dtb:depth" content="1"/><meta name="dtb:totalPageC'
+              b'ount" content="0"/><meta name="dtb:maxPageNumber" content="0"/></head><docTitle>'
+              b'<text>Test Story Title 5</text></docTitle><navMap><navPoint id="file0001" playOr'
+              b'der="0"><navLabel><text>Prologue tests:[bare amp(&amp;) qt(\') amp(&amp;) gt(&gt;'
+              b') lt(&lt;) ATnT(AT&amp;T) L(\xc2\xa3) Onna(\xe5\xa5\xb3)]</text></navLabel><content'
+              b' src="OEBPS/file0001.xhtml"/></navPoint><navPoint id="file0002" playOrder="1"><n'
+              b'avLabel><text>Chapter 1, Xenos on Cinnabar</text></navLabel><content src="OEBPS/'
+              b'file0002.xhtml"/></navPoint><navPoint id="file0003" playOrder="2"><navLabel><tex'
+              b't>Chapter 2, Sinmay on Kintikin</text></navLabel><content src="OEBPS/file0003.xh'
+              b'tml"/></navPoint><navPoint id="file0004" playOrder="3"><navLabel><text>Chapter 3'
+              b', &quot;Over&quot; Cinnabar</text></navLabel><content src="OEBPS/file0004.xhtml"'
+              b'/></navPoint><navPoint id="file0005" playOrder="4"><navLabel><text>Chapter 4 &am'
+              b'p; 4.5</text></navLabel><content src="OEBPS/file0005.xhtml"/></navPoint><navPoin'
+              b't id="file0006" playOrder="5"><navLabel><text>Chapter 5 &lt; 5.4</text></navLabe'
+              b'l><content src="OEBPS/file0006.xhtml"/></navPoint><navPoint id="file0007" playOr'
+              b'der="6"><navLabel><text>Chapter A &amp; B &lt; C &gt; D</text></navLabel><conten'
+              b't src="OEBPS/file0007.xhtml"/></navPoint><navPoint id="file0008" playOrder="7"><'
+              b'navLabel><text>Chapter 7</text></navLabel><content src="OEBPS/file0008.xhtml"/><'
+              b'/navPoint><navPoint id="file0009" playOrder="8"><navLabel><text>Chapter 8</text>'
+              b'</navLabel><content src="OEBPS/file0009.xhtml"/></navPoint><navPoint id="log_pag'
+              b'e" playOrder="9"><navLabel><text>Update Log</text></navLabel><content src="OEBPS'
+              b'/log_page.xhtml"/></navPoint></navMap></ncx>'}),
+ ('30',
+  'epub_version:3.0\ninclude_titlepage:false\ninclude_tocpage:false\n',
+  {'META-INF/container.xml': b'<?xml version="1.0" encoding="utf-8"?><container version="1.0" xmlns'
+                             b'="urn:oasis:names:tc:opendocument:xmlns:container"><rootfiles><rootf'
+                             b'ile full-path="content.opf" media-type="application/oebps-package+xm'
+                             b'l"/></rootfiles></container>',
+   'content.opf': b'<?xml version="1.0" encoding="utf-8"?><package version="3.0" xmlns="http://w'
+                  b'ww.idpf.org/2007/opf" unique-identifier="fanficfare-uid"><metadata xmlns:dc='
+                  b'"http://purl.org/dc/elements/1.1/" xmlns:opf="http://www.idpf.org/2007/opf">'
+                  b'<dc:identifier id="fanficfare-uid">fanficfare-uid:test1.com-u98765-s30</dc:i'
+                  b'dentifier><dc:title id="id">Test Story Title 30</dc:title><dc:creator id="id'
+                  b'-1">Test Author aa</dc:creator><dc:contributor id="id-2">FanFicFare [https:/'
+                  b'/github.com/JimmXinu/FanFicFare]</dc:contributor><dc:language>en</dc:languag'
+                  b'e><meta property="dcterms:modified">DATE</meta><dc:description>Description t'
+                  b"ests:[bare amp(&amp;) qt(') amp(&amp;) gt(&gt;) lt(&lt;) ATnT(AT&amp;T) "
+                  b'L(\xc2\xa3) Onna(\xe5\xa5\xb3)] Done\n\nSome more longer description.  &quot;'
+                  b'I suck at summaries!&quot;  &quot;Better than it sounds!&quot; A span!  &quo'
+                  b't;My first fic&quot;</dc:description><dc:publisher>test1.com</dc:publisher><'
+                  b'dc:identifier>URL:http://test1.com?sid=30</dc:identifier><dc:source>http://t'
+                  b'est1.com?sid=30</dc:source><meta property="title-type" refines="#id">main</m'
+                  b'eta><meta property="role" refines="#id-1" scheme="marc:relators">aut</meta><'
+                  b'meta property="role" refines="#id-2" scheme="marc:relators">bkp</meta></meta'
+                  b'data><manifest><item id="ncx" href="toc.ncx" media-type="application/x-dtbnc'
+                  b'x+xml"/><item id="style" href="OEBPS/stylesheet.css" media-type="text/css"/>'
+                  b'<item id="file0001" href="OEBPS/file0001.xhtml" media-type="application/xhtm'
+                  b'l+xml"/><item id="file0002" href="OEBPS/file0002.xhtml" media-type="applicat'
+                  b'ion/xhtml+xml"/><item id="file0003" href="OEBPS/file0003.xhtml" media-type="'
+                  b'application/xhtml+xml"/><item id="file0004" href="OEBPS/file0004.xhtml" medi'
+                  b'a-type="application/xhtml+xml"/><item id="file0005" href="OEBPS/file0005.xht'
+                  b'ml" media-type="application/xhtml+xml"/><item id="file0006" href="OEBPS/file'
+                  b'0006.xhtml" media-type="application/xhtml+xml"/><item id="file0007" href="OE'
+                  b'BPS/file0007.xhtml" media-type="application/xhtml+xml"/><item id="file0008" '
+                  b'href="OEBPS/file0008.xhtml" media-type="application/xhtml+xml"/><item id="fi'
+                  b'le0009" href="OEBPS/file0009.xhtml" media-type="application/xhtml+xml"/><ite'
+                  b'm href="nav.xhtml" id="nav" media-type="application/xhtml+xml" properties="n'
+                  b'av"/></manifest><spine toc="ncx"><itemref idref="file0001" linear="yes"/><it'
+                  b'emref idref="file0002" linear="yes"/><itemref idref="file0003" linear="yes"/'
+                  b'><itemref idref="file0004" linear="yes"/><itemref idref="file0005" linear="y'
+                  b'es"/><itemref idref="file0006" linear="yes"/><itemref idref="file0007" linea'
+                  b'r="yes"/><itemref idref="file0008" linear="yes"/><itemref idref="file0009" l'
+                  b'inear="yes"/></spine></package>',
+   'nav.xhtml': b'<?xml version="1.0" encoding="utf-8"?><html xmlns="http://www.w3.org/1999/xhtml"'
+                b' xmlns:epub="http://www.idpf.org/2007/ops" xml:lang="en"><head><title>Navigation'
+                b'</title><meta http-equiv="Content-Type" content="text/html; charset=utf-8"/></he'
+                b'ad><body><nav epub:type="toc"><ol><li><a href="OEBPS/file0001.xhtml">Prologue te'
+                b"sts:[bare amp(&amp;) qt(') amp(&amp;) gt(&gt;) lt(&lt;) ATnT(AT&amp;T) L"
+                b'(\xc2\xa3) Onna(\xe5\xa5\xb3)]</a></li><li><a href="OEBPS/file0002.xhtml">Chapt'
+                b'er 1, Xenos on Cinnabar</a></li><li><a href="OEBPS/file0003.xhtml">Chapter 2, Si'
+                b'nmay on Kintikin</a></li><li><a href="OEBPS/file0004.xhtml">Chapter 3, &quot;Ove'
+                b'r&quot; Cinnabar</a></li><li><a href="OEBPS/file0005.xhtml">Chapter 4 &amp; 4.5<'
+                b'/a></li><li><a href="OEBPS/file0006.xhtml">Chapter 5 &lt; 5.4</a></li><li><a hre'
+                b'f="OEBPS/file0007.xhtml">Chapter A &amp; B &lt; C &gt; D</a></li><li><a href="OE'
+                b'BPS/file0008.xhtml">Chapter 7</a></li><li><a href="OEBPS/file0009.xhtml">Chapter'
+                b' 8</a></li></ol></nav></body></html>',
+   'toc.ncx': b'<?xml version="1.0" encoding="utf-8"?><ncx version="2005-1" xmlns="http://www.da'
+              b'isy.org/z3986/2005/ncx/"><head><meta name="dtb:uid" content="fanficfare-uid:test'
+              b'1.com-u98765-s30"/><meta name="dtb:depth" content="1"/><meta name="dtb:totalPage'
+              b'Count" content="0"/><meta name="dtb:maxPageNumber" content="0"/></head><docTitle'
+              b'><text>Test Story Title 30</text></docTitle><navMap><navPoint id="file0001" play'
+              b'Order="0"><navLabel><text>Prologue tests:[bare amp(&amp;) qt(\') amp(&amp;) gt(&g'
+              b't;) lt(&lt;) ATnT(AT&amp;T) L(\xc2\xa3) Onna(\xe5\xa5\xb3)]</text></navLabel><conte'
+              b'nt src="OEBPS/file0001.xhtml"/></navPoint><navPoint id="file0002" playOrder="1">'
+              b'<navLabel><text>Chapter 1, Xenos on Cinnabar</text></navLabel><content src="OEBP'
+              b'S/file0002.xhtml"/></navPoint><navPoint id="file0003" playOrder="2"><navLabel><t'
+              b'ext>Chapter 2, Sinmay on Kintikin</text></navLabel><content src="OEBPS/file0003.'
+              b'xhtml"/></navPoint><navPoint id="file0004" playOrder="3"><navLabel><text>Chapter'
+              b' 3, &quot;Over&quot; Cinnabar</text></navLabel><content src="OEBPS/file0004.xhtm'
+              b'l"/></navPoint><navPoint id="file0005" playOrder="4"><navLabel><text>Chapter 4 &'
+              b'amp; 4.5</text></navLabel><content src="OEBPS/file0005.xhtml"/></navPoint><navPo'
+              b'int id="file0006" playOrder="5"><navLabel><text>Chapter 5 &lt; 5.4</text></navLa'
+              b'bel><content src="OEBPS/file0006.xhtml"/></navPoint><navPoint id="file0007" play'
+              b'Order="6"><navLabel><text>Chapter A &amp; B &lt; C &gt; D</text></navLabel><cont'
+              b'ent src="OEBPS/file0007.xhtml"/></navPoint><navPoint id="file0008" playOrder="7"'
+              b'><navLabel><text>Chapter 7</text></navLabel><content src="OEBPS/file0008.xhtml"/'
+              b'></navPoint><navPoint id="file0009" playOrder="8"><navLabel><text>Chapter 8</tex'
+              b't></navLabel><content src="OEBPS/file0009.xhtml"/></navPoint></navMap></ncx>'}),
+ ('12',
+  'epub_version:2.0\ninclude_images:true\ndefault_cover_image:%(cover)s\n',
+  {'META-INF/container.xml': b'<?xml version="1.0" encoding="utf-8"?><container version="1.0" xmlns'
+                             b'="urn:oasis:names:tc:opendocument:xmlns:container"><rootfiles><rootf'
+                             b'ile full-path="content.opf" media-type="application/oebps-package+xm'
+                             b'l"/></rootfiles></container>',
+   'content.opf': b'<?xml version="1.0" encoding="utf-8"?><package version="2.0" xmlns="http://w'
+                  b'ww.idpf.org/2007/opf" unique-identifier="fanficfare-uid"><metadata xmlns:dc='
+                  b'"http://purl.org/dc/elements/1.1/" xmlns:opf="http://www.idpf.org/2007/opf">'
+                  b'<dc:identifier id="fanficfare-uid">fanficfare-uid:test1.com-u98765-s12</dc:i'
+                  b'dentifier><dc:title id="id">Test Story Title 12</dc:title><dc:creator opf:ro'
+                  b'le="aut">Test Author aa</dc:creator><dc:contributor id="id-2">FanFicFare [ht'
+                  b'tps://github.com/JimmXinu/FanFicFare]</dc:contributor><dc:language>en</dc:la'
+                  b'nguage><dc:date opf:event="publication">DATE</dc:date><dc:date opf:event="cr'
+                  b'eation">DATE</dc:date><dc:date opf:event="modification">DATE</dc:date><meta '
+                  b'name="calibre:timestamp" content="DATE"/><dc:description>Description tests:['
+                  b"bare amp(&amp;) qt(') amp(&amp;) gt(&gt;) lt(&lt;) ATnT(AT&amp;T) L(\xc2\xa3) "
+                  b'Onna(\xe5\xa5\xb3)] Done\n\nSome more longer description.  &quot;I suck at summ'
+                  b'aries!&quot;  &quot;Better than it sounds!&quot; A span!  &quot;My first fic'
+                  b'&quot;</dc:description><dc:publisher>test1.com</dc:publisher><dc:identifier '
+                  b'opf:scheme="URL">http://test1.com?sid=12</dc:identifier><dc:source>http://te'
+                  b'st1.com?sid=12</dc:source><meta name="cover" content="image0000"/></metadata'
+                  b'><manifest><item id="ncx" href="toc.ncx" media-type="application/x-dtbncx+xm'
+                  b'l"/><item id="image0000" href="OEBPS/images/cover.jpg" media-type="image/jpe'
+                  b'g"/><item id="style" href="OEBPS/stylesheet.css" media-type="text/css"/><ite'
+                  b'm id="cover" href="OEBPS/cover.xhtml" media-type="application/xhtml+xml"/><i'
+                  b'tem id="file0001" href="OEBPS/file0001.xhtml" media-type="application/xhtml+'
+                  b'xml"/><item id="file0002" href="OEBPS/file0002.xhtml" media-type="applicatio'
+                  b'n/xhtml+xml"/><item id="file0003" href="OEBPS/file0003.xhtml" media-type="ap'
+                  b'plication/xhtml+xml"/><item id="file0004" href="OEBPS/file0004.xhtml" media-'
+                  b'type="application/xhtml+xml"/><item id="file0005" href="OEBPS/file0005.xhtml'
+                  b'" media-type="application/xhtml+xml"/><item id="file0006" href="OEBPS/file00'
+                  b'06.xhtml" media-type="application/xhtml+xml"/><item id="file0007" href="OEBP'
+                  b'S/file0007.xhtml" media-type="application/xhtml+xml"/><item id="file0008" hr'
+                  b'ef="OEBPS/file0008.xhtml" media-type="application/xhtml+xml"/><item id="file'
+                  b'0009" href="OEBPS/file0009.xhtml" media-type="application/xhtml+xml"/></mani'
+                  b'fest><spine toc="ncx"><itemref idref="cover" linear="yes"/><itemref idref="f'
+                  b'ile0001" linear="yes"/><itemref idref="file0002" linear="yes"/><itemref idre'
+                  b'f="file0003" linear="yes"/><itemref idref="file0004" linear="yes"/><itemref '
+                  b'idref="file0005" linear="yes"/><itemref idref="file0006" linear="yes"/><item'
+                  b'ref idref="file0007" linear="yes"/><itemref idref="file0008" linear="yes"/><'
+                  b'itemref idref="file0009" linear="yes"/></spine><guide><reference type="cover'
+                  b'" title="Cover" href="OEBPS/cover.xhtml"/></guide></package>',
+   'toc.ncx': b'<?xml version="1.0" encoding="utf-8"?><ncx version="2005-1" xmlns="http://www.da'
+              b'isy.org/z3986/2005/ncx/"><head><meta name="dtb:uid" content="fanficfare-uid:test'
+              b'1.com-u98765-s12"/><meta name="dtb:depth" content="1"/><meta name="dtb:totalPage'
+              b'Count" content="0"/><meta name="dtb:maxPageNumber" content="0"/></head><docTitle'
+              b'><text>Test Story Title 12</text></docTitle><navMap><navPoint id="file0001" play'
+              b'Order="0"><navLabel><text>Prologue tests:[bare amp(&amp;) qt(\') amp(&amp;) gt(&g'
+              b't;) lt(&lt;) ATnT(AT&amp;T) L(\xc2\xa3) Onna(\xe5\xa5\xb3)]</text></navLabel><conte'
+              b'nt src="OEBPS/file0001.xhtml"/></navPoint><navPoint id="file0002" playOrder="1">'
+              b'<navLabel><text>Chapter 1, Xenos on Cinnabar</text></navLabel><content src="OEBP'
+              b'S/file0002.xhtml"/></navPoint><navPoint id="file0003" playOrder="2"><navLabel><t'
+              b'ext>Chapter 2, Sinmay on Kintikin</text></navLabel><content src="OEBPS/file0003.'
+              b'xhtml"/></navPoint><navPoint id="file0004" playOrder="3"><navLabel><text>Chapter'
+              b' 3, &quot;Over&quot; Cinnabar</text></navLabel><content src="OEBPS/file0004.xhtm'
+              b'l"/></navPoint><navPoint id="file0005" playOrder="4"><navLabel><text>Chapter 4 &'
+              b'amp; 4.5</text></navLabel><content src="OEBPS/file0005.xhtml"/></navPoint><navPo'
+              b'int id="file0006" playOrder="5"><navLabel><text>Chapter 5 &lt; 5.4</text></navLa'
+              b'bel><content src="OEBPS/file0006.xhtml"/></navPoint><navPoint id="file0007" play'
+              b'Order="6"><navLabel><text>Chapter A &amp; B &lt; C &gt; D</text></navLabel><cont'
+              b'ent src="OEBPS/file0007.xhtml"/></navPoint><navPoint id="file0008" playOrder="7"'
+              b'><navLabel><text>Chapter 7</text></navLabel><content src="OEBPS/file0008.xhtml"/'
+              b'></navPoint><navPoint id="file0009" playOrder="8"><navLabel><text>Chapter 8</tex'
+              b't></navLabel><content src="OEBPS/file0009.xhtml"/></navPoint></navMap></ncx>'}),
+ ('12',
+  'epub_version:3.0\ninclude_images:true\ndefault_cover_image:%(cover)s\n',
+  {'META-INF/container.xml': b'<?xml version="1.0" encoding="utf-8"?><container version="1.0" xmlns'
+                             b'="urn:oasis:names:tc:opendocument:xmlns:container"><rootfiles><rootf'
+                             b'ile full-path="content.opf" media-type="application/oebps-package+xm'
+                             b'l"/></rootfiles></container>',
+   'content.opf': b'<?xml version="1.0" encoding="utf-8"?><package version="3.0" xmlns="http://w'
+                  b'ww.idpf.org/2007/opf" unique-identifier="fanficfare-uid"><metadata xmlns:dc='
+                  b'"http://purl.org/dc/elements/1.1/" xmlns:opf="http://www.idpf.org/2007/opf">'
+                  b'<dc:identifier id="fanficfare-uid">fanficfare-uid:test1.com-u98765-s12</dc:i'
+                  b'dentifier><dc:title id="id">Test Story Title 12</dc:title><dc:creator id="id'
+                  b'-1">Test Author aa</dc:creator><dc:contributor id="id-2">FanFicFare [https:/'
+                  b'/github.com/JimmXinu/FanFicFare]</dc:contributor><dc:language>en</dc:languag'
+                  b'e><meta property="dcterms:modified">DATE</meta><dc:description>Description t'
+                  b"ests:[bare amp(&amp;) qt(') amp(&amp;) gt(&gt;) lt(&lt;) ATnT(AT&amp;T) "
+                  b'L(\xc2\xa3) Onna(\xe5\xa5\xb3)] Done\n\nSome more longer description.  &quot;'
+                  b'I suck at summaries!&quot;  &quot;Better than it sounds!&quot; A span!  &quo'
+                  b't;My first fic&quot;</dc:description><dc:publisher>test1.com</dc:publisher><'
+                  b'dc:identifier>URL:http://test1.com?sid=12</dc:identifier><dc:source>http://t'
+                  b'est1.com?sid=12</dc:source><meta property="title-type" refines="#id">main</m'
+                  b'eta><meta property="role" refines="#id-1" scheme="marc:relators">aut</meta><'
+                  b'meta property="role" refines="#id-2" scheme="marc:relators">bkp</meta><meta '
+                  b'name="cover" content="image0000"/></metadata><manifest><item id="ncx" href="'
+                  b'toc.ncx" media-type="application/x-dtbncx+xml"/><item id="image0000" href="O'
+                  b'EBPS/images/cover.jpg" media-type="image/jpeg"/><item id="style" href="OEBPS'
+                  b'/stylesheet.css" media-type="text/css"/><item id="cover" href="OEBPS/cover.x'
+                  b'html" media-type="application/xhtml+xml"/><item id="file0001" href="OEBPS/fi'
+                  b'le0001.xhtml" media-type="application/xhtml+xml"/><item id="file0002" href="'
+                  b'OEBPS/file0002.xhtml" media-type="application/xhtml+xml"/><item id="file0003'
+                  b'" href="OEBPS/file0003.xhtml" media-type="application/xhtml+xml"/><item id="'
+                  b'file0004" href="OEBPS/file0004.xhtml" media-type="application/xhtml+xml"/><i'
+                  b'tem id="file0005" href="OEBPS/file0005.xhtml" media-type="application/xhtml+'
+                  b'xml"/><item id="file0006" href="OEBPS/file0006.xhtml" media-type="applicatio'
+                  b'n/xhtml+xml"/><item id="file0007" href="OEBPS/file0007.xhtml" media-type="ap'
+                  b'plication/xhtml+xml"/><item id="file0008" href="OEBPS/file0008.xhtml" media-'
+                  b'type="application/xhtml+xml"/><item id="file0009" href="OEBPS/file0009.xhtml'
+                  b'" media-type="application/xhtml+xml"/><item href="nav.xhtml" id="nav" media-'
+                  b'type="application/xhtml+xml" properties="nav"/></manifest><spine toc="ncx"><'
+                  b'itemref idref="cover" linear="yes"/><itemref idref="file0001" linear="yes"/>'
+                  b'<itemref idref="file0002" linear="yes"/><itemref idref="file0003" linear="ye'
+                  b's"/><itemref idref="file0004" linear="yes"/><itemref idref="file0005" linear'
+                  b'="yes"/><itemref idref="file0006" linear="yes"/><itemref idref="file0007" li'
+                  b'near="yes"/><itemref idref="file0008" linear="yes"/><itemref idref="file0009'
+                  b'" linear="yes"/></spine><guide><reference type="cover" title="Cover" href="O'
+                  b'EBPS/cover.xhtml"/></guide></package>',
+   'nav.xhtml': b'<?xml version="1.0" encoding="utf-8"?><html xmlns="http://www.w3.org/1999/xhtml"'
+                b' xmlns:epub="http://www.idpf.org/2007/ops" xml:lang="en"><head><title>Navigation'
+                b'</title><meta http-equiv="Content-Type" content="text/html; charset=utf-8"/></he'
+                b'ad><body><nav epub:type="toc"><ol><li><a href="OEBPS/file0001.xhtml">Prologue te'
+                b"sts:[bare amp(&amp;) qt(') amp(&amp;) gt(&gt;) lt(&lt;) ATnT(AT&amp;T) L"
+                b'(\xc2\xa3) Onna(\xe5\xa5\xb3)]</a></li><li><a href="OEBPS/file0002.xhtml">Chapt'
+                b'er 1, Xenos on Cinnabar</a></li><li><a href="OEBPS/file0003.xhtml">Chapter 2, Si'
+                b'nmay on Kintikin</a></li><li><a href="OEBPS/file0004.xhtml">Chapter 3, &quot;Ove'
+                b'r&quot; Cinnabar</a></li><li><a href="OEBPS/file0005.xhtml">Chapter 4 &amp; 4.5<'
+                b'/a></li><li><a href="OEBPS/file0006.xhtml">Chapter 5 &lt; 5.4</a></li><li><a hre'
+                b'f="OEBPS/file0007.xhtml">Chapter A &amp; B &lt; C &gt; D</a></li><li><a href="OE'
+                b'BPS/file0008.xhtml">Chapter 7</a></li><li><a href="OEBPS/file0009.xhtml">Chapter'
+                b' 8</a></li></ol></nav><nav epub:type="landmarks" hidden=""><ol><li><a href="OEBP'
+                b'S/cover.xhtml" epub:type="cover">Cover</a></li></ol></nav></body></html>',
+   'toc.ncx': b'<?xml version="1.0" encoding="utf-8"?><ncx version="2005-1" xmlns="http://www.da'
+              b'isy.org/z3986/2005/ncx/"><head><meta name="dtb:uid" content="fanficfare-uid:test'
+              b'1.com-u98765-s12"/><meta name="dtb:depth" content="1"/><meta name="dtb:totalPage'
+              b'Count" content="0"/><meta name="dtb:maxPageNumber" content="0"/></head><docTitle'
+              b'><text>Test Story Title 12</text></docTitle><navMap><navPoint id="file0001" play'
+              b'Order="0"><navLabel><text>Prologue tests:[bare amp(&amp;) qt(\') amp(&amp;) gt(&g'
+              b't;) lt(&lt;) ATnT(AT&amp;T) L(\xc2\xa3) Onna(\xe5\xa5\xb3)]</text></navLabel><conte'
+              b'nt src="OEBPS/file0001.xhtml"/></navPoint><navPoint id="file0002" playOrder="1">'
+              b'<navLabel><text>Chapter 1, Xenos on Cinnabar</text></navLabel><content src="OEBP'
+              b'S/file0002.xhtml"/></navPoint><navPoint id="file0003" playOrder="2"><navLabel><t'
+              b'ext>Chapter 2, Sinmay on Kintikin</text></navLabel><content src="OEBPS/file0003.'
+              b'xhtml"/></navPoint><navPoint id="file0004" playOrder="3"><navLabel><text>Chapter'
+              b' 3, &quot;Over&quot; Cinnabar</text></navLabel><content src="OEBPS/file0004.xhtm'
+              b'l"/></navPoint><navPoint id="file0005" playOrder="4"><navLabel><text>Chapter 4 &'
+              b'amp; 4.5</text></navLabel><content src="OEBPS/file0005.xhtml"/></navPoint><navPo'
+              b'int id="file0006" playOrder="5"><navLabel><text>Chapter 5 &lt; 5.4</text></navLa'
+              b'bel><content src="OEBPS/file0006.xhtml"/></navPoint><navPoint id="file0007" play'
+              b'Order="6"><navLabel><text>Chapter A &amp; B &lt; C &gt; D</text></navLabel><cont'
+              b'ent src="OEBPS/file0007.xhtml"/></navPoint><navPoint id="file0008" playOrder="7"'
+              b'><navLabel><text>Chapter 7</text></navLabel><content src="OEBPS/file0008.xhtml"/'
+              b'></navPoint><navPoint id="file0009" playOrder="8"><navLabel><text>Chapter 8</tex'
+              b't></navLabel><content src="OEBPS/file0009.xhtml"/></navPoint></navMap></ncx>'})]
@@ -0,0 +1,90 @@
+import re
+import struct
+
+from fanficfare.browsercache import base_browsercache, browsercache_simple
+from fanficfare.browsercache.base_browsercache import BaseBrowserCache
+from fanficfare.browsercache.browsercache_simple import SimpleCache
+
+
+def simple_cache_dir(path):
+    '''
+    Makes path a Chrome Simple Cache dir with no entries.
+    '''
+    (path / 'index').write_bytes(b'\0' * 24)
+    (path / 'index-dir').mkdir()
+    (path / 'index-dir' / 'the-real-index').write_bytes(
+        struct.pack('QQ', 0, browsercache_simple.THE_REAL_INDEX_MAGIC_NUMBER))
+    return str(path)
+
+
+def add_entry(path, url):
+    key = url.encode('utf-8')
+    header = struct.pack('<QLLLL', browsercache_simple.ENTRY_MAGIC_NUMBER, 5, len(key), 0, 0)
+    (path / ('%s_0' % browsercache_simple._key_hash(url))).write_bytes(header + key)
+
+
+class TestSampleDirEntries:
+    def test_limit(self, tmp_path):
+        # Given
+        for i in range(200):
+            (tmp_path / ('%016x_0' % i)).write_bytes(b'')
+
+        # When
+        result = list(BaseBrowserCache.sample_dir_entries(str(tmp_path), browsercache_simple.ENTRY_FILE_RE))
+
+        # Then
+        assert len(result) == base_browsercache.CACHE_DIR_SAMPLE_LIMIT
+        assert all(re.search(r'[0-9a-f]{16}_0$', path) for path in result)
+
+    def test_only_matching(self, tmp_path):
+        # Given
+        for i in range(10):
+            (tmp_path / ('%016x_0' % i)).write_bytes(b'')
+            (tmp_path / ('other%d' % i)).write_bytes(b'')
+
+        # When
+        result = list(BaseBrowserCache.sample_dir_entries(str(tmp_path), browsercache_simple.ENTRY_FILE_RE))
+
+        # Then
+        assert len(result) == 10
+
+    def test_missing_dir(self, tmp_path):
+        # When
+        result = list(BaseBrowserCache.sample_dir_entries(str(tmp_path / 'none'), browsercache_simple.ENTRY_FILE_RE))
+
+        # Then
+        assert result == []
+
+
+class TestSimpleCacheDetection:
+    def test_needs_valid_entry(self, tmp_path):
+        # Given
+        cache_dir = simple_cache_dir(tmp_path)
+        empty = SimpleCache.is_cache_dir(cache_dir)
+        (tmp_path / ('%016x_0' % 1)).write_bytes(b'\0' * 40)
+        bad_entry = SimpleCache.is_cache_dir(cache_dir)
+
+        # When
+        add_entry(tmp_path, 'https://test1.com/')
+
+        # Then
+        assert not empty
+        assert not bad_entry
+        assert SimpleCache.is_cache_dir(cache_dir)
+
+    def test_only_valid_remembered(self, tmp_path):
+        # Given
+        cache_dir = simple_cache_dir(tmp_path)
+        before = SimpleCache.is_cache_dir_cached(cache_dir)
+
+        # When
+        add_entry(tmp_path, 'https://test1.com/')
+        created = SimpleCache.is_cache_dir_cached(cache_dir)
+        for entry in tmp_path.glob('*_0'):
+            entry.unlink()
+
+        # Then
+        assert not before
+        assert created
+        assert not SimpleCache.is_cache_dir(cache_dir)
+        assert SimpleCache.is_cache_dir_cached(cache_dir)
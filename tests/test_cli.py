@@ -0,0 +1,171 @@
+import re
+from io import BytesIO
+from zipfile import ZipFile
+
+import pytest
+
+from fanficfare import adapters, cli
+from fanficfare.adapters import adapter_test1
+from fanficfare.adapters.base_adapter import fetch_settings_differ
+from fanficfare.configurable import Configuration
+
+
+def download(argv, tmp_path, monkeypatch, personalini=''):
+    '''
+    Runs the CLI in tmp_path, returns ({filename: data}, chapters fetched).
+    '''
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'personal.ini').write_text(u'[overrides]\nslow_down_sleep_time:0\n' + personalini)
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path))
+    fetched = []
+    real_get = adapter_test1.TestSiteAdapter.getChapterText
+    monkeypatch.setattr(adapter_test1.TestSiteAdapter, 'getChapterText',
+                        lambda self, url: fetched.append(url) or real_get(self, url))
+    cli.main(argv + ['http://test1.com?sid=1'])
+    files = dict((path.name, path.read_bytes()) for path in tmp_path.iterdir() if path.name != 'personal.ini')
+    for path in tmp_path.iterdir():
+        path.unlink()
+    return files, fetched
+
+
+def without_times(data):
+    ## test1 chapters include the time they were fetched.
+    return re.sub(br'\d\d:\d\d:\d\d', b'', data)
+
+
+def output_files(name, data):
+    '''
+    {filename: data} of an output file, an epub's files separately.
+    '''
+    if not name.endswith('.epub'):
+        return {name: without_times(data)}
+    with ZipFile(BytesIO(data)) as epub:
+        return dict((info.filename, without_times(epub.read(info)))
+                    for info in epub.infolist())
+
+
+class TestCopyForFileform:
+    def test_sections(self):
+        # Given
+        configuration = Configuration(['test1.com'], 'epub')
+        configuration.read_string('[overrides]\n'
+                                  '[html]\nzip_output:true\n'
+                                  '[test1.com:html]\nwrap_width:5\n')
+
+        # When
+        html = configuration.copy_for_fileform('html')
+
+        # Then
+        assert configuration.copy_for_fileform('epub') is configuration
+        assert html.fileform == 'html'
+        assert html.sectionslist == [section.replace('epub', 'html')
+                                     for section in configuration.sectionslist]
+        assert html.getConfig('zip_output') == 'true'
+        assert html.getConfig('wrap_width') == '5'
+        assert not configuration.getConfig('zip_output')
+        assert html.get_basic_cache() is configuration.get_basic_cache()
+
+
+def single_downloads(formats, tmp_path, monkeypatch, personalini=''):
+    files = {}
+    fetched = []
+    for fmt in formats:
+        result, result_fetched = download(['-f', fmt], tmp_path, monkeypatch, personalini)
+        files.update(result)
+        fetched.extend(result_fetched)
+    return files, fetched
+
+
+class TestMultipleFormats:
+    def test_fetched_once(self, tmp_path, monkeypatch):
+        # Given
+        personalini = '[txt]\nreplace_metadata:\n title=>Test Story=>Text Story\n'
+        single, single_fetched = single_downloads(['epub', 'html', 'txt'], tmp_path, monkeypatch, personalini)
+
+        # When
+        result, fetched = download(['-f', 'epub,html,txt'], tmp_path, monkeypatch, personalini)
+
+        # Then
+        assert sorted(result) == sorted(single)
+        assert b'Text Story' in result['Text Story Title 1-tst1_1.txt']
+        assert b'Text Story' not in result['Test Story Title 1-tst1_1.html']
+        assert len(fetched) * 3 == len(single_fetched)
+
+    @pytest.mark.parametrize('formats', ['epub,txt', 'txt,epub,html', 'html,txt,epub'])
+    def test_same_as_single(self, formats, tmp_path, monkeypatch):
+        # Given
+        single, single_fetched = single_downloads(formats.split(','), tmp_path, monkeypatch)
+
+        # When
+        result, fetched = download(['-f', formats], tmp_path, monkeypatch)
+
+        # Then
+        assert sorted(result) == sorted(single)
+        assert len(fetched) * len(result) == len(single_fetched)
+        for name in result:
+            assert output_files(name, result[name]) == output_files(name, single[name])
+        assert b'<p>' not in result['Test Story Title 1-tst1_1.txt']
+
+    def test_fetch_settings_differ(self, tmp_path, monkeypatch):
+        # Given
+        personalini = '[txt]\nreplace_chapter_text:\n fake adapter=>pretend adapter\n'
+        single, single_fetched = single_downloads(['txt', 'epub', 'html'], tmp_path, monkeypatch, personalini)
+
+        # When
+        result, fetched = download(['-f', 'txt,epub,html'], tmp_path, monkeypatch, personalini)
+
+        # Then
+        assert len(fetched) * 3 == len(single_fetched) * 2
+        for name in result:
+            assert output_files(name, result[name]) == output_files(name, single[name])
+        assert b'pretend adapter' in result['Test Story Title 1-tst1_1.txt']
+        assert b'pretend adapter' not in result['Test Story Title 1-tst1_1.html']
+
+    def test_site_fetch_setting_differs(self, tmp_path, monkeypatch):
+        # Given
+        personalini = '[test1.com:txt]\nusername:Someone\n'
+        single, single_fetched = single_downloads(['epub', 'txt'], tmp_path, monkeypatch, personalini)
+
+        # When
+        result, fetched = download(['-f', 'epub,txt'], tmp_path, monkeypatch, personalini)
+
+        # Then
+        assert len(fetched) == len(single_fetched)
+        for name in result:
+            assert output_files(name, result[name]) == output_files(name, single[name])
+
+    @pytest.mark.parametrize('argv', [['-f', 'epub,html', '-u'], ['-f', 'html,epub', '--unnew']])
+    def test_epub_only_options(self, argv, tmp_path, monkeypatch):
+        # When
+        with pytest.raises(SystemExit):
+            download(argv, tmp_path, monkeypatch)
+
+
+class TestFetchSettingsDiffer:
+    def test_defaults_share(self):
+        # Given
+        configuration = Configuration(adapters.getConfigSectionsFor('https://www.royalroad.com/fiction/1'), 'epub')
+        configuration.read(['fanficfare/defaults.ini'])
+
+        # When
+        result = [fetch_settings_differ(configuration, configuration.copy_for_fileform(fmt))
+                  for fmt in ('html', 'txt', 'mobi')]
+
+        # Then
+        assert result == [[], [], []]
+
+    def test_site_setting(self):
+        # Given
+        configuration = Configuration(adapters.getConfigSectionsFor('https://www.royalroad.com/fiction/1'), 'epub')
+        configuration.read(['fanficfare/defaults.ini'])
+        configuration.read_string('[royalroad.com:txt]\n'
+                                  'include_author_notes:false\n'
+                                  'wrap_width:60\n'
+                                  'add_to_titlepage_entries:,favs\n')
+
+        # When
+        result = fetch_settings_differ(configuration, configuration.copy_for_fileform('txt'))
+
+        # Then
+        assert result == ['include_author_notes']
@@ -0,0 +1,168 @@
+import random
+import re
+import unicodedata
+
+import bs4
+import pytest
+
+from fanficfare.htmlcleanup import reduce_zalgo, internalize_text_links
+
+
+def reference_reduce_zalgo(text, max_zalgo=1):
+    '''
+    reduce_zalgo as it was, one character at a time.
+    '''
+    lineout = []
+    count = 0
+    for c in unicodedata.normalize('NFD', text):
+        if unicodedata.category(c) not in ['Mn', 'Me']:
+            lineout.append(c)
+            count = 0
+        else:
+            if count < max_zalgo:
+                lineout.append(c)
+            count += 1
+    return ''.join(lineout)
+
+
+def random_text(seed):
+    rnd = random.Random(seed)
+    pools = ['abc xyz<p>&amp;\n',
+             'éüñçÅøß',
+             ''.join(chr(c) for c in range(0x300, 0x370)),    # combining diacriticals
+             '⃝⃞҈҉',                      # enclosing marks, Me
+             '️\U0001f600‍\U0001f468',              # emoji, variation selector
+             '한국어 日本語 ḱṷṓ',
+             '\U000e0100\U0001d167ः']                    # astral and Mc marks
+    return ''.join(rnd.choice(rnd.choice(pools)) for i in range(rnd.randint(0, 400)))
+
+
+CORPUS = ['',
+          'plain ascii text, nothing to do',
+          'T̴̢̛̖̗̘̙̜̝̞̟̠̤̥̦̩̪̫̬̭̮̯̰̱̲̳̹̺̻̼͇͈͉͍͎̀́̂̃̄̅̆̇̈̉̊̋̌̍̎̏̐̑̒̓̔̽̾̿̀́͂̓̈́͆͊͋͌̕̚ͅ͏͓͔͕͖͙͚͐͑͒͗͛ͣͤͥͦͧͨͩͪͫͬͭͮͯ͘͜͟͢͝͞͠͡ȩ̸̡̢̧̨̛̛̖̗̘̙̜̝̞̟̠̣̤̥̦̩̪̫̬̭̮̯̰̱̲̳̹̺̻̼͇͈͉͍͎̀́̂̃̄̅̆̇̈̉̊̋̌̍̎̏̐̑̒̓̔̽̾̿̀́͂̓̈́͆͊͋͌̕̚ͅ͏͓͔͕͖͙͚͐͑͒͗͛ͣͤͥͦͧͨͩͪͫͬͭͮͯ͘͜͟͢͝͞͠͡x̵̡̢̧̨̛̖̗̘̙̜̝̞̟̠̣̤̥̦̩̪̫̬̭̮̯̰̱̲̳̹̺̻̼͇͈͉͍͎̀́̂̃̄̅̆̇̈̉̊̋̌̍̎̏̐̑̒̓̔̽̾̿̀́͂̓̈́͆͊͋͌̕̚ͅ͏͓͔͕͖͙͚͐͑͒͗͛ͣͤͥͦͧͨͩͪͫͬͭͮͯ͘͜͟͢͝͞͠͡t̶',
+          'Café naïve résumé Ångström',
+          'Café already decomposed',
+          '́̂ leading marks',
+          'trailing markś̂̃',
+          '1⃣ keycap and (⃝) enclosed',
+          '각 jamo and 각 syllable',
+          '<p class="x">Zalgo in <b>tags</b>: ẑ̃̄a̅̆l̇̈g̉̊ỏ̋</p>'] + \
+    [random_text(seed) for seed in range(40)]
+
+
+class TestReduceZalgo:
+    @pytest.mark.parametrize('max_zalgo', [0, 1, 2, 3, 10])
+    def test_same_as_reference(self, max_zalgo):
+        for text in CORPUS:
+            # When
+            result = reduce_zalgo(text, max_zalgo)
+
+            # Then
+            assert result == reference_reduce_zalgo(text, max_zalgo), repr(text)
+
+    def test_precomposed_decomposed(self):
+        # When
+        result = reduce_zalgo('é', 0)
+
+        # Then
+        assert result == 'e'
+
+    def test_default_max(self):
+        # When
+        result = reduce_zalgo('á̂̃b')
+
+        # Then
+        assert result == 'áb'
+
+
+def reparse(html):
+    html = str(bs4.BeautifulSoup(html, 'html5lib'))
+    return re.sub(r"</?(html|head|body)[^>]*>\r?\n?", "", html)
+
+
+def reference_internalize_text_links(html, chapurlmap, keep_orighref=True):
+    '''
+    internalize_text_links as it was, with html5lib.
+    '''
+    soup = bs4.BeautifulSoup(html, 'html5lib')
+    for alink in soup.find_all('a'):
+        if keep_orighref and alink.has_attr('data-orighref') and alink['data-orighref'] in chapurlmap:
+            alink['href'] = chapurlmap[alink['data-orighref']]
+        elif alink.has_attr('href') and alink['href'] in chapurlmap:
+            if keep_orighref and not alink['href'].startswith('file'):
+                alink['data-orighref'] = alink['href']
+            alink['href'] = chapurlmap[alink['href']]
+    return reparse(str(soup))
+
+
+CHAPURLMAP = {'https://test1.com/s?sid=1&chapter=1': 'file0001.xhtml',
+              'https://test1.com/s?sid=1&chapter=2': 'file0002.xhtml',
+              'https://test1.com/"q"': 'file0003.xhtml',
+              'file0009.xhtml': 'file0004.xhtml'}
+
+
+def random_chapter(seed):
+    rnd = random.Random(seed)
+    hrefs = list(CHAPURLMAP.keys()) + ['https://test1.com/other', '#note', '']
+    parts = []
+    for i in range(rnd.randint(0, 12)):
+        choice = rnd.random()
+        if choice < 0.6:
+            attrs = {}
+            if rnd.random() < 0.9:
+                attrs['href'] = rnd.choice(hrefs)
+            if rnd.random() < 0.3:
+                attrs['data-orighref'] = rnd.choice(hrefs)
+            if rnd.random() < 0.3:
+                attrs['class'] = 'x'
+            tag = bs4.BeautifulSoup('', 'html5lib').new_tag('a', attrs=attrs)
+            tag.string = 'link %d' % i
+            parts.append(str(tag))
+        elif choice < 0.8:
+            parts.append('<abbr title="a">t</abbr><aside>x</aside>')
+        else:
+            parts.append('<p>text &amp; &lt;a href=&quot;%s&quot;&gt;</p>' % rnd.choice(hrefs))
+    return '<div>%s</div>' % ''.join(parts)
+
+
+class TestInternalizeTextLinks:
+    @pytest.mark.parametrize('keep_orighref', [True, False])
+    def test_same_as_reference(self, keep_orighref):
+        for seed in range(200):
+            # Given
+            html = random_chapter(seed)
+
+            # When
+            result = internalize_text_links(html, CHAPURLMAP, keep_orighref)
+
+            # Then
+            assert reparse(result) == reference_internalize_text_links(html, CHAPURLMAP, keep_orighref), html
+
+    def test_only_links_changed(self):
+        # Given
+        html = ('<div><p>x<br/>y</p><a class="c" href="https://test1.com/s?sid=1&amp;chapter=2">2</a>'
+                '<a href=\'https://test1.com/"q"\'>3</a><a href="elsewhere">4</a></div>')
+
+        # When
+        result = internalize_text_links(html, CHAPURLMAP)
+
+        # Then
+        assert result == ('<div><p>x<br/>y</p><a class="c" href="file0002.xhtml"'
+                          ' data-orighref="https://test1.com/s?sid=1&amp;chapter=2">2</a>'
+                          '<a href="file0003.xhtml" data-orighref=\'https://test1.com/"q"\'>3</a>'
+                          '<a href="elsewhere">4</a></div>')
+
+    def test_orighref_used(self):
+        # When
+        result = internalize_text_links('<a href="file0009.xhtml" data-orighref="https://test1.com/s?sid=1&amp;chapter=1">1</a>',
+                                        CHAPURLMAP)
+
+        # Then
+        assert result == '<a href="file0001.xhtml" data-orighref="https://test1.com/s?sid=1&amp;chapter=1">1</a>'
+
+    def test_no_links(self):
+        # Given
+        html = '<p>no links, <abbr>abbr</abbr></p>'
+
+        # Then
+        assert internalize_text_links(html, CHAPURLMAP) is html
@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from fanficfare.htmlheuristics import replace_br_with_p, tag_sanitizer, was_run_marker
+from tests.fixtures_htmlheuristics import replace_br_with_p_cases
+
+
+class TestReplaceBrWithP:
+    @pytest.mark.parametrize('body,expected', replace_br_with_p_cases)
+    def test_same_as_before(self, body, expected):
+        # When
+        result = replace_br_with_p(body)
+
+        # Then
+        assert result == expected
+
+    def test_only_breaks(self):
+        # Given
+        body = '<div>' + ('word' + '<br/>' * 3) * 2000 + '</div>'
+
+        # When
+        result = replace_br_with_p(body)
+
+        # Then
+        assert result.count('<p>word</p>') == 2000
+        assert '<br' not in result.replace('<p><br/></p>', '')
+
+    def test_already_run(self):
+        # Given
+        body = replace_br_with_p('<div>one<br/><br/>two</div>')
+
+        # When
+        result = replace_br_with_p(body)
+
+        # Then
+        assert was_run_marker in body
+        assert result == body
+
+
+class TestConcurrent:
+    def test_threads_same_as_serial(self):
+        # Given
+        bodies = [body for (body, expected) in replace_br_with_p_cases] * 4
+        serial = [replace_br_with_p(body) for body in bodies]
+
+        # When
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            threaded = list(executor.map(replace_br_with_p, bodies))
+
+        # Then
+        assert threaded == serial
+
+    def test_tag_sanitizer_threads(self):
+        # Given
+        ## open tags left on a shared stack would show up in other calls.
+        bodies = ['<p><b>bold%d<i>ital</p><p>next</b></p>' % i for i in range(500)]
+        serial = [tag_sanitizer(body) for body in bodies]
+
+        # When
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            threaded = list(executor.map(tag_sanitizer, bodies))
+
+        # Then
+        assert threaded == serial
+        assert serial[0] == '<p><b>bold0<i>ital</i></b></p><p><b><i>next</i></b></p>'
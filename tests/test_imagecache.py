@@ -0,0 +1,45 @@
+import os
+import time
+
+from fanficfare.imagecache import ConvertedImageCache
+
+
+class TestConvertedImageCache:
+    def test_set_and_get(self, tmp_path):
+        # Given
+        cache = ConvertedImageCache(str(tmp_path / 'cache'), 1000)
+
+        # When
+        cache.set(('digest', (580, 725)), 'jpg', b'converted')
+
+        # Then
+        assert cache.get(('digest', (580, 725)), 'jpg') == b'converted'
+        assert cache.get(('digest', (100, 100)), 'jpg') is None
+        assert cache.get(('digest', (580, 725)), 'png') is None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        # Given
+        cache = ConvertedImageCache(str(tmp_path), 350)
+        for i in range(3):
+            cache.set(i, 'jpg', b'x' * 100)
+            os.utime(cache.make_filename(i, 'jpg'), (i, i))
+        # 0 used since, so 1 is least recently used.
+        cache.get(0, 'jpg')
+
+        # When
+        cache.set(3, 'jpg', b'x' * 100)
+
+        # Then
+        assert [cache.get(i, 'jpg') is not None for i in range(4)] == [True, False, True, True]
+        assert cache.size <= 350
+
+    def test_shared_directory(self, tmp_path):
+        # Given
+        cache1 = ConvertedImageCache(str(tmp_path), 1000)
+        cache2 = ConvertedImageCache(str(tmp_path), 1000)
+
+        # When
+        cache1.set('key', 'png', b'data')
+
+        # Then
+        assert cache2.get('key', 'png') == b'data'
@@ -0,0 +1,238 @@
+import random
+import re
+import struct
+from io import BytesIO
+
+import bs4
+import pytest
+
+from fanficfare import adapters, writers
+from fanficfare.configurable import Configuration
+from fanficfare.mobi import Converter, PalmDocCompress
+from fanficfare.mobihtml import HtmlProcessor, FileposAnchors
+
+
+def palmdoc_decompress(data):
+    data = bytearray(data)
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        c = data[i]
+        i += 1
+        if 1 <= c <= 8:
+            out += data[i:i + c]
+            i += c
+        elif c < 0x80:
+            out.append(c)
+        elif c >= 0xc0:
+            out += b' '
+            out.append(c ^ 0x80)
+        else:
+            code = (c << 8) | data[i]
+            i += 1
+            distance = (code >> 3) & 0x7ff
+            assert 0 < distance <= len(out)
+            for j in range((code & 7) + 3):
+                out.append(out[-distance])
+    return bytes(out)
+
+
+def mobi_text(mobi):
+    '''
+    Returns (compression, text length, text records, text) read back
+    from a mobi file.
+    '''
+    count = struct.unpack('>H', mobi[76:78])[0]
+    offsets = [struct.unpack('>I', mobi[78 + 8 * i:82 + 8 * i])[0] for i in range(count)] + [len(mobi)]
+    records = [mobi[offsets[i]:offsets[i + 1]] for i in range(count)]
+    compression, unused, length, text_count, size = struct.unpack('>HHIHH', records[0][:12])
+    extra_flags = struct.unpack('>H', records[0][0xf2:0xf4])[0]
+    assert extra_flags == 1
+    text = b''
+    text_records = records[1:text_count + 1]
+    for record in text_records:
+        record = record[:-((bytearray(record[-1:])[0] & 3) + 1)]
+        text += palmdoc_decompress(record) if compression == 2 else record
+    return compression, length, text_records, text
+
+
+def write_mobi(ini=''):
+    configuration = Configuration(['test1.com'], 'mobi')
+    configuration.read_string('[overrides]\nslow_down_sleep_time:0\n' + ini)
+    adapter = adapters.getAdapter(configuration, 'http://test1.com?sid=1')
+    adapter.getStory()
+    out = BytesIO()
+    writers.getWriter('mobi', configuration, adapter).writeStory(outstream=out)
+    return out.getvalue()
+
+
+def without_times(data):
+    ## test1 chapters include the time they were fetched.
+    return re.sub(br'\d\d:\d\d:\d\d', b'', data)
+
+
+class TestPalmDocCompress:
+    @pytest.mark.parametrize('seed', range(20))
+    def test_round_trip(self, seed):
+        # Given
+        rnd = random.Random(seed)
+        pools = [b'<p>The quick brown fox.</p>\n', b'  @@ x', bytes(bytearray(range(256))),
+                 u'女性 Ångström \u2014'.encode('utf-8')]
+        data = b''.join(rnd.choice(pools)[:rnd.randint(1, 30)]
+                        for i in range(rnd.randint(0, 400)))[:4096]
+
+        # When
+        result = PalmDocCompress(data)
+
+        # Then
+        assert palmdoc_decompress(result) == data
+
+    def test_repeats_shrink(self):
+        # Given
+        data = (b'<p>All work and no play makes Jack a dull boy.</p>\n' * 100)[:4096]
+
+        # When
+        result = PalmDocCompress(data)
+
+        # Then
+        assert len(result) < len(data) / 4
+        assert palmdoc_decompress(result) == data
+
+
+class TestMobiCompression:
+    def test_same_text(self):
+        # Given
+        compression, length, records, expected = mobi_text(write_mobi('mobi_compression:false\n'))
+        assert compression == 1
+
+        # When
+        compression, length, records, result = mobi_text(write_mobi())
+
+        # Then
+        assert compression == 2
+        assert len(result) == length
+        title = re.compile(br'Bibliorize [^<]* GMT')
+        assert title.sub(b'', without_times(result)) == title.sub(b'', without_times(expected))
+        assert len(records) > 2
+
+    @pytest.mark.parametrize('compression', [True, False])
+    def test_multibyte_overlap(self, compression):
+        # Given
+        html = u'<html><head><title>t</title></head><body><p>%s</p></body></html>' % (u'女' * 3000)
+
+        # When
+        mobi = Converter(compression=compression).ConvertString(html)
+
+        # Then
+        result, length, records, text = mobi_text(mobi)
+        assert text.decode('utf-8').count(u'女') == 3000
+        overlaps = []
+        for record in records[:-1]:
+            count = bytearray(record[-1:])[0]
+            overlaps.append(record[-1 - count:-1])
+        assert any(overlaps)
+        for (i, overlap) in enumerate(overlaps):
+            end = 4096 * (i + 1)
+            assert text[:end + len(overlap)].decode('utf-8')
+            assert text[end:end + len(overlap)] == overlap
+
+
+def reference_one_html(html_strs):
+    '''
+    MakeOneHTML as it was, one soup for the whole book.
+    '''
+    entries = [HtmlProcessor(html) for html in html_strs]
+    body_html = [entries[0].RenameAnchors('mobi_article_1_'), '<mbp:pagebreak/>']
+    toc_html = ['<mbp:pagebreak/>', '<a name="TOCTOP"><h3>Table of Contents</h3><br />']
+    for pos, entry in enumerate(entries[1:]):
+        name = 'mobi_article_%d' % (pos + 1)
+        toc_html.append('<a href="#%s_MOBI_START">%.80s</a><br />' % (name, entry.title))
+        body_html.extend(['<mbp:pagebreak/>', '<a name="%s_MOBI_START">' % name,
+                          entry.RenameAnchors(name + '_')])
+    header = ('<html><head><title>Bibliorize</title><guide>'
+              '<reference href="#TOCTOP" type="toc" title="Table of Contents"/>'
+              '</guide></head><body>')
+    all_html = header + '\n'.join(body_html[:2] + toc_html + body_html[2:]) + '</body></html>'
+    return HtmlProcessor(all_html).CleanHtml()
+
+
+def filepos_targets(text):
+    targets = []
+    for m in re.finditer(br'filepos="(\d{10})"', text):
+        target = re.match(br'<[^<>]*?\sname="([^"]*)"', text[int(m.group(1)):])
+        targets.append(target and target.group(1))
+    return targets
+
+
+def visible_text(text):
+    text = re.sub(br'Bibliorize[^<]*', b'', text)
+    return ' '.join(bs4.BeautifulSoup(text, 'html5lib').get_text(' ').split())
+
+
+def book_html(count):
+    title = u'<html><head><title>Book</title></head><body><h1>Book &amp; co</h1></body></html>'
+    chapters = [u'<html><head><title>Chapter %d</title><style>p{}</style></head><body>\n'
+                u'<h3>Chapter %d</h3><p>See <a href="#note">note</a>, <a href="http://x.com/">out</a>.</p>\n'
+                u'<script>var a = "<p>";</script><pre>pre text\n  two</pre>\n<p>%s</p>\n'
+                u'<p><a name="note">The note</a> <a href="#back">back</a> <a name="back"></a></p>\n'
+                u'<mbp:pagebreak/>\n<p>after break</p></body></html>'
+                % (i, i, u'Lorem ipsum 女 £ ' * (i * 50)) for i in range(1, count + 1)]
+    return [title] + chapters
+
+
+class TestMakeOneHTML:
+    def test_same_as_reference(self):
+        # Given
+        html_strs = book_html(6)
+        expected = reference_one_html(html_strs)
+
+        # When
+        result = Converter().MakeOneHTML(html_strs)
+
+        # Then
+        assert visible_text(result) == visible_text(expected)
+        assert filepos_targets(result) == filepos_targets(expected)
+        assert filepos_targets(result)[:3] == [b'TOCTOP', b'mobi_article_1_MOBI_START',
+                                               b'mobi_article_2_MOBI_START']
+        assert b'mobi_article_6_back' in filepos_targets(result)
+        assert b'</mbp:pagebreak>' not in result
+
+    def test_toc_titles_escaped(self):
+        # Given
+        html_strs = [u'<html><head><title>Book</title></head><body></body></html>',
+                     u'<html><head><title>A &lt;b&gt; &amp; c</title></head><body>x</body></html>']
+
+        # When
+        result = Converter().MakeOneHTML(html_strs)
+
+        # Then
+        assert b'>A &lt;b&gt; &amp; c</a><br/>' in result
+
+
+    def test_body_parts_on_own_lines(self):
+        # Given
+        html = u'<html><head><title>t</title></head><body><p>a</p><pre>b  c</pre><p>d</p></body></html>'
+
+        # When
+        result = HtmlProcessor(html).CleanBody('x_', FileposAnchors())
+
+        # Then
+        assert result == b'<p>a</p>\nb&amp;nbsp;&amp;nbsp;c\n<p>d</p>'
+
+class TestFileposAnchors:
+    def test_across_chunks(self):
+        # Given
+        anchors = FileposAnchors()
+        soup = bs4.BeautifulSoup('<a href="#later">1</a><a href="#nowhere">2</a>', 'html5lib')
+        anchors.StubInternalAnchors(soup)
+
+        # When
+        anchors.Append(u'<p>女 <a filepos="%s">0</a></p>' % anchors.Stub('#b%20c'))
+        anchors.Append(soup.body.decode_contents())
+        anchors.Append(u'<a name="b c"></a><p name="later">x</p><a name="later"></a>')
+        result = anchors.Text()
+
+        # Then
+        assert filepos_targets(result) == [b'b c', b'later', None]
+        assert result.endswith(b'<a name="b c"></a><p name="later">x</p><a name="later"></a>')
+        assert b'filepos="0000000001">2</a>' in result
@@ -0,0 +1,50 @@
+from fanficfare.spillfile import MemoryBudget, SpillDict, SpilledData, parse_budget
+
+
+class TestMemoryBudget:
+    def test_spills_past_budget(self):
+        # Given
+        memory = MemoryBudget(10)
+
+        # When
+        kept = [memory.keep(b'%05d' % i) for i in range(5)]
+
+        # Then
+        assert kept[:2] == [b'00000', b'00001']
+        assert all(isinstance(k, SpilledData) for k in kept[2:])
+        assert [k.read() for k in kept[2:]] == [b'00002', b'00003', b'00004']
+        assert memory.spillfile.size == 15
+
+    def test_no_budget_never_spills(self):
+        # Given
+        memory = MemoryBudget()
+
+        # When
+        kept = memory.keep(b'x' * 1000000)
+
+        # Then
+        assert kept == b'x' * 1000000
+        assert memory.spillfile.tmpfile is None
+
+
+class TestSpillDict:
+    def test_values_read_back(self):
+        # Given
+        images = SpillDict(4)
+
+        # When
+        images['a'] = b'aaaa'
+        images['b'] = b'bbbb'
+
+        # Then
+        assert 'b' in images
+        assert images['a'] == b'aaaa'
+        assert images['b'] == b'bbbb'
+        assert isinstance(dict.__getitem__(images, 'b'), SpilledData)
+
+
+def test_parse_budget():
+    assert parse_budget('') is None
+    assert parse_budget('2') == 2 * 1024 * 1024
+    assert parse_budget('0.5') == 512 * 1024
+    assert parse_budget('lots') is None
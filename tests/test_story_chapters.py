@@ -0,0 +1,281 @@
+import random
+import re
+from io import BytesIO
+from zipfile import ZipFile
+
+import pytest
+
+from fanficfare import adapters, writers
+from fanficfare.configurable import Configuration
+from fanficfare.spillfile import SpilledText
+from fanficfare.adapters import adapter_test1
+from fanficfare.story import (Story, make_chapter_text_replacements,
+                              combine_chapter_text_replacements)
+
+
+def make_story(ini=''):
+    configuration = Configuration(['test1.com'], 'EPUB')
+    configuration.read_string('[overrides]\n' + ini)
+    return Story(configuration)
+
+
+def sequential(replacements, data):
+    for (repl_line, regexp, replacement) in replacements:
+        data = regexp.sub(replacement, data)
+    return data
+
+
+def combined(replacements, data):
+    for (repl_line, regexp, replacement) in combine_chapter_text_replacements(replacements):
+        data = regexp.sub(replacement, data)
+    return data
+
+
+class TestCombinedChapterTextReplacements:
+    def test_literals_combined(self):
+        # Given
+        replace = '\n'.join('word%02d=>W%02d' % (i, i) for i in range(50))
+
+        # When
+        replacements = combine_chapter_text_replacements(
+            make_chapter_text_replacements(replace))
+
+        # Then
+        assert len(replacements) == 1
+        assert replacements[0][1].sub(replacements[0][2], 'word07 word49') == 'W07 W49'
+
+    def test_conflicts_not_combined(self):
+        # Given
+        replace = '\n'.join(['cat=>dog',    # makes 'dog' for next line
+                             'dog=>wolf',
+                             'ab=>X',
+                             'bc=>Y',       # overlaps 'ab'
+                             'x+=>y',       # regexp
+                             's=>',         # empty replacement
+                             'q=>r'])
+
+        # When
+        replacements = combine_chapter_text_replacements(
+            make_chapter_text_replacements(replace))
+
+        # Then
+        assert len(replacements) == 6
+        assert combined(make_chapter_text_replacements(replace),
+                        'cat abc xx qs') == 'wolf Xc y r'
+
+    @pytest.mark.parametrize('seed', range(20))
+    def test_same_as_sequential(self, seed):
+        # Given
+        rnd = random.Random(seed)
+        alphabet = 'abcde<>/ '
+        lines = []
+        for i in range(rnd.randint(1, 30)):
+            pattern = ''.join(rnd.choice(alphabet) for j in range(rnd.randint(1, 3)))
+            if rnd.random() < 0.1:
+                pattern += '+'
+            replacement = ''.join(rnd.choice(alphabet + 'XYZ') for j in range(rnd.randint(0, 3)))
+            lines.append('%s=>%s' % (pattern, replacement))
+        replacements = make_chapter_text_replacements('\n'.join(lines))
+        data = ''.join(rnd.choice(alphabet) for i in range(500))
+
+        # When
+        result = combined(replacements, data)
+
+        # Then
+        assert result == sequential(replacements, data)
+
+
+class TestChapterTextReplacedOnce:
+    def test_add_chapter(self, monkeypatch):
+        # Given
+        story = make_story('replace_chapter_text:\n Xander=>Alexander\n <b>=>\n')
+        calls = []
+        real_do = story.do_chapter_text_replacements
+        monkeypatch.setattr(story, 'do_chapter_text_replacements',
+                            lambda data: calls.append(data) or real_do(data))
+
+        # When
+        story.addChapter({'title': 'Xander', 'html': '<p>Xander <b>x</b></p>'})
+        story.addChapter({'title': 'Two', 'html': '<p>two</p>'})
+        calls[:] = []
+        chapters = story.getChapters()
+        toc = story.getChapters(fortoc=True)
+
+        # Then
+        assert calls == []
+        assert chapters[0]['title'] == 'Alexander'
+        assert chapters[0]['html'] == '<p>Alexander x</b></p>'
+        assert toc[0]['toctitle'] == 'Alexander'
+
+
+class TestGetChaptersMemo:
+    def make_story(self):
+        story = make_story('add_chapter_numbers:toconly\n'
+                           'chapter_title_add_pattern:${index}. ${title}\n'
+                           'mark_new_chapters:true\n'
+                           'chapter_title_new_pattern:${title} (new)\n'
+                           'chapter_title_addnew_pattern:${index}. ${title} (new)\n')
+        story.addChapter({'title': 'One', 'html': '<p>1</p>'})
+        story.addChapter({'title': 'Two', 'html': '<p>2</p>'}, newchap=True)
+        return story
+
+    def test_reused(self):
+        # Given
+        story = self.make_story()
+        chapters = story.getChapters()
+        toc = story.getChapters(fortoc=True)
+
+        # When
+        again = story.getChapters()
+
+        # Then
+        assert again is chapters
+        assert story.getChapters(fortoc=True) is toc
+        assert [c['title'] for c in chapters] == ['One', 'Two (new)']
+        assert [c['title'] for c in toc] == ['1. One', '2. Two (new)']
+
+    def test_add_chapter_invalidates(self):
+        # Given
+        story = self.make_story()
+        story.getChapters()
+
+        # When
+        story.addChapter({'title': 'Three', 'html': '<p>3</p>'})
+
+        # Then
+        assert [c['title'] for c in story.getChapters()] == ['One', 'Two (new)', 'Three']
+
+    def test_metadata_invalidates(self):
+        # Given
+        story = self.make_story()
+        story.getChapters()
+
+        # When
+        story.setMetadata('newforanthology', 'true')
+
+        # Then
+        assert [c['title'] for c in story.getChapters()] == ['One (new)', 'Two (new)']
+
+
+def write_story(fmt, ini=''):
+    configuration = Configuration(['test1.com'], fmt)
+    configuration.read_string('[overrides]\nslow_down_sleep_time:0\n' + ini)
+    adapter = adapters.getAdapter(configuration, 'http://test1.com?sid=1')
+    adapter.getStory()
+    out = BytesIO()
+    writers.getWriter(fmt, configuration, adapter).writeStory(outstream=out)
+    return adapter.story, out.getvalue()
+
+
+def without_times(data):
+    ## test1 chapters include the time they were fetched.
+    return re.sub(br'\d\d:\d\d:\d\d', b'', data)
+
+
+def epub_chapters(data):
+    with ZipFile(BytesIO(data)) as epub:
+        return dict((name, without_times(epub.read(name))) for name in epub.namelist()
+                    if name.startswith('OEBPS/file'))
+
+
+class TestChapterMemoryBudget:
+    def test_chapters_spilled(self):
+        # Given
+        story = make_story('chapter_memory_budget:0.0001\n')
+
+        # When
+        story.addChapter({'title': 'One', 'html': '<p>%s</p>' % ('女' * 100)})
+        story.addChapter({'title': 'Two', 'html': '<p>two</p>'})
+
+        # Then
+        assert isinstance(dict.__getitem__(story.chapters[0], 'html'), SpilledText)
+        assert story.chapter_memory.spillfile.size > 0
+        chapters = story.getChapters()
+        assert chapters[0]['html'] == '<p>%s</p>' % ('女' * 100)
+        assert chapters[1]['html'] == '<p>two</p>'
+        assert isinstance(dict.__getitem__(chapters[0].copy(), 'html'), SpilledText)
+
+    @pytest.mark.parametrize('fmt', ['epub', 'html', 'txt'])
+    def test_same_output(self, fmt):
+        # Given
+        expected_story, expected = write_story(fmt)
+
+        # When
+        story, result = write_story(fmt, 'chapter_memory_budget:0.001\n')
+
+        # Then
+        assert story.chapter_memory.spillfile.size > 0
+        if fmt == 'epub':
+            assert epub_chapters(result) == epub_chapters(expected)
+        else:
+            assert without_times(result) == without_times(expected)
+
+
+def story_chapters(ini):
+    configuration = Configuration(['test1.com'], 'EPUB')
+    configuration.read_string('[overrides]\nslow_down_sleep_time:0\n'
+                              'replace_br_with_p:true\nreplace_hr:true\n' + ini)
+    adapter = adapters.getAdapter(configuration, 'http://test1.com?sid=1')
+    adapter.getStory()
+    return adapter, [(c['title'], re.sub(r'\d\d:\d\d:\d\d', '', c['html']))
+                     for c in adapter.story.getChapters()]
+
+
+class TestChapterTextProcesses:
+    def test_same_chapters(self):
+        # Given
+        ini = ('replace_chapter_text:\n'
+               ' fake adapter=>pretend adapter\n'
+               ' (?i)<p>\\s*</p>=>\n')
+        adapter, expected = story_chapters(ini)
+
+        # When
+        adapter, result = story_chapters(ini + 'chapter_text_processes:2\n')
+
+        # Then
+        assert result == expected
+        assert any('pretend adapter' in html for (title, html) in result)
+
+    def test_combined_literals_in_pool(self, monkeypatch):
+        # Given
+        ini = ('replace_chapter_text:\n'
+               ' fake adapter=>pretend adapter\n'
+               ' Hard coded=>Fixed\n')
+        adapter, expected = story_chapters(ini)
+        cleaned = []
+        real_add = Story.addChapter
+        monkeypatch.setattr(Story, 'addChapter',
+                            lambda self, chap, newchap=False, html_cleaned=False:
+                            cleaned.append(html_cleaned) or real_add(self, chap, newchap, html_cleaned))
+
+        # When
+        adapter, result = story_chapters(ini + 'chapter_text_processes:2\n')
+
+        # Then
+        assert result == expected
+        assert any('Fixed' in html for (title, html) in result)
+        assert cleaned and all(cleaned)
+
+    def test_adapter_string_changes_kept(self, monkeypatch):
+        # Given
+        ## like adapter_efpfanficnet, change utf8FromSoup's result.
+        real_get = adapter_test1.TestSiteAdapter.getChapterText
+        monkeypatch.setattr(adapter_test1.TestSiteAdapter, 'getChapterText',
+                            lambda self, url: re.sub('Hard coded', 'Changed', real_get(self, url)))
+
+        # When
+        adapter, result = story_chapters('chapter_text_processes:2\n')
+
+        # Then
+        assert any('Changed' in html for (title, html) in result)
+        assert not any('Hard coded' in html for (title, html) in result)
+
+    def test_same_txt(self):
+        # Given
+        story, expected = write_story('txt')
+
+        # When
+        story, result = write_story('txt', 'chapter_text_processes:2\n')
+
+        # Then
+        assert without_times(result) == without_times(expected)
@@ -0,0 +1,229 @@
+import os
+import random
+import time
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from fanficfare import adapters
+from fanficfare.configurable import Configuration
+from fanficfare.story import quoted_attr_value
+
+PAGE_URL = 'https://test1.com/chapter1.html'
+
+
+def make_png(color, size=(300, 300)):
+    out = BytesIO()
+    Image.new('RGB', size, color).save(out, 'PNG')
+    return out.getvalue()
+
+
+## url -> bytes, fetches of other URLs fail.
+IMAGES = {
+    'https://test1.com/small.png': make_png('red', (50, 50)),
+    'https://test1.com/a.png': make_png('blue'),
+    'https://test1.com/copy-of-a.png': make_png('blue'),
+    'https://test1.com/b.png?x=1&y=2': make_png('green'),
+    'https://other.example.com/c.png': make_png('yellow', (1200, 400)),
+}
+
+CHAPTER = '''<div>
+<p>start<img src="small.png"></p>
+<p><img src="/a.png"> <img src="missing.png"></p>
+<p><img src="https://test1.com/copy-of-a.png"><img src="b.png?x=1&amp;y=2"></p>
+<p><img src="data:image/gif,GIF89a"></p>
+<p><img src="//other.example.com/c.png"><img src="a.png"></p>
+</div>'''
+
+
+def fetch(url, referer=None, image=False):
+    ## finish out of order when threaded.
+    time.sleep(random.random() / 50)
+    if url not in IMAGES:
+        raise Exception('404 %s' % url)
+    return IMAGES[url]
+
+
+class TestQueuedImages:
+    def make_adapter(self, **settings):
+        configuration = Configuration(['test1.com'], 'EPUB', lightweight=True)
+        settings.setdefault('include_images', 'true')
+        settings.setdefault('dedup_img_files', 'true')
+        settings.setdefault('make_firstimage_cover', 'true')
+        settings.setdefault('cover_min_size', '100,100')
+        configuration.read_string('[overrides]\n' + ''.join(
+            '%s:%s\n' % item for item in settings.items()))
+        return adapters.getAdapter(configuration, 'http://test1.com?sid=1')
+
+    def process(self, **settings):
+        adapter = self.make_adapter(**settings)
+        html = adapter.utf8FromSoup(PAGE_URL, adapter.make_soup(CHAPTER), fetch)
+        story = adapter.story
+        images = [(i['newsrc'], i['url'], i['data']) for i in story.img_store.get_imgs()]
+        return html, images, story.cover, story.getMetadata('cover_image')
+
+    @pytest.mark.parametrize('settings', [
+        {'image_fetch_threads': '4'},
+        {'image_fetch_threads': '4', 'image_convert_processes': '2'},
+        {'image_fetch_threads': '4', 'make_firstimage_cover': 'false'},
+        {'image_fetch_threads': '2', 'dedup_img_files': 'false'},
+    ])
+    def test_same_as_unqueued(self, settings):
+        # Given
+        unqueued_settings = dict(settings)
+        del unqueued_settings['image_fetch_threads']
+        unqueued_settings.pop('image_convert_processes', None)
+        expected = self.process(**unqueued_settings)
+
+        # When
+        result = self.process(**settings)
+
+        # Then
+        assert result == expected
+        assert 'ffdlpending' not in result[0]
+
+    def test_unqueued_results(self):
+        # When
+        html, images, cover, cover_image = self.process()
+
+        # Then
+        assert [i[1] for i in images] == ['https://test1.com/a.png',
+                                         'https://test1.com/small.png',
+                                         'https://test1.com/a.png',
+                                         'https://test1.com/b.png?x=1&y=2',
+                                         'https://other.example.com/c.png']
+        assert images[0][0] == 'images/cover.jpg'
+        assert cover_image == 'first'
+        assert html.count('failedtoload') == 2
+        assert 'longdesc="https://test1.com/b.png?x=1&amp;y=2"' in html
+
+    def test_adapter_addimgurl_keeps_order(self):
+        # Given
+        adapter = self.make_adapter(image_fetch_threads='4')
+        story = adapter.story
+        queued = story.queueImgUrl(PAGE_URL, 'a.png', fetch)
+
+        # When
+        direct = story.addImgUrl(PAGE_URL, 'small.png', fetch)
+        html = story.resolve_img_placeholders('<img src="%s"/>' % queued[0])
+
+        # Then
+        assert queued[0].startswith('ffdlpendingsrc')
+        assert html == '<img src="images/ffdl-0.jpg"/>'
+        assert direct == ('images/ffdl-1.jpg', 'https://test1.com/small.png')
+
+
+class TestQuotedAttrValue:
+    def test_quoting(self):
+        assert quoted_attr_value('images/ffdl-0.jpg') == '="images/ffdl-0.jpg"'
+        assert quoted_attr_value('a&b<c') == '="a&amp;b&lt;c"'
+        assert quoted_attr_value('say "hi"') == '=\'say "hi"\''
+        assert quoted_attr_value(None) == ''
+
+
+class TestImageDedup:
+    def make_story(self, **settings):
+        return TestQueuedImages().make_adapter(**settings).story
+
+    def test_same_size_images(self):
+        # Given
+        story = self.make_story()
+        ## same-size panels, every third one repeated under a new URL.
+        panels = dict(('https://test1.com/panel%d.png' % i,
+                       make_png((i % 3 * 100, 0, 0), (120, 120)))
+                      for i in range(9))
+
+        # When
+        results = [story.addImgUrl(PAGE_URL, url, lambda url, **kw: panels[url])
+                   for url in panels]
+
+        # Then
+        assert [r[0] for r in results] == ['images/ffdl-0.jpg',
+                                           'images/ffdl-1.jpg',
+                                           'images/ffdl-2.jpg'] * 3
+        assert len(story.img_store.get_imgs()) == 4  # plus cover copy
+
+    def test_raw_duplicate_not_converted_again(self, monkeypatch):
+        # Given
+        story = self.make_story()
+        from fanficfare import story as story_module
+        calls = []
+        real_convert = story_module.convert_image
+        monkeypatch.setattr(story_module, 'convert_image',
+                            lambda *args, **kw: calls.append(args[0]) or real_convert(*args, **kw))
+
+        # When
+        story.addImgUrl(PAGE_URL, 'a.png', fetch)
+        result = story.addImgUrl(PAGE_URL, 'copy-of-a.png', fetch)
+
+        # Then
+        assert calls == ['https://test1.com/a.png']
+        assert result == ('images/ffdl-0.jpg', 'https://test1.com/a.png')
+
+    def test_dedup_off_keeps_copies(self):
+        # Given
+        story = self.make_story(dedup_img_files='false')
+
+        # When
+        story.addImgUrl(PAGE_URL, 'a.png', fetch)
+        result = story.addImgUrl(PAGE_URL, 'copy-of-a.png', fetch)
+
+        # Then
+        assert result == ('images/ffdl-1.jpg', 'https://test1.com/copy-of-a.png')
+
+
+class TestImageMemoryBudget:
+    def test_spilled_images_same_output(self):
+        # Given
+        expected = TestQueuedImages().process()
+
+        # When
+        result = TestQueuedImages().process(image_memory_budget='0.001')
+
+        # Then
+        assert result == expected
+
+    def test_images_spilled(self):
+        # Given
+        story = TestQueuedImages().make_adapter(image_memory_budget='0.001').story
+
+        # When
+        story.addImgUrl(PAGE_URL, 'a.png', fetch)
+        story.addImgUrl(PAGE_URL, 'b.png?x=1&y=2', fetch)
+
+        # Then
+        assert story.img_store.memory.spillfile.size > 0
+        assert [i['data'][:2] for i in story.getImgUrls()] == [b'\xff\xd8'] * 3
+
+
+class TestConvertedImageCache:
+    def test_second_run_not_converted(self, tmp_path, monkeypatch):
+        # Given
+        from fanficfare import story as story_module
+        calls = []
+        real_convert = story_module.convert_image
+        monkeypatch.setattr(story_module, 'convert_image',
+                            lambda *args, **kw: calls.append(args[0]) or real_convert(*args, **kw))
+        settings = {'converted_image_cache_dir': str(tmp_path)}
+        expected = TestQueuedImages().process(**settings)
+        first_calls = len(calls)
+
+        # When
+        result = TestQueuedImages().process(**settings)
+
+        # Then
+        assert first_calls > 0
+        assert len(calls) == first_calls
+        assert result == expected
+
+    def test_settings_change_converts(self, tmp_path):
+        # Given
+        TestQueuedImages().process(converted_image_cache_dir=str(tmp_path))
+
+        # When
+        html, images, cover, cover_image = TestQueuedImages().process(
+            converted_image_cache_dir=str(tmp_path), grayscale_images='true')
+
+        # Then
+        assert len(os.listdir(str(tmp_path))) == 8
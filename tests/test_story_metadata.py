@@ -0,0 +1,144 @@
+import pytest
+
+from fanficfare.configurable import Configuration
+from fanficfare.story import Story
+
+
+def make_story(ini=''):
+    configuration = Configuration(['test1.com'], 'EPUB')
+    configuration.read_string('[overrides]\n' + ini)
+    story = Story(configuration)
+    story.setMetadata('title', 'A Title')
+    story.setMetadata('author', 'Author')
+    story.setMetadata('authorUrl', 'https://test1.com/a')
+    story.setMetadata('storyUrl', 'https://test1.com/s')
+    story.addToList('category', 'Buffy')
+    story.addToList('genre', 'Drama')
+    return story
+
+
+class TestMetadataInvalidation:
+    def test_include_in_dependency(self):
+        # Given
+        story = make_story('include_in_genre:category,genre\n')
+        assert story.getList('genre') == ['Buffy', 'Drama']
+        title_cache = story.metadata_cache.processed_metadata_cache.get('title')
+
+        # When
+        story.addToList('category', 'Angel')
+
+        # Then
+        assert story.getList('genre') == ['Angel', 'Buffy', 'Drama']
+        assert story.metadata_cache.processed_metadata_cache.get('title') == title_cache
+
+    def test_list_conditional_dependency(self):
+        # Given
+        story = make_story('replace_metadata:\n genre=>Drama=>Angst&&category_LIST=~Buffy\n')
+        assert story.getList('genre') == ['Angst']
+
+        # When
+        story.setMetadata('category', 'Angel')
+
+        # Then
+        assert story.getList('genre') == ['Drama']
+
+    def test_include_in_loop(self):
+        # Given
+        story = make_story('include_in_genre:category,genre\ninclude_in_category:genre,category\n')
+        story.getList('genre')
+
+        # When
+        story.addToList('category', 'Angel')
+
+        # Then
+        assert story.getList('genre') == ['Angel', 'Buffy', 'Drama']
+        assert story.getList('category') == ['Angel', 'Buffy', 'Drama']
+
+    def test_title_chapter_range(self):
+        # Given
+        story = make_story('title_chapter_range_pattern:${title} (Ch ${first}-${last})\n')
+        story.setMetadata('numChapters', 10)
+        story.set_chapters_range(first='2')
+        assert story.getMetadata('title') == 'A Title (Ch 2-10)'
+
+        # When
+        story.setMetadata('numChapters', 12)
+
+        # Then
+        assert story.getMetadata('title') == 'A Title (Ch 2-12)'
+
+
+class TestAllMetadataSnapshot:
+    @pytest.fixture
+    def story(self, monkeypatch):
+        story = make_story()
+        self.calls = []
+        real_getMetadata = story.getMetadata
+
+        def getMetadata(key, *args, **kargs):
+            self.calls.append(key)
+            return real_getMetadata(key, *args, **kargs)
+        monkeypatch.setattr(story, 'getMetadata', getMetadata)
+        return story
+
+    def test_snapshot_reused(self, story):
+        # Given
+        first = story.getAllMetadata()
+        self.calls[:] = []
+
+        # When
+        second = story.getAllMetadata()
+
+        # Then
+        assert second == first
+        assert second is not first
+        assert self.calls == []
+
+    def test_same_value_keeps_snapshot(self, story):
+        # Given
+        story.getAllMetadata()
+        self.calls[:] = []
+
+        # When
+        story.setMetadata('title', 'A Title')
+        story.addToList('category', 'Buffy')
+        story.getAllMetadata()
+
+        # Then
+        assert self.calls == []
+
+    def test_change_refreshes(self, story):
+        # Given
+        story.getAllMetadata()
+
+        # When
+        story.setMetadata('title', 'New Title')
+        allmeta = story.getAllMetadata()
+
+        # Then
+        assert allmeta['title'] == 'New Title'
+        assert '>New Title</a>' in allmeta['titleHTML']
+
+    def test_keyed_by_args(self, story):
+        # Given
+        story.addToList('genre', 'Humor')
+
+        # When
+        joined = story.getAllMetadata()
+        lists = story.getAllMetadata(keeplists=True)
+
+        # Then
+        assert joined['genre'] == 'Drama, Humor'
+        assert lists['genre'] == ['Drama', 'Humor']
+
+    def test_lists_copied(self, story):
+        # Given
+        story.addToList('genre', 'Humor')
+        lists = story.getAllMetadata(keeplists=True)
+
+        # When
+        lists['genre'].append('Changed')
+
+        # Then
+        assert story.getAllMetadata(keeplists=True)['genre'] == ['Drama', 'Humor']
+        assert story.getList('genre') == ['Drama', 'Humor']
@@ -0,0 +1,135 @@
+import random
+
+import pytest
+
+from fanficfare.configurable import Configuration
+from fanficfare.six import string_types as basestring
+from fanficfare.story import Story, SPLIT_META
+
+KEYS = ['genre', 'category', 'characters', 'status', 'rating']
+WORDS = ['Drama', 'Humor', 'Angst', 'Buffy', 'Angel', 'Xander', 'Willow',
+         'Completed', 'In-Progress', 'Teen', 'Adult']
+
+
+class LinearStory(Story):
+    '''
+    Story with doReplacements as it was before rules were indexed by
+    key, every line checked for every value.
+    '''
+    def doReplacements(self, value, key, return_list=False, seen_list={}):
+        self.prepare_replacements()
+
+        value = self.do_in_ex_clude('include_metadata_pre', value, key, seen_list)
+        value = self.do_in_ex_clude('exclude_metadata_pre', value, key, seen_list)
+
+        retlist = [value]
+        for replaceline in self.replacements:
+            (repl_line, metakeys, regexp, replacement, cond_match) = replaceline
+            if (metakeys == None or key in metakeys) \
+                    and isinstance(value, basestring) \
+                    and regexp.search(value):
+                if repl_line in seen_list:
+                    continue
+                doreplace = True
+                if cond_match and cond_match.key() != key:
+                    new_seen_list = dict(seen_list)
+                    new_seen_list[repl_line] = True
+                    condval = self.getMetadataForConditional(cond_match.key(), seen_list=new_seen_list)
+                    doreplace = condval != None and cond_match.is_match(condval)
+
+                if doreplace:
+                    if SPLIT_META in replacement:
+                        retlist = []
+                        for splitrepl in replacement.split(SPLIT_META):
+                            tval = regexp.sub(splitrepl, value)
+                            new_seen_list = dict(seen_list)
+                            new_seen_list[repl_line] = True
+                            retlist.extend(self.doReplacements(tval, key,
+                                                               return_list=True,
+                                                               seen_list=new_seen_list))
+                        break
+                    else:
+                        value = regexp.sub(replacement, value)
+                        retlist = [value]
+
+        for val in retlist:
+            retlist = [self.do_in_ex_clude('include_metadata_post', x, key=key, seen_list=seen_list) for x in retlist]
+            retlist = [self.do_in_ex_clude('exclude_metadata_post', x, key=key, seen_list=seen_list) for x in retlist]
+
+        if return_list:
+            return retlist
+        else:
+            return self.join_list(key, retlist)
+
+
+def random_rule(rnd):
+    parts = []
+    if rnd.random() < 0.8:
+        parts.append(','.join(rnd.sample(KEYS, rnd.randint(1, 2))))
+    parts.append(rnd.choice(WORDS[:7] + ['^A', 'er$', 'l+']))
+    if rnd.random() < 0.15:
+        parts.append(SPLIT_META.join(rnd.sample(WORDS, 2)))
+    else:
+        parts.append(rnd.choice(WORDS))
+    rule = '=>'.join(parts)
+    if rnd.random() < 0.3:
+        condkey = rnd.choice(KEYS)
+        if rnd.random() < 0.3:
+            condkey += '_LIST'
+        rule += '&&%s%s%s' % (condkey,
+                               rnd.choice(['=~', '==', '!~', '!=']),
+                               rnd.choice(WORDS))
+    return rule
+
+
+def make_stories(rnd, count):
+    rules = [random_rule(rnd) for i in range(count)]
+    ini = '[overrides]\nreplace_metadata:\n' + ''.join(' %s\n' % r for r in rules)
+    ini += 'exclude_metadata_post:\n rating=~^Adult$&&status==Completed\n'
+    stories = []
+    for cls in (LinearStory, Story):
+        configuration = Configuration(['test1.com'], 'EPUB')
+        configuration.read_string(ini)
+        stories.append(cls(configuration))
+    return stories
+
+
+def all_values(story):
+    return dict((key, story.getList(key)) for key in KEYS)
+
+
+class TestIndexedReplacements:
+    @pytest.mark.parametrize('seed', range(6))
+    def test_same_as_linear(self, seed):
+        # Given
+        rnd = random.Random(seed)
+        linear, indexed = make_stories(rnd, 150)
+
+        for step in range(8):
+            # When
+            key = rnd.choice(KEYS)
+            values = rnd.sample(WORDS, rnd.randint(1, 3))
+            for story in (linear, indexed):
+                story.extendList(key, values)
+
+            # Then
+            assert all_values(indexed) == all_values(linear)
+
+    def test_memo_not_used_for_conditional(self):
+        # Given
+        configuration = Configuration(['test1.com'], 'EPUB')
+        configuration.read_string('[overrides]\nreplace_metadata:\n'
+                                  ' genre=>Drama=>Angst&&status==Completed\n'
+                                  ' category=>Buffy=>BtVS\n')
+        story = Story(configuration)
+        story.setMetadata('status', 'In-Progress')
+        assert story.doReplacements('Drama', 'genre') == 'Drama'
+        assert story.doReplacements('Buffy', 'category') == 'BtVS'
+
+        # When
+        story.setMetadata('status', 'Completed')
+
+        # Then
+        assert story.doReplacements('Drama', 'genre') == 'Angst'
+        assert ('category', 'Buffy', frozenset()) in story.replacements_memo
+        assert not any(k[0] == 'genre' for k in story.replacements_memo)
@@ -0,0 +1,235 @@
+import random
+import re
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from zipfile import ZipFile, ZIP_STORED, ZIP_DEFLATED
+
+import pytest
+from PIL import Image
+
+from fanficfare import adapters, writers
+from fanficfare.configurable import Configuration
+from fanficfare.story import get_img_pool
+from fanficfare.writers.writer_epub import EpubEntries, XMLBuilder
+
+from tests.fixtures_writer_epub import epub_xml_cases
+
+
+class Unseekable(object):
+    '''
+    Write only stream, like a pipe.
+    '''
+    def __init__(self):
+        self.out = BytesIO()
+
+    def write(self, data):
+        return self.out.write(data)
+
+    def flush(self):
+        pass
+
+    def seekable(self):
+        return False
+
+    def tell(self):
+        raise OSError('unseekable')
+
+    def seek(self, *args):
+        raise OSError('unseekable')
+
+
+def write_epub(sid, ini, out=None):
+    configuration = Configuration(['test1.com'], 'epub')
+    configuration.read_string('[overrides]\nslow_down_sleep_time:0\n' + ini)
+    adapter = adapters.getAdapter(configuration, 'http://test1.com?sid=%s' % sid)
+    adapter.getStory()
+    if out is None:
+        out = BytesIO()
+    writers.getWriter('epub', configuration, adapter).writeStory(outstream=out)
+    return out
+
+
+def epub_xml(sid, ini):
+    with ZipFile(write_epub(sid, ini)) as epub:
+        return dict((name, re.sub(br'\d{4}-\d\d-\d\d(T[\d:]*Z?)?', b'DATE', epub.read(name)))
+                    for name in ('META-INF/container.xml', 'content.opf', 'toc.ncx', 'nav.xhtml')
+                    if name in epub.namelist())
+
+
+@pytest.fixture
+def cover(tmp_path):
+    path = tmp_path / 'cover.png'
+    Image.new('RGB', (400, 600), 'blue').save(str(path))
+    return path.as_uri()
+
+
+class TestEpubXml:
+    @pytest.mark.parametrize('sid,ini,expected', epub_xml_cases)
+    def test_same_as_minidom(self, sid, ini, expected, cover):
+        # When
+        result = epub_xml(sid, ini % {'cover': cover})
+
+        # Then
+        assert result == expected
+
+
+class TestXMLBuilder:
+    def test_elements(self):
+        # Given
+        xml = XMLBuilder()
+
+        # When
+        xml.start('root', {'b': '1', 'a': 'x"&<>'})
+        xml.start('empty')
+        xml.end('empty')
+        xml.tag('none', {'id': 'n'})
+        xml.tag('blank', text='')
+        xml.tag('text', text=u'a & b < c > "d" 女 \ud800')
+        xml.end('root')
+
+        # Then
+        assert xml.toxml() == (b'<?xml version="1.0" encoding="utf-8"?>'
+                               b'<root b="1" a="x&quot;&amp;&lt;&gt;">'
+                               b'<empty/><none id="n"/><blank></blank>'
+                               b'<text>a &amp; b &lt; c &gt; &quot;d&quot; \xe5\xa5\xb3 &#55296;</text>'
+                               b'</root>')
+
+
+def zip_entries(ini, cover, out=None):
+    out = write_epub('12', 'include_images:true\ninclude_logpage:true\n'
+                     'default_cover_image:%s\n%s' % (cover, ini), out)
+    if isinstance(out, Unseekable):
+        out = BytesIO(out.out.getvalue())
+    with ZipFile(out) as epub:
+        assert epub.testzip() is None
+        ## test1 chapters include the time they were fetched.
+        return [(i.filename, i.compress_type, i.create_system,
+                 re.sub(br'\d\d:\d\d:\d\d', b'', epub.read(i))
+                 if i.filename.startswith('OEBPS/file') else (i.CRC, i.compress_size))
+                for i in epub.infolist()]
+
+
+class TestEpubCompression:
+    def test_images_stored(self, cover):
+        # When
+        entries = zip_entries('', cover)
+
+        # Then
+        types = dict((e[0], e[1]) for e in entries)
+        assert types['mimetype'] == ZIP_STORED
+        assert types['OEBPS/images/cover.jpg'] == ZIP_STORED
+        assert types['content.opf'] == ZIP_DEFLATED
+        assert types['OEBPS/file0001.xhtml'] == ZIP_DEFLATED
+
+    def test_images_deflated(self, cover):
+        # When
+        entries = zip_entries('epub_deflate_images:true\n', cover)
+
+        # Then
+        assert dict((e[0], e[1]) for e in entries)['OEBPS/images/cover.jpg'] == ZIP_DEFLATED
+
+    @pytest.mark.parametrize('ini', ['', 'epub_compression_level:1\n', 'epub_compression_level:9\n'])
+    def test_threads_same(self, ini, cover):
+        # Given
+        expected = zip_entries(ini, cover)
+
+        # When
+        result = zip_entries(ini + 'epub_compress_threads:4\n', cover)
+
+        # Then
+        assert result == expected
+        assert all(e[2] == 0 for e in result)
+
+    def test_level(self, cover):
+        # When
+        fast = dict((e[0], e[3]) for e in zip_entries('epub_compression_level:1\n', cover))
+        small = dict((e[0], e[3]) for e in zip_entries('epub_compression_level:9\n', cover))
+
+        # Then
+        assert fast['content.opf'][1] > small['content.opf'][1]
+        assert fast['content.opf'][0] == small['content.opf'][0]
+
+    def test_unseekable_outstream(self, cover):
+        # Given
+        expected = zip_entries('epub_compress_threads:4\n', cover)
+
+        # When
+        result = zip_entries('epub_compress_threads:4\n', cover, Unseekable())
+
+        # Then
+        assert result == expected
+
+    @pytest.mark.parametrize('unseekable', [False, True])
+    def test_written_epub_round_trip(self, unseekable, cover):
+        # Given
+        ini = ('include_images:true\ninclude_logpage:true\ndefault_cover_image:%s\n' % cover)
+        with ZipFile(write_epub('12', ini + 'epub_compress_threads:0\n')) as epub:
+            expected = dict((name, epub.read(name)) for name in epub.namelist())
+
+        # When
+        out = write_epub('12', ini + 'epub_compress_threads:4\n',
+                         Unseekable() if unseekable else None)
+
+        # Then
+        out = out.out if unseekable else out
+        with ZipFile(BytesIO(out.getvalue())) as epub:
+            assert epub.testzip() is None
+            assert epub.namelist() == list(expected)
+            ## test1 chapters and the log page include the time.
+            times = re.compile(br'\d\d:\d\d:\d\d|\d{4}-\d\d-\d\d(T[\d:]*Z?)?')
+            for name in epub.namelist():
+                assert times.sub(b'', epub.read(name)) == times.sub(b'', expected[name]), name
+
+    @pytest.mark.parametrize('unseekable', [False, True])
+    @pytest.mark.parametrize('threads', [0, 4])
+    def test_round_trip(self, unseekable, threads):
+        # Given
+        stream = Unseekable() if unseekable else BytesIO()
+        epubzip = ZipFile(stream, 'w', compression=ZIP_DEFLATED)
+        entries = EpubEntries(epubzip, stream, 6,
+                              get_img_pool(ThreadPoolExecutor, threads) if threads else None)
+        rand = random.Random(threads)
+        files = [('mimetype', b'application/epub+zip', None, ZIP_DEFLATED),
+                 ('OEBPS/images/cover.jpg', bytes(bytearray(rand.getrandbits(8) for _ in range(5000))),
+                  'image/jpeg', ZIP_STORED)]
+        files += [('OEBPS/file%04d.xhtml' % i, u'<p>chapter %d 女</p>'.encode('utf-8') * (i * 500),
+                   None, ZIP_DEFLATED) for i in range(8)]
+        files.insert(5, ('OEBPS/images/img1.png', b'\x89PNG' + files[1][1], 'image/png', ZIP_STORED))
+
+        # When
+        for (name, data, mime, compress_type) in files:
+            entries.writestr(name, data, mime=mime)
+        entries.flush()
+        epubzip.close()
+
+        # Then
+        out = stream.out if unseekable else stream
+        with ZipFile(BytesIO(out.getvalue())) as epub:
+            assert epub.testzip() is None
+            assert [(i.filename, i.compress_type) for i in epub.infolist()] == \
+                [(name, compress_type) for (name, data, mime, compress_type) in files]
+            for (name, data, mime, compress_type) in files:
+                assert epub.read(name) == data
+
+    @pytest.mark.parametrize('threads', [0, 4])
+    def test_unseekable_zip(self, threads):
+        # Given
+        stream = Unseekable()
+        epubzip = ZipFile(stream, 'w', compression=ZIP_DEFLATED)
+        entries = EpubEntries(epubzip, stream, 9,
+                              get_img_pool(ThreadPoolExecutor, threads) if threads else None)
+        files = [('file%d.xhtml' % i, b'chapter text %d ' % i * 1000) for i in range(10)]
+
+        # When
+        for (name, data) in files:
+            entries.writestr(name, data)
+        entries.writestr('cover.jpg', b'jpeg', mime='image/jpeg')
+        entries.flush()
+        epubzip.close()
+
+        # Then
+        with ZipFile(BytesIO(stream.out.getvalue())) as epub:
+            assert epub.testzip() is None
+            assert [(i.filename, i.compress_type) for i in epub.infolist()] == \
+                [(name, ZIP_DEFLATED) for (name, data) in files] + [('cover.jpg', ZIP_STORED)]
+            assert [epub.read(name) for (name, data) in files] == [data for (name, data) in files]
@@ -0,0 +1,82 @@
+import random
+import re
+from io import BytesIO
+from textwrap import wrap
+
+import pytest
+
+from fanficfare import adapters, writers
+from fanficfare.configurable import Configuration
+from fanficfare.writers.writer_txt import TextWriter
+
+
+def reference_wraplines(text, width):
+    '''
+    TextWriter.wraplines as it was, adding to a string.
+    '''
+    result = ''
+    for para in text.split("\n"):
+        first = True
+        for line in wrap(para, width):
+            if first:
+                first = False
+            else:
+                result += u"\n"
+            result += line
+        result += u"\n"
+    return result
+
+
+def random_text(seed):
+    rnd = random.Random(seed)
+    words = ['a', 'word', 'longerwordthanmost', u'女性', '\t', ' ', '', '\n', '\n\n']
+    return ''.join(rnd.choice(words) + rnd.choice(['', ' ']) for i in range(rnd.randint(0, 300)))
+
+
+def write_txt(ini, wraplines=None):
+    configuration = Configuration(['test1.com'], 'txt')
+    configuration.read_string('[overrides]\nslow_down_sleep_time:0\n' + ini)
+    adapter = adapters.getAdapter(configuration, 'http://test1.com?sid=1')
+    adapter.getStory()
+    writer = writers.getWriter('txt', configuration, adapter)
+    if wraplines:
+        ## one write of each whole wrapped piece, as it was.
+        writer.writewrapped = lambda out, text: writer._write(out, writer.lineends(wraplines(writer, text)))
+    out = BytesIO()
+    writer.writeStory(outstream=out)
+    ## test1 chapters include the time they were fetched.
+    return re.sub(br'\d\d:\d\d:\d\d', b'', out.getvalue())
+
+
+class TestWrapLines:
+    @pytest.mark.parametrize('width', [1, 5, 20, 78])
+    def test_same_as_reference(self, width):
+        writer = TextWriter.__new__(TextWriter)
+        writer.wrap_width = width
+        for seed in range(30):
+            # Given
+            text = random_text(seed)
+
+            # When
+            result = writer.wraplines(text)
+
+            # Then
+            assert result == reference_wraplines(text, width), repr(text)
+
+
+class TestTextWriter:
+    @pytest.mark.parametrize('ini', ['wrap_width:0\n',
+                                     'wrap_width:30\nwindows_eol:true\n',
+                                     'wrap_width:50\ninclude_tocpage:always\n'
+                                     'chapter_start:${title} ${chapter} &amp; x\n'])
+    def test_same_output(self, ini):
+        # Given
+        expected = write_txt(ini, lambda writer, text: reference_wraplines(text, writer.wrap_width)
+                             if writer.wrap_width else text)
+
+        # When
+        result = write_txt(ini)
+
+        # Then
+        assert result == expected
+        assert (b'\r\n' in result) == ('windows_eol' in ini)